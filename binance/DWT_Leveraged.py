@@ -29,6 +29,8 @@ import re
 
 
 import custom_indicators as cta
+from candle_cache import CandleCache
+from informative_cache import InformativeCache
 
 import pywt
 
@@ -140,6 +142,8 @@ class DWT_Leveraged(IStrategy):
     # Strategy Specific Variable Storage
     dwt_window = startup_candle_count
     custom_trade_info = {}
+    candle_cache = CandleCache()  # last candle of each pair, for the custom exit/stoploss functions
+    informative_cache = InformativeCache()  # populated informative dataframes of the underlying pairs
     custom_fiat = "USDT"  # Only relevant if stake is BTC or ETH
 
     ############################################################################
@@ -183,14 +187,11 @@ class DWT_Leveraged(IStrategy):
             inf_slow = self.dp.get_pair_dataframe(pair=inf_pair, timeframe=self.inf_timeframe)
             inf_fast = self.dp.get_pair_dataframe(pair=inf_pair, timeframe=self.timeframe)
 
-            # DWT
-
-            inf_slow['dwt_model'] = inf_slow['close'].rolling(window=self.dwt_window).apply(self.model)
-
-            # trend (in informative)
-            inf_fast['candle-up'] = np.where(inf_fast['close'] >= inf_fast['open'], 1, 0)
-            inf_fast['candle-up-trend'] = np.where(inf_fast['candle-up'].rolling(5).sum() >= 3, 1, 0)
-            inf_fast['candle-dn-trend'] = np.where(inf_fast['candle-up'].rolling(5).sum() <= 2, 1, 0)
+            # indicators are calculated from the underlying pair, so are the same for the BULL and BEAR tokens
+            inf_slow = self.informative_cache.get_dataframe(inf_pair, self.inf_timeframe, inf_slow,
+                                                            self.populate_slow_informative)
+            inf_fast = self.informative_cache.get_dataframe(inf_pair, self.timeframe, inf_fast,
+                                                            self.populate_fast_informative)
 
             # merge into normal timeframe
             dataframe = merge_informative_pair(dataframe, inf_slow, self.timeframe, self.inf_timeframe, ffill=True)
@@ -265,6 +266,26 @@ class DWT_Leveraged(IStrategy):
 
     ###################################
 
+    # indicators for the underlying pair (informative timeframe)
+    def populate_slow_informative(self, inf_slow: DataFrame) -> DataFrame:
+
+        # DWT
+        inf_slow['dwt_model'] = inf_slow['close'].rolling(window=self.dwt_window).apply(self.model)
+
+        return inf_slow
+
+    # indicators for the underlying pair (strategy timeframe)
+    def populate_fast_informative(self, inf_fast: DataFrame) -> DataFrame:
+
+        # trend (in informative)
+        inf_fast['candle-up'] = np.where(inf_fast['close'] >= inf_fast['open'], 1, 0)
+        inf_fast['candle-up-trend'] = np.where(inf_fast['candle-up'].rolling(5).sum() >= 3, 1, 0)
+        inf_fast['candle-dn-trend'] = np.where(inf_fast['candle-up'].rolling(5).sum() <= 2, 1, 0)
+
+        return inf_fast
+
+    ###################################
+
     def madev(self, d, axis=None):
         """ Mean absolute deviation of a signal """
         return np.mean(np.absolute(d - np.mean(d, axis)), axis)
@@ -480,8 +501,8 @@ class DWT_Leveraged(IStrategy):
     def custom_stoploss(self, pair: str, trade: 'Trade', current_time: datetime, current_rate: float,
                         current_profit: float, **kwargs) -> float:
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         in_trend = self.custom_trade_info[trade.pair]['had-trend']
 
@@ -513,8 +534,8 @@ class DWT_Leveraged(IStrategy):
     def custom_exit_long(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                              current_profit: float, **kwargs):
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         max_profit = max(0.0, trade.calc_profit_ratio(trade.max_rate))
@@ -576,8 +597,8 @@ class DWT_Leveraged(IStrategy):
     def custom_exit_short(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                     current_profit: float, **kwargs):
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         max_profit = max(0.0, trade.calc_profit_ratio(trade.max_rate))
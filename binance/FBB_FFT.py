@@ -33,6 +33,7 @@ log = logging.getLogger(__name__)
 warnings.simplefilter(action='ignore', category=pd.errors.PerformanceWarning)
 
 import custom_indicators as cta
+import windowed_models as wm
 
 import pywt
 
@@ -161,7 +162,11 @@ class FBB_FFT(IStrategy):
 
         # dataframe['fft_model'] = dataframe['close'].rolling(window=self.buy_fft_window.value).apply(self.model)
         # informative['fft_lookahead'] = informative['close'].rolling(window=self.buy_fft_window.value).apply(self.predict)
-        informative['fft_lookahead'] = informative['close'].rolling(window=self.fft_window).apply(self.predict)
+        if self.fft_lookahead == 0:
+            informative['fft_lookahead'] = wm.rolling_model(informative['close'], self.fft_window, self.batchModel,
+                                                            scale=False)
+        else:
+            informative['fft_lookahead'] = informative['close'].rolling(window=self.fft_window).apply(self.predict)
 
 
         # merge into normal timeframe
@@ -235,6 +240,10 @@ class FBB_FFT(IStrategy):
         length = len(model)
         return model[length-1]
 
+    # batched version of predict() (no lookahead). data is a 2D array of windows, returns the last sample of each
+    def batchModel(self, data: np.ndarray) -> np.ndarray:
+        return wm.fft_lowpass_model(data, cutoff=self.buy_fft_cutoff.value)
+
     def fourierModel(self, x):
 
         n = x.size
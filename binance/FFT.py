@@ -33,6 +33,7 @@ log = logging.getLogger(__name__)
 warnings.simplefilter(action='ignore', category=pd.errors.PerformanceWarning)
 
 import custom_indicators as cta
+import windowed_models as wm
 
 
 
@@ -143,7 +144,7 @@ class FFT(IStrategy):
 
         # FFT
 
-        informative['fft_predict'] = informative['close'].rolling(window=self.fft_window).apply(self.model)
+        informative['fft_predict'] = wm.rolling_model(informative['close'], self.fft_window, wm.fft_model)
 
         # merge into normal timeframe
         dataframe = merge_informative_pair(dataframe, informative, self.timeframe, self.inf_timeframe, ffill=True)
@@ -0,0 +1,78 @@
+
+# checks that NostalgiaForInfinityX.merge_btc_informative() gives the same result as merge_informative_pair(...,
+# ffill=True), including when the BTC indicators have missing values (NaN) mid-series, and when the pair starts later
+# than the BTC data or has gaps
+
+import numpy as np
+import pandas as pd
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from freqtrade.strategy import merge_informative_pair
+
+from NostalgiaForInfinityX import NostalgiaForInfinityX
+
+
+# minimal data provider, just returns the BTC data
+class TestDataProvider():
+
+    def __init__(self, btc_dataframes):
+        self.btc_dataframes = btc_dataframes
+
+    def get_pair_dataframe(self, pair, timeframe):
+        return self.btc_dataframes[timeframe]
+
+
+def make_candles(start, periods, freq, rng):
+    dates = pd.date_range(start, periods=periods, freq=freq, tz='UTC')
+    close = 100.0 + np.cumsum(rng.standard_normal(periods))
+    return pd.DataFrame({'date': dates, 'open': close, 'high': close + 1.0, 'low': close - 1.0, 'close': close,
+                         'volume': rng.random(periods) * 1000.0})
+
+
+# BTC indicators with missing values (including a run of them, and a whole NaN column)
+def btc_indicators(dataframe, metadata):
+    dataframe['btc_ind'] = dataframe['close'].rolling(3).mean()
+    dataframe.loc[dataframe.index[10:13], 'btc_ind'] = np.nan
+    dataframe.loc[dataframe.index[25], 'btc_ind'] = np.nan
+    dataframe['btc_flag'] = (dataframe['close'] > dataframe['open'].shift(1)).astype(float)
+    dataframe.loc[dataframe.index[::7], 'btc_flag'] = np.nan
+    dataframe['btc_empty'] = np.nan
+    return dataframe
+
+
+def reference_merge(dataframe, btc_dataframe, timeframe, timeframe_inf):
+    informative = btc_indicators(btc_dataframe.copy(), {})
+    merged = merge_informative_pair(dataframe, informative, timeframe, timeframe_inf, ffill=True)
+    drop_columns = [f"{s}_{timeframe_inf}" for s in ['date', 'open', 'high', 'low', 'close', 'volume']]
+    return merged.drop(columns=merged.columns.intersection(drop_columns))
+
+
+if __name__ == '__main__':
+
+    rng = np.random.default_rng(0)
+    timeframe = '5m'
+    btc_dataframes = {
+        '5m': make_candles('2023-01-01', 2000, '5min', rng),
+        '1h': make_candles('2023-01-01', 200, '1h', rng),
+        '1d': make_candles('2022-12-01', 40, '1D', rng),
+    }
+
+    # pair starts after BTC, and has a gap
+    pair_dataframe = make_candles('2023-01-01 03:00', 1500, '5min', rng)
+    pair_dataframe = pair_dataframe.drop(pair_dataframe.index[300:340]).reset_index(drop=True)
+
+    strategy = NostalgiaForInfinityX.__new__(NostalgiaForInfinityX)
+    strategy.dp = TestDataProvider(btc_dataframes)
+    strategy.timeframe = timeframe
+    strategy.btc_info_cache = {}
+
+    for timeframe_inf in ['5m', '1h', '1d']:
+        expected = reference_merge(pair_dataframe, btc_dataframes[timeframe_inf], timeframe, timeframe_inf)
+        result = strategy.merge_btc_informative(pair_dataframe, 'BTC/USDT', timeframe_inf, btc_indicators,
+                                                {'pair': 'ETH/USDT'})
+        pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+        print(f"{timeframe_inf}: OK ({result[f'btc_ind_{timeframe_inf}'].isna().sum()} leading NaNs)")
@@ -0,0 +1,43 @@
+# Cache of populated informative dataframes, shared between pairs
+#
+# The leveraged strategies trade tokens such as BTC3L/USDT and BTC3S/USDT, but calculate their indicators from the
+# underlying pair (BTC/USDT), so the BULL and BEAR tokens populate exactly the same informative dataframes.
+# InformativeCache keeps the latest populated dataframe for each (underlying) pair and timeframe, so it only has to
+# be calculated once per candle, and the other token(s) just get a copy.
+#
+# An entry is reused while the source dataframe is unchanged, which is detected using its length, first & last dates
+# and the last close.
+#
+# Usage:
+#   inf_slow = self.dp.get_pair_dataframe(pair=inf_pair, timeframe=self.inf_timeframe)
+#   inf_slow = self.informative_cache.get_dataframe(inf_pair, self.inf_timeframe, inf_slow, self.populate_slow)
+
+from pandas import DataFrame
+
+
+class InformativeCache():
+
+    entries = {}  # (pair, timeframe) -> entry
+
+    def __init__(self):
+        super().__init__()
+        self.entries = {}
+
+    # returns the populated dataframe. populate(dataframe) is only called if there is no entry for the current data
+    def get_dataframe(self, pair: str, timeframe: str, dataframe: DataFrame, populate) -> DataFrame:
+        key = self.get_key(dataframe)
+        entry = self.entries.get((pair, timeframe))
+        if (entry is None) or (entry['key'] != key):
+            entry = {'key': key, 'dataframe': populate(dataframe)}
+            self.entries[(pair, timeframe)] = entry
+
+        # merge_informative_pair() renames the columns of the informative dataframe, so always return a copy
+        return entry['dataframe'].copy()
+
+    def get_key(self, dataframe: DataFrame):
+        if len(dataframe) == 0:
+            return (0, None, None, None)
+        return (len(dataframe), dataframe['date'].iloc[0], dataframe['date'].iloc[-1], dataframe['close'].iloc[-1])
+
+    def clear(self):
+        self.entries = {}
@@ -96,6 +96,9 @@ from AnomalyDetector_Ensemble import AnomalyDetector_Ensemble
 
 from DataframeUtils import DataframeUtils, ScalerType
 from DataframePopulator import DataframePopulator
+from CandleCache import CandleCache
+from ModelRegistry import get_model_registry
+from PredictionCache import PredictionCache
 
 """
 ####################################################################################
@@ -190,9 +193,24 @@ class Anomaly(IStrategy):
 
     curr_pair = ""
     custom_trade_info = {}
+    candle_cache = CandleCache()  # last candle of each pair, for the custom exit/stoploss functions
 
     compressor = None
     compress_data = True
+    # if set, only these indicators (plus the minimal set and signal_indicator_list) are calculated. None means all of
+    # the default indicators
+    indicator_list = None
+    # indicators used by get_train_buy_signals()/get_train_sell_signals() and save_debug_indicators(), including the
+    # future_* columns. Must be set for indicator_list to take effect, otherwise all indicators are calculated
+    signal_indicator_list = None
+
+    # commonly used indicators, added to the debug dataframe for viewing
+    dbg_indicator_list = [
+        'full_dwt', 'train_buy', 'train_sell',
+        'future_gain', 'future_min', 'future_max',
+        'future_profit_min', 'future_profit_max', 'future_profit_threshold',
+        'future_loss_min', 'future_loss_max', 'future_loss_threshold',
+    ]
     scaler_type = ScalerType.Robust # scaler type used for normalisation
 
     dataframeUtils = None
@@ -203,6 +221,15 @@ class Anomaly(IStrategy):
     sell_classifier = None
     buy_classifier_list = {}
     sell_classifier_list = {}
+    model_registry = None  # controls which models are kept in memory (see ModelRegistry)
+    model_memory_budget = 4 * 1024 * 1024 * 1024  # memory allowed for models (bytes, all pairs)
+
+    # live/dry runs: only predict the rows that were not in the previous dataframe. Off by default, because most of the
+    # anomaly detectors set their threshold from the scores of all of the rows being predicted, so predicting just a
+    # few rows gives different results. Only enable for classifiers that predict each row independently
+    use_tail_inference = False
+    max_tail_rows = 32  # if there are more new rows than this, just predict the whole dataframe
+    prediction_cache: PredictionCache = None  # predictions from previous candles (live/dry runs only)
 
     ignore_exit_signals = False # set to True if you don't want to process sell/exit signals (let custom sell do it)
 
@@ -401,7 +428,8 @@ class Anomaly(IStrategy):
             self.dataframePopulator.n_profit_stddevs = self.n_profit_stddevs
 
         # populate the normal dataframe
-        dataframe = self.dataframePopulator.add_indicators(dataframe)
+        dataframe = self.dataframePopulator.add_indicators(dataframe, pair=curr_pair, timeframe=self.timeframe,
+                                                           columns=self.get_indicator_columns())
         # dataframe = self.add_indicators(dataframe)
 
         if Anomaly.first_time:
@@ -413,6 +441,9 @@ class Anomaly(IStrategy):
 
             print("    Lookahead: ", self.curr_lookahead, " candles (", self.lookahead_hours, " hours)")
 
+            if (self.indicator_list is not None) and (self.signal_indicator_list is None):
+                print("    WARN: indicator_list ignored (signal_indicator_list not set). Using all indicators")
+
         print("")
         print(curr_pair)
 
@@ -475,14 +506,18 @@ class Anomaly(IStrategy):
 
         # future_df = self.add_future_data(dataframe.copy())
         future_df = self.dataframePopulator.add_hidden_indicators(dataframe.copy())
-        future_df = self.dataframePopulator.add_future_data(future_df, self.curr_lookahead)
+        future_df = self.dataframePopulator.add_future_data(future_df, self.curr_lookahead,
+                                                            columns=self.get_future_indicators())
 
         future_df['train_buy'] = 0.0
         future_df['train_sell'] = 0.0
 
         # use sequence trends as criteria
-        future_df['train_buy'] = self.get_train_buy_signals(future_df)
-        future_df['train_sell'] = self.get_train_sell_signals(future_df)
+        if self.check_signal_indicators(future_df):
+            future_df['train_buy'] = self.get_train_buy_signals(future_df)
+            future_df['train_sell'] = self.get_train_sell_signals(future_df)
+        else:
+            print("    ERROR: Missing indicators in dataframe")
 
         buys = future_df['train_buy'].copy()
         if buys.sum() < 3:
@@ -500,15 +535,10 @@ class Anomaly(IStrategy):
     def save_debug_data(self, future_df: DataFrame):
 
         # Debug support: add commonly used indicators so that they can be viewed
-        # the list below is available for any subclass. Subclasses themselves can add more by overriding
-        # the func save_debug_indicators()
+        # the list (dbg_indicator_list) is available for any subclass. Subclasses themselves can add more by
+        # overriding the func save_debug_indicators()
 
-        dbg_list = [
-            'full_dwt', 'train_buy', 'train_sell',
-            'future_gain', 'future_min', 'future_max',
-            'future_profit_min', 'future_profit_max', 'future_profit_threshold',
-            'future_loss_min', 'future_loss_max', 'future_loss_threshold',
-        ]
+        dbg_list = self.dbg_indicator_list
 
         if len(dbg_list) > 0:
             for indicator in dbg_list:
@@ -521,6 +551,29 @@ class Anomaly(IStrategy):
         pass
         return
 
+    # the indicators to be calculated by the dataframe populator (None means all of them)
+    def get_indicator_columns(self):
+        if (self.indicator_list is None) or (self.signal_indicator_list is None):
+            return None
+        return self.indicator_list + self.signal_indicator_list
+
+    # the indicators needed to create the training data (and debug data). Used so that add_future_data() only
+    # calculates the future data that is actually used (None means all of it)
+    def get_future_indicators(self):
+        if self.signal_indicator_list is None:
+            return None
+        return self.signal_indicator_list + self.dbg_indicator_list
+
+    # check that the indicators used by the training signals are present
+    def check_signal_indicators(self, future_df: DataFrame) -> bool:
+        result = True
+        if self.signal_indicator_list is not None:
+            for ind in self.signal_indicator_list:
+                if ind not in future_df.columns:
+                    result = False
+                    print(f"    ERROR: indicator not in dataframe: {ind}")
+        return result
+
     # adds an indicator to the main frame for debug (e.g. plotting). Column will be prefixed with '%', which will
     # cause it to be removed before normalisation and fitting of models
     def add_debug_indicator(self, future_df: DataFrame, indicator):
@@ -531,6 +584,23 @@ class Anomaly(IStrategy):
 
     ############################
 
+    # switch from the previous pair's classifier to the current one. The model registry keeps the model in memory
+    # while it is in use, and releases models of other pairs if needed
+    def switch_classifier(self, prev_classifier, classifier):
+        if self.model_registry is None:
+            self.model_registry = get_model_registry(self.model_memory_budget)
+
+        if classifier is prev_classifier:
+            return classifier
+
+        if prev_classifier is not None:
+            self.model_registry.release(prev_classifier)
+        if classifier is None:
+            return None
+        return self.model_registry.acquire(classifier)
+
+    ############################
+
     def get_classifier(self, nfeatures, tag):
         clf = None
         # clf_type = 4
@@ -614,17 +684,14 @@ class Anomaly(IStrategy):
         # create classifiers, if necessary
 
         if self.curr_pair not in self.buy_classifier_list:
-            self.buy_classifier = self.get_classifier(full_df_norm.shape[1], "Buy")
-            self.buy_classifier_list[self.curr_pair] = self.buy_classifier
-        else:
-            self.buy_classifier = self.buy_classifier_list[self.curr_pair]
+            self.buy_classifier_list[self.curr_pair] = self.get_classifier(full_df_norm.shape[1], "Buy")
+        self.buy_classifier = self.switch_classifier(self.buy_classifier, self.buy_classifier_list[self.curr_pair])
 
         if not self.ignore_exit_signals:
             if self.curr_pair not in self.sell_classifier_list:
-                self.sell_classifier = self.get_classifier(full_df_norm.shape[1], "Sell")
-                self.sell_classifier_list[self.curr_pair] = self.sell_classifier
-            else:
-                self.sell_classifier = self.sell_classifier_list[self.curr_pair]
+                self.sell_classifier_list[self.curr_pair] = self.get_classifier(full_df_norm.shape[1], "Sell")
+            self.sell_classifier = self.switch_classifier(self.sell_classifier,
+                                                          self.sell_classifier_list[self.curr_pair])
 
         # constrain sample size to what will be available in run modes
         data_size = int(min(975, full_df_norm.shape[0]))
@@ -759,18 +826,60 @@ class Anomaly(IStrategy):
 
         return compressor
 
+    # predictions are only cached in live/dry runs, where the dataframe moves on by one candle at a time
+    def use_prediction_cache(self) -> bool:
+        if not self.use_tail_inference:
+            return False
+        if self.dp.runmode.value not in ('live', 'dry_run'):
+            return False
+        if self.prediction_cache is None:
+            self.prediction_cache = PredictionCache()
+        return True
+
+    # predict only the rows that do not have a cached prediction (plus any earlier rows needed by sequence-based
+    # classifiers). Returns None if the whole dataframe needs to be predicted
+    def predict_tail(self, dataframe: DataFrame, pair, clf, name):
+        num_rows = self.prediction_cache.num_new_rows(pair, name, dataframe)
+        if (num_rows is None) or (num_rows > self.max_tail_rows):
+            return None
+
+        predict = []
+        if num_rows > 0:
+            # the scaler must be fitted on the whole dataframe (as for a full prediction), then only the tail is scaled
+            if not self.dataframeUtils.scaler_fitted:
+                self.dataframeUtils.norm_dataframe(dataframe)
+
+            seq_len = getattr(clf, 'seq_len', 1)
+            df_norm = self.dataframeUtils.norm_dataframe(dataframe.iloc[-(num_rows + seq_len - 1):])
+            if self.compress_data:
+                if self.compressor is None:
+                    return None
+                df_norm = self.compress_dataframe(df_norm)
+            predict = np.asarray(clf.predict(df_norm))[-num_rows:]
+
+        return self.prediction_cache.merge(pair, name, dataframe, predict)
+
     # make predictions for supplied dataframe (returns column)
-    def predict(self, dataframe: DataFrame, pair, clf):
+    # name identifies the classifier (buy/sell) for tail inference
+    def predict(self, dataframe: DataFrame, pair, clf, name=""):
 
         # predict = 0
         predict = None
 
         if clf:
-            # print("    predicting... - dataframe:", dataframe.shape)
-            df_norm = self.dataframeUtils.norm_dataframe(dataframe)
-            if self.compress_data:
-                df_norm = self.compress_dataframe(df_norm)
-            predict = clf.predict(df_norm)
+            use_cache = self.use_prediction_cache()
+            if use_cache:
+                predict = self.predict_tail(dataframe, pair, clf, name)
+
+            if predict is None:
+                # print("    predicting... - dataframe:", dataframe.shape)
+                df_norm = self.dataframeUtils.norm_dataframe(dataframe)
+                if self.compress_data:
+                    df_norm = self.compress_dataframe(df_norm)
+                predict = clf.predict(df_norm)
+
+            if use_cache:
+                self.prediction_cache.save(pair, name, dataframe, predict)
 
         else:
             print("Null CLF for pair: ", pair)
@@ -788,7 +897,7 @@ class Anomaly(IStrategy):
             return predict
 
         print("    predicting buys...")
-        predict = self.predict(df, pair, clf)
+        predict = self.predict(df, pair, clf, "buy")
 
         # anomaly detection tends to flag both buys and sells, so filter based on MFI
         predict = np.where((predict > 0) & (df['mfi'] < 50), 1.0, 0.0)
@@ -804,7 +913,7 @@ class Anomaly(IStrategy):
             return predict
 
         print("    predicting sells...")
-        predict = self.predict(df, pair, clf)
+        predict = self.predict(df, pair, clf, "sell")
 
         # anomaly detection tends to flag both buys and sells, so filter based on MFI
         predict = np.where((predict > 0) & (df['mfi'] > 50), 1.0, 0.0)
@@ -972,7 +1081,7 @@ class Anomaly(IStrategy):
         # self.set_state(pair, self.State.STOPLOSS)
 
         dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         in_trend = self.custom_trade_info[trade.pair]['had_trend']
 
@@ -1043,8 +1152,8 @@ class Anomaly(IStrategy):
 
         # Mod: just take the profit:
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         # Above 3%, sell if MFA > 90
         if current_profit > 0.03:
@@ -1067,8 +1176,8 @@ class Anomaly(IStrategy):
     def complex_custom_exit(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                             current_profit: float):
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         max_profit = max(0, trade.calc_profit_ratio(trade.max_rate))
@@ -1143,8 +1252,8 @@ class Anomaly(IStrategy):
 
     def simpler_custom_exit(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                             current_profit: float):
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         # Above 5% profit, sell
         if current_profit > 0.05:
@@ -111,6 +111,14 @@ class Anomaly_fbb(Anomaly):
 
     ###################################
 
+    # indicators used by the training signals (and debug indicators) below
+    signal_indicator_list = [
+        'fisher_wr', 'bb_gain', 'bb_loss',
+        'profit_threshold', 'loss_threshold',
+        'future_gain', 'future_profit_max', 'future_profit_threshold', 'future_loss_threshold',
+        'future_max', 'future_loss_min', 'future_min'
+    ]
+
     # override the default training signal generation
 
     def get_train_buy_signals(self, future_df: DataFrame):
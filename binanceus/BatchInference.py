@@ -0,0 +1,107 @@
+# Batched inference across pairs (live/dry runs)
+#
+# freqtrade analyses the pairs one at a time, and the NN strategies run a separate model.predict() for each pair, over
+# the whole dataframe, even though all pairs share the same model (unless model_per_pair is set). In live runs only
+# the latest candle is new, so most of the cost of each call is framework overhead.
+#
+# At the start of each bot loop (bot_loop_start() in the strategies), the strategy populates the pairs that are about
+# to be analysed and adds the latest window of each one to the batch. predict() then runs a single prediction over all
+# of the windows. When the pair is analysed (populate_indicators()), it gets:
+#   - the dataframe that was already populated (see get_dataframe())
+#   - predictions for the whole dataframe: the last row from the batch, earlier rows from the previous analysis of
+#     the pair (see get_predictions() and PredictionCache)
+# Everything is tagged with the date of the latest candle, so stale results are never used. If anything is missing,
+# the strategy just falls back to the normal (per pair) path.
+#
+# Usage:
+#   batch = BatchInference()
+#   batch.clear()
+#   batch.add_window(pair, dataframe, window)  # for each pair
+#   batch.predict("buy", classifier)
+#   ...
+#   predictions = batch.get_predictions(pair, "buy", dataframe, prediction_cache)
+#   if predictions is None:
+#       predictions = <full prediction>
+#   prediction_cache.save(pair, "buy", dataframe, predictions)
+
+import numpy as np
+from pandas import DataFrame
+
+from PredictionCache import PredictionCache
+
+
+class BatchInference():
+
+    windows = {}  # pair -> window (seq_len, nfeatures) for the latest candle
+    dataframes = {}  # pair -> populated dataframe
+    dates = {}  # pair -> date of the latest candle (of the current batch)
+    results = {}  # (pair, name) -> prediction for the latest candle
+
+    def __init__(self):
+        super().__init__()
+        self.windows = {}
+        self.dataframes = {}
+        self.dates = {}
+        self.results = {}
+
+    # start a new batch
+    def clear(self):
+        self.windows = {}
+        self.dataframes = {}
+        self.dates = {}
+        self.results = {}
+
+    # True if the latest candle has not yet been analysed
+    def needs_analysis(self, dataframe: DataFrame, analysed_df: DataFrame) -> bool:
+        if (dataframe is None) or (len(dataframe) == 0):
+            return False
+        if (analysed_df is None) or (len(analysed_df) == 0):
+            return True
+        return analysed_df['date'].iloc[-1] != dataframe['date'].iloc[-1]
+
+    # add a pair to the batch. dataframe is the populated dataframe, window the (normalised) input for the latest candle
+    # window can be None, in which case only the dataframe is saved
+    def add_window(self, pair, dataframe: DataFrame, window):
+        self.dates[pair] = dataframe['date'].iloc[-1]
+        self.dataframes[pair] = dataframe
+        if window is not None:
+            self.windows[pair] = window
+
+    # run the classifier over all of the windows in the batch
+    def predict(self, name, classifier):
+        if (classifier is None) or (len(self.windows) == 0):
+            return
+
+        pairs = list(self.windows.keys())
+        tensor = np.stack([self.windows[pair] for pair in pairs])
+        predictions = np.asarray(classifier.predict(tensor))
+        if len(predictions) != len(pairs):
+            print(f"    WARN: batch prediction returned {len(predictions)} results for {len(pairs)} pairs. Ignored")
+            return
+
+        for pair, prediction in zip(pairs, predictions):
+            self.results[(pair, name)] = prediction
+
+    # returns the dataframe populated for the batch, if it matches the supplied (unpopulated) dataframe
+    def get_dataframe(self, pair, dataframe: DataFrame):
+        populated = self.dataframes.pop(pair, None)
+        if (populated is None) or (len(populated) != len(dataframe)) or (len(dataframe) == 0):
+            return None
+        if populated['date'].iloc[-1] != dataframe['date'].iloc[-1]:
+            return None
+        return populated
+
+    # returns predictions for every row of the dataframe (the batch result for the latest row, the rest from the
+    # cache), or None if they are not all available
+    def get_predictions(self, pair, name, dataframe: DataFrame, cache: PredictionCache):
+        key = (pair, name)
+        if (key not in self.results) or (len(dataframe) == 0):
+            return None
+
+        if self.dates.get(pair) != dataframe['date'].iloc[-1]:
+            return None
+
+        if cache.num_new_rows(pair, name, dataframe) != 1:
+            return None
+
+        return cache.merge(pair, name, dataframe, [self.results.pop(key)])
@@ -74,7 +74,9 @@ os.environ['PYTHONHASHSEED'] = str(seed)
 random.seed(seed)
 np.random.seed(seed)
 
-from DataframeUtils import DataframeUtils
+from DataframeUtils import DataframeUtils, save_object, load_object
+from TimeSeriesBuilder import TimeSeriesBuilder
+from DartsBacktester import DartsBacktester
 
 
 # ---------------------------
@@ -102,6 +104,9 @@ class ClassifierDarts():
     new_model = False  # May not wrok for darts-based strats, so leave at False
 
     dataframeUtils = None
+    series_builder = None  # converts dataframes to (scaled) TimeSeries
+    backtester = None  # fast backtesting engine (see DartsBacktester)
+    use_fast_backtest = True  # set to False to backtest with darts historical_forecasts()
     requires_dataframes = True  # set to True if classifier takes dataframes rather than tensors
     prescale_dataframe = False  # set to True if algorithms need dataframes to be pre-scaled
     single_prediction = False  # True if algorithm only produces 1 prediction (not entire data array)
@@ -150,6 +155,10 @@ class ClassifierDarts():
         if self.dataframeUtils is None:
             self.dataframeUtils = DataframeUtils()
 
+        # training scalers are only reused if the model is specific to a pair (prices vary too much across pairs)
+        self.series_builder = TimeSeriesBuilder(self.target_column, reuse_scalers=self.model_per_pair)
+        self.backtester = DartsBacktester()
+
         # # the following should turn on hardware acceleration, if suported
         # torch.device("mps")
         # self.trainer = Trainer(accelerator='mps', devices=1)
@@ -232,6 +241,8 @@ class ClassifierDarts():
 
     def set_target_column(self, target_column):
         self.target_column = target_column
+        if self.series_builder is not None:
+            self.series_builder.target_column = target_column
 
     # ---------------------------
 
@@ -266,7 +277,8 @@ class ClassifierDarts():
                                            verbose=True)
         return preds
 
-    def model_predict(self, model, target_series, covariate_series):
+    # target_series and covariate_series can also be lists of series, in which case a list of predictions is returned
+    def model_predict(self, model, target_series, covariate_series, verbose=True):
 
         preds = model.predict(n=self.lookahead,
                               series=target_series,
@@ -274,7 +286,7 @@ class ClassifierDarts():
                               batch_size=self.batch_size,
                               # trainer=self.trainer,
                               # num_loader_workers=self.num_cpus,
-                              verbose=True)
+                              verbose=verbose)
 
         return preds
 
@@ -331,44 +343,12 @@ class ClassifierDarts():
             print(f'    df_test:{np.shape(df_test)} test_results:{np.shape(test_results)}')
             print("")
 
-        # convert time formats
-        df_train['date'] = pd.to_datetime(df_train.date).dt.tz_localize(None)
-        df_test['date'] = pd.to_datetime(df_test.date).dt.tz_localize(None)
-
-        # convert to timeseries
-        train_time_series = darts.TimeSeries.from_dataframe(df_train, time_col='date', fillna_value=0)
-        test_time_series = darts.TimeSeries.from_dataframe(df_test, time_col='date', fillna_value=0)
-
-        # convert results. Put into dataframe format first, because we need to match the date index
-        df2 = df_train.copy()
-        df2[self.target_column] = train_results
-        train_price_series = darts.TimeSeries.from_dataframe(df2, time_col='date', value_cols=self.target_column,
-                                                             fillna_value=0)
-
-        df3 = df_test.copy()
-        df3[self.target_column] = test_results
-        test_price_series = darts.TimeSeries.from_dataframe(df3, time_col='date', value_cols=self.target_column,
-                                                            fillna_value=0)
-
-        # convert to 32-bit (allows use of GPU)
+        # convert to (scaled) timeseries. Use 32-bit if the GPU is available
         if self.is_gpu_available():
             print("    Converting to 32-bit to allow GPU usage...")
-            train_time_series = train_time_series.astype(np.float32)
-            test_time_series = test_time_series.astype(np.float32)
-            train_price_series = train_price_series.astype(np.float32)
-            test_price_series = test_price_series.astype(np.float32)
-
-        # scale the dataframes
-        df_scaler = Scaler(RobustScaler())
-        df_scaler = df_scaler.fit(train_time_series)
-        train_covariate_series = df_scaler.transform(train_time_series)
-        test_covariate_series = df_scaler.transform(test_time_series)
-
-        # price_series = df_train_norm[self.target_column]
-        train_price_scaler = Scaler(RobustScaler())
-        train_price_scaler = train_price_scaler.fit(train_price_series)
-        train_target_series = train_price_scaler.transform(train_price_series)
-        test_target_series = train_price_scaler.transform(test_price_series)
+        dtype = np.float32 if self.is_gpu_available() else np.float64
+        train_covariate_series, train_target_series, test_covariate_series, test_target_series = \
+            self.series_builder.fit_transform(df_train, train_results, df_test, test_results, dtype=dtype)
 
         # fit the model against the training data
 
@@ -404,31 +384,14 @@ class ClassifierDarts():
             print(f"  train_cols:{self.train_cols}")
             print(f"  predict_cols:{predict_cols}")
 
-        # use the whole dataframe the 'covariate' series
-        df = dataframe.copy()
-        df['date'] = pd.to_datetime(df.date).dt.tz_localize(None)
-
-        # convert closing price column to time series & scale
-        price_series = darts.TimeSeries.from_dataframe(df, time_col='date', value_cols=self.target_column)
-        price_scaler = Scaler(RobustScaler())
-        price_scaler = price_scaler.fit(price_series)
-        price_series = price_scaler.transform(price_series)
-
-        # convert dataframe to timeseries
-        df_time_series = darts.TimeSeries.from_dataframe(df, time_col='date')
-
-        # convert to 32-bit (allows use of GPU)
-        if self.is_gpu_available():
-            price_series = price_series.astype(np.float32)
-            df_time_series = df_time_series.astype(np.float32)
-
-        # scale the dataframe
-        df_scaler = Scaler(RobustScaler())
-        covariate_series = df_scaler.fit_transform(df_time_series)
+        # predict every row from the input chunk ending at that row, using batched calls to the model
+        if self.use_fast_backtest:
+            print(f"    backtesting {dataframe.shape[0]} samples")
+            return self.backtester.backtest(self, dataframe)
 
-        # print(f'    dataframe:{np.shape(dataframe)}')
-        # print(f'    covariate_series:{covariate_series.n_samples}, {covariate_series.n_timesteps}, {covariate_series.n_components}')
-        # print(f'    price_series:{price_series.n_samples}, {price_series.n_timesteps}, {price_series.n_components}')
+        # convert the whole dataframe to 'covariate' and price series (32-bit allows use of GPU)
+        dtype = np.float32 if self.is_gpu_available() else np.float64
+        covariate_series, price_series, price_scaler = self.series_builder.transform(dataframe, dtype=dtype)
 
         time_est = dataframe.shape[0] / (200.0 * 60.0)  # ~200 it/sec
         print(f"    backtesting {dataframe.shape[0]} samples. Estimated time:{time_est:.2f} (mins)")
@@ -438,11 +401,7 @@ class ClassifierDarts():
             preds = self.model_historical_forecasts(self.model, price_series, covariate_series)
 
         # reverse scaling
-        preds2 = price_scaler.inverse_transform(preds)
-
-        # get the underlying dataframe and column
-        df = preds2.pd_dataframe()
-        scaled_preds = np.array(df[self.target_column])
+        scaled_preds = self.series_builder.inverse_transform_target(preds, price_scaler)
 
         # predictions = np.zeros(np.shape(dataframe)[0])
         predictions = np.array(dataframe[self.target_column])
@@ -479,31 +438,8 @@ class ClassifierDarts():
             print(f"  train_cols:{self.train_cols}")
             print(f"  predict_cols:{predict_cols}")
 
-        # use the whole dataframe the 'covariate' series
-        df = dataframe.copy()
-        df['date'] = pd.to_datetime(df.date).dt.tz_localize(None)
-
-        # convert closing price column to time series & scale
-        price_series = darts.TimeSeries.from_dataframe(df, time_col='date', value_cols=self.target_column)
-        price_scaler = Scaler(RobustScaler())
-        price_scaler = price_scaler.fit(price_series)
-        price_series = price_scaler.transform(price_series)
-
-        # convert dataframe to timeseries
-        df_time_series = darts.TimeSeries.from_dataframe(df, time_col='date')
-
-        # # convert to 32-bit (allows use of GPU)
-        # if self.is_gpu_available():
-        #     price_series = price_series.astype(np.float32)
-        #     df_time_series = df_time_series.astype(np.float32)
-
-        # workaround for GPU bug: always convert to 32-bit
-        price_series = price_series.astype(np.float32)
-        df_time_series = df_time_series.astype(np.float32)
-
-        # scale the dataframe
-        df_scaler = Scaler(RobustScaler())
-        covariate_series = df_scaler.fit_transform(df_time_series)
+        # convert to 'covariate' and price series. Workaround for GPU bug: always use 32-bit
+        covariate_series, price_series, price_scaler = self.series_builder.transform(dataframe, dtype=np.float32)
 
         self.trainer = Trainer(accelerator='mps', devices=1)
         # print(f'Prediction data size: {np.shape(df)}')
@@ -518,13 +454,41 @@ class ClassifierDarts():
         # preds_series = darts.TimeSeries.from_series(scaled_preds)
 
         # reverse scaling
-        preds2 = price_scaler.inverse_transform(preds)
+        predictions = self.series_builder.inverse_transform_target(preds, price_scaler)
+
+        return predictions
 
-        # get the underlying dataframe and column
-        df = preds2.pd_dataframe()
-        scaled_preds = np.array(df[self.target_column])
+    # ---------------------------
 
-        predictions = scaled_preds
+    # get predictions for a list of dataframes (windows) in a single call to the model. Each window is scaled separately,
+    # in the same way as predict(), and the result is the last prediction for each window (same as predict()[-1])
+    def predict_batch(self, dataframes: list):
+
+        if self.model is None:
+            print("    ERR: no model")
+            return np.zeros(len(dataframes))
+
+        if len(dataframes) == 0:
+            return np.zeros(0)
+
+        price_list = []
+        covariate_list = []
+        price_scalers = []
+        for dataframe in dataframes:
+            # always convert to 32-bit (see predict()). Windows may be converted in several threads, and each one would
+            # replace the covariates kept by the builder, so do not use them
+            covariate_series, price_series, price_scaler = self.series_builder.transform(dataframe, dtype=np.float32,
+                                                                                         incremental=False)
+            covariate_list.append(covariate_series)
+            price_list.append(price_series)
+            price_scalers.append(price_scaler)
+
+        with torch.inference_mode():
+            preds = self.model_predict(self.model, price_list, covariate_list, verbose=False)
+
+        # reverse scaling
+        predictions = np.array([self.series_builder.inverse_transform_target(pred, price_scaler)[-1]
+                                for pred, price_scaler in zip(preds, price_scalers)])
 
         return predictions
 
@@ -629,10 +593,19 @@ class ClassifierDarts():
         self.model.save(self.model_path)
         # torch.save(self.model.state_dict(), self.model_path)
 
+        # save the scalers fitted in training, so that they can be used for inference
+        save_object(self.series_builder.get_scalers(), self.get_scalers_path())
+
         return
 
     # ---------------------------
 
+    # returns path to the file holding the fitted scalers (see TimeSeriesBuilder)
+    def get_scalers_path(self):
+        return self.model_path + ".scalers"
+
+    # ---------------------------
+
     def save_as_coreml(self):
         return
 
@@ -651,6 +624,7 @@ class ClassifierDarts():
             print("    loading from: ", self.model_path)
             # self.model = joblib.load(self.model_path)
             self.model = self.load_from_file(self.model_path, use_gpu=self.is_gpu_available())
+            self.series_builder.set_scalers(load_object(self.get_scalers_path()))
             self.loaded_from_file = True
             self.is_trained = True
             print(f'Model: {self.model_path}')
@@ -685,6 +659,24 @@ class ClassifierDarts():
 
     # ---------------------------
 
+    # (re)load the model from file, if it is not in memory. Used by ModelRegistry
+    def load_model(self):
+        if (self.model is None) and self.model_exists():
+            self.load()
+        return self.model
+
+    # ---------------------------
+
+    # release the in-memory model, if it can be re-loaded from file. Used by ModelRegistry
+    # Note: the model is saved every time it is trained, so the file is always up to date
+    def unload_model(self) -> bool:
+        if (self.model is None) or (not self.model_exists()):
+            return False
+        self.model = None
+        return True
+
+    # ---------------------------
+
     def model_is_trained(self) -> bool:
         return self.is_trained
 
@@ -26,6 +26,9 @@ log = logging.getLogger(__name__)
 warnings.simplefilter(action='ignore', category=pd.errors.PerformanceWarning)
 
 import random
+import hashlib
+import json
+import time
 
 import os
 
@@ -80,6 +83,7 @@ class ClassifierKeras():
     prescale_dataframe = True  # set to True if algorithms need dataframes to be pre-scaled
     single_prediction = False  # True if algorithm only produces 1 prediction (not entire data array)
     combine_models = False  # True means combine models for all pairs (unless model per pair). False will train only on 1st pair
+    use_bundle = True  # also save the weights in a bundle (see save_bundle()), which loads much faster than the .h5 file
 
     # ---------------------------
 
@@ -453,6 +457,9 @@ class ClassifierKeras():
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
         tf.keras.models.save_model(self.model, filepath=path, save_format='h5')
+
+        if self.use_bundle:
+            self.save_bundle(self.model, path)
         return
 
     # ---------------------------
@@ -467,9 +474,17 @@ class ClassifierKeras():
 
         model = None
 
+        # use the bundle if there is one (much faster), otherwise the full (.h5) model
+        if self.use_bundle and os.path.exists(self.get_bundle_path(path)):
+            model = self.load_bundle(path)
+            if model is not None:
+                self.is_trained = True
+                return model
+
         # if model exists, load it
         if os.path.exists(path):
             print("    Loading existing model ({})...".format(path))
+            start = time.perf_counter()
             try:
                 # check for custom load function (used with custom layers)
                 custom_load = getattr(self, "custom_load", None)
@@ -479,6 +494,11 @@ class ClassifierKeras():
                     model = tf.keras.models.load_model(path, compile=False)
                 self.compile_model(model)
                 self.is_trained = True
+                print(f"    Loaded model in {time.perf_counter() - start:.2f}s")
+
+                # save a bundle, so that the next load is faster
+                if self.use_bundle:
+                    self.save_bundle(model, path)
 
             except Exception as e:
                 print("    ", str(e))
@@ -498,12 +518,134 @@ class ClassifierKeras():
 
     # ---------------------------
 
+    # Model bundles
+    # Loading a full .h5 model means parsing the saved config and rebuilding the graph, which is slow (especially when
+    # there is a model for each pair). A bundle just contains the weights:
+    #   <name>.weights.npy - all weights, as a single float32 array (memory-mapped when loaded)
+    #   <name>.bundle.json - manifest: architecture fingerprint, shape and type of each weight
+    # The model is re-created with create_model() and the weights copied in. The fingerprint (layer types and weight
+    # shapes) is checked first, so if the architecture has changed, the .h5 file is used instead.
+    # Note: the fitted scaler and compressor are saved next to the model by the strategy (see get_preprocessor_path())
+
+    def get_bundle_path(self, path=""):
+        if len(path) == 0:
+            path = self.model_path
+        return os.path.splitext(path)[0] + ".bundle.json"
+
+    def get_weights_path(self, path=""):
+        if len(path) == 0:
+            path = self.model_path
+        return os.path.splitext(path)[0] + ".weights.npy"
+
+    # returns an identifier for the architecture of the model (layer types and shapes of the weights)
+    def get_model_fingerprint(self, model) -> str:
+        layers = []
+        for layer in model.layers:
+            shapes = [list(w.shape) for w in layer.weights]
+            layers.append([layer.__class__.__name__, shapes])
+        spec = json.dumps([self.__class__.__name__, self.seq_len, self.num_features, layers])
+        return hashlib.sha1(spec.encode()).hexdigest()
+
+    def save_bundle(self, model, path=""):
+        try:
+            weights = model.get_weights()
+            flat = np.concatenate([np.ravel(w).astype(np.float32) for w in weights]) if len(weights) > 0 \
+                else np.zeros(0, dtype=np.float32)
+            manifest = {
+                'fingerprint': self.get_model_fingerprint(model),
+                'shapes': [list(np.shape(w)) for w in weights],
+                'dtypes': [str(np.asarray(w).dtype) for w in weights],
+                'size': int(flat.size)
+            }
+
+            # write the weights first, then the manifest (so a partial save is never used)
+            weights_path = self.get_weights_path(path)
+            tmp_path = weights_path + f".{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, flat)
+            os.replace(tmp_path, weights_path)
+
+            bundle_path = self.get_bundle_path(path)
+            tmp_path = bundle_path + f".{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, bundle_path)
+
+        except Exception as e:
+            print(f"    WARN: could not save model bundle ({path}): {str(e)}")
+
+    # re-create the model and load the weights from the bundle. Returns None if the bundle cannot be used
+    def load_bundle(self, path=""):
+        if len(path) == 0:
+            path = self.model_path
+        bundle_path = self.get_bundle_path(path)
+        start = time.perf_counter()
+        try:
+            # don't use the bundle if the .h5 file has been updated since it was saved
+            if os.path.exists(path) and (os.path.getmtime(path) > os.path.getmtime(bundle_path)):
+                print(f"    Model bundle is out of date ({bundle_path})")
+                return None
+
+            with open(bundle_path, 'r') as f:
+                manifest = json.load(f)
+
+            model = self.create_model(self.seq_len, self.num_features)
+            if model is None:
+                return None
+
+            if manifest['fingerprint'] != self.get_model_fingerprint(model):
+                print(f"    Model architecture changed, not using bundle ({bundle_path})")
+                return None
+
+            flat = np.load(self.get_weights_path(path), mmap_mode='r')
+            if flat.size != manifest['size']:
+                print(f"    Model bundle is incomplete ({bundle_path})")
+                return None
+
+            weights = []
+            offset = 0
+            for shape, dtype in zip(manifest['shapes'], manifest['dtypes']):
+                count = int(np.prod(shape))
+                weights.append(np.asarray(flat[offset:offset + count]).reshape(shape).astype(dtype))
+                offset = offset + count
+            model.set_weights(weights)
+
+            self.compile_model(model)
+
+        except Exception as e:
+            print(f"    WARN: could not load model bundle ({bundle_path}): {str(e)}")
+            return None
+
+        print(f"    Loaded model bundle ({bundle_path}) in {time.perf_counter() - start:.2f}s")
+        return model
+
+    # ---------------------------
+
     def model_exists(self) -> bool:
         path = self.get_model_path()
         return os.path.exists(path)
 
     # ---------------------------
 
+    # (re)load the model from file, if it is not in memory. Used by ModelRegistry
+    def load_model(self):
+        if (self.model is None) and self.model_exists():
+            self.model = self.load()
+        return self.model
+
+    # ---------------------------
+
+    # release the in-memory model, if it can be re-loaded from file. Used by ModelRegistry
+    # Note: the model is saved every time it is trained, so the file is always up to date
+    def unload_model(self) -> bool:
+        if (self.model is None) or (not self.model_exists()):
+            return False
+        self.model = None
+        self.encoder = None
+        return True
+
+    # ---------------------------
+
     def model_is_trained(self) -> bool:
         return self.is_trained
 
@@ -64,7 +64,8 @@ os.environ['PYTHONHASHSEED'] = str(seed)
 random.seed(seed)
 np.random.seed(seed)
 
-from DataframeUtils import DataframeUtils
+from DataframeUtils import DataframeUtils, save_object, load_object
+from TimeSeriesBuilder import TimeSeriesBuilder
 
 
 # ---------------------------
@@ -84,6 +85,7 @@ class ClassifierPyTorch():
     checkpoint_path = "/tmp/model" + model_ext # will be overwritten later
 
     loaded_from_file = False
+    unsaved_changes = False  # True if the model has been re-trained since it was saved
     contamination = 0.01  # ratio of signals to samples. Used in several algorithms, so saved
 
     clean_data_required = False  # train with positive rows removed
@@ -91,6 +93,7 @@ class ClassifierPyTorch():
     new_model = False  # True if a new model was created this run
 
     dataframeUtils = None
+    series_builder = None  # converts dataframes to (scaled) TimeSeries
     requires_dataframes = True  # set to True if classifier takes dataframes rather than tensors
     prescale_dataframe = False  # set to True if algorithms need dataframes to be pre-scaled
     single_prediction = True  # True if algorithm only produces 1 prediction (not entire data array)
@@ -112,6 +115,7 @@ class ClassifierPyTorch():
         self.set_all_seeds()
 
         self.loaded_from_file = False
+        self.unsaved_changes = False
         self.seq_len = seq_len
         self.num_features = num_features
 
@@ -136,6 +140,9 @@ class ClassifierPyTorch():
         if self.dataframeUtils is None:
             self.dataframeUtils = DataframeUtils()
 
+        # training scalers are only reused if the model is specific to a pair (prices vary too much across pairs)
+        self.series_builder = TimeSeriesBuilder('close', reuse_scalers=self.model_per_pair)
+
         # the following should turn on hardware acceleration, if suported
         torch.device("mps")
         self.num_cpus = multiprocessing.cpu_count()
@@ -242,42 +249,12 @@ class ClassifierPyTorch():
 
         # convert various arrays to format expected by PyTorch
 
-        # convert time formats
-        df_train['date'] = pd.to_datetime(df_train.date).dt.tz_localize(None)
-        df_test['date'] = pd.to_datetime(df_test.date).dt.tz_localize(None)
-
-        # convert to timeseries
-        train_time_series = darts.TimeSeries.from_dataframe(df_train, time_col='date', fillna_value=0)
-        test_time_series = darts.TimeSeries.from_dataframe(df_test, time_col='date', fillna_value=0)
-
-        # convert results. Put into dataframe format first, because we need to match the date index
-        df2 = df_train.copy()
-        df2['close'] = train_results
-        train_price_series = darts.TimeSeries.from_dataframe(df2, time_col='date', value_cols='close', fillna_value=0)
-
-        df3 = df_test.copy()
-        df3['close'] = test_results
-        test_price_series = darts.TimeSeries.from_dataframe(df3, time_col='date', value_cols='close', fillna_value=0)
-
-        # convert to 32-bit (allows use of GPU)
+        # convert to (scaled) timeseries. Use 32-bit if the GPU is available
         if self.is_gpu_available():
             print("    Converting to 32-bit to allow GPU usage...")
-            train_time_series = train_time_series.astype(np.float32)
-            test_time_series = test_time_series.astype(np.float32)
-            train_price_series = train_price_series.astype(np.float32)
-            test_price_series = test_price_series.astype(np.float32)
-
-        # scale the dataframes
-        df_scaler = Scaler(RobustScaler())
-        df_scaler = df_scaler.fit(train_time_series)
-        train_covariate_series = df_scaler.transform(train_time_series)
-        test_covariate_series = df_scaler.transform(test_time_series)
-
-        # price_series = df_train_norm['close']
-        train_price_scaler = Scaler(RobustScaler())
-        train_price_scaler = train_price_scaler.fit(train_price_series)
-        train_target_series = train_price_scaler.transform(train_price_series)
-        test_target_series = train_price_scaler.transform(test_price_series)
+        dtype = np.float32 if self.is_gpu_available() else np.float64
+        train_covariate_series, train_target_series, test_covariate_series, test_target_series = \
+            self.series_builder.fit_transform(df_train, results, df_test, test_results, dtype=dtype)
 
         # check for nans
 
@@ -308,6 +285,8 @@ class ClassifierPyTorch():
             self.save()
             print(f'Model: {self.model_path}')
             # summary(self.model, input_size=(self.batch_size, self.seq_len, self.num_features))
+        else:
+            self.unsaved_changes = True
 
         self.is_trained = True
 
@@ -331,27 +310,9 @@ class ClassifierPyTorch():
             print(f"  train_cols:{self.train_cols}")
             print(f"  predict_cols:{predict_cols}")
 
-        # use the whole dataframe the 'covariate' series
-        df = dataframe.copy()
-        df['date'] = pd.to_datetime(df.date).dt.tz_localize(None)
-
-        # convert closing price column to time series & scale
-        price_series = darts.TimeSeries.from_dataframe(df, time_col='date', value_cols='close')
-        price_scaler = Scaler(RobustScaler())
-        price_scaler = price_scaler.fit(price_series)
-        price_series = price_scaler.transform(price_series)
-
-        # convert dataframe to timeseries
-        df_time_series = darts.TimeSeries.from_dataframe(df, time_col='date')
-
-        # convert to 32-bit (allows use of GPU)
-        if self.is_gpu_available():
-            price_series = price_series.astype(np.float32)
-            df_time_series = df_time_series.astype(np.float32)
-
-        # scale the dataframe
-        df_scaler = Scaler(RobustScaler())
-        covariate_series = df_scaler.fit_transform(df_time_series)
+        # convert the whole dataframe to 'covariate' and price series (32-bit allows use of GPU)
+        dtype = np.float32 if self.is_gpu_available() else np.float64
+        covariate_series, price_series, price_scaler = self.series_builder.transform(dataframe, dtype=dtype)
 
         time_est = dataframe.shape[0] / 600.0 # ~10 it/sec
         print(f"    backtesting {dataframe.shape[0]} samples. Estimated time:{time_est:.2f} (mins)")
@@ -366,11 +327,7 @@ class ClassifierPyTorch():
                                                     verbose=False)
 
         # reverse scaling
-        preds2 = price_scaler.inverse_transform(preds)
-
-        # get the underlying dataframe and column
-        df = preds2.pd_dataframe()
-        scaled_preds = np.array(df['close'])
+        scaled_preds = self.series_builder.inverse_transform_target(preds, price_scaler)
 
         # predictions = np.zeros(np.shape(dataframe)[0])
         predictions = np.array(dataframe['close'])
@@ -407,32 +364,8 @@ class ClassifierPyTorch():
             print(f"  train_cols:{self.train_cols}")
             print(f"  predict_cols:{predict_cols}")
 
-        # use the whole dataframe the 'covariate' series
-        df = dataframe.copy()
-        df['date'] = pd.to_datetime(df.date).dt.tz_localize(None)
-
-
-        # convert closing price column to time series & scale
-        price_series = darts.TimeSeries.from_dataframe(df, time_col='date', value_cols='close')
-        price_scaler = Scaler(RobustScaler())
-        price_scaler = price_scaler.fit(price_series)
-        price_series = price_scaler.transform(price_series)
-
-        # convert dataframe to timeseries
-        df_time_series = darts.TimeSeries.from_dataframe(df, time_col='date')
-
-        # # convert to 32-bit (allows use of GPU)
-        # if self.is_gpu_available():
-        #     price_series = price_series.astype(np.float32)
-        #     df_time_series = df_time_series.astype(np.float32)
-
-        # workaround for GPU bug: always convert to 32-bit
-        price_series = price_series.astype(np.float32)
-        df_time_series = df_time_series.astype(np.float32)
-
-        # scale the dataframe
-        df_scaler = Scaler(RobustScaler())
-        covariate_series = df_scaler.fit_transform(df_time_series)
+        # convert to 'covariate' and price series. Workaround for GPU bug: always use 32-bit
+        covariate_series, price_series, price_scaler = self.series_builder.transform(dataframe, dtype=np.float32)
 
         self.trainer = Trainer(accelerator='mps', devices=1)
         # print(f'Prediction data size: {np.shape(df)}')
@@ -452,13 +385,7 @@ class ClassifierPyTorch():
         # preds_series = darts.TimeSeries.from_series(scaled_preds)
 
         # reverse scaling
-        preds2 = price_scaler.inverse_transform(preds)
-
-        # get the underlying dataframe and column
-        df = preds2.pd_dataframe()
-        scaled_preds = np.array(df['close'])
-
-        predictions = scaled_preds
+        predictions = self.series_builder.inverse_transform_target(preds, price_scaler)
 
         return predictions
 
@@ -559,10 +486,19 @@ class ClassifierPyTorch():
         # joblib.dump(self.model, self.model_path)
         self.model.save(self.model_path)
 
+        # save the scalers fitted in training, so that they can be used for inference
+        save_object(self.series_builder.get_scalers(), self.get_scalers_path())
+
         return
 
     # ---------------------------
 
+    # returns path to the file holding the fitted scalers (see TimeSeriesBuilder)
+    def get_scalers_path(self):
+        return self.model_path + ".scalers"
+
+    # ---------------------------
+
     def save_as_coreml(self):
         return
 
@@ -582,6 +518,7 @@ class ClassifierPyTorch():
             print("    loading from: ", self.model_path)
             # self.model = joblib.load(self.model_path)
             self.model = self.load_from_file(self.model_path)
+            self.series_builder.set_scalers(load_object(self.get_scalers_path()))
             self.loaded_from_file = True
             self.is_trained = True
             print(f'Model: {self.model_path}')
@@ -608,6 +545,24 @@ class ClassifierPyTorch():
 
     # ---------------------------
 
+    # (re)load the model from file, if it is not in memory. Used by ModelRegistry
+    def load_model(self):
+        if (self.model is None) and self.model_exists():
+            self.load()
+        return self.model
+
+    # ---------------------------
+
+    # release the in-memory model, if it can be re-loaded from file. Used by ModelRegistry
+    # Note: the model is only saved the first time it is trained, so a re-trained model cannot be released
+    def unload_model(self) -> bool:
+        if (self.model is None) or self.unsaved_changes or (not self.model_exists()):
+            return False
+        self.model = None
+        return True
+
+    # ---------------------------
+
     def model_is_trained(self) -> bool:
         return self.is_trained
 
@@ -295,6 +295,18 @@ class ClassifierSklearn():
         path = self.get_model_path()
         return os.path.exists(path)
 
+    # sklearn models are re-fitted every time train() is called, so there is no point re-loading from file.
+    # Used by ModelRegistry
+    def load_model(self):
+        return self.model
+
+    # release the in-memory model (it is re-created by the next call to train()). Used by ModelRegistry
+    def unload_model(self) -> bool:
+        if self.model is None:
+            return False
+        self.model = None
+        return True
+
     def model_is_trained(self) -> bool:
         return self.is_trained
 
@@ -0,0 +1,90 @@
+# PCA calculated from the eigendecomposition of the covariance matrix.
+#
+# For 'tall' data (many more rows than columns, which is what we have for dataframes of indicators), this is much
+# faster than the SVD of the full data matrix used by sklearn.decomposition.PCA(svd_solver='full'), because the data
+# is only touched once (to build a [ncols, ncols] covariance matrix).
+# The decomposition is kept, so reducing the number of components (e.g. after checking the explained variance) does
+# not need another fit - see truncate()
+#
+# Attributes and transform() follow sklearn's PCA, so it can be used in its place
+
+import numpy as np
+
+
+class CovariancePCA():
+
+    n_components = None
+    whiten = False
+
+    mean_ = None
+    components_ = None
+    explained_variance_ = None
+    explained_variance_ratio_ = None
+    n_components_ = 0
+    n_features_in_ = 0
+    n_samples_ = 0
+
+    # full decomposition (all components), kept for truncate()
+    all_components = None
+    all_variance = None
+
+    def __init__(self, n_components=None, whiten=False):
+        super().__init__()
+        self.n_components = n_components
+        self.whiten = whiten
+
+    def fit(self, data):
+        x = np.asarray(data, dtype=float)
+        self.n_samples_, self.n_features_in_ = np.shape(x)
+
+        self.mean_ = x.mean(axis=0)
+        xc = x - self.mean_
+        cov = (xc.T @ xc) / (self.n_samples_ - 1)
+
+        # eigh returns eigenvalues in ascending order, we want largest first
+        variance, vectors = np.linalg.eigh(cov)
+        variance = np.clip(variance[::-1], 0.0, None)
+        components = vectors[:, ::-1].T
+
+        # deterministic signs: largest loading of each component is positive (same convention as sklearn)
+        max_rows = np.argmax(np.abs(components), axis=1)
+        signs = np.sign(components[np.arange(len(components)), max_rows])
+        signs[signs == 0] = 1.0
+        components = components * signs[:, np.newaxis]
+
+        self.all_components = components
+        self.all_variance = variance
+
+        n = self.n_features_in_ if self.n_components is None else self.n_components
+        return self.truncate(n)
+
+    # keep only the first n components (uses the existing decomposition, no re-fit)
+    def truncate(self, n: int):
+        n = min(n, len(self.all_variance))
+        total_var = self.all_variance.sum()
+
+        self.n_components = n
+        self.n_components_ = n
+        self.components_ = self.all_components[:n]
+        self.explained_variance_ = self.all_variance[:n]
+        if total_var > 0.0:
+            self.explained_variance_ratio_ = self.explained_variance_ / total_var
+        else:
+            self.explained_variance_ratio_ = np.zeros(n)
+        return self
+
+    def transform(self, data) -> np.ndarray:
+        x = np.asarray(data, dtype=float)
+        result = (x - self.mean_) @ self.components_.T
+        if self.whiten:
+            result = result / np.sqrt(np.maximum(self.explained_variance_, np.finfo(float).eps))
+        return result
+
+    def fit_transform(self, data) -> np.ndarray:
+        return self.fit(data).transform(data)
+
+    def inverse_transform(self, data) -> np.ndarray:
+        x = np.asarray(data, dtype=float)
+        if self.whiten:
+            x = x * np.sqrt(self.explained_variance_)
+        return x @ self.components_ + self.mean_
@@ -0,0 +1,188 @@
+# Fast backtesting of the darts-based forecasting models (NNPredict_NBeats, NNPredict_NHiTS, NNPredict_NLinear,
+# NNPredict_TFT etc.)
+#
+# ClassifierDarts.backtest() used darts' historical_forecasts(), which builds and predicts each input chunk in turn
+# (~200 chunks per second), so a long backtest takes several minutes per pair.
+#
+# DartsBacktester produces the same prediction for every row as predict() does in live runs: the input chunk ending at
+# the row is used to forecast 'lookahead' candles ahead, and the last forecast is saved against the row. Rows without
+# a full input chunk just get the target value.
+#   - the scaled target and covariates for the whole dataframe are stacked into one array, and all of the input chunks
+#     are a strided view of it (no copying)
+#   - the underlying torch module of the darts model is run directly, in large batches, using all CPU threads
+#   - models that cannot be run that way (e.g. TFT, which generates its own future covariates, or probabilistic models)
+#     fall back to darts' predict(), which is still given large batches of chunks
+#   - backtest_pairs() can spread pairs across worker processes (each one loads the model from file)
+#
+# Usage:
+#   backtester = DartsBacktester()
+#   predictions = backtester.backtest(classifier, dataframe)
+#   predictions = backtester.backtest_pairs(classifier, {pair: dataframe, ...}, num_workers=4)
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+from pandas import DataFrame
+
+
+class DartsBacktester():
+
+    batch_size = 4096  # number of input chunks per call to the model
+    num_threads = 0  # torch CPU threads. 0 uses all CPUs
+    module_input_size = 0  # number of elements in the tuple expected by the torch module (depends on darts version)
+    dbg_verbose = False
+
+    def __init__(self, batch_size=4096, num_threads=0):
+        super().__init__()
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.module_input_size = 0
+
+    # returns a prediction for each row of the dataframe
+    def backtest(self, classifier, dataframe: DataFrame) -> np.ndarray:
+
+        model = classifier.model
+        target_column = classifier.target_column
+        lookahead = classifier.get_lookahead()
+        chunk_len = getattr(model, 'input_chunk_length', classifier.lookback)
+
+        predictions = np.array(dataframe[target_column], dtype=float)
+        if len(predictions) < chunk_len:
+            return predictions
+
+        # scaled 'covariate' and target series for the whole dataframe (same precision as the model)
+        dtype = self.get_dtype(model)
+        covariate_series, target_series, target_scaler = classifier.series_builder.transform(dataframe, dtype=dtype)
+
+        prev_threads = torch.get_num_threads()
+        torch.set_num_threads(self.num_threads if self.num_threads > 0 else os.cpu_count())
+        try:
+            scaled_preds = None
+            if self.can_run_module(model, lookahead):
+                try:
+                    scaled_preds = self.run_module(model, target_series, covariate_series, chunk_len, lookahead)
+                except Exception as e:
+                    print(f"    WARN: could not run model directly ({str(e)}). Using predict()")
+            if scaled_preds is None:
+                scaled_preds = self.run_predict(classifier, target_series, covariate_series, chunk_len)
+        finally:
+            torch.set_num_threads(prev_threads)
+
+        # reverse scaling
+        scaled_preds = target_scaler.inverse_transform(scaled_preds.reshape(-1, 1))[:, 0]
+
+        predictions[chunk_len - 1:] = scaled_preds
+        return predictions
+
+    # numpy equivalent of the dtype of the model parameters (float32 if the model has not been created)
+    def get_dtype(self, model):
+        module = getattr(model, 'model', None)
+        if module is None:
+            return np.float32
+        return torch.empty(0, dtype=next(module.parameters()).dtype).numpy().dtype
+
+    # the torch module can only be used directly for deterministic models that only use past covariates, and that
+    # forecast far enough ahead in a single step
+    def can_run_module(self, model, lookahead) -> bool:
+        if getattr(model, 'model', None) is None:
+            return False
+        if getattr(model, 'likelihood', None) is not None:
+            return False
+        if getattr(model, 'add_relative_index', False) or getattr(model, 'add_encoders', None):
+            return False
+        return lookahead <= getattr(model, 'output_chunk_length', 0)
+
+    # run the torch module over all input chunks, returns the (scaled) prediction for each chunk
+    def run_module(self, model, target_series, covariate_series, chunk_len, lookahead) -> np.ndarray:
+
+        module = model.model
+        module.eval()
+        param = next(module.parameters())
+
+        # module input is the target followed by the covariates, shape: [time, features]
+        data = np.concatenate([target_series.values(copy=False), covariate_series.values(copy=False)], axis=1)
+        data = np.ascontiguousarray(data, dtype=self.get_dtype(model))
+
+        # all input chunks, shape: [nchunks, chunk_len, features] (strided view, no copy)
+        chunks = np.swapaxes(sliding_window_view(data, chunk_len, axis=0), 1, 2)
+        nchunks = np.shape(chunks)[0]
+
+        scaled_preds = np.empty(nchunks, dtype=float)
+        with torch.inference_mode():
+            for start in range(0, nchunks, self.batch_size):
+                end = min(start + self.batch_size, nchunks)
+                x_past = torch.from_numpy(np.ascontiguousarray(chunks[start:end])).to(param.device)
+                output = self.call_module(module, x_past)
+                # output shape: [batch, output_chunk_length, targets]
+                scaled_preds[start:end] = output[:, lookahead - 1, 0].cpu().numpy()
+
+        return scaled_preds
+
+    # the module input is (past, future, static) in recent versions of darts, (past, static) in older versions
+    def call_module(self, module, x_past):
+        if self.module_input_size == 0:
+            for size in (3, 2):
+                try:
+                    output = self.call_module_with(module, x_past, size)
+                    self.module_input_size = size
+                    return output
+                except (TypeError, ValueError):
+                    continue
+            raise ValueError("unsupported module input")
+        return self.call_module_with(module, x_past, self.module_input_size)
+
+    def call_module_with(self, module, x_past, size):
+        x_in = (x_past, None, None) if size == 3 else (x_past, None)
+        output = module._produce_predict_output(x_in)
+        if output.dim() == 2:
+            output = output.unsqueeze(-1)
+        return output
+
+    # fall back to darts' predict(), with batches of input chunks
+    def run_predict(self, classifier, target_series, covariate_series, chunk_len) -> np.ndarray:
+
+        nchunks = len(target_series) - chunk_len + 1
+        scaled_preds = np.empty(nchunks, dtype=float)
+
+        with torch.inference_mode():
+            for start in range(0, nchunks, self.batch_size):
+                end = min(start + self.batch_size, nchunks)
+                targets = [target_series[i:i + chunk_len] for i in range(start, end)]
+                covariates = [covariate_series[i:i + chunk_len] for i in range(start, end)]
+                preds = classifier.model_predict(classifier.model, targets, covariates, verbose=False)
+                scaled_preds[start:end] = [pred.values(copy=False)[-1, 0] for pred in preds]
+
+        return scaled_preds
+
+    # backtest several pairs. With num_workers > 1, pairs are run in separate processes, each of which loads the model
+    # from file (so the model must have been saved). Returns a dict of predictions, keyed by pair
+    def backtest_pairs(self, classifier, dataframes: dict, num_workers=0) -> dict:
+
+        if (num_workers <= 1) or (len(dataframes) <= 1) or (not os.path.exists(classifier.model_path)):
+            return {pair: self.backtest(classifier, dataframe) for pair, dataframe in dataframes.items()}
+
+        # share the CPUs between the workers
+        num_workers = min(num_workers, len(dataframes))
+        num_threads = max(1, (os.cpu_count() or 1) // num_workers)
+        results = {}
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = {pair: executor.submit(backtest_worker, classifier.__class__, classifier.model_path,
+                                             classifier.get_lookahead(), classifier.lookback, classifier.num_features,
+                                             classifier.target_column, dataframe, self.batch_size, num_threads)
+                       for pair, dataframe in dataframes.items()}
+            for pair, future in futures.items():
+                results[pair] = future.result()
+        return results
+
+
+# runs in a worker process: create the classifier, load the model and backtest the dataframe
+def backtest_worker(classifier_class, model_path, lookahead, lookback, num_features, target_column, dataframe,
+                    batch_size, num_threads) -> np.ndarray:
+    classifier = classifier_class("", lookback, num_features)
+    classifier.set_lookahead(lookahead)
+    classifier.set_target_column(target_column)
+    classifier.load(model_path)
+    return DartsBacktester(batch_size=batch_size, num_threads=num_threads).backtest(classifier, dataframe)
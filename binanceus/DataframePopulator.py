@@ -11,6 +11,7 @@ import pandas as pd
 import pywt
 import talib.abstract as ta
 from scipy.ndimage import gaussian_filter1d
+from numpy.lib.stride_tricks import sliding_window_view
 
 from pandas import DataFrame, Series
 
@@ -36,6 +37,9 @@ from finta import TA as fta
 import legendary_ta as lta
 
 from DataframeUtils import DataframeUtils
+from RollingDWT import RollingDWT
+from FeatureStore import FeatureStore
+from IndicatorGraph import IndicatorGraph
 from scipy.stats import linregress
 
 
@@ -62,10 +66,37 @@ class DataframePopulator():
     n_loss_stddevs = 0.0
 
     dataframeUtils = None
+    rollingDWT = None
+    indicatorGraph = None
+
+    # populated dataframes are cached on disk (backtest modes only), so that strategies sharing the same dataset type
+    # do not recompute the same indicators. Bump populator_version whenever the indicator calculations change
+    populator_version = 2
+    use_feature_store = True
+    feature_store = None
+
+    # incremental mode (live/dry runs only). Indicators are only calculated for newly appended candles, using the last
+    # incremental_warmup candles to prime them, and merged with the results from the previous call for the pair.
+    # The new rows match a full recalculation exactly:
+    #   - indicators over finite windows (rolling stats, Bollinger Bands, STOCHF, MFI, Williams %R, DWT and its
+    #     derivatives, Keltner, ULTOSC, Aroon, CCI, AO, Legendary TA except exhaustion bars...) only need the warmup.
+    #     This includes dwt_nseq_up/dn: runs are clipped to 20, which is well within the warmup. VFI and SMI use very
+    #     short EMAs (span 3), which fully decay within the warmup
+    #   - indicators with unbounded memory (recursive smoothing: EMA, TEMA, MACD, Wilder's RSI/ATR/ADX/DMI, Hilbert
+    #     transform) are cheap, so they are recalculated over the whole dataframe (see recursive_nodes)
+    #   - the exhaustion bar counters are carried over from the previous call (see add_exhaustion_bars()), so they
+    #     continue from the first populated candle, rather than restarting at the start of the dataframe
+    incremental = True
+    incremental_warmup = 256
+    incremental_state = {}  # last populated dataframe, keyed by pair
+    exhaustion_state = {}  # exhaustion bar counters after the last populated candle, keyed by pair
+    stream_key = None  # set while populating incrementally, selects streaming DWT
 
     def __init__(self):
         super().__init__()
         self.dataframeUtils = DataframeUtils()
+        self.incremental_state = {}
+        self.exhaustion_state = {}
 
     #################
 
@@ -97,24 +128,11 @@ class DataframePopulator():
         dataframe["bb_gain"] = ((dataframe["bb_upperband"] - dataframe["close"]) / dataframe["close"])
         dataframe["bb_loss"] = ((dataframe["bb_lowerband"] - dataframe["close"]) / dataframe["close"])
 
-        # RSI
-        dataframe['rsi'] = ta.RSI(dataframe, timeperiod=self.win_size)
-
-        # Williams %R
-        dataframe['wr'] = 0.02 * (self.williams_r(dataframe, period=14) + 50.0)
-
-        # Fisher RSI
-        rsi = 0.1 * (dataframe['rsi'] - 50)
-        dataframe['fisher_rsi'] = (np.exp(2 * rsi) - 1) / (np.exp(2 * rsi) + 1)
-
-        # Combined Fisher RSI and Williams %R
-        dataframe['fisher_wr'] = (dataframe['wr'] + dataframe['fisher_rsi']) / 2.0
+        # RSI, Williams %R
+        dataframe = self.add_rsi_wr(dataframe)
 
         # MACD
-        macd = ta.MACD(dataframe)
-        dataframe['macd'] = macd['macd']
-        dataframe['macdsignal'] = macd['macdsignal']
-        dataframe['macdhist'] = macd['macdhist']
+        dataframe = self.add_macd(dataframe)
 
         # Stoch fast
         stoch_fast = ta.STOCHF(dataframe)
@@ -129,7 +147,11 @@ class DataframePopulator():
         # if in backtest or hyperopt, then we have to do rolling calculations
         if self.runmode in ('hyperopt', 'backtest', 'plot'):
             # dataframe['dwt'] = dataframe['close'].rolling(window=self.startup_win).apply(self.roll_get_dwt)
-            dataframe['dwt'] = dataframe['mid'].rolling(window=self.startup_win).apply(self.roll_get_dwt)
+            # dataframe['dwt'] = dataframe['mid'].rolling(window=self.startup_win).apply(self.roll_get_dwt)
+            dataframe['dwt'] = self.get_rolling_dwt().transform(dataframe['mid'])
+        elif self.stream_key is not None:
+            # incremental mode, only process new windows
+            dataframe['dwt'] = self.get_rolling_dwt().update(self.stream_key, dataframe['mid'])
         else:
             # dataframe['dwt'] = self.get_dwt(dataframe['close'])
             dataframe['dwt'] = self.get_dwt(dataframe['mid'])
@@ -164,23 +186,126 @@ class DataframePopulator():
         dataframe['dwt_nseq_dn'] = dataframe['dwt_nseq_dn'].clip(lower=0.0, upper=20.0)
 
         # rolling linear slope of the DWT (i.e. average trend) of near-past
-        dataframe['dwt_slope'] = dataframe['dwt'].rolling(window=6).apply(self.roll_get_slope)
+        # dataframe['dwt_slope'] = dataframe['dwt'].rolling(window=6).apply(self.roll_get_slope)
+        dataframe['dwt_slope'] = self.rolling_slope(dataframe['dwt'], 6)
 
         return dataframe
 
+    # RSI, Williams %R and their combination (part of the minimal set)
+    def add_rsi_wr(self, dataframe: DataFrame) -> DataFrame:
+        # RSI
+        dataframe['rsi'] = ta.RSI(dataframe, timeperiod=self.win_size)
+
+        # Williams %R
+        dataframe['wr'] = 0.02 * (self.williams_r(dataframe, period=14) + 50.0)
+
+        # Fisher RSI
+        rsi = 0.1 * (dataframe['rsi'] - 50)
+        dataframe['fisher_rsi'] = (np.exp(2 * rsi) - 1) / (np.exp(2 * rsi) + 1)
+
+        # Combined Fisher RSI and Williams %R
+        dataframe['fisher_wr'] = (dataframe['wr'] + dataframe['fisher_rsi']) / 2.0
+        return dataframe
+
+    # MACD (part of the minimal set)
+    def add_macd(self, dataframe: DataFrame) -> DataFrame:
+        macd = ta.MACD(dataframe)
+        dataframe['macd'] = macd['macd']
+        dataframe['macdsignal'] = macd['macdsignal']
+        dataframe['macdhist'] = macd['macdhist']
+        return dataframe
+
     # ------------------------------
+    # The optional indicators (i.e. anything not in the minimal set) are nodes in an IndicatorGraph, so that a
+    # strategy can ask for just the columns it uses (see add_indicators()). The dataset types are lists of nodes,
+    # in the order in which their columns are added to the dataframe (do not change this, the models depend on it)
+
+    small_indicators = ['ma', 'donchian', 'keltner']
+
+    medium_indicators = small_indicators + ['adx', 'dmi', 'vfi', 'atr', 'ewo', 'uo', 'aroon', 'ao']
+
+    large_indicators = medium_indicators + [
+        'srsi', 'rsi_14', 'sma_200', 'hilbert', 'cci',
+        'fisher_cg', 'exhaustion_bars', 'smi_momentum', 'pinbar', 'breakouts'
+    ]
+
+    default_indicators = [
+        'ma', 'srsi', 'donchian', 'keltner', 'rsi_14', 'sma_200', 'adx', 'dmi', 'vfi', 'atr', 'hilbert',
+        'ewo', 'uo', 'aroon', 'ao', 'cci',
+        'fisher_cg', 'exhaustion_bars', 'smi_momentum', 'pinbar', 'breakouts'
+    ]
+
+    # nodes with unbounded memory, recalculated over the whole dataframe in incremental mode (along with the RSI and
+    # MACD columns of the minimal set). srsi is only there because it uses RSI
+    recursive_nodes = ['ma', 'srsi', 'donchian', 'rsi_14', 'adx', 'dmi', 'atr', 'hilbert', 'ewo']
+
+    # returns the indicator graph, creating it on first use
+    def get_indicator_graph(self) -> IndicatorGraph:
+        if self.indicatorGraph is None:
+            graph = IndicatorGraph()
+            graph.add_node('ma', self.add_ma, ['sma', 'ema', 'tema'])
+            graph.add_node('srsi', self.add_srsi, ['srsi_k', 'srsi_d'], inputs=['rsi'])
+            graph.add_node('donchian', self.add_donchian,
+                           ['dc_upper', 'dc_lower', 'dc_mid', 'dcbb_dist_upper', 'dcbb_dist_lower', 'dc_dist'],
+                           inputs=['bb_upperband', 'bb_lowerband'])
+            graph.add_node('keltner', self.add_keltner, ['kc_upper', 'kc_lower', 'kc_mid'])
+            graph.add_node('rsi_14', self.add_rsi_14, ['rsi_14'])
+            graph.add_node('sma_200', self.add_sma_200, ['sma_200'])
+            graph.add_node('adx', self.add_adx, ['adx'])
+            graph.add_node('dmi', self.add_dmi, ['dm_plus', 'di_plus', 'dm_minus', 'di_minus', 'dm_delta', 'di_delta'])
+            graph.add_node('vfi', self.add_vfi, ['vfi'])
+            graph.add_node('atr', self.add_atr, ['atr'])
+            graph.add_node('hilbert', self.add_hilbert, ['htsine', 'htleadsine'])
+            graph.add_node('ewo', self.add_ewo, ['ewo'])
+            graph.add_node('uo', self.add_uo, ['uo'])
+            graph.add_node('aroon', self.add_aroon, ['aroonup', 'aroondown', 'aroonosc'])
+            graph.add_node('ao', self.add_ao, ['ao'])
+            graph.add_node('cci', self.add_cci, ['cci'])
+
+            # Legendary TA indicators
+            graph.add_node('fisher_cg', lta.fisher_cg, ['hl2', 'fisher_cg', 'fisher_sig'])
+            graph.add_node('exhaustion_bars', self.add_exhaustion_bars, ['leledc_major', 'leledc_minor'])
+            graph.add_node('smi_momentum', lta.smi_momentum, ['smi'])
+            graph.add_node('pinbar', lambda df: lta.pinbar(df, df["smi"]), ['pinbar_sell', 'pinbar_buy'],
+                           inputs=['smi'])
+            graph.add_node('breakouts', lta.breakouts,
+                           ['support_level', 'resistance_level', 'support_breakout', 'resistance_breakout',
+                            'support_retest', 'potential_support_retest',
+                            'resistance_retest', 'potential_resistance_retest'])
+            self.indicatorGraph = graph
+
+        return self.indicatorGraph
+
+    def add_default_indicators(self, dataframe: DataFrame, columns=None) -> DataFrame:
+        dataframe = self.add_minimal_indicators(dataframe)
+        return self.get_indicator_graph().populate(dataframe, self.default_indicators, columns)
+
+    # 'small' set of indicators - basically, the best-known ones
+    def add_small_indicators(self, dataframe: DataFrame, columns=None) -> DataFrame:
+        dataframe = self.add_minimal_indicators(dataframe)
+        return self.get_indicator_graph().populate(dataframe, self.small_indicators, columns)
 
-    def add_default_indicators(self, dataframe: DataFrame) -> DataFrame:
+    def add_medium_indicators(self, dataframe: DataFrame, columns=None) -> DataFrame:
+        dataframe = self.add_minimal_indicators(dataframe)
+        return self.get_indicator_graph().populate(dataframe, self.medium_indicators, columns)
 
+    def add_large_indicators(self, dataframe: DataFrame, columns=None) -> DataFrame:
         dataframe = self.add_minimal_indicators(dataframe)
+        return self.get_indicator_graph().populate(dataframe, self.large_indicators, columns)
 
-        # moving averages
+    # ------------------------------
+    # Indicator graph nodes
+
+    # moving averages
+    def add_ma(self, dataframe: DataFrame) -> DataFrame:
         dataframe['sma'] = ta.SMA(dataframe, timeperiod=self.win_size)
         dataframe['ema'] = ta.EMA(dataframe, timeperiod=self.win_size)
         dataframe['tema'] = ta.TEMA(dataframe, timeperiod=self.win_size)
         # dataframe['tema_stddev'] = dataframe['tema'].rolling(self.win_size).std()
+        return dataframe
 
-        # Stochastic
+    # Stochastic
+    def add_srsi(self, dataframe: DataFrame) -> DataFrame:
         period = 14
         smoothD = 3
         SmoothK = 3
@@ -188,8 +313,10 @@ class DataframePopulator():
                 dataframe['rsi'].rolling(period).max() - dataframe['rsi'].rolling(period).min())
         dataframe['srsi_k'] = stochrsi.rolling(SmoothK).mean() * 100
         dataframe['srsi_d'] = dataframe['srsi_k'].rolling(smoothD).mean()
+        return dataframe
 
-        # Donchian Channels
+    # Donchian Channels
+    def add_donchian(self, dataframe: DataFrame) -> DataFrame:
         dataframe['dc_upper'] = ta.MAX(dataframe['high'], timeperiod=self.win_size)
         dataframe['dc_lower'] = ta.MIN(dataframe['low'], timeperiod=self.win_size)
         dataframe['dc_mid'] = ta.TEMA(((dataframe['dc_upper'] + dataframe['dc_lower']) / 2), timeperiod=self.win_size)
@@ -203,262 +330,178 @@ class DataframePopulator():
         # dataframe['dc_chf'] = dataframe['dc_upper'] - dataframe['dc_dist'] * 0.382  # Centre High Fib
         # dataframe['dc_clf'] = dataframe['dc_upper'] - dataframe['dc_dist'] * 0.618  # Centre Low Fib
         # dataframe['dc_lf'] = dataframe['dc_upper'] - dataframe['dc_dist'] * 0.764  # Low Fib
+        return dataframe
 
-        # Keltner Channels (these can sometimes produce inf results)
+    # Keltner Channels (these can sometimes produce inf results)
+    def add_keltner(self, dataframe: DataFrame) -> DataFrame:
         keltner = qtpylib.keltner_channel(dataframe)
         dataframe["kc_upper"] = keltner["upper"]
         dataframe["kc_lower"] = keltner["lower"]
         dataframe["kc_mid"] = keltner["mid"]
+        return dataframe
 
-        # RSI
-        # dataframe['rsi'] = ta.RSI(dataframe, timeperiod=self.win_size)
+    # RSI
+    def add_rsi_14(self, dataframe: DataFrame) -> DataFrame:
         dataframe['rsi_14'] = ta.RSI(dataframe, timeperiod=14)
+        return dataframe
 
-        # # EMAs
-        # dataframe['ema_12'] = ta.EMA(dataframe, timeperiod=12)
-        # dataframe['ema_20'] = ta.EMA(dataframe, timeperiod=20)
-        # dataframe['ema_25'] = ta.EMA(dataframe, timeperiod=25)
-        # dataframe['ema_35'] = ta.EMA(dataframe, timeperiod=35)
-        # dataframe['ema_50'] = ta.EMA(dataframe, timeperiod=50)
-        # dataframe['ema_100'] = ta.EMA(dataframe, timeperiod=100)
-        # dataframe['ema_200'] = ta.EMA(dataframe, timeperiod=200)
-
-        # SMA
+    # SMA
+    def add_sma_200(self, dataframe: DataFrame) -> DataFrame:
         dataframe['sma_200'] = ta.SMA(dataframe, timeperiod=200)
         # dataframe['sma_200_dec_20'] = np.where(dataframe['sma_200'] < dataframe['sma_200'].shift(20), 1.0, -1.0)
         # dataframe['sma_200_dec_24'] = np.where(dataframe['sma_200'] < dataframe['sma_200'].shift(24), 1.0, -1.0)
+        return dataframe
 
-        # # CMF
-        # dataframe['cmf'] = chaikin_money_flow(dataframe, 20)
-
-        # # CTI
-        # dataframe['cti'] = pta.cti(dataframe["close"], length=20)
-
-        # # CRSI (3, 2, 100)
-        # crsi_closechange = dataframe['close'] / dataframe['close'].shift(1)
-        # crsi_updown = np.where(crsi_closechange.gt(1), 1.0, np.where(crsi_closechange.lt(1), -1.0, -1.0))
-        # dataframe['crsi'] = (ta.RSI(dataframe['close'], timeperiod=3) + ta.RSI(crsi_updown, timeperiod=2) + ta.ROC(
-        #     dataframe['close'],
-        #     100)) / 3
-        #
-        # # Williams %R
-        # dataframe['r_14'] = self.williams_r(dataframe, period=14)
-        # dataframe['r_480'] = self.williams_r(dataframe, period=480)
-
-        # # ROC
-        # dataframe['roc_9'] = ta.ROC(dataframe, timeperiod=9)
-
-        # # T3 Average
-        # dataframe['t3_avg'] = t3_average(dataframe)
-
-        # # S/R
-        # res_series = dataframe['high'].rolling(window=5, center=True).apply(lambda row: is_resistance(row),
-        #                                                                     raw=True).shift(2)
-        # sup_series = dataframe['low'].rolling(window=5, center=True).apply(lambda row: is_support(row),
-        #                                                                    raw=True).shift(2)
-        # dataframe['res_level'] = Series(
-        #     np.where(res_series,
-        #              np.where(dataframe['close'] > dataframe['open'], dataframe['close'], dataframe['open']),
-        #              float('NaN'))).ffill()
-        # dataframe['res_hlevel'] = Series(np.where(res_series, dataframe['high'], float('NaN'))).ffill()
-        # dataframe['sup_level'] = Series(
-        #     np.where(sup_series,
-        #              np.where(dataframe['close'] < dataframe['open'], dataframe['close'], dataframe['open']),
-        #              float('NaN'))).ffill()
-
-        # # Pump protections
-        # dataframe['hl_pct_change_48'] = self.range_percent_change(dataframe, 'HL', 48)
-        # dataframe['hl_pct_change_36'] = self.range_percent_change(dataframe, 'HL', 36)
-        # dataframe['hl_pct_change_24'] = self.range_percent_change(dataframe, 'HL', 24)
-        # dataframe['hl_pct_change_12'] = self.range_percent_change(dataframe, 'HL', 12)
-        # dataframe['hl_pct_change_6'] = self.range_percent_change(dataframe, 'HL', 6)
-
-        # ADX
+    # ADX
+    def add_adx(self, dataframe: DataFrame) -> DataFrame:
         dataframe['adx'] = ta.ADX(dataframe)
+        return dataframe
 
-        # Plus Directional Indicator / Movement
+    # Plus/Minus Directional Indicator / Movement
+    def add_dmi(self, dataframe: DataFrame) -> DataFrame:
         dataframe['dm_plus'] = ta.PLUS_DM(dataframe)
         dataframe['di_plus'] = ta.PLUS_DI(dataframe)
-
-        # Minus Directional Indicator / Movement
         dataframe['dm_minus'] = ta.MINUS_DM(dataframe)
         dataframe['di_minus'] = ta.MINUS_DI(dataframe)
         dataframe['dm_delta'] = dataframe['dm_plus'] - dataframe['dm_minus']
         dataframe['di_delta'] = dataframe['di_plus'] - dataframe['di_minus']
+        return dataframe
 
-        # # SAR Parabol
-        # dataframe['sar'] = ta.SAR(dataframe)
-
-        # dataframe['mom'] = ta.MOM(dataframe, timeperiod=14)
-        #
-        # # priming indicators
-        # dataframe['color'] = np.where((dataframe['close'] > dataframe['open']), 1.0, -1.0)
-        # dataframe['rsi_7'] = ta.RSI(dataframe, timeperiod=7)
-        # dataframe['roc_6'] = ta.ROC(dataframe, timeperiod=6)
-        # dataframe['primed'] = np.where(dataframe['color'].rolling(3).sum() == 3.0, 1.0, -1.0)
-        # dataframe['in_the_mood'] = np.where(dataframe['rsi_7'] > dataframe['rsi_7'].rolling(12).mean(), 1.0, -1.0)
-        # dataframe['moist'] = np.where(qtpylib.crossed_above(dataframe['macd'], dataframe['macdsignal']), 1.0, -1.0)
-        # dataframe['throbbing'] = np.where(dataframe['roc_6'] > dataframe['roc_6'].rolling(12).mean(), 1.0, -1.0)
-
-        # Volume Flow Indicator (MFI) for volume based on the direction of price movement
+    # Volume Flow Indicator (MFI) for volume based on the direction of price movement
+    def add_vfi(self, dataframe: DataFrame) -> DataFrame:
         dataframe['vfi'] = fta.VFI(dataframe, period=14)
+        return dataframe
 
-        # ATR
+    # ATR
+    def add_atr(self, dataframe: DataFrame) -> DataFrame:
         dataframe['atr'] = ta.ATR(dataframe, timeperiod=self.win_size)
+        return dataframe
 
-        # Hilbert Transform Indicator - SineWave
+    # Hilbert Transform Indicator - SineWave
+    def add_hilbert(self, dataframe: DataFrame) -> DataFrame:
         hilbert = ta.HT_SINE(dataframe)
         dataframe['htsine'] = hilbert['sine']
         dataframe['htleadsine'] = hilbert['leadsine']
-
-        # Oscillators
-
-        # EWO
-        dataframe['ewo'] = self.ewo(dataframe, 50, 200)
-
-        # Ultimate Oscillator
-        dataframe['uo'] = ta.ULTOSC(dataframe)
-
-        # Aroon, Aroon Oscillator
-        aroon = ta.AROON(dataframe)
-        dataframe['aroonup'] = aroon['aroonup']
-        dataframe['aroondown'] = aroon['aroondown']
-        dataframe['aroonosc'] = ta.AROONOSC(dataframe)
-
-        # Awesome Oscillator
-        dataframe['ao'] = qtpylib.awesome_oscillator(dataframe)
-
-        # Commodity Channel Index: values [Oversold:-100, Overbought:100]
-        dataframe['cci'] = ta.CCI(dataframe)
-
-        # Legenadry TA indicators
-        dataframe = lta.fisher_cg(dataframe)
-        dataframe = lta.exhaustion_bars(dataframe)
-        dataframe = lta.smi_momentum(dataframe)
-        dataframe = lta.pinbar(dataframe, dataframe["smi"])
-        dataframe = lta.breakouts(dataframe)
-
         return dataframe
 
-    # ------------------------------
-    # 'small' set of indicators - basically, the best-known ones
-    def add_small_indicators(self, dataframe: DataFrame) -> DataFrame:
-
-        dataframe = self.add_minimal_indicators(dataframe)
-
-        # moving averages
-        dataframe['sma'] = ta.SMA(dataframe, timeperiod=self.win_size)
-        dataframe['ema'] = ta.EMA(dataframe, timeperiod=self.win_size)
-        dataframe['tema'] = ta.TEMA(dataframe, timeperiod=self.win_size)
-        # dataframe['tema_stddev'] = dataframe['tema'].rolling(self.win_size).std()
-
-        # Donchian Channels
-        dataframe['dc_upper'] = ta.MAX(dataframe['high'], timeperiod=self.win_size)
-        dataframe['dc_lower'] = ta.MIN(dataframe['low'], timeperiod=self.win_size)
-        dataframe['dc_mid'] = ta.TEMA(((dataframe['dc_upper'] + dataframe['dc_lower']) / 2), timeperiod=self.win_size)
-
-        dataframe["dcbb_dist_upper"] = (dataframe["dc_upper"] - dataframe['bb_upperband'])
-        dataframe["dcbb_dist_lower"] = (dataframe["dc_lower"] - dataframe['bb_lowerband'])
-
-        # Fibonacci Levels (of Donchian Channel)
-        dataframe['dc_dist'] = (dataframe['dc_upper'] - dataframe['dc_lower'])
-        # dataframe['dc_hf'] = dataframe['dc_upper'] - dataframe['dc_dist'] * 0.236  # Highest Fib
-        # dataframe['dc_chf'] = dataframe['dc_upper'] - dataframe['dc_dist'] * 0.382  # Centre High Fib
-        # dataframe['dc_clf'] = dataframe['dc_upper'] - dataframe['dc_dist'] * 0.618  # Centre Low Fib
-        # dataframe['dc_lf'] = dataframe['dc_upper'] - dataframe['dc_dist'] * 0.764  # Low Fib
-
-        # Keltner Channels (these can sometimes produce inf results)
-        keltner = qtpylib.keltner_channel(dataframe)
-        dataframe["kc_upper"] = keltner["upper"]
-        dataframe["kc_lower"] = keltner["lower"]
-        dataframe["kc_mid"] = keltner["mid"]
-
-        return dataframe
-
-    # ------------------------------
-
-    def add_medium_indicators(self, dataframe: DataFrame) -> DataFrame:
-
-        dataframe = self.add_small_indicators(dataframe)
-
-
-        # ADX
-        dataframe['adx'] = ta.ADX(dataframe)
-
-        # Plus Directional Indicator / Movement
-        dataframe['dm_plus'] = ta.PLUS_DM(dataframe)
-        dataframe['di_plus'] = ta.PLUS_DI(dataframe)
-
-        # Minus Directional Indicator / Movement
-        dataframe['dm_minus'] = ta.MINUS_DM(dataframe)
-        dataframe['di_minus'] = ta.MINUS_DI(dataframe)
-        dataframe['dm_delta'] = dataframe['dm_plus'] - dataframe['dm_minus']
-        dataframe['di_delta'] = dataframe['di_plus'] - dataframe['di_minus']
-
-        # Volume Flow Indicator (MFI) for volume based on the direction of price movement
-        dataframe['vfi'] = fta.VFI(dataframe, period=14)
-
-        # ATR
-        dataframe['atr'] = ta.ATR(dataframe, timeperiod=self.win_size)
-
-        # Oscillators
-
-        # EWO
+    # EWO
+    def add_ewo(self, dataframe: DataFrame) -> DataFrame:
         dataframe['ewo'] = self.ewo(dataframe, 50, 200)
+        return dataframe
 
-        # Ultimate Oscillator
+    # Ultimate Oscillator
+    def add_uo(self, dataframe: DataFrame) -> DataFrame:
         dataframe['uo'] = ta.ULTOSC(dataframe)
+        return dataframe
 
-        # Aroon, Aroon Oscillator
+    # Aroon, Aroon Oscillator
+    def add_aroon(self, dataframe: DataFrame) -> DataFrame:
         aroon = ta.AROON(dataframe)
         dataframe['aroonup'] = aroon['aroonup']
         dataframe['aroondown'] = aroon['aroondown']
         dataframe['aroonosc'] = ta.AROONOSC(dataframe)
+        return dataframe
 
-        # Awesome Oscillator
+    # Awesome Oscillator
+    def add_ao(self, dataframe: DataFrame) -> DataFrame:
         dataframe['ao'] = qtpylib.awesome_oscillator(dataframe)
-
         return dataframe
 
-    # ------------------------------
-
-    def add_large_indicators(self, dataframe: DataFrame) -> DataFrame:
-
-        dataframe = self.add_medium_indicators(dataframe)
-
-        # Stochastic
-        period = 14
-        smoothD = 3
-        SmoothK = 3
-        stochrsi = (dataframe['rsi'] - dataframe['rsi'].rolling(period).min()) / (
-                dataframe['rsi'].rolling(period).max() - dataframe['rsi'].rolling(period).min())
-        dataframe['srsi_k'] = stochrsi.rolling(SmoothK).mean() * 100
-        dataframe['srsi_d'] = dataframe['srsi_k'].rolling(smoothD).mean()
-
-        # RSI
-        dataframe['rsi_14'] = ta.RSI(dataframe, timeperiod=14)
-
-        # SMA
-        dataframe['sma_200'] = ta.SMA(dataframe, timeperiod=200)
-
-        # Hilbert Transform Indicator - SineWave
-        hilbert = ta.HT_SINE(dataframe)
-        dataframe['htsine'] = hilbert['sine']
-        dataframe['htleadsine'] = hilbert['leadsine']
-
-        # Commodity Channel Index: values [Oversold:-100, Overbought:100]
+    # Commodity Channel Index: values [Oversold:-100, Overbought:100]
+    def add_cci(self, dataframe: DataFrame) -> DataFrame:
         dataframe['cci'] = ta.CCI(dataframe)
+        return dataframe
 
-        # Legendary TA indicators
-        dataframe = lta.fisher_cg(dataframe)
-        dataframe = lta.exhaustion_bars(dataframe)
-        dataframe = lta.smi_momentum(dataframe)
-        dataframe = lta.pinbar(dataframe, dataframe["smi"])
-        dataframe = lta.breakouts(dataframe)
-
-
+    # Leledc exhaustion bars. The counters carry over indefinitely, so in incremental mode they are saved for each pair,
+    # and the calculation resumes after the last candle of the previous call (instead of restarting on the tail)
+    def add_exhaustion_bars(self, dataframe: DataFrame) -> DataFrame:
+        if self.stream_key is None:
+            return lta.exhaustion_bars(dataframe)
+
+        start = 0
+        state = {}
+        saved = self.exhaustion_state.get(self.stream_key, None)
+        if saved is not None:
+            rows = np.flatnonzero(dataframe['date'] == saved['date'])
+            if len(rows) > 0:
+                start = rows[0] + 1
+                state = dict(saved['state'])
+
+        dataframe = lta.exhaustion_bars(dataframe, start=start, state=state)
+        if dataframe.shape[0] > 0:
+            self.exhaustion_state[self.stream_key] = {'date': dataframe['date'].iloc[-1], 'state': state}
         return dataframe
 
+    # Other indicators that have been tried (could be added as nodes):
+
+    # # EMAs
+    # dataframe['ema_12'] = ta.EMA(dataframe, timeperiod=12)
+    # dataframe['ema_20'] = ta.EMA(dataframe, timeperiod=20)
+    # dataframe['ema_25'] = ta.EMA(dataframe, timeperiod=25)
+    # dataframe['ema_35'] = ta.EMA(dataframe, timeperiod=35)
+    # dataframe['ema_50'] = ta.EMA(dataframe, timeperiod=50)
+    # dataframe['ema_100'] = ta.EMA(dataframe, timeperiod=100)
+    # dataframe['ema_200'] = ta.EMA(dataframe, timeperiod=200)
+
+    # # CMF
+    # dataframe['cmf'] = chaikin_money_flow(dataframe, 20)
+
+    # # CTI
+    # dataframe['cti'] = pta.cti(dataframe["close"], length=20)
+
+    # # CRSI (3, 2, 100)
+    # crsi_closechange = dataframe['close'] / dataframe['close'].shift(1)
+    # crsi_updown = np.where(crsi_closechange.gt(1), 1.0, np.where(crsi_closechange.lt(1), -1.0, -1.0))
+    # dataframe['crsi'] = (ta.RSI(dataframe['close'], timeperiod=3) + ta.RSI(crsi_updown, timeperiod=2) + ta.ROC(
+    #     dataframe['close'],
+    #     100)) / 3
+    #
+    # # Williams %R
+    # dataframe['r_14'] = self.williams_r(dataframe, period=14)
+    # dataframe['r_480'] = self.williams_r(dataframe, period=480)
+
+    # # ROC
+    # dataframe['roc_9'] = ta.ROC(dataframe, timeperiod=9)
+
+    # # T3 Average
+    # dataframe['t3_avg'] = t3_average(dataframe)
+
+    # # S/R
+    # res_series = dataframe['high'].rolling(window=5, center=True).apply(lambda row: is_resistance(row),
+    #                                                                     raw=True).shift(2)
+    # sup_series = dataframe['low'].rolling(window=5, center=True).apply(lambda row: is_support(row),
+    #                                                                    raw=True).shift(2)
+    # dataframe['res_level'] = Series(
+    #     np.where(res_series,
+    #              np.where(dataframe['close'] > dataframe['open'], dataframe['close'], dataframe['open']),
+    #              float('NaN'))).ffill()
+    # dataframe['res_hlevel'] = Series(np.where(res_series, dataframe['high'], float('NaN'))).ffill()
+    # dataframe['sup_level'] = Series(
+    #     np.where(sup_series,
+    #              np.where(dataframe['close'] < dataframe['open'], dataframe['close'], dataframe['open']),
+    #              float('NaN'))).ffill()
+
+    # # Pump protections
+    # dataframe['hl_pct_change_48'] = self.range_percent_change(dataframe, 'HL', 48)
+    # dataframe['hl_pct_change_36'] = self.range_percent_change(dataframe, 'HL', 36)
+    # dataframe['hl_pct_change_24'] = self.range_percent_change(dataframe, 'HL', 24)
+    # dataframe['hl_pct_change_12'] = self.range_percent_change(dataframe, 'HL', 12)
+    # dataframe['hl_pct_change_6'] = self.range_percent_change(dataframe, 'HL', 6)
+
+    # # SAR Parabol
+    # dataframe['sar'] = ta.SAR(dataframe)
+
+    # dataframe['mom'] = ta.MOM(dataframe, timeperiod=14)
+    #
+    # # priming indicators
+    # dataframe['color'] = np.where((dataframe['close'] > dataframe['open']), 1.0, -1.0)
+    # dataframe['rsi_7'] = ta.RSI(dataframe, timeperiod=7)
+    # dataframe['roc_6'] = ta.ROC(dataframe, timeperiod=6)
+    # dataframe['primed'] = np.where(dataframe['color'].rolling(3).sum() == 3.0, 1.0, -1.0)
+    # dataframe['in_the_mood'] = np.where(dataframe['rsi_7'] > dataframe['rsi_7'].rolling(12).mean(), 1.0, -1.0)
+    # dataframe['moist'] = np.where(qtpylib.crossed_above(dataframe['macd'], dataframe['macdsignal']), 1.0, -1.0)
+    # dataframe['throbbing'] = np.where(dataframe['roc_6'] > dataframe['roc_6'].rolling(12).mean(), 1.0, -1.0)
+
     # ------------------------------
 
     def add_custom1_indicators(self, dataframe: DataFrame) -> DataFrame:
@@ -475,18 +518,109 @@ class DataframePopulator():
 
     #------------------------------
 
-    def add_indicators(self, dataframe: DataFrame, dataset_type=DatasetType.DEFAULT) -> DataFrame:
+    # columns is an optional list of the indicators actually used (e.g. model features plus training signal
+    # indicators). If supplied, only those (plus the minimal set) are calculated, otherwise all of the indicators in
+    # dataset_type are calculated. Column names that are not part of the dataset type are ignored
+    def add_indicators(self, dataframe: DataFrame, dataset_type=DatasetType.DEFAULT,
+                       pair: str = "", timeframe: str = "", columns=None) -> DataFrame:
+
+        # check feature store first (only if the caller identified the data)
+        key = None
+        if self.use_feature_store and pair and (self.runmode in ('hyperopt', 'backtest', 'plot')):
+            if self.feature_store is None:
+                self.feature_store = FeatureStore()
+            params = self.get_feature_params()
+            if columns is not None:
+                params['columns'] = ",".join(sorted(set(columns)))
+            key = self.feature_store.make_key(pair, timeframe, dataset_type, self.populator_version,
+                                              params, dataframe)
+            cached_df = self.feature_store.load(key)
+            if cached_df is not None:
+                cached_df.index = dataframe.index
+                return cached_df
+
+        # in live/dry runs, only process new candles
+        if self.incremental and pair and (self.runmode in ('live', 'dry_run')):
+            return self.add_indicators_incremental(dataframe, dataset_type, pair, columns)
+
+        dataframe = self.populate_dataset(dataframe, dataset_type, columns)
+
+        if key is not None:
+            self.feature_store.save(key, dataframe)
+
+        return dataframe
+
+    # incremental version of add_indicators(). Only the candles added since the last call for this pair are populated
+    def add_indicators_incremental(self, dataframe: DataFrame, dataset_type, pair: str, columns=None) -> DataFrame:
+
+        nrows = dataframe.shape[0]
+        dates = dataframe['date']
+        prev_df = self.incremental_state.get(pair, None)
+
+        # figure out how many rows are new, and make sure that we have all the old ones
+        num_new = nrows
+        if prev_df is not None:
+            old_rows = prev_df.loc[prev_df['date'] >= dates.iloc[0]]
+            num_new = int((dates > prev_df['date'].iloc[-1]).sum())
+            if (old_rows.shape[0] != (nrows - num_new)) or \
+                    (old_rows.shape[0] > 0 and old_rows['date'].iloc[0] != dates.iloc[0]):
+                num_new = nrows
+
+        self.stream_key = pair
+
+        if num_new >= nrows:
+            # nothing usable from previous call, process everything
+            self.exhaustion_state.pop(pair, None)
+            result = self.populate_dataset(dataframe, dataset_type, columns)
+        elif num_new == 0:
+            result = old_rows.copy()
+        else:
+            # populate the new rows, plus enough history to prime the indicators
+            tail_len = min(nrows, num_new + max(self.incremental_warmup, self.startup_win))
+            # (some indicators index by row label, so the tail must start at 0)
+            tail = self.populate_dataset(dataframe.iloc[-tail_len:].reset_index(drop=True), dataset_type, columns)
+            result = pd.concat([old_rows, tail.iloc[-num_new:]])
+            result.index = dataframe.index
+            result = self.update_recursive_indicators(result, num_new)
+
+        self.stream_key = None
+
+        result.index = dataframe.index
+        self.incremental_state[pair] = result
+
+        return result.copy()
+
+    # recalculate the indicators with unbounded memory over the whole dataframe, and replace the values in the last
+    # num_new rows (the earlier rows are unchanged, they were calculated the same way when they were new)
+    def update_recursive_indicators(self, dataframe: DataFrame, num_new: int) -> DataFrame:
+        full_df = self.add_macd(self.add_rsi_wr(dataframe.copy()))
+        columns = ['rsi', 'wr', 'fisher_rsi', 'fisher_wr', 'macd', 'macdsignal', 'macdhist']
+
+        graph = self.get_indicator_graph()
+        for name in self.recursive_nodes:
+            node = graph.nodes[name]
+            if all(col in dataframe.columns for col in node.outputs):
+                full_df = node.func(full_df)
+                columns.extend(node.outputs)
+
+        # same clean up as populate_dataset()
+        values = full_df[columns].iloc[-num_new:].fillna(0.0)
+        dataframe.iloc[-num_new:, dataframe.columns.get_indexer(columns)] = values.to_numpy()
+        return dataframe
+
+    # add the indicators for the requested dataset type, and clean up the results
+    def populate_dataset(self, dataframe: DataFrame, dataset_type, columns=None) -> DataFrame:
 
         if dataset_type == DatasetType.DEFAULT:
-            dataframe = self.add_default_indicators(dataframe)
+            dataframe = self.add_default_indicators(dataframe, columns)
         elif dataset_type == DatasetType.MINIMAL:
             dataframe = self.add_minimal_indicators(dataframe)
         elif dataset_type == DatasetType.SMALL:
-            dataframe = self.add_small_indicators(dataframe)
+            dataframe = self.add_small_indicators(dataframe, columns)
         elif dataset_type == DatasetType.MEDIUM:
-            dataframe = self.add_medium_indicators(dataframe)
+            dataframe = self.add_medium_indicators(dataframe, columns)
         elif dataset_type == DatasetType.LARGE:
-            dataframe = self.add_large_indicators(dataframe)
+            dataframe = self.add_large_indicators(dataframe, columns)
         elif dataset_type == DatasetType.CUSTOM1:
             dataframe = self.add_custom1_indicators(dataframe)
         elif dataset_type == DatasetType.CUSTOM2:
@@ -502,6 +636,16 @@ class DataframePopulator():
 
         return dataframe
 
+    # settings that affect the output of add_indicators() (used for feature store keys)
+    def get_feature_params(self) -> dict:
+        return {
+            'runmode': self.runmode,
+            'startup_win': self.startup_win,
+            'win_size': self.win_size,
+            'n_profit_stddevs': self.n_profit_stddevs,
+            'n_loss_stddevs': self.n_loss_stddevs
+        }
+
     ################################
 
     # 'hidden' indicators. These are ostensibly backward looking, but may inadvertently use means, smoothing etc.
@@ -547,136 +691,141 @@ class DataframePopulator():
 
         return dataframe
 
+    # columns created by add_future_data(), in order
+    future_columns = [
+        'full_dwt', 'future_close', 'future_gain', 'future_profit', 'future_loss',
+        'future_gain_mean', 'future_gain_std', 'future_gain_sum',
+        'future_profit_mean', 'future_profit_std', 'future_loss_mean', 'future_loss_std',
+        'future_profit_max', 'future_profit_min', 'future_loss_max', 'future_loss_min',
+        'future_profit_threshold', 'future_loss_threshold', 'future_profit_diff', 'future_loss_diff',
+        'future_dwt', 'trend', 'ftrend', 'curr_trend', 'future_trend',
+        'full_dwt_dir', 'full_dwt_dir_up', 'full_dwt_nseq_up', 'full_dwt_dir_dn', 'full_dwt_nseq_dn',
+        'future_nseq_up', 'future_nseq_up_mean', 'future_nseq_up_std', 'future_nseq_up_thresh',
+        'future_nseq_dn', 'future_nseq_dn_mean', 'future_nseq_dn_std', 'future_nseq_dn_thresh',
+        'future_min', 'future_max', 'future_maxmin', 'future_delta_min', 'future_delta_max',
+        'future_slope'
+    ]
+
     # calculate future gains. Used for setting targets. Yes, we lookahead in the data!
-    def add_future_data(self, dataframe: DataFrame, lookahead: int) -> DataFrame:
+    # The future columns are added to the supplied dataframe, so do not pass the 'main' dataframe (use a copy).
+    # columns is an optional list of the columns actually needed (e.g. from TrainingSignals.get_indicator_list()),
+    # other future columns are not added. Names that are not future columns are ignored
+    def add_future_data(self, dataframe: DataFrame, lookahead: int, columns=None) -> DataFrame:
 
         lookahead_win = max(lookahead, 14)
+        win_size = int(self.win_size)
+        nrows = np.shape(dataframe)[0]
+
+        if columns is None:
+            columns = self.future_columns
+        wanted = set(columns)
+
+        def needed(*names) -> bool:
+            return any(name in wanted for name in names)
 
-        # make a copy of the dataframe so that we do not put any forward looking data into the main dataframe
-        # Also, use a different name to avoid cut & paste errors
-        future_df = dataframe.copy()
+        # Note: everything is calculated with numpy arrays, and only the requested columns are added to the dataframe
+        future = {}
 
         # we can either use the actual closing price, or the DWT model (smoother)
+        close = dataframe['close'].to_numpy(dtype=float)
 
         use_dwt = True
         if use_dwt:
-            price_col = 'full_dwt'
-
             # get the 'full' DWT transform. This models the entire dataframe, so cannot be used in the 'main' dataframe
-            future_df['full_dwt'] = self.get_dwt(dataframe['close'])
-
+            future['full_dwt'] = np.asarray(self.get_dwt(close), dtype=float)[:nrows]
+            price = future['full_dwt']
         else:
-            price_col = 'close'
-            future_df['full_dwt'] = 0.0
+            future['full_dwt'] = np.zeros(nrows, dtype=float)
+            price = close
 
         # calculate future gains
-        future_df['future_close'] = future_df[price_col].shift(-lookahead_win)
+        future['future_close'] = self.shift_array(price, -lookahead_win)
 
-        future_df['future_gain'] = 100.0 * (future_df['future_close'] - future_df[price_col]) / future_df[price_col]
-        future_df['future_gain'].clip(lower=-5.0, upper=5.0, inplace=True)
-
-        future_df['future_profit'] = future_df['future_gain'].clip(lower=0.0)
-        future_df['future_loss'] = future_df['future_gain'].clip(upper=0.0)
+        future['future_gain'] = np.clip(100.0 * (future['future_close'] - price) / price, -5.0, 5.0)
+        future['future_profit'] = np.clip(future['future_gain'], 0.0, None)
+        future['future_loss'] = np.clip(future['future_gain'], None, 0.0)
 
         # get rolling mean & stddev so that we have a localised estimate of (recent) future activity
         # Note: window in past because we already looked forward (with 'future_close')
-        future_df['future_gain_mean'] = future_df['future_gain'].rolling(lookahead_win).mean()
-        future_df['future_gain_std'] = future_df['future_gain'].rolling(lookahead_win).std()
-        future_df['future_gain_sum'] = future_df['future_gain'].rolling(lookahead_win).sum()
-
-        future_df['future_profit_mean'] = future_df['future_profit'].rolling(lookahead_win).mean()
-        future_df['future_profit_std'] = future_df['future_profit'].rolling(lookahead_win).std()
-        future_df['future_loss_mean'] = future_df['future_loss'].rolling(lookahead_win).mean()
-        future_df['future_loss_std'] = future_df['future_loss'].rolling(lookahead_win).std()
-
-        future_df['future_profit_max'] = future_df['future_profit'].rolling(lookahead_win).max()
-        future_df['future_profit_min'] = future_df['future_profit'].rolling(lookahead_win).min()
-        future_df['future_loss_max'] = future_df['future_loss'].rolling(lookahead_win).max()
-        future_df['future_loss_min'] = future_df['future_loss'].rolling(lookahead_win).min()
-
-        # future_df['profit_threshold'] = future_df['profit_mean'] + self.n_profit_stddevs * abs(future_df['profit_std'])
-        # future_df['loss_threshold'] = future_df['loss_mean'] - self.n_loss_stddevs * abs(future_df['loss_std'])
-
-        future_df['future_profit_threshold'] = future_df['dwt_profit_mean'] + self.n_profit_stddevs * abs(
-            future_df['dwt_profit_std'])
-        future_df['future_loss_threshold'] = future_df['dwt_loss_mean'] - self.n_loss_stddevs * abs(
-            future_df['dwt_loss_std'])
-
-        future_df['future_profit_diff'] = (future_df['future_profit'] - future_df['future_profit_threshold']) * 10.0
-        future_df['future_loss_diff'] = (future_df['future_loss'] - future_df['future_loss_threshold']) * 10.0
-
-        # future_df['buy_signal'] = np.where(future_df['profit_diff'] > 0.0, 1.0, 0.0)
-        # future_df['sell_signal'] = np.where(future_df['loss_diff'] < 0.0, -1.0, 0.0)
+        if needed('future_gain_mean', 'future_gain_std', 'future_gain_sum'):
+            gain_mean, gain_std, gain_sum = self.rolling_stats(future['future_gain'], lookahead_win)
+            future['future_gain_mean'] = gain_mean
+            future['future_gain_std'] = gain_std
+            future['future_gain_sum'] = gain_sum
+
+        if needed('future_profit_mean', 'future_profit_std', 'future_profit_max', 'future_profit_min'):
+            future['future_profit_mean'], future['future_profit_std'], _ = \
+                self.rolling_stats(future['future_profit'], lookahead_win)
+            future['future_profit_min'], future['future_profit_max'] = \
+                self.rolling_minmax(future['future_profit'], lookahead_win)
+
+        if needed('future_loss_mean', 'future_loss_std', 'future_loss_max', 'future_loss_min'):
+            future['future_loss_mean'], future['future_loss_std'], _ = \
+                self.rolling_stats(future['future_loss'], lookahead_win)
+            future['future_loss_min'], future['future_loss_max'] = \
+                self.rolling_minmax(future['future_loss'], lookahead_win)
+
+        future['future_profit_threshold'] = dataframe['dwt_profit_mean'].to_numpy(dtype=float) + \
+                                            self.n_profit_stddevs * abs(dataframe['dwt_profit_std'].to_numpy(dtype=float))
+        future['future_loss_threshold'] = dataframe['dwt_loss_mean'].to_numpy(dtype=float) - \
+                                          self.n_loss_stddevs * abs(dataframe['dwt_loss_std'].to_numpy(dtype=float))
+
+        future['future_profit_diff'] = (future['future_profit'] - future['future_profit_threshold']) * 10.0
+        future['future_loss_diff'] = (future['future_loss'] - future['future_loss_threshold']) * 10.0
 
         # these explicitly uses dwt
-        future_df['future_dwt'] = future_df['full_dwt'].shift(-lookahead_win)
-        # future_df['curr_trend'] = np.where(future_df['full_dwt'].shift(-1) > future_df['full_dwt'], 1.0, -1.0)
-        # future_df['future_trend'] = np.where(future_df['future_dwt'].shift(-1) > future_df['future_dwt'], 1.0, -1.0)
+        future['future_dwt'] = self.shift_array(future['full_dwt'], -lookahead_win)
 
-        future_df['trend'] = np.where(future_df[price_col] >= future_df[price_col].shift(), 1.0, -1.0)
-        future_df['ftrend'] = np.where(future_df['future_close'] >= future_df['future_close'].shift(), 1.0, -1.0)
+        # Note: comparisons with NaN are False, so the first entry (and any NaNs) give -1
+        future['trend'] = np.where(price >= self.shift_array(price, 1), 1.0, -1.0)
+        future['ftrend'] = np.where(future['future_close'] >= self.shift_array(future['future_close'], 1), 1.0, -1.0)
 
-        future_df['curr_trend'] = np.where(future_df['trend'].rolling(3).sum() > 0.0, 1.0, -1.0)
-        future_df['future_trend'] = np.where(future_df['ftrend'].rolling(3).sum() > 0.0, 1.0, -1.0)
+        future['curr_trend'] = np.where(self.rolling_stats(future['trend'], 3)[2] > 0.0, 1.0, -1.0)
+        future['future_trend'] = np.where(self.rolling_stats(future['ftrend'], 3)[2] > 0.0, 1.0, -1.0)
 
         # Sequences of consecutive up/downs (using full_dwt)
-        future_df['full_dwt_dir'] = 0.0
-        future_df['full_dwt_dir'] = np.where(future_df['full_dwt'].diff() > 0, 1.0, -1.0)
-
-        future_df['full_dwt_dir_up'] = future_df['full_dwt_dir'].clip(lower=0.0)
-        future_df['full_dwt_nseq_up'] = future_df['full_dwt_dir_up'] * (future_df['full_dwt_dir_up'].groupby(
-            (future_df['full_dwt_dir_up'] != future_df['full_dwt_dir_up'].shift()).cumsum()).cumcount() + 1)
-        future_df['full_dwt_nseq_up'] = future_df['full_dwt_nseq_up'].clip(lower=0.0,
-                                                                           upper=20.0)  # removes startup artifacts
-
-        future_df['full_dwt_dir_dn'] = abs(future_df['full_dwt_dir'].clip(upper=0.0))
-        future_df['full_dwt_nseq_dn'] = future_df['full_dwt_dir_dn'] * (future_df['full_dwt_dir_dn'].groupby(
-            (future_df['full_dwt_dir_dn'] != future_df['full_dwt_dir_dn'].shift()).cumsum()).cumcount() + 1)
-        future_df['full_dwt_nseq_dn'] = future_df['full_dwt_nseq_dn'].clip(lower=0.0, upper=20.0)
+        future['full_dwt_dir'] = np.where(np.diff(future['full_dwt'], prepend=np.nan) > 0, 1.0, -1.0)
 
-        # build forward-looking sum of up/down trends
-        future_win = pd.api.indexers.FixedForwardWindowIndexer(window_size=int(self.win_size))  # don't use a big window
+        future['full_dwt_dir_up'] = np.clip(future['full_dwt_dir'], 0.0, None)
+        future['full_dwt_nseq_up'] = np.clip(self.run_lengths(future['full_dwt_dir_up']), 0.0, 20.0)
 
-        future_df['future_nseq_up'] = future_df['full_dwt_nseq_up'].shift(-self.win_size)
+        future['full_dwt_dir_dn'] = np.abs(np.clip(future['full_dwt_dir'], None, 0.0))
+        future['full_dwt_nseq_dn'] = np.clip(self.run_lengths(future['full_dwt_dir_dn']), 0.0, 20.0)
 
-        future_df['future_nseq_up_mean'] = future_df['future_nseq_up'].rolling(window=future_win).mean()
-        future_df['future_nseq_up_std'] = future_df['future_nseq_up'].rolling(window=future_win).std()
-        future_df['future_nseq_up_thresh'] = future_df['future_nseq_up_mean'] + self.n_profit_stddevs * future_df[
-            'future_nseq_up_std']
+        # build forward-looking sum of up/down trends (don't use a big window)
+        future['future_nseq_up'] = self.shift_array(future['full_dwt_nseq_up'], -win_size)
+        if needed('future_nseq_up_mean', 'future_nseq_up_std', 'future_nseq_up_thresh'):
+            up_mean, up_std, _ = self.rolling_stats(future['future_nseq_up'], win_size, forward=True)
+            future['future_nseq_up_mean'] = up_mean
+            future['future_nseq_up_std'] = up_std
+            future['future_nseq_up_thresh'] = up_mean + self.n_profit_stddevs * up_std
 
-        future_df['future_nseq_dn'] = future_df['full_dwt_nseq_dn'].shift(-self.win_size)
-
-        future_df['future_nseq_dn_mean'] = future_df['future_nseq_dn'].rolling(future_win).mean()
-        future_df['future_nseq_dn_std'] = future_df['future_nseq_dn'].rolling(future_win).std()
-        future_df['future_nseq_dn_thresh'] = future_df['future_nseq_dn_mean'] \
-                                             - self.n_loss_stddevs * future_df['future_nseq_dn_std']
+        future['future_nseq_dn'] = self.shift_array(future['full_dwt_nseq_dn'], -win_size)
+        if needed('future_nseq_dn_mean', 'future_nseq_dn_std', 'future_nseq_dn_thresh'):
+            dn_mean, dn_std, _ = self.rolling_stats(future['future_nseq_dn'], win_size, forward=True)
+            future['future_nseq_dn_mean'] = dn_mean
+            future['future_nseq_dn_std'] = dn_std
+            future['future_nseq_dn_thresh'] = dn_mean - self.n_loss_stddevs * dn_std
 
         # Recent min/max
-        # future_df['future_min'] = future_df[price_col].rolling(window=future_win).min()
-        # future_df['future_max'] = future_df[price_col].rolling(window=future_win).max()
-        future_df['future_min'] = future_df['dwt'].rolling(window=future_win).min()
-        future_df['future_max'] = future_df['dwt'].rolling(window=future_win).max()
-
-        future_df['future_maxmin'] = 100.0 * (future_df['future_max'] - future_df['future_min']) / \
-                                     future_df['future_max']
-        future_df['future_delta_min'] = 100.0 * (future_df['future_min'] - future_df['close']) / \
-                                        future_df['close']
-        future_df['future_delta_max'] = 100.0 * (future_df['future_max'] - future_df['close']) / \
-                                        future_df['close']
-
-        future_df['future_maxmin'] = future_df['future_maxmin'].clip(lower=0.0, upper=10.0)
-
+        if needed('future_min', 'future_max', 'future_maxmin', 'future_delta_min', 'future_delta_max'):
+            future_min, future_max = self.rolling_minmax(dataframe['dwt'].to_numpy(dtype=float), win_size,
+                                                         forward=True)
+            future['future_min'] = future_min
+            future['future_max'] = future_max
+            future['future_maxmin'] = np.clip(100.0 * (future_max - future_min) / future_max, 0.0, 10.0)
+            future['future_delta_min'] = 100.0 * (future_min - close) / close
+            future['future_delta_max'] = 100.0 * (future_max - close) / close
 
         # rolling linear slope of the DWT (i.e. average trend) of near-past (shifted forward)
-        future_df['future_slope'] = future_df['future_dwt'].rolling(window=6).apply(self.roll_get_slope)
+        if needed('future_slope'):
+            future['future_slope'] = self.rolling_slope(future['future_dwt'], 6)
 
-        # get average gain & stddev
-        profit_mean = future_df['future_profit'].mean()
-        profit_std = future_df['future_profit'].std()
-        loss_mean = future_df['future_loss'].mean()
-        loss_std = future_df['future_loss'].std()
+        for col in self.future_columns:
+            if (col in wanted) and (col in future):
+                dataframe[col] = future[col]
 
-        return future_df
+        return dataframe
 
     ###################################
 
@@ -746,6 +895,12 @@ class DataframePopulator():
 
         return model
 
+    # returns the (vectorised) rolling DWT engine. Re-created if startup_win has been changed
+    def get_rolling_dwt(self) -> RollingDWT:
+        if (self.rollingDWT is None) or (self.rollingDWT.window != self.startup_win):
+            self.rollingDWT = RollingDWT(window=self.startup_win)
+        return self.rollingDWT
+
     def roll_get_dwt(self, col) -> float:
         # must return scalar, so just calculate prediction and take last value
 
@@ -807,6 +962,91 @@ class DataframePopulator():
 
         return slope
 
+    # fast equivalent of col.rolling(window).apply(self.roll_get_slope), i.e. the least squares slope over each
+    # window (assumes evenly spaced samples). Windows containing NaNs give NaN
+    def rolling_slope(self, col, window: int) -> np.ndarray:
+        data = np.asarray(col, dtype=float)
+        result = np.full(len(data), np.nan)
+        if len(data) < window:
+            return result
+
+        # slope = sum((x - mean(x)) * y) / sum((x - mean(x))^2)
+        x = np.arange(window, dtype=float) - (window - 1) / 2.0
+        weights = x / np.sum(x * x)
+
+        result[window - 1:] = sliding_window_view(data, window) @ weights
+        return result
+
+    # shift a numpy array by n places (same as Series.shift()), filling with NaN
+    def shift_array(self, data, n: int) -> np.ndarray:
+        result = np.full(len(data), np.nan)
+        if n == 0:
+            result[:] = data
+        elif n > 0:
+            result[n:] = data[:-n]
+        else:
+            result[:n] = data[-n:]
+        return result
+
+    # rolling mean, stddev and sum of data. Same as rolling(window).mean() etc., i.e. NaN for incomplete windows and
+    # windows containing NaNs. Set forward=True for a forward looking window (same as FixedForwardWindowIndexer)
+    def rolling_stats(self, data, window: int, forward=False):
+        data = np.asarray(data, dtype=float)
+        nrows = len(data)
+        mean = np.full(nrows, np.nan)
+        std = np.full(nrows, np.nan)
+        total = np.full(nrows, np.nan)
+        if nrows < window:
+            return mean, std, total
+
+        # sums (and NaN counts) from cumulative sums
+        nans = np.isnan(data)
+        csum = np.concatenate(([0.0], np.cumsum(np.where(nans, 0.0, data))))
+        cnan = np.concatenate(([0], np.cumsum(nans)))
+        valid = (cnan[window:] - cnan[:-window]) == 0
+        wsum = np.where(valid, csum[window:] - csum[:-window], np.nan)
+
+        # stddev calculated directly from the (strided) windows, which avoids the rounding problems of using sums of
+        # squares (constant windows are common here, and need to give 0)
+        wstd = np.full(len(wsum), np.nan)
+        if window > 1:
+            wstd[valid] = sliding_window_view(data, window)[valid].std(axis=1, ddof=1)
+
+        # trailing windows are indexed by their last row, forward windows by their first row
+        start = 0 if forward else window - 1
+        total[start:start + len(wsum)] = wsum
+        mean[start:start + len(wsum)] = wsum / window
+        std[start:start + len(wsum)] = wstd
+
+        return mean, std, total
+
+    # rolling min & max of data (see rolling_stats())
+    def rolling_minmax(self, data, window: int, forward=False):
+        data = np.asarray(data, dtype=float)
+        nrows = len(data)
+        wmin = np.full(nrows, np.nan)
+        wmax = np.full(nrows, np.nan)
+        if nrows < window:
+            return wmin, wmax
+
+        # Note: min/max propagate NaNs, so windows containing NaN give NaN (same as rolling())
+        windows = sliding_window_view(data, window)
+        start = 0 if forward else window - 1
+        wmin[start:start + len(windows)] = windows.min(axis=1)
+        wmax[start:start + len(windows)] = windows.max(axis=1)
+
+        return wmin, wmax
+
+    # count of consecutive non-zero values, e.g. [0, 1, 1, 1, 0, 1] -> [0, 1, 2, 3, 0, 1]
+    # (vectorised version of: flags * (flags.groupby((flags != flags.shift()).cumsum()).cumcount() + 1))
+    def run_lengths(self, flags) -> np.ndarray:
+        flags = np.asarray(flags, dtype=float)
+        idx = np.arange(len(flags))
+        new_run = np.ones(len(flags), dtype=bool)
+        new_run[1:] = flags[1:] != flags[:-1]
+        run_start = np.maximum.accumulate(np.where(new_run, idx, 0))
+        return flags * (idx - run_start + 1)
+
     #######################
 
     # Utility functions
@@ -6,6 +6,7 @@
 import numpy as np
 import pandas as pd
 
+import os
 import sys
 from pathlib import Path
 
@@ -24,6 +25,7 @@ from pandas import DataFrame, Series
 from datetime import datetime, timedelta, timezone
 from sklearn.model_selection import RandomizedSearchCV, train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler, RobustScaler, MinMaxScaler
+import joblib
 
 pd.options.mode.chained_assignment = None  # default='warn'
 
@@ -87,6 +89,32 @@ class DataframeUtils():
             print("    WARN: fit_scaler() called, but scaler has not been assigned")
         return
 
+    # save the fitted scaler, so that exactly the same scaling can be used in later runs (e.g. live/dry runs)
+    def save_scaler(self, path: str):
+        if (self.scaler is None) or (not self.scaler_fitted):
+            return
+        save_object(self.scaler, path)
+
+    # load a scaler saved by save_scaler(). The scaler is then only used for transforms (i.e. not re-fitted)
+    # Returns False if not found, or not the same type as the current scaler type
+    def load_scaler(self, path: str) -> bool:
+        scaler = load_object(path)
+        if scaler is None:
+            return False
+        return self.set_fitted_scaler(scaler)
+
+    # use an already fitted scaler (e.g. one previously loaded by load_scaler())
+    def set_fitted_scaler(self, scaler) -> bool:
+        if self.scaler_type == ScalerType.NoScaling:
+            return False
+        expected = self.make_scaler()
+        if type(scaler) != type(expected):
+            print(f"    WARN: scaler type mismatch ({type(scaler).__name__} vs {type(expected).__name__})")
+            return False
+        self.scaler = scaler
+        self.scaler_fitted = True
+        return True
+
     ###################################
     # debug utilities
 
@@ -154,6 +182,12 @@ class DataframeUtils():
 
         cols = df.columns
 
+        # a previously saved scaler will not work if the features have changed
+        if self.scaler_fitted and (getattr(self.scaler, 'n_features_in_', len(cols)) != len(cols)):
+            print("    WARN: scaler does not match data (features changed?). Re-fitting")
+            self.scaler = self.make_scaler()
+            self.scaler_fitted = False
+
         # fit, if not already done
         # Note that fitting is only done once, then reused on subsequent calls to norm/denorm.
         # Call set_scaler() to reset
@@ -467,44 +501,30 @@ class DataframeUtils():
         return train_tensor, test_tensor, train_buys_tensor, test_buys_tensor, train_sells_tensor, test_sells_tensor
 
     # convert dataframe to 3D tensor (for use with keras models)
-    def df_to_tensor(self, df, seq_len):
+    # Output format is [nrows, seq_len, nfeatures], where tensor[row][i] = data[row-i] (i.e. most recent row first),
+    # and rows before the start of the data are zero-filled.
+    # By default, this returns a read-only strided view (no per-window copies). If you need a writeable array, or
+    # want to reduce memory (e.g. float32 for keras), then specify dtype and a contiguous copy will be returned
+    def df_to_tensor(self, df, seq_len, dtype=None):
 
         if self.is_dataframe(df):
-            data = np.array(df)
+            data = np.array(df, dtype=float)
         else:
-            data = df
+            data = np.asarray(df, dtype=float)
 
-        nrows = np.shape(data)[0]
         nfeatures = np.shape(data)[1]
-        tensor_arr = np.zeros((nrows, seq_len, nfeatures), dtype=float)
-        zero_row = np.zeros((nfeatures), dtype=float)
-        # tensor_arr = []
 
-        # print("data:{} tensor:{}".format(np.shape(data), np.shape(tensor_arr)))
-        # print("nrows:{} nfeatures:{}".format(nrows, nfeatures))
+        # prepend (seq_len-1) rows of zeros, so that every row has a full window behind it
+        padded = np.concatenate([np.zeros((seq_len - 1, nfeatures), dtype=float), data], axis=0)
 
-        reverse = True
+        # sliding windows are [nrows, nfeatures, seq_len], oldest first. Reverse the sequence axis and move it
+        # in front of the features. All of this is just stride manipulation, nothing is copied
+        windows = np.lib.stride_tricks.sliding_window_view(padded, seq_len, axis=0, writeable=False)
+        tensor_arr = windows[:, :, ::-1].transpose(0, 2, 1)
+
+        if dtype is not None:
+            tensor_arr = np.ascontiguousarray(tensor_arr, dtype=dtype)
 
-        # fill the first part (0..seqlen rows), which are only sparsely populated
-        for row in range(seq_len):
-            for seq in range(seq_len):
-                if seq >= (seq_len - row - 1):
-                    src_row = (row + seq) - seq_len + 1
-                    tensor_arr[row][seq] = data[src_row]
-                else:
-                    tensor_arr[row][seq] = zero_row
-            if reverse:
-                tensor_arr[row] = np.flipud(tensor_arr[row])
-
-        # fill the rest
-        # print("Data:{}, len:{}".format(np.shape(data), seq_len))
-        for row in range(seq_len, nrows):
-            tensor_arr[row] = data[(row - seq_len) + 1:row + 1]
-            if reverse:
-                tensor_arr[row] = np.flipud(tensor_arr[row])
-
-        # print("data: ", data)
-        # print("tensor: ", tensor_arr)
         # print("data:{} tensor:{}".format(np.shape(data), np.shape(tensor_arr)))
         return tensor_arr
 
@@ -517,3 +537,30 @@ class DataframeUtils():
     def is_tensor(self, data) -> bool:
         ctype = str(type(data)).lower()
         return True if ('array' in ctype) else False
+
+
+# save an object (e.g. fitted scaler or compressor) to file. Written to a temp file first so that a partially
+# written file is never seen by another process
+def save_object(obj, path: str):
+    save_dir = os.path.dirname(path)
+    if save_dir and (not os.path.exists(save_dir)):
+        os.makedirs(save_dir)
+    tmp_path = path + f".{os.getpid()}.tmp"
+    try:
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"    WARN: could not save {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# load an object saved with save_object(). Returns None if not found (or unreadable)
+def load_object(path: str):
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path)
+    except Exception as e:
+        print(f"    WARN: could not load {path}: {e}")
+        return None
@@ -0,0 +1,161 @@
+# On-disk cache ("feature store") for populated indicator dataframes
+#
+# Many strategies (NNTC_*, NNBC_*, PCA_*, Anomaly_*) populate exactly the same set of indicators, so running a group
+# of them (e.g. scripts/test_group.sh) computes the same thing over and over. This stores the populated dataframe
+# in Feather format, keyed by:
+#   - pair & timeframe
+#   - dataset type
+#   - populator version and settings (anything that changes the output)
+#   - a hash of the input OHLCV data
+# so any change to the inputs results in a different key (i.e. no stale data).
+#
+# The total size of the store is limited, and the least recently used entries are removed when that is exceeded.
+#
+# Usage:
+#   store = FeatureStore()
+#   key = store.make_key(pair, timeframe, dataset_type, version, params, dataframe)
+#   df = store.load(key)
+#   if df is None:
+#       df = <populate>
+#       store.save(key, df)
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+try:
+    import pyarrow  # needed for Feather format
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
+
+
+class FeatureStore():
+
+    root_dir = ""
+    max_size = 2 * 1024 * 1024 * 1024  # bytes
+    enabled = True
+
+    file_ext = ".feather"
+    input_columns = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self, root_dir=None, max_size=None):
+        super().__init__()
+
+        if root_dir is None:
+            root_dir = os.path.dirname(str(Path(__file__))) + "/feature_store/"
+        self.root_dir = str(root_dir)
+
+        if max_size is not None:
+            self.max_size = max_size
+
+        if not pyarrow_available:
+            print("    WARN: pyarrow not installed, feature store disabled")
+            self.enabled = False
+            return
+
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    # build the key for a dataframe. params should contain anything else that affects the populated data
+    def make_key(self, pair: str, timeframe: str, dataset_type, version, params: dict, dataframe: DataFrame) -> str:
+
+        hasher = hashlib.sha1()
+
+        # input data
+        for col in self.input_columns:
+            if col in dataframe.columns:
+                values = dataframe[col]
+                if col == 'date':
+                    values = pd.to_datetime(values, utc=True).astype('int64')
+                hasher.update(col.encode())
+                hasher.update(np.ascontiguousarray(values.to_numpy()).tobytes())
+
+        # settings
+        settings = f"{version}|{dataset_type}|" + "|".join(f"{k}={params[k]}" for k in sorted(params))
+        hasher.update(settings.encode())
+
+        pair_str = pair.replace("/", "_").replace(":", "_")
+        return f"{pair_str}_{timeframe}_{hasher.hexdigest()[:16]}"
+
+    def get_path(self, key: str) -> str:
+        return self.root_dir + key + self.file_ext
+
+    # returns the cached dataframe, or None if not present
+    def load(self, key: str):
+
+        if not self.enabled:
+            return None
+
+        path = self.get_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            dataframe = pd.read_feather(path)
+        except Exception as e:
+            print(f"    WARN: could not read feature store entry {key}: {e}")
+            self.remove(key)
+            return None
+
+        # mark as recently used (for LRU eviction)
+        os.utime(path)
+
+        return dataframe
+
+    def save(self, key: str, dataframe: DataFrame):
+
+        if not self.enabled:
+            return
+
+        path = self.get_path(key)
+        tmp_path = path + f".{os.getpid()}.tmp"
+
+        try:
+            dataframe.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, path)  # atomic, in case multiple processes share the store
+        except Exception as e:
+            print(f"    WARN: could not save feature store entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self.evict()
+
+    def remove(self, key: str):
+        path = self.get_path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    # remove least recently used entries until the store fits within max_size
+    def evict(self):
+
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.root_dir):
+            if entry.is_file() and entry.name.endswith(self.file_ext):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for mtime, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+            except FileNotFoundError:
+                pass  # already removed by another process
+
+    # remove everything
+    def clear(self):
+        for entry in os.scandir(self.root_dir):
+            if entry.is_file() and entry.name.endswith(self.file_ext):
+                os.remove(entry.path)
@@ -0,0 +1,109 @@
+# Dependency graph of indicators
+#
+# Each indicator (or group of indicators that are calculated together, e.g. Bollinger Bands) is registered as a node,
+# along with the columns it creates and the columns it needs as inputs. A caller can then ask for a set of columns,
+# and only the nodes needed to produce them are run, in dependency order.
+# Input columns that are not produced by any node (e.g. OHLCV data) are assumed to already be in the dataframe.
+#
+# Results are memoised in the dataframe itself: a node is skipped if all of its output columns are already present.
+#
+# Usage:
+#   graph = IndicatorGraph()
+#   graph.add_node('rsi', lambda df: ..., outputs=['rsi'])
+#   graph.add_node('srsi', lambda df: ..., outputs=['srsi_k', 'srsi_d'], inputs=['rsi'])
+#   dataframe = graph.populate(dataframe, columns=['srsi_k'])  # runs 'rsi', then 'srsi'
+
+from pandas import DataFrame
+
+
+class IndicatorNode():
+
+    name = ""
+    func = None  # func(dataframe) -> dataframe
+    outputs = []
+    inputs = []
+
+    def __init__(self, name: str, func, outputs, inputs=None):
+        super().__init__()
+        self.name = name
+        self.func = func
+        self.outputs = list(outputs)
+        self.inputs = [] if inputs is None else list(inputs)
+
+
+class IndicatorGraph():
+
+    nodes = {}  # node name -> IndicatorNode (in order of registration)
+    producers = {}  # column name -> name of the node that creates it
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = {}
+        self.producers = {}
+
+    def add_node(self, name: str, func, outputs, inputs=None):
+        if name in self.nodes:
+            raise ValueError(f"Indicator node already defined: {name}")
+
+        node = IndicatorNode(name, func, outputs, inputs)
+        for col in node.outputs:
+            if col in self.producers:
+                raise ValueError(f"Column {col} is created by both {self.producers[col]} and {name}")
+            self.producers[col] = name
+        self.nodes[name] = node
+
+    # returns the list of columns created by the listed nodes (all nodes if None)
+    def get_outputs(self, node_names=None) -> list:
+        if node_names is None:
+            node_names = self.nodes.keys()
+        outputs = []
+        for name in node_names:
+            outputs.extend(self.nodes[name].outputs)
+        return outputs
+
+    # returns the names of the nodes that need to be run, in execution order (dependencies first).
+    # node_names selects nodes directly, columns selects the nodes that produce those columns. If node_names and
+    # columns are both supplied, then columns is restricted to the outputs of node_names (ordering follows node_names)
+    def resolve(self, node_names=None, columns=None) -> list:
+
+        if node_names is None:
+            node_names = list(self.nodes.keys())
+
+        for name in node_names:
+            if name not in self.nodes:
+                raise ValueError(f"Unknown indicator node: {name}")
+
+        if columns is not None:
+            wanted = set(self.producers[col] for col in columns if col in self.producers)
+            node_names = [name for name in node_names if name in wanted]
+
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Circular dependency in indicator graph at node: {name}")
+            visiting.add(name)
+            for col in self.nodes[name].inputs:
+                if col in self.producers:
+                    visit(self.producers[col])
+            visiting.remove(name)
+            order.append(name)
+
+        for name in node_names:
+            visit(name)
+
+        return order
+
+    # run the required nodes (see resolve()) on the dataframe. Nodes whose outputs are already present are skipped
+    def populate(self, dataframe: DataFrame, node_names=None, columns=None) -> DataFrame:
+
+        for name in self.resolve(node_names, columns):
+            node = self.nodes[name]
+            if all(col in dataframe.columns for col in node.outputs):
+                continue
+            dataframe = node.func(dataframe)
+
+        return dataframe
@@ -0,0 +1,180 @@
+# Shared registry of in-memory classifier models
+#
+# With model_per_pair=True, the NN strategies keep a classifier (and its model) for every pair in the whitelist, and
+# the models stay in memory once they have been loaded, so memory use grows with the number of pairs.
+# The registry keeps track of all of the classifiers that have been loaded, and when the (estimated) total size goes
+# over the memory budget, the least recently used models are released. A released model is re-loaded from file the
+# next time the classifier is acquired.
+#
+# - classifiers that are in use are pinned (reference counted), so are never released
+# - only models that can be re-loaded from file are released (see unload_model() in the classifier base classes)
+# - model size is estimated from the size of the model file (we cannot easily measure the memory used by a model)
+# - prefetch() loads a model in a background thread, so that the next pair does not have to wait for it
+#
+# The registry is shared by all strategies in the process (use get_model_registry())
+#
+# Usage:
+#   registry = get_model_registry()
+#   registry.acquire(classifier)  # loads the model, if it was released
+#   ... train/predict ...
+#   registry.release(classifier)
+#   registry.prefetch(next_classifier)
+
+import gc
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ModelRegistry():
+
+    memory_budget = 4 * 1024 * 1024 * 1024  # bytes
+    default_size = 64 * 1024 * 1024  # size used if the model file does not exist (yet)
+    size_factor = 2.0  # models use more memory than their files (graphs, optimiser state etc.)
+
+    entries = OrderedDict()  # id(classifier) -> entry. In LRU order (most recently used last)
+    lock = None
+    executor = None
+    dbg_verbose = False
+
+    def __init__(self, memory_budget=None):
+        super().__init__()
+        if memory_budget is not None:
+            self.memory_budget = memory_budget
+        self.entries = OrderedDict()
+        self.lock = threading.RLock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model_prefetch")
+
+    # marks the classifier as in use, and makes sure that its model is in memory (if it was released)
+    def acquire(self, classifier):
+        with self.lock:
+            entry = self.get_entry(classifier)
+            entry['refcount'] += 1
+            self.entries.move_to_end(id(classifier))
+            future = entry['future']
+
+        # wait for any prefetch that is still running, otherwise the model would be loaded twice
+        if future is not None:
+            future.result()
+
+        with self.lock:
+            entry['future'] = None
+            if entry['released']:
+                classifier.load_model()
+                entry['released'] = False
+            entry['size'] = self.get_model_size(classifier)
+            self.evict()
+        return classifier
+
+    # marks the classifier as no longer in use (the model stays in memory until it needs to be evicted)
+    def release(self, classifier):
+        with self.lock:
+            entry = self.entries.get(id(classifier))
+            if entry is None:
+                return
+            entry['refcount'] = max(0, entry['refcount'] - 1)
+            self.evict()
+
+    # start loading the model in the background. Only models that exist on file are loaded
+    def prefetch(self, classifier):
+        with self.lock:
+            entry = self.get_entry(classifier)
+            if (entry['future'] is not None) or (not self.is_managed(classifier)) or (classifier.model is not None):
+                return
+            if not classifier.model_exists():
+                return
+            entry['size'] = self.get_model_size(classifier)
+            self.entries.move_to_end(id(classifier))
+            entry['future'] = self.executor.submit(self.load_entry, classifier, entry)
+
+    # runs in the prefetch thread
+    def load_entry(self, classifier, entry):
+        try:
+            classifier.load_model()
+            with self.lock:
+                entry['released'] = False
+        except Exception as e:
+            print(f"    WARN: error prefetching model ({classifier.model_path}): {str(e)}")
+
+    # remove the classifier from the registry (does not release the model)
+    def remove(self, classifier):
+        with self.lock:
+            entry = self.entries.pop(id(classifier), None)
+        if (entry is not None) and (entry['future'] is not None):
+            entry['future'].result()
+
+    def get_entry(self, classifier) -> dict:
+        key = id(classifier)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {'classifier': classifier, 'refcount': 0, 'size': 0, 'released': False, 'future': None}
+            self.entries[key] = entry
+        return entry
+
+    # estimated memory used by the model (based on the size of the model file)
+    def get_model_size(self, classifier) -> int:
+        path = getattr(classifier, 'model_path', "")
+        if path and os.path.isfile(path):
+            return int(self.size_factor * os.path.getsize(path))
+        return self.default_size
+
+    # estimated memory used by all models currently in memory
+    def get_total_size(self) -> int:
+        return sum(entry['size'] for entry in self.entries.values()
+                   if (not entry['released']) and (getattr(entry['classifier'], 'model', None) is not None))
+
+    # only classifiers that support load_model() and unload_model() can be released (see classifier base classes)
+    def is_managed(self, classifier) -> bool:
+        return callable(getattr(classifier, 'load_model', None)) and callable(getattr(classifier, 'unload_model', None))
+
+    # release least recently used models until the total size is within the memory budget
+    def evict(self, budget=None):
+        if budget is None:
+            budget = self.memory_budget
+
+        total = self.get_total_size()
+        if total <= budget:
+            return
+
+        num_released = 0
+        for entry in list(self.entries.values()):
+            if total <= budget:
+                break
+            if (entry['refcount'] > 0) or entry['released']:
+                continue
+            if (entry['future'] is not None) and (not entry['future'].done()):
+                continue
+            classifier = entry['classifier']
+            if (not self.is_managed(classifier)) or (classifier.model is None):
+                continue
+            if classifier.unload_model():
+                entry['released'] = True
+                total = total - entry['size']
+                num_released += 1
+                if self.dbg_verbose:
+                    print(f"    Released model: {classifier.model_path}")
+
+        if num_released > 0:
+            gc.collect()
+
+        if (budget > 0) and (total > budget):
+            print(f"    WARN: models in use exceed memory budget ({total / 1e6:.0f}MB > {budget / 1e6:.0f}MB)")
+
+    # release all models that are not in use
+    def clear(self):
+        with self.lock:
+            self.evict(budget=0)
+
+
+model_registry = None
+
+
+# returns the registry shared by all strategies in this process
+def get_model_registry(memory_budget=None) -> ModelRegistry:
+    global model_registry
+    if model_registry is None:
+        model_registry = ModelRegistry(memory_budget)
+    elif memory_budget is not None:
+        model_registry.memory_budget = memory_budget
+    return model_registry
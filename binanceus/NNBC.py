@@ -85,8 +85,11 @@ import Attention
 import RBM
 
 
-from DataframeUtils import DataframeUtils, ScalerType
+from DataframeUtils import DataframeUtils, ScalerType, save_object, load_object
 from DataframePopulator import DataframePopulator
+from CandleCache import CandleCache
+from BatchInference import BatchInference
+from PredictionCache import PredictionCache
 
 from NNBClassifier_MLP import NNBClassifier_MLP
 from NNBClassifier_MLP2 import NNBClassifier_MLP2
@@ -208,16 +211,37 @@ class NNBC(IStrategy):
 
     compressor = None
     compress_data = True
+    preprocessor_cache = None  # scalers & compressors saved during training, keyed by file path. Created per instance
+    # if set, only these indicators (plus the minimal set and signal_indicator_list) are calculated. None means all of
+    # the default indicators
+    indicator_list = None
+    # indicators used by get_train_buy_signals()/get_train_sell_signals() and save_debug_indicators(), including the
+    # future_* columns. Must be set for indicator_list to take effect, otherwise all indicators are calculated
+    signal_indicator_list = None
+
+    # commonly used indicators, added to the debug dataframe for viewing
+    dbg_indicator_list = [
+        'full_dwt', 'train_buy', 'train_sell',
+        'future_gain', 'future_min', 'future_max',
+        'future_profit_min', 'future_profit_max', 'profit_threshold',
+        'future_loss_min', 'future_loss_max', 'loss_threshold',
+    ]
     classifier_name = 'Transformer'  # select based on testing
     # classifier_name = 'Multihead'  # select based on testing
     # classifier_name = 'LSTM'  # for debug
     buy_classifier = None
     sell_classifier = None
+    use_batch_inference = True  # live/dry runs: predict the latest candle of all pairs in one batch (shared model only)
+    batch_inference: BatchInference = None
+    use_tail_inference = True  # live/dry runs: only predict the rows that were not in the previous dataframe
+    max_tail_rows = 32  # if there are more new rows than this, just predict the whole dataframe
+    prediction_cache: PredictionCache = None  # predictions from previous candles (live/dry runs only)
 
     curr_lookahead = int(12 * lookahead_hours)
 
     curr_pair = ""
     custom_trade_info = {}
+    candle_cache = CandleCache()  # last candle of each pair, for the custom exit/stoploss functions
 
     # the following affect training of the model. Bigger numbers give better results, but take longer and use more memory
     seq_len = 8  # 'depth' of training sequence
@@ -368,6 +392,9 @@ class NNBC(IStrategy):
         self.dbg_curr_df = dataframe
 
         # create and initialise instances of objects shared across pairs
+        if self.preprocessor_cache is None:
+            self.preprocessor_cache = {}
+
         if self.dataframeUtils is None:
             self.dataframeUtils = DataframeUtils()
 
@@ -398,6 +425,9 @@ class NNBC(IStrategy):
 
             print("    Lookahead: ", self.curr_lookahead, " candles (", self.lookahead_hours, " hours)")
 
+            if (self.indicator_list is not None) and (self.signal_indicator_list is None):
+                print("    WARN: indicator_list ignored (signal_indicator_list not set). Using all indicators")
+
 
         print("")
         print(curr_pair)
@@ -410,7 +440,11 @@ class NNBC(IStrategy):
         self.dataframeUtils.set_scaler_type(self.scaler_type)
 
         # populate the normal dataframe
-        dataframe = self.dataframePopulator.add_indicators(dataframe)
+        dataframe = self.add_indicators(dataframe, curr_pair)
+
+        # use the scaler & compressor that were fitted when the models were trained (unless we are training)
+        if not self.refit_model:
+            self.load_preprocessors(curr_pair)
 
         # get the buy/sell training signals
         buys, sells = self.create_training_data(dataframe)
@@ -440,6 +474,60 @@ class NNBC(IStrategy):
 
         return dataframe
 
+    # populate the indicators. Re-uses the dataframe populated by bot_loop_start(), if there is one
+    def add_indicators(self, dataframe: DataFrame, pair) -> DataFrame:
+        if self.batch_inference is not None:
+            populated = self.batch_inference.get_dataframe(pair, dataframe)
+            if populated is not None:
+                return populated
+
+        return self.dataframePopulator.add_indicators(dataframe, pair=pair, timeframe=self.timeframe,
+                                                      columns=self.get_indicator_columns())
+
+    ################################
+
+    def bot_loop_start(self, **kwargs) -> None:
+        if self.use_batch_inference and (not self.model_per_pair) and (self.dp.runmode.value in ('live', 'dry_run')):
+            self.run_batch_inference()
+        return super().bot_loop_start(**kwargs)
+
+    # predict the latest candle of every pair that is about to be analysed, using a single call to each model.
+    # The results are picked up in populate_indicators() (see BatchInference)
+    def run_batch_inference(self):
+        # nothing to do until the first pass has set everything up
+        if (self.buy_classifier is None) or (self.dataframePopulator is None):
+            return
+
+        if self.batch_inference is None:
+            self.batch_inference = BatchInference()
+        self.batch_inference.clear()
+
+        for pair in self.dp.current_whitelist():
+            dataframe = self.dp.ohlcv(pair, self.timeframe)
+            analysed_df, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+            if not self.batch_inference.needs_analysis(dataframe, analysed_df):
+                continue
+            dataframe = self.dataframePopulator.add_indicators(dataframe.copy(), pair=pair, timeframe=self.timeframe,
+                                                               columns=self.get_indicator_columns())
+            self.batch_inference.add_window(pair, dataframe, self.get_latest_window(dataframe, pair))
+
+        self.batch_inference.predict("buy", self.buy_classifier)
+        self.batch_inference.predict("sell", self.sell_classifier)
+
+    # returns the normalised input (window) for the latest candle. Only the last seq_len rows are processed, so the
+    # scaler and compressor saved during training are needed (otherwise they would be fitted on just those rows)
+    def get_latest_window(self, dataframe: DataFrame, pair):
+        self.dataframeUtils.set_scaler_type(self.scaler_type)
+        self.load_preprocessors(pair)
+        if (not self.dataframeUtils.scaler_fitted) or (self.compress_data and (self.compressor is None)):
+            return None
+
+        df_norm = self.dataframeUtils.norm_dataframe(dataframe.iloc[-self.seq_len:])
+        if self.compress_data:
+            if self.compressor.n_features_in_ != df_norm.shape[1]:
+                return None
+            df_norm = self.compress_dataframe(df_norm)
+        return self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)[-1]
 
     ################################
 
@@ -448,14 +536,18 @@ class NNBC(IStrategy):
 
         # future_df = self.add_future_data(dataframe.copy())
         future_df = self.dataframePopulator.add_hidden_indicators(dataframe.copy())
-        future_df = self.dataframePopulator.add_future_data(future_df, self.curr_lookahead)
+        future_df = self.dataframePopulator.add_future_data(future_df, self.curr_lookahead,
+                                                            columns=self.get_future_indicators())
 
         future_df['train_buy'] = 0.0
         future_df['train_sell'] = 0.0
 
         # use sequence trends as criteria
-        future_df['train_buy'] = self.get_train_buy_signals(future_df)
-        future_df['train_sell'] = self.get_train_sell_signals(future_df)
+        if self.check_signal_indicators(future_df):
+            future_df['train_buy'] = self.get_train_buy_signals(future_df)
+            future_df['train_sell'] = self.get_train_sell_signals(future_df)
+        else:
+            print("    ERROR: Missing indicators in dataframe")
 
         buys = future_df['train_buy'].copy()
         if buys.sum() < 3:
@@ -473,15 +565,10 @@ class NNBC(IStrategy):
     def save_debug_data(self, future_df: DataFrame):
 
         # Debug support: add commonly used indicators so that they can be viewed
-        # the list below is available for any subclass. Subclasses themselves can add more by overriding
-        # the func save_debug_indicators()
+        # the list (dbg_indicator_list) is available for any subclass. Subclasses themselves can add more by
+        # overriding the func save_debug_indicators()
 
-        dbg_list = [
-            'full_dwt', 'train_buy', 'train_sell',
-            'future_gain', 'future_min', 'future_max',
-            'future_profit_min', 'future_profit_max', 'profit_threshold',
-            'future_loss_min', 'future_loss_max', 'loss_threshold',
-        ]
+        dbg_list = self.dbg_indicator_list
 
         if len(dbg_list) > 0:
             for indicator in dbg_list:
@@ -494,6 +581,29 @@ class NNBC(IStrategy):
         pass
         return
 
+    # the indicators to be calculated by the dataframe populator (None means all of them)
+    def get_indicator_columns(self):
+        if (self.indicator_list is None) or (self.signal_indicator_list is None):
+            return None
+        return self.indicator_list + self.signal_indicator_list
+
+    # the indicators needed to create the training data (and debug data). Used so that add_future_data() only
+    # calculates the future data that is actually used (None means all of it)
+    def get_future_indicators(self):
+        if self.signal_indicator_list is None:
+            return None
+        return self.signal_indicator_list + self.dbg_indicator_list
+
+    # check that the indicators used by the training signals are present
+    def check_signal_indicators(self, future_df: DataFrame) -> bool:
+        result = True
+        if self.signal_indicator_list is not None:
+            for ind in self.signal_indicator_list:
+                if ind not in future_df.columns:
+                    result = False
+                    print(f"    ERROR: indicator not in dataframe: {ind}")
+        return result
+
     # adds an indicator to the main frame for debug (e.g. plotting). Column will be prefixed with '%', which will
     # cause it to be removed before normalisation and fitting of models
     def add_debug_indicator(self, future_df: DataFrame, indicator):
@@ -517,6 +627,9 @@ class NNBC(IStrategy):
 
     # compress the supplied dataframe
     def compress_dataframe(self, dataframe: DataFrame) -> DataFrame:
+        if self.compressor and (self.compressor.n_features_in_ != dataframe.shape[1]):
+            print("    WARN: compressor does not match data (features changed?). Re-fitting")
+            self.compressor = None
         if not self.compressor:
             self.compressor = self.get_compressor(dataframe)
         return pd.DataFrame(self.compressor.transform(dataframe))
@@ -538,6 +651,8 @@ class NNBC(IStrategy):
 
         rand_st = 27  # use fixed number for reproducibility
 
+        scaler_loaded = self.dataframeUtils.scaler_fitted
+
         remove_outliers = False
         if remove_outliers:
             # norm dataframe before splitting, otherwise variances are skewed
@@ -547,12 +662,22 @@ class NNBC(IStrategy):
             # full_df_norm = self.dataframeUtils.norm_dataframe(dataframe).clip(lower=-3.0, upper=3.0)  # supress outliers
             full_df_norm = self.dataframeUtils.norm_dataframe(dataframe)
 
+        # save newly fitted scaler (so that the same scaling is used for predictions in later runs)
+        save_preprocessors = (self.dp.runmode.value == 'backtest')
+        if save_preprocessors and (not scaler_loaded):
+            self.dataframeUtils.save_scaler(self.get_preprocessor_path(curr_pair, "scaler"))
 
-        # compress data
+        # compress data. The compressor is saved with the models, so it is only per pair if the models are
         if self.compress_data:
+            compressor_path = self.get_preprocessor_path(curr_pair, "compressor")
+            self.compressor = self.preprocessor_cache.get(compressor_path)
+            old_compressor = self.compressor
             old_size = full_df_norm.shape[1]
             full_df_norm = self.compress_dataframe(full_df_norm)
             print("    Compressed data {} -> {} (features)".format(old_size, full_df_norm.shape[1]))
+            self.preprocessor_cache[compressor_path] = self.compressor
+            if save_preprocessors and (self.compressor is not old_compressor):
+                save_object(self.compressor, compressor_path)
 
         # constrain size to what will be available in run modes
         if self.use_full_dataset:
@@ -703,6 +828,37 @@ class NNBC(IStrategy):
 
     #######################################
 
+    # path of the file used to save the scaler or compressor (ptype) of the current models. Saved next to the models.
+    # Scalers are fitted per pair, so the pair is added to the name if the models are shared across pairs
+    def get_preprocessor_path(self, pair, ptype):
+        category, model_name = self.get_model_identifiers(pair, self.classifier_name, "")
+        if (ptype == "scaler") and (not self.model_per_pair):
+            model_name = model_name + "_" + pair.split("/")[0]
+        root_dir = os.path.dirname(str(Path(__file__))) + "/models/"
+        return root_dir + category + "/" + model_name + "." + ptype + ".joblib"
+
+    # load the scaler & compressor saved when the models were trained. Files are only read once, after that the
+    # transforms are just re-used (no fitting)
+    def load_preprocessors(self, pair):
+        scaler = self.get_preprocessor(pair, "scaler")
+        if scaler is not None:
+            self.dataframeUtils.set_fitted_scaler(scaler)
+
+        # if there is no saved compressor, compress_dataframe() fits a new one to this pair's data
+        if self.compress_data:
+            self.compressor = self.get_preprocessor(pair, "compressor")
+
+    # returns the saved scaler or compressor (ptype) for the pair, None if there isn't one. Missing files are not
+    # cached, because they are written when the models are trained
+    def get_preprocessor(self, pair, ptype):
+        path = self.get_preprocessor_path(pair, ptype)
+        if path not in self.preprocessor_cache:
+            preprocessor = load_object(path)
+            if preprocessor is None:
+                return None
+            self.preprocessor_cache[path] = preprocessor
+        return self.preprocessor_cache[path]
+
     def get_compressor(self, df_norm: DataFrame):
         # just use fixed size PCA (easier for classifiers to deal with)
         ncols = 64
@@ -882,20 +1038,68 @@ class NNBC(IStrategy):
 
         return clf, best_classifier
 
+    # predictions are only cached in live/dry runs, where the dataframe moves on by one candle at a time
+    def use_prediction_cache(self) -> bool:
+        if not (self.use_tail_inference or self.use_batch_inference):
+            return False
+        if self.dp.runmode.value not in ('live', 'dry_run'):
+            return False
+        if self.prediction_cache is None:
+            self.prediction_cache = PredictionCache()
+        return True
+
+    # predict only the rows that do not have a cached prediction (plus the seq_len-1 earlier rows needed for their
+    # windows). Returns None if the whole dataframe needs to be predicted
+    def predict_tail(self, dataframe: DataFrame, pair, clf, name):
+        num_rows = self.prediction_cache.num_new_rows(pair, name, dataframe)
+        if (num_rows is None) or (num_rows > self.max_tail_rows):
+            return None
+
+        predict = []
+        if num_rows > 0:
+            # the scaler must be fitted on the whole dataframe (as for a full prediction), then only the tail is scaled
+            if not self.dataframeUtils.scaler_fitted:
+                self.dataframeUtils.norm_dataframe(dataframe)
+
+            df_norm = self.dataframeUtils.norm_dataframe(dataframe.iloc[-(num_rows + self.seq_len - 1):])
+            if self.compress_data:
+                if (self.compressor is None) or (self.compressor.n_features_in_ != df_norm.shape[1]):
+                    return None
+                df_norm = self.compress_dataframe(df_norm)
+
+            df_tensor = self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)[-num_rows:]
+            predict = self.get_classifier_predictions(clf, df_tensor)
+
+        return self.prediction_cache.merge(pair, name, dataframe, predict)
+
     # make predictions for supplied dataframe (returns column)
-    def predict(self, dataframe: DataFrame, pair, clf):
+    # name identifies the classifier (buy/sell) for batch inference
+    def predict(self, dataframe: DataFrame, pair, clf, name=""):
 
         # predict = 0
         predict = None
 
         if clf is not None:
-            # print("    predicting... - dataframe:", dataframe.shape)
-            df_norm = self.dataframeUtils.norm_dataframe(dataframe)
-            if self.compress_data:
-                df_norm = self.compress_dataframe(df_norm)
+            use_cache = self.use_prediction_cache()
 
-            df_tensor = self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)
-            predict = self.get_classifier_predictions(clf, df_tensor)
+            # use the batch prediction, if there is one, otherwise just predict the new rows
+            if use_cache and (self.batch_inference is not None):
+                predict = self.batch_inference.get_predictions(pair, name, dataframe, self.prediction_cache)
+
+            if use_cache and self.use_tail_inference and (predict is None):
+                predict = self.predict_tail(dataframe, pair, clf, name)
+
+            if predict is None:
+                # print("    predicting... - dataframe:", dataframe.shape)
+                df_norm = self.dataframeUtils.norm_dataframe(dataframe)
+                if self.compress_data:
+                    df_norm = self.compress_dataframe(df_norm)
+
+                df_tensor = self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)
+                predict = self.get_classifier_predictions(clf, df_tensor)
+
+            if use_cache:
+                self.prediction_cache.save(pair, name, dataframe, predict)
 
         else:
             print("Null Classifier for pair: ", pair)
@@ -913,7 +1117,7 @@ class NNBC(IStrategy):
             return predict
 
         print("    predicting buys...")
-        predict = self.predict(df, pair, clf)
+        predict = self.predict(df, pair, clf, "buy")
 
         # if self.dbg_test_classifier:
         #     # DEBUG: check accuracy
@@ -944,7 +1148,7 @@ class NNBC(IStrategy):
             return predict
 
         print("    predicting sells...")
-        predict = self.predict(df, pair, clf)
+        predict = self.predict(df, pair, clf, "sell")
 
         # if self.dbg_test_classifier:
         #     # DEBUG: check accuracy
@@ -1111,7 +1315,7 @@ class NNBC(IStrategy):
         # self.set_state(pair, self.State.STOPLOSS)
 
         dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         in_trend = self.custom_trade_info[trade.pair]['had_trend']
 
@@ -1143,8 +1347,8 @@ class NNBC(IStrategy):
     def custom_exit(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                     current_profit: float, **kwargs):
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         max_profit = max(0, trade.calc_profit_ratio(trade.max_rate))
@@ -127,6 +127,14 @@ class NNBC_fbb(NNBC):
 
     ###################################
 
+    # indicators used by the training signals (and debug indicators) below
+    signal_indicator_list = [
+        'fisher_wr', 'bb_gain', 'bb_loss',
+        'profit_threshold', 'loss_threshold',
+        'future_gain', 'future_profit_max', 'future_profit_threshold', 'future_loss_threshold',
+        'future_loss_min'
+    ]
+
     # override the default training signal generation
 
     # uses various fisher_wr and bollinger band indicators, combined with future los/gain
@@ -52,12 +52,15 @@ from tqdm.keras import TqdmCallback
 import sklearn.decomposition as skd
 
 import random
+from concurrent.futures import ThreadPoolExecutor
 import Time2Vector
 import Transformer
 import Attention
 
 from DataframeUtils import DataframeUtils, ScalerType
 from DataframePopulator import DataframePopulator
+from CandleCache import CandleCache
+from ModelRegistry import get_model_registry
 from NNPredictor_LSTM import NNPredictor_LSTM
 import Environment
 import profiler
@@ -148,6 +151,7 @@ class NNPredict(IStrategy):
 
     curr_pair = ""
     custom_trade_info = {}
+    candle_cache = CandleCache()  # last candle of each pair, for the custom exit/stoploss functions
 
     num_pairs = 0
     # pair_model_info = {}  # holds model-related info for each pair
@@ -161,8 +165,16 @@ class NNPredict(IStrategy):
     batch_size = 1024  # batch size for training
     predict_batch_size = 512
 
+    # rolling predictions (classifiers that only return a single prediction, e.g. the Darts models)
+    rolling_window = 64  # number of rows used for each prediction
+    rolling_batch_size = 64  # number of windows passed to the classifier in each call (if it supports predict_batch())
+    rolling_workers = 0  # number of worker threads. 0 or 1 runs everything in the main thread
+
     classifier_list = {}  # classifier for each pair
     curr_classifier = None
+    model_registry = None  # controls which models are kept in memory (see ModelRegistry)
+    model_memory_budget = 4 * 1024 * 1024 * 1024  # memory allowed for models (bytes, all pairs)
+    prefetch_models = True  # load the model for the next pair in the background (model_per_pair only)
     init_done = {}  # flags whether initialisation has been done for a pair or not
 
     compressor = None
@@ -370,7 +382,7 @@ class NNPredict(IStrategy):
     def add_indicators(self, dataframe: DataFrame) -> DataFrame:
 
         # populate the standard indicators
-        dataframe = self.dataframePopulator.add_indicators(dataframe)
+        dataframe = self.dataframePopulator.add_indicators(dataframe, pair=self.curr_pair, timeframe=self.timeframe)
 
         # populate the training indicators
         dataframe = self.add_training_indicators(dataframe)
@@ -411,7 +423,10 @@ class NNPredict(IStrategy):
         if self.model_per_pair:
             if self.curr_pair not in self.classifier_list:
                 self.classifier_list[self.curr_pair] = self.make_classifier(self.curr_pair, self.seq_len, nfeatures)
-            self.curr_classifier = self.classifier_list[self.curr_pair]
+            self.set_curr_classifier(self.classifier_list[self.curr_pair])
+
+            if self.prefetch_models:
+                self.prefetch_classifier(self.get_next_pair(), nfeatures)
 
         else:
             if not self.curr_classifier:
@@ -788,13 +803,13 @@ class NNPredict(IStrategy):
         dataframe['predict'] = predictions
         return dataframe
 
-    # run prediction in rolling fashion (one result at a time -> slow) over the entire history
+    # run prediction in rolling fashion over the entire history. Each row is predicted using a fixed-size window of
+    # data ending at that row. Windows are grouped into batches, which are passed to the classifier in a single call if
+    # it supports predict_batch() (otherwise one call per window), and batches can optionally be run in a worker pool
     def add_model_rolling_predictions(self, dataframe: DataFrame) -> DataFrame:
 
         print("    Adding rolling predictions. Might take a while...")
 
-        # probably don't need to handle tensor cases since those classifiers typically do not return single values
-
         # get the current clasifier
         classifier = self.curr_classifier
         use_dataframes = classifier.needs_dataframes()
@@ -806,28 +821,33 @@ class NNPredict(IStrategy):
         else:
             df_norm = dataframe
 
-        if not use_dataframes:
-            df_tensor = self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)
-
-        window = 64
-        start = window
-        end = np.shape(df_norm)[0]
-
-        preds_notrend: np.array = []
-
-        # set values for startup window
-        for index in range(0, start):
-            preds_notrend = np.concatenate((preds_notrend, [df_norm[self.target_column].iloc[index]]))
+        if use_dataframes:
+            data = df_norm
+        else:
+            data = self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)
 
-        # add predictions
-        for i in tqdm(range(start, end), desc="    Predicting…", ascii=True, ncols=75):
-            # for index in range(start, end):
-            if use_dataframes:
-                chunk = df_norm.iloc[start:end]
-            else:
-                chunk = df_tensor[start:end]
-            preds = self.get_predictions(chunk)
-            preds_notrend = np.concatenate((preds_notrend, preds))
+        window = max(1, self.rolling_window)
+        nrows = np.shape(df_norm)[0]
+        start = min(window - 1, nrows)
+
+        # preallocate results. Rows without a full window of data just use the target values
+        preds_notrend = np.empty(nrows, dtype=float)
+        preds_notrend[:start] = np.array(df_norm[self.target_column].iloc[:start])
+
+        # split the remaining rows into batches
+        batch_size = max(1, self.rolling_batch_size)
+        batches = [(first, min(first + batch_size, nrows)) for first in range(start, nrows, batch_size)]
+
+        if self.rolling_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.rolling_workers) as executor:
+                futures = [executor.submit(self.get_rolling_predictions, data, window, first, last)
+                           for first, last in batches]
+                for (first, last), future in tqdm(zip(batches, futures), total=len(batches),
+                                                  desc="    Predicting…", ascii=True, ncols=75):
+                    preds_notrend[first:last] = future.result()
+        else:
+            for first, last in tqdm(batches, desc="    Predicting…", ascii=True, ncols=75):
+                preds_notrend[first:last] = self.get_rolling_predictions(data, window, first, last)
 
         # re-scale, if needed
         if prescale_data:
@@ -844,6 +864,21 @@ class NNPredict(IStrategy):
 
         return dataframe
 
+    # returns the rolling predictions for rows first..last-1 of data (dataframe or tensor), using the window of data
+    # that ends at each row
+    def get_rolling_predictions(self, data, window, first, last) -> np.ndarray:
+
+        use_dataframes = isinstance(data, DataFrame)
+        if use_dataframes:
+            chunks = [data.iloc[i - window + 1:i + 1] for i in range(first, last)]
+        else:
+            chunks = [data[i - window + 1:i + 1] for i in range(first, last)]
+
+        if use_dataframes and hasattr(self.curr_classifier, 'predict_batch'):
+            return np.asarray(self.curr_classifier.predict_batch(chunks), dtype=float)
+
+        return np.array([self.get_predictions(chunk)[-1] for chunk in chunks], dtype=float)
+
     ################################
 
     # add columns based on predictions. Do not call until after model has been trained
@@ -864,6 +899,34 @@ class NNPredict(IStrategy):
 
     #######################################
 
+    # switch to the classifier for the current pair. The model registry keeps the model in memory while it is in use,
+    # and releases models of other pairs if needed
+    def set_curr_classifier(self, classifier):
+        if self.model_registry is None:
+            self.model_registry = get_model_registry(self.model_memory_budget)
+
+        if classifier is self.curr_classifier:
+            return
+
+        if self.curr_classifier is not None:
+            self.model_registry.release(self.curr_classifier)
+        self.curr_classifier = self.model_registry.acquire(classifier)
+
+    # start loading the model for the supplied pair in the background
+    def prefetch_classifier(self, pair, num_features: int):
+        if (pair is None) or (self.model_registry is None):
+            return
+        if pair not in self.classifier_list:
+            self.classifier_list[pair] = self.make_classifier(pair, self.seq_len, num_features)
+        self.model_registry.prefetch(self.classifier_list[pair])
+
+    # returns the pair after the current one in the whitelist (i.e. the next one to be processed), None if there is none
+    def get_next_pair(self):
+        pairs = self.dp.current_whitelist()
+        if (len(pairs) < 2) or (self.curr_pair not in pairs):
+            return None
+        return pairs[(pairs.index(self.curr_pair) + 1) % len(pairs)]
+
     # returns the classifier model.
     def make_classifier(self, pair, seq_len: int, num_features: int):
         predictor = self.get_classifier(pair, seq_len, num_features)
@@ -1074,7 +1137,7 @@ class NNPredict(IStrategy):
                         current_profit: float, **kwargs) -> float:
 
         dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         in_trend = self.custom_trade_info[trade.pair]['had_trend']
 
@@ -1106,8 +1169,8 @@ class NNPredict(IStrategy):
     def custom_exit(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                     current_profit: float, **kwargs):
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         max_profit = max(0, trade.calc_profit_ratio(trade.max_rate))
@@ -65,8 +65,12 @@ tf.compat.v1.logging.set_verbosity(tf.compat.v1.logging.WARN)
 tf_logger = logging.getLogger('tensorflow')
 tf_logger.setLevel(logging.WARN)
 
-from DataframeUtils import DataframeUtils, ScalerType
+from DataframeUtils import DataframeUtils, ScalerType, save_object, load_object
 from DataframePopulator import DataframePopulator, DatasetType
+from CandleCache import CandleCache
+from ModelRegistry import get_model_registry
+from BatchInference import BatchInference
+from PredictionCache import PredictionCache
 import TrainingSignals
 
 import NNTClassifier
@@ -181,13 +185,24 @@ class NNTC(IStrategy):
 
     compressor = None
     compress_data = True
+    preprocessor_cache = None  # scalers & compressors saved during training, keyed by file path. Created per instance
 
     trinary_classifier = None
+    pair_classifiers = None  # classifier for each pair (model_per_pair only). Created per instance
+    model_registry = None  # controls which models are kept in memory (see ModelRegistry)
+    model_memory_budget = 4 * 1024 * 1024 * 1024  # memory allowed for models (bytes, all pairs)
+    prefetch_models = True  # load the model for the next pair in the background (model_per_pair only)
+    use_batch_inference = True  # live/dry runs: predict the latest candle of all pairs in one batch (shared model only)
+    batch_inference: BatchInference = None
+    use_tail_inference = True  # live/dry runs: only predict the rows that were not in the previous dataframe
+    max_tail_rows = 32  # if there are more new rows than this, just predict the whole dataframe
+    prediction_cache: PredictionCache = None  # predictions from previous candles (live/dry runs only)
 
     curr_lookahead = int(12 * lookahead_hours)
 
     curr_pair = ""
     custom_trade_info = {}
+    candle_cache = CandleCache()  # last candle of each pair, for the custom exit/stoploss functions
 
     # the following affect training of the model. Bigger numbers give better results, but take longer and use more memory
     seq_len = 8  # 'depth' of training sequence
@@ -224,6 +239,14 @@ class NNTC(IStrategy):
     dbg_trace_memory = False  # if true, trace memory usage
     dbg_trace_pair = ""  # pair used for synching memory snapshots
 
+    # commonly used indicators, added to the debug dataframe for viewing
+    dbg_indicator_list = [
+        'full_dwt', 'train_buy', 'train_sell',
+        'future_gain', 'future_min', 'future_max',
+        'future_profit_min', 'future_profit_max',
+        'future_loss_min', 'future_loss_max', 'loss_threshold',
+    ]
+
     # variables to track state
     class State(Enum):
         INIT = 1
@@ -234,6 +257,9 @@ class NNTC(IStrategy):
     classifier_type = NNTClassifier.ClassifierType.LSTM  # default, override in subclass
 
     dataset_type = DatasetType.DEFAULT
+    # if set, only these indicators (plus the minimal set and those used by the training signals) are calculated.
+    # None means all of the indicators in dataset_type
+    indicator_list = None
     signal_type = TrainingSignals.SignalType.Profit  # should override this
     training_signals = None
 
@@ -401,6 +427,12 @@ class NNTC(IStrategy):
             self.n_profit_stddevs = self.training_signals.get_n_profit_stddevs()
 
         # create and initialise instances of objects shared across pairs
+        if self.pair_classifiers is None:
+            self.pair_classifiers = {}
+
+        if self.preprocessor_cache is None:
+            self.preprocessor_cache = {}
+
         if self.dataframeUtils is None:
             self.dataframeUtils = DataframeUtils()
 
@@ -448,13 +480,17 @@ class NNTC(IStrategy):
         # populate the normal dataframe
         if self.dbg_verbose:
             print("    adding indicators...")
-        dataframe = self.dataframePopulator.add_indicators(dataframe, dataset_type=self.dataset_type)
+        dataframe = self.add_indicators(dataframe, curr_pair)
 
         # if number of features less than compressed size, just disable compression
         if dataframe.shape[-1] <= self.COMPRESSED_SIZE:
             self.compress_data = False
             print(f"    Disabled compression ({dataframe.shape[-1]} <= {self.COMPRESSED_SIZE})")
 
+        # use the scaler & compressor that were fitted when the model was trained (unless we are training)
+        if not self.refit_model:
+            self.load_preprocessors(curr_pair)
+
         # get the buy/sell training signals
         buys, sells = self.create_training_data(dataframe)
 
@@ -483,6 +519,62 @@ class NNTC(IStrategy):
 
         return dataframe
 
+    # populate the indicators. Re-uses the dataframe populated by bot_loop_start(), if there is one
+    def add_indicators(self, dataframe: DataFrame, pair) -> DataFrame:
+        if self.batch_inference is not None:
+            populated = self.batch_inference.get_dataframe(pair, dataframe)
+            if populated is not None:
+                return populated
+
+        return self.dataframePopulator.add_indicators(dataframe, dataset_type=self.dataset_type,
+                                                      pair=pair, timeframe=self.timeframe,
+                                                      columns=self.get_indicator_columns())
+
+    ################################
+
+    def bot_loop_start(self, **kwargs) -> None:
+        if self.use_batch_inference and (not self.model_per_pair) and (self.dp.runmode.value in ('live', 'dry_run')):
+            self.run_batch_inference()
+        return super().bot_loop_start(**kwargs)
+
+    # predict the latest candle of every pair that is about to be analysed, using a single call to the model.
+    # The results are picked up in populate_indicators() (see BatchInference)
+    def run_batch_inference(self):
+        # nothing to do until the first pass has set everything up
+        if (self.trinary_classifier is None) or (self.dataframePopulator is None):
+            return
+
+        if self.batch_inference is None:
+            self.batch_inference = BatchInference()
+        self.batch_inference.clear()
+
+        for pair in self.dp.current_whitelist():
+            dataframe = self.dp.ohlcv(pair, self.timeframe)
+            analysed_df, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+            if not self.batch_inference.needs_analysis(dataframe, analysed_df):
+                continue
+            dataframe = self.dataframePopulator.add_indicators(dataframe.copy(), dataset_type=self.dataset_type,
+                                                               pair=pair, timeframe=self.timeframe,
+                                                               columns=self.get_indicator_columns())
+            self.batch_inference.add_window(pair, dataframe, self.get_latest_window(dataframe, pair))
+
+        self.batch_inference.predict("trinary", self.trinary_classifier)
+
+    # returns the normalised input (window) for the latest candle. Only the last seq_len rows are processed, so the
+    # scaler and compressor saved during training are needed (otherwise they would be fitted on just those rows)
+    def get_latest_window(self, dataframe: DataFrame, pair):
+        self.dataframeUtils.set_scaler_type(self.scaler_type)
+        self.load_preprocessors(pair)
+        if (not self.dataframeUtils.scaler_fitted) or (self.compress_data and (self.compressor is None)):
+            return None
+
+        df_norm = self.dataframeUtils.norm_dataframe(dataframe.iloc[-self.seq_len:])
+        if self.compress_data:
+            if self.compressor.n_features_in_ != df_norm.shape[1]:
+                return None
+            df_norm = self.compress_dataframe(df_norm)
+        return self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)[-1]
+
     ################################
     # run data augmentation techniques
     def augment_training_signals(self, buys, sells):
@@ -516,7 +608,8 @@ class NNTC(IStrategy):
 
         # future_df = self.add_future_data(dataframe.copy())
         future_df = self.dataframePopulator.add_hidden_indicators(dataframe.copy())
-        future_df = self.dataframePopulator.add_future_data(future_df, self.curr_lookahead)
+        future_df = self.dataframePopulator.add_future_data(future_df, self.curr_lookahead,
+                                                            columns=self.get_future_indicators())
 
         future_df['train_buy'] = 0.0
         future_df['train_sell'] = 0.0
@@ -553,12 +646,7 @@ class NNTC(IStrategy):
 
         # Subclasses themselves can add more by overriding the func save_debug_indicators()
 
-        dbg_list = [
-            'full_dwt', 'train_buy', 'train_sell',
-            'future_gain', 'future_min', 'future_max',
-            'future_profit_min', 'future_profit_max',
-            'future_loss_min', 'future_loss_max', 'loss_threshold',
-        ]
+        dbg_list = self.dbg_indicator_list
 
         if len(dbg_list) > 0:
             for indicator in dbg_list:
@@ -569,6 +657,18 @@ class NNTC(IStrategy):
 
         return
 
+    # the indicators to be calculated by the dataframe populator (None means all of them)
+    def get_indicator_columns(self):
+        if self.indicator_list is None:
+            return None
+        return self.indicator_list + self.training_signals.get_indicator_list()
+
+    # the indicators needed to create the training data (and debug data). Used so that add_future_data() only
+    # calculates the future data that is actually used
+    def get_future_indicators(self):
+        return self.training_signals.get_indicator_list() + self.training_signals.get_debug_indicators() + \
+            self.dbg_indicator_list
+
     # save debug indicators identified by the training signal. Can also be overidden in the subclass
     def save_debug_indicators(self, future_df: DataFrame):
         dbg_list = self.training_signals.get_debug_indicators()
@@ -602,6 +702,9 @@ class NNTC(IStrategy):
 
     # compress the supplied dataframe
     def compress_dataframe(self, dataframe: DataFrame) -> DataFrame:
+        if self.compressor and (self.compressor.n_features_in_ != dataframe.shape[1]):
+            print("    WARN: compressor does not match data (features changed?). Re-fitting")
+            self.compressor = None
         if not self.compressor:
             self.compressor = self.get_compressor(dataframe)
         # self.compressor = self.get_compressor(dataframe)
@@ -625,6 +728,8 @@ class NNTC(IStrategy):
 
         frame_size = dataframe.shape[0]
 
+        scaler_loaded = self.dataframeUtils.scaler_fitted
+
         remove_outliers = False
         if remove_outliers:
             # norm dataframe before splitting, otherwise variances are skewed
@@ -634,11 +739,22 @@ class NNTC(IStrategy):
             # full_df_norm = self.dataframeUtils.norm_dataframe(dataframe).clip(lower=-3.0, upper=3.0)  # supress outliers
             full_df_norm = self.dataframeUtils.norm_dataframe(dataframe)
 
-        # compress data
+        # save newly fitted scaler (so that the same scaling is used for predictions in later runs)
+        save_preprocessors = (self.dp.runmode.value == 'backtest')
+        if save_preprocessors and (not scaler_loaded):
+            self.dataframeUtils.save_scaler(self.get_preprocessor_path(curr_pair, "scaler"))
+
+        # compress data. The compressor is saved with the model, so it is only per pair if the model is
         if self.compress_data:
+            compressor_path = self.get_preprocessor_path(curr_pair, "compressor")
+            self.compressor = self.preprocessor_cache.get(compressor_path)
+            old_compressor = self.compressor
             old_size = full_df_norm.shape[1]
             full_df_norm = self.compress_dataframe(full_df_norm)
             print("    Compressed data {} -> {} (features)".format(old_size, full_df_norm.shape[1]))
+            self.preprocessor_cache[compressor_path] = self.compressor
+            if save_preprocessors and (self.compressor is not old_compressor):
+                save_object(self.compressor, compressor_path)
 
         # constrain size to what will be available in run modes
         if self.use_full_dataset:
@@ -648,16 +764,16 @@ class NNTC(IStrategy):
 
         # create classifiers, if necessary
         num_features = full_df_norm.shape[1]
-        if (self.trinary_classifier is None) or self.model_per_pair:
-            self.trinary_classifier, name = NNTClassifier.create_classifier(self.classifier_type,
-                                                                            self.curr_pair,
-                                                                            num_features,
-                                                                            self.seq_len)
+        if self.model_per_pair:
+            if self.curr_pair not in self.pair_classifiers:
+                self.pair_classifiers[self.curr_pair] = self.make_classifier(self.curr_pair, num_features)
+            self.set_trinary_classifier(self.pair_classifiers[self.curr_pair])
 
-            # set additional model parameters
-            category, model_name = self.get_model_identifiers(self.curr_pair, name)
-            self.trinary_classifier.set_model_name(category, model_name)
-            self.trinary_classifier.set_combine_models(self.combine_models)
+            if self.prefetch_models:
+                self.prefetch_classifier(self.get_next_pair(), num_features)
+
+        elif self.trinary_classifier is None:
+            self.trinary_classifier = self.make_classifier(self.curr_pair, num_features)
 
         # combine holds/buys/sells into a single array
         blabels = buys.to_numpy()
@@ -784,6 +900,38 @@ class NNTC(IStrategy):
 
     #######################################
 
+    # path of the file used to save the scaler or compressor (ptype) of the current model. Saved next to the model.
+    # Scalers are fitted per pair, so the pair is added to the name if the model is shared across pairs
+    def get_preprocessor_path(self, pair, ptype):
+        clf_name = str(self.classifier_type).split(".")[-1]
+        category, model_name = self.get_model_identifiers(pair, clf_name)
+        if (ptype == "scaler") and (not self.model_per_pair):
+            model_name = model_name + "_" + pair.split("/")[0]
+        root_dir = os.path.dirname(str(Path(__file__))) + "/models/"
+        return root_dir + category + "/" + model_name + "." + ptype + ".joblib"
+
+    # load the scaler & compressor saved when the model was trained. Files are only read once, after that the
+    # transforms are just re-used (no fitting)
+    def load_preprocessors(self, pair):
+        scaler = self.get_preprocessor(pair, "scaler")
+        if scaler is not None:
+            self.dataframeUtils.set_fitted_scaler(scaler)
+
+        # if there is no saved compressor, compress_dataframe() fits a new one to this pair's data
+        if self.compress_data:
+            self.compressor = self.get_preprocessor(pair, "compressor")
+
+    # returns the saved scaler or compressor (ptype) for the pair, None if there isn't one. Missing files are not
+    # cached, because they are written when the model are trained
+    def get_preprocessor(self, pair, ptype):
+        path = self.get_preprocessor_path(pair, ptype)
+        if path not in self.preprocessor_cache:
+            preprocessor = load_object(path)
+            if preprocessor is None:
+                return None
+            self.preprocessor_cache[path] = preprocessor
+        return self.preprocessor_cache[path]
+
     def get_compressor(self, df_norm: DataFrame):
         #  use fixed size PCA (Tensorflow models need fixed inputs)
         ncols = min(self.COMPRESSED_SIZE, df_norm.shape[-1])
@@ -801,6 +949,46 @@ class NNTC(IStrategy):
 
     #######################################
 
+    # create the classifier (model) for the supplied pair
+    def make_classifier(self, pair, num_features):
+        classifier, name = NNTClassifier.create_classifier(self.classifier_type, pair, num_features, self.seq_len)
+
+        # set additional model parameters
+        category, model_name = self.get_model_identifiers(pair, name)
+        classifier.set_model_name(category, model_name)
+        classifier.set_combine_models(self.combine_models)
+        return classifier
+
+    # switch to the classifier for the current pair. The model registry keeps the model in memory while it is in use,
+    # and releases models of other pairs if needed
+    def set_trinary_classifier(self, classifier):
+        if self.model_registry is None:
+            self.model_registry = get_model_registry(self.model_memory_budget)
+
+        if classifier is self.trinary_classifier:
+            return
+
+        if self.trinary_classifier is not None:
+            self.model_registry.release(self.trinary_classifier)
+        self.trinary_classifier = self.model_registry.acquire(classifier)
+
+    # start loading the model for the supplied pair in the background
+    def prefetch_classifier(self, pair, num_features):
+        if (pair is None) or (self.model_registry is None):
+            return
+        if pair not in self.pair_classifiers:
+            self.pair_classifiers[pair] = self.make_classifier(pair, num_features)
+        self.model_registry.prefetch(self.pair_classifiers[pair])
+
+    # returns the pair after the current one in the whitelist (i.e. the next one to be processed), None if there is none
+    def get_next_pair(self):
+        pairs = self.dp.current_whitelist()
+        if (len(pairs) < 2) or (self.curr_pair not in pairs):
+            return None
+        return pairs[(pairs.index(self.curr_pair) + 1) % len(pairs)]
+
+    #######################################
+
     def fit_classifier(self, classifier, name, tag, tensor, labels, test_tensor, test_labels):
 
         if classifier is None:
@@ -967,6 +1155,40 @@ class NNTC(IStrategy):
 
         return clf, best_classifier
 
+    # predictions are only cached in live/dry runs, where the dataframe moves on by one candle at a time
+    def use_prediction_cache(self) -> bool:
+        if not (self.use_tail_inference or self.use_batch_inference):
+            return False
+        if self.dp.runmode.value not in ('live', 'dry_run'):
+            return False
+        if self.prediction_cache is None:
+            self.prediction_cache = PredictionCache()
+        return True
+
+    # predict only the rows that do not have a cached prediction (plus the seq_len-1 earlier rows needed for their
+    # windows). Returns None if the whole dataframe needs to be predicted
+    def predict_tail(self, dataframe: DataFrame, pair, clf, name):
+        num_rows = self.prediction_cache.num_new_rows(pair, name, dataframe)
+        if (num_rows is None) or (num_rows > self.max_tail_rows):
+            return None
+
+        predict = []
+        if num_rows > 0:
+            # the scaler must be fitted on the whole dataframe (as for a full prediction), then only the tail is scaled
+            if not self.dataframeUtils.scaler_fitted:
+                self.dataframeUtils.norm_dataframe(dataframe)
+
+            df_norm = self.dataframeUtils.norm_dataframe(dataframe.iloc[-(num_rows + self.seq_len - 1):])
+            if self.compress_data:
+                if (self.compressor is None) or (self.compressor.n_features_in_ != df_norm.shape[1]):
+                    return None
+                df_norm = self.compress_dataframe(df_norm)
+
+            df_tensor = self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)[-num_rows:]
+            predict = self.get_classifier_predictions(clf, df_tensor)
+
+        return self.prediction_cache.merge(pair, name, dataframe, predict)
+
     # make predictions for supplied dataframe (returns column)
     def predict(self, dataframe: DataFrame, pair, clf):
 
@@ -974,13 +1196,26 @@ class NNTC(IStrategy):
         predict = None
 
         if clf is not None:
-            # print("    predicting... - dataframe:", dataframe.shape)
-            df_norm = self.dataframeUtils.norm_dataframe(dataframe)
-            if self.compress_data:
-                df_norm = self.compress_dataframe(df_norm)
+            use_cache = self.use_prediction_cache()
 
-            df_tensor = self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)
-            predict = self.get_classifier_predictions(clf, df_tensor)
+            # use the batch prediction, if there is one, otherwise just predict the new rows
+            if use_cache and (self.batch_inference is not None):
+                predict = self.batch_inference.get_predictions(pair, "trinary", dataframe, self.prediction_cache)
+
+            if use_cache and self.use_tail_inference and (predict is None):
+                predict = self.predict_tail(dataframe, pair, clf, "trinary")
+
+            if predict is None:
+                # print("    predicting... - dataframe:", dataframe.shape)
+                df_norm = self.dataframeUtils.norm_dataframe(dataframe)
+                if self.compress_data:
+                    df_norm = self.compress_dataframe(df_norm)
+
+                df_tensor = self.dataframeUtils.df_to_tensor(df_norm, self.seq_len)
+                predict = self.get_classifier_predictions(clf, df_tensor)
+
+            if use_cache:
+                self.prediction_cache.save(pair, "trinary", dataframe, predict)
 
         else:
             print("Null Classifier for pair: ", pair)
@@ -1217,8 +1452,8 @@ class NNTC(IStrategy):
     def custom_exit(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                     current_profit: float, **kwargs):
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         # trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         # max_profit = max(0, trade.calc_profit_ratio(trade.max_rate))
@@ -81,10 +81,13 @@ from prettytable import PrettyTable
 
 from CompressionAutoEncoder import CompressionAutoEncoder
 from RBMEncoder import RBMEncoder
+from CovariancePCA import CovariancePCA
 
 
 from DataframeUtils import DataframeUtils, ScalerType
 from DataframePopulator import DataframePopulator
+from CandleCache import CandleCache
+from PredictionCache import PredictionCache
 
 """
 ####################################################################################
@@ -201,15 +204,35 @@ class PCA(IStrategy):
     n_loss_stddevs = 0.0
     min_f1_score = 0.70
 
+    # if set, only these indicators (plus the minimal set and signal_indicator_list) are calculated. None means all of
+    # the default indicators
+    indicator_list = None
+    # indicators used by get_train_buy_signals()/get_train_sell_signals() and save_debug_indicators(), including the
+    # future_* columns. Must be set for indicator_list to take effect, otherwise all indicators are calculated
+    signal_indicator_list = None
+
+    # commonly used indicators, added to the debug dataframe for viewing
+    dbg_indicator_list = [
+        'full_dwt', 'train_buy', 'train_sell',
+        'future_gain', 'future_min', 'future_max',
+        'future_profit_min', 'future_profit_max', 'profit_threshold',
+        'future_loss_min', 'future_loss_max', 'loss_threshold',
+    ]
+
     curr_lookahead = int(12 * lookahead_hours)
 
     curr_pair = ""
     custom_trade_info = {}
+    candle_cache = CandleCache()  # last candle of each pair, for the custom exit/stoploss functions
 
     num_pairs = 0
     pair_model_info = {}  # holds model-related info for each pair
     classifier_stats = {}  # holds statistics for each type of classifier (useful to rank classifiers
 
+    use_tail_inference = True  # live/dry runs: only predict the rows that were not in the previous dataframe
+    max_tail_rows = 32  # if there are more new rows than this, just predict the whole dataframe
+    prediction_cache: PredictionCache = None  # predictions from previous candles (live/dry runs only)
+
     ignore_exit_signals = False # set to True if you don't want to process sell/exit signals (let custom sell do it)
 
     # debug flags
@@ -218,6 +241,16 @@ class PCA(IStrategy):
 
     scaler_type = ScalerType.Robust # scaler type used for normalisation
 
+    # solver used for PCA (see get_pca()):
+    #   'full':        sklearn PCA with full SVD (fitted twice if components are dropped). Original method
+    #   'covariance':  eigendecomposition of the covariance matrix, which is then just truncated. Same results as
+    #                  'full' (to within rounding and component signs), but much faster
+    #   'randomized':  sklearn PCA with randomized SVD (number of components chosen from the covariance eigenvalues)
+    #   'incremental': sklearn IncrementalPCA, fitted in chunks of pca_batch_size rows (limits memory usage)
+    pca_solver = 'covariance'
+    pca_batch_size = 8192
+    pca_variance_threshold = 0.999
+
     dataframeUtils = None
     dataframePopulator = None
 
@@ -370,6 +403,9 @@ class PCA(IStrategy):
 
             print("    Lookahead: ", self.curr_lookahead, " candles (", self.lookahead_hours, " hours)")
 
+            if (self.indicator_list is not None) and (self.signal_indicator_list is None):
+                print("    WARN: indicator_list ignored (signal_indicator_list not set). Using all indicators")
+
         print("")
         print(curr_pair)
 
@@ -393,7 +429,8 @@ class PCA(IStrategy):
 
         # populate the normal dataframe
         # dataframe = self.add_indicators(dataframe)
-        dataframe = self.dataframePopulator.add_indicators(dataframe)
+        dataframe = self.dataframePopulator.add_indicators(dataframe, pair=curr_pair, timeframe=self.timeframe,
+                                                           columns=self.get_indicator_columns())
 
         buys, sells = self.create_training_data(dataframe)
 
@@ -445,14 +482,18 @@ class PCA(IStrategy):
     def create_training_data(self, dataframe: DataFrame):
 
         future_df = self.dataframePopulator.add_hidden_indicators(dataframe.copy())
-        future_df = self.dataframePopulator.add_future_data(future_df, self.curr_lookahead)
+        future_df = self.dataframePopulator.add_future_data(future_df, self.curr_lookahead,
+                                                            columns=self.get_future_indicators())
 
         future_df['train_buy'] = 0.0
         future_df['train_sell'] = 0.0
 
         # use sequence trends as criteria
-        future_df['train_buy'] = self.get_train_buy_signals(future_df)
-        future_df['train_sell'] = self.get_train_sell_signals(future_df)
+        if self.check_signal_indicators(future_df):
+            future_df['train_buy'] = self.get_train_buy_signals(future_df)
+            future_df['train_sell'] = self.get_train_sell_signals(future_df)
+        else:
+            print("    ERROR: Missing indicators in dataframe")
 
         buys = future_df['train_buy'].copy()
         if buys.sum() < 3:
@@ -470,15 +511,10 @@ class PCA(IStrategy):
     def save_debug_data(self, future_df: DataFrame):
 
         # Debug support: add commonly used indicators so that they can be viewed
-        # the list below is available for any subclass. Subclasses themselves can add more by overriding
-        # the func save_debug_indicators()
+        # the list (dbg_indicator_list) is available for any subclass. Subclasses themselves can add more by
+        # overriding the func save_debug_indicators()
 
-        dbg_list = [
-            'full_dwt', 'train_buy', 'train_sell',
-            'future_gain', 'future_min', 'future_max',
-            'future_profit_min', 'future_profit_max', 'profit_threshold',
-            'future_loss_min', 'future_loss_max', 'loss_threshold',
-        ]
+        dbg_list = self.dbg_indicator_list
 
         if len(dbg_list) > 0:
             for indicator in dbg_list:
@@ -491,6 +527,29 @@ class PCA(IStrategy):
         pass
         return
 
+    # the indicators to be calculated by the dataframe populator (None means all of them)
+    def get_indicator_columns(self):
+        if (self.indicator_list is None) or (self.signal_indicator_list is None):
+            return None
+        return self.indicator_list + self.signal_indicator_list
+
+    # the indicators needed to create the training data (and debug data). Used so that add_future_data() only
+    # calculates the future data that is actually used (None means all of it)
+    def get_future_indicators(self):
+        if self.signal_indicator_list is None:
+            return None
+        return self.signal_indicator_list + self.dbg_indicator_list
+
+    # check that the indicators used by the training signals are present
+    def check_signal_indicators(self, future_df: DataFrame) -> bool:
+        result = True
+        if self.signal_indicator_list is not None:
+            for ind in self.signal_indicator_list:
+                if ind not in future_df.columns:
+                    result = False
+                    print(f"    ERROR: indicator not in dataframe: {ind}")
+        return result
+
     # adds an indicator to the main frame for debug (e.g. plotting). Column will be prefixed with '%', which will
     # cause it to be removed before normalisation and fitting of models
     def add_debug_indicator(self, future_df: DataFrame, indicator):
@@ -657,25 +716,34 @@ class PCA(IStrategy):
 
         # there are various types of PCA, plus alternatives like ICA and Feature Extraction
         if pca_type == 0:
-            pca = skd.PCA(n_components=ncols, whiten=whiten, svd_solver='full').fit(df_norm)
+
+            if self.pca_solver == 'full':
+                pca = skd.PCA(n_components=ncols, whiten=whiten, svd_solver='full').fit(df_norm)
+            else:
+                # full decomposition from the covariance matrix (cheap), used to select the number of components
+                pca = CovariancePCA(n_components=ncols, whiten=whiten).fit(df_norm)
             var_ratios = pca.explained_variance_ratio_
 
             # if self.dbg_verbose:
             #     print ("PCA variance_ratio: ", pca.explained_variance_ratio_)
 
             # scan variance and only take if column contributes >x%
-            ncols = 0
-            var_sum = 0.0
-            variance_threshold = 0.999
-            # variance_threshold = 0.99
-            while ((var_sum < variance_threshold) & (ncols < len(var_ratios))):
-                var_sum = var_sum + var_ratios[ncols]
-                ncols = ncols + 1
+            ncols = self.get_num_components(var_ratios, self.pca_variance_threshold)
 
             # if necessary, re-calculate pca with reduced column set
-            if (ncols != df_norm.shape[1]):
-                # pca = skd.PCA(n_components=ncols, svd_solver="randomized", whiten=True).fit(df_norm)
-                pca = skd.PCA(n_components=ncols, whiten=whiten, svd_solver='full').fit(df_norm)
+            if self.pca_solver == 'full':
+                if (ncols != df_norm.shape[1]):
+                    pca = skd.PCA(n_components=ncols, whiten=whiten, svd_solver='full').fit(df_norm)
+            elif self.pca_solver == 'covariance':
+                pca = pca.truncate(ncols)
+            elif self.pca_solver == 'randomized':
+                pca = skd.PCA(n_components=ncols, whiten=whiten, svd_solver='randomized', random_state=0).fit(df_norm)
+            elif self.pca_solver == 'incremental':
+                pca = skd.IncrementalPCA(n_components=ncols, whiten=whiten,
+                                         batch_size=max(self.pca_batch_size, ncols)).fit(df_norm)
+            else:
+                print(f"    ERR: unknown PCA solver: {self.pca_solver}. Using covariance")
+                pca = pca.truncate(ncols)
 
             self.check_pca(pca, df_norm)
 
@@ -754,6 +822,15 @@ class PCA(IStrategy):
 
         return pca
 
+    # returns the number of components needed to explain (at least) variance_threshold of the variance
+    def get_num_components(self, var_ratios, variance_threshold) -> int:
+        ncols = 0
+        var_sum = 0.0
+        while ((var_sum < variance_threshold) & (ncols < len(var_ratios))):
+            var_sum = var_sum + var_ratios[ncols]
+            ncols = ncols + 1
+        return ncols
+
     # does a quick for suspicious values. Separate func because we always want to call this
     def check_pca(self, pca, df):
 
@@ -1057,8 +1134,38 @@ class PCA(IStrategy):
 
         return clf, best_classifier
 
+    # predictions are only cached in live/dry runs, where the dataframe moves on by one candle at a time
+    def use_prediction_cache(self) -> bool:
+        if not self.use_tail_inference:
+            return False
+        if self.dp.runmode.value not in ('live', 'dry_run'):
+            return False
+        if self.prediction_cache is None:
+            self.prediction_cache = PredictionCache()
+        return True
+
+    # predict only the rows that do not have a cached prediction. Returns None if the whole dataframe needs to be
+    # predicted
+    def predict_tail(self, dataframe: DataFrame, pair, clf, name):
+        num_rows = self.prediction_cache.num_new_rows(pair, name, dataframe)
+        if (num_rows is None) or (num_rows > self.max_tail_rows):
+            return None
+
+        predict = []
+        if num_rows > 0:
+            # the scaler must be fitted on the whole dataframe (as for a full prediction), then only the tail is scaled
+            if not self.dataframeUtils.scaler_fitted:
+                self.dataframeUtils.norm_dataframe(dataframe)
+
+            df_norm = self.dataframeUtils.norm_dataframe(dataframe.iloc[-num_rows:])
+            df_norm_pca = self.pair_model_info[pair]['pca'].transform(df_norm)
+            predict = clf.predict(df_norm_pca)
+
+        return self.prediction_cache.merge(pair, name, dataframe, predict)
+
     # make predictions for supplied dataframe (returns column)
-    def predict(self, dataframe: DataFrame, pair, clf):
+    # name identifies the classifier (buy/sell) for tail inference
+    def predict(self, dataframe: DataFrame, pair, clf, name=""):
 
         # predict = 0
         predict = None
@@ -1066,10 +1173,18 @@ class PCA(IStrategy):
         pca = self.pair_model_info[pair]['pca']
 
         if clf:
-            # print("    predicting.. - dataframe:", dataframe.shape)
-            df_norm = self.dataframeUtils.norm_dataframe(dataframe)
-            df_norm_pca = pca.transform(df_norm)
-            predict = clf.predict(df_norm_pca)
+            use_cache = self.use_prediction_cache()
+            if use_cache:
+                predict = self.predict_tail(dataframe, pair, clf, name)
+
+            if predict is None:
+                # print("    predicting.. - dataframe:", dataframe.shape)
+                df_norm = self.dataframeUtils.norm_dataframe(dataframe)
+                df_norm_pca = pca.transform(df_norm)
+                predict = clf.predict(df_norm_pca)
+
+            if use_cache:
+                self.prediction_cache.save(pair, name, dataframe, predict)
 
         else:
             print("Null CLF for pair: ", pair)
@@ -1088,7 +1203,7 @@ class PCA(IStrategy):
             return predict
 
         print("    predicting buys..")
-        predict = self.predict(df, pair, clf)
+        predict = self.predict(df, pair, clf, "buy")
 
         # if self.dbg_test_classifier:
         #     # DEBUG: check accuracy
@@ -1120,7 +1235,7 @@ class PCA(IStrategy):
             return predict
 
         print("    predicting sells..")
-        predict = self.predict(df, pair, clf)
+        predict = self.predict(df, pair, clf, "sell")
 
         # if self.dbg_test_classifier:
         #     # DEBUG: check accuracy
@@ -1343,7 +1458,7 @@ class PCA(IStrategy):
         # self.set_state(pair, self.State.STOPLOSS)
 
         dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         in_trend = self.custom_trade_info[trade.pair]['had_trend']
 
@@ -1375,8 +1490,8 @@ class PCA(IStrategy):
     def custom_exit(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                     current_profit: float, **kwargs):
 
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-        last_candle = dataframe.iloc[-1].squeeze()
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+        last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         trade_dur = int((current_time.timestamp() - trade.open_date_utc.timestamp()) // 60)
         max_profit = max(0, trade.calc_profit_ratio(trade.max_rate))
@@ -0,0 +1,62 @@
+# Cache of the predictions made for each pair (live/dry runs)
+#
+# In live runs the strategies are called with (almost) the same dataframe on every candle: the oldest row drops off
+# and a new one is added. Predicting over the whole dataframe each time is wasteful, since only the new rows can
+# change the entry/exit signals. This keeps the predictions made for each pair (one column per classifier, indexed
+# by date), so that only the rows that were not in the previous dataframe need to be predicted ('tail inference').
+# The predictions for older rows are the ones made when those rows were the latest (i.e. what the bot saw at the time)
+#
+# Usage:
+#   num_rows = cache.num_new_rows(pair, "buy", dataframe)
+#   if num_rows is None:
+#       predictions = <predict whole dataframe>
+#   else:
+#       predictions = cache.merge(pair, "buy", dataframe, <predictions for the last num_rows rows>)
+#   cache.save(pair, "buy", dataframe, predictions)
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+
+class PredictionCache():
+
+    history = {}  # (pair, name) -> predictions (Series, indexed by date)
+
+    def __init__(self):
+        super().__init__()
+        self.history = {}
+
+    # returns the number of rows at the end of the dataframe that do not have a saved prediction, or None if the
+    # earlier rows are not all covered (in which case the whole dataframe has to be predicted)
+    def num_new_rows(self, pair, name, dataframe: DataFrame):
+        saved = self.history.get((pair, name))
+        if (saved is None) or (len(dataframe) == 0):
+            return None
+
+        covered = pd.Index(dataframe['date']).isin(saved.index)
+        found = np.flatnonzero(covered)
+        if len(found) == 0:
+            return None
+
+        num_old = found[-1] + 1
+        if not covered[:num_old].all():
+            return None
+        return len(covered) - num_old
+
+    # returns predictions for the whole dataframe: saved predictions, followed by the supplied predictions for the
+    # last len(predictions) rows
+    def merge(self, pair, name, dataframe: DataFrame, predictions) -> np.ndarray:
+        num_new = len(predictions)
+        dates = pd.Index(dataframe['date'])
+        saved = self.history[(pair, name)].reindex(dates[:len(dates) - num_new]).to_numpy()
+        return np.concatenate([saved, np.asarray(predictions)])
+
+    # save the predictions for the whole dataframe
+    def save(self, pair, name, dataframe: DataFrame, predictions):
+        if (np.ndim(predictions) != 1) or (len(predictions) != len(dataframe)):
+            return
+        self.history[(pair, name)] = pd.Series(np.asarray(predictions), index=pd.Index(dataframe['date']))
+
+    def clear(self):
+        self.history = {}
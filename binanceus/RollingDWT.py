@@ -0,0 +1,161 @@
+# Rolling DWT engine.
+# This replaces the pattern:
+#       dataframe['dwt'] = dataframe['mid'].rolling(window=win).apply(roll_get_dwt)
+# which runs a full wavedec/threshold/waverec (in python) for every candle, just to keep the last sample.
+# Here, all windows are stacked into a 2D array (using a strided view, so no copying) and the wavelet transforms
+# are run along axis 1, so that all windows are processed in one (vectorised) pass.
+#
+# There is also a 'streaming' mode, intended for dry/live runs, where only the windows for newly arrived candles are
+# processed. State is held per key (e.g. pair), so one engine can be shared across pairs.
+#
+# Results match DataframePopulator.roll_get_dwt() (to within floating point rounding)
+
+import numpy as np
+import pywt
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class RollingDWT():
+
+    window = 128
+    wavelet = 'db8'
+    level = 1
+    wmode = "smooth"
+    tmode = "hard"
+
+    # max number of windows processed at once (limits memory usage on long dataframes)
+    batch_size = 8192
+
+    # streaming state, keyed by caller-supplied key (e.g. pair)
+    stream_inputs = {}
+    stream_outputs = {}
+
+    def __init__(self, window=128, wavelet='db8'):
+        super().__init__()
+        self.window = window
+        self.wavelet = wavelet
+        self.stream_inputs = {}
+        self.stream_outputs = {}
+
+    # returns the rolling (last sample) DWT model for each row of col. The first (window-1) entries are NaN, as are
+    # entries whose window contains a NaN (same as rolling().apply())
+    def transform(self, col) -> np.ndarray:
+
+        data = np.asarray(col, dtype=float)
+        nrows = len(data)
+        result = np.full(nrows, np.nan)
+
+        if nrows < self.window:
+            return result
+
+        windows = sliding_window_view(data, self.window)
+        result[self.window - 1:] = self.model_last(windows)
+
+        return result
+
+    # streaming version of transform(). Compares col to the data seen on the previous call for the same key, and
+    # only processes the windows that end on new candles. Falls back to transform() if there is no usable overlap
+    def update(self, key, col) -> np.ndarray:
+
+        data = np.asarray(col, dtype=float)
+        nrows = len(data)
+
+        prev_data = self.stream_inputs.get(key, None)
+        prev_result = self.stream_outputs.get(key, None)
+
+        num_new = self.count_new_rows(prev_data, data)
+
+        if (num_new is None) or (len(prev_result) < (nrows - num_new)):
+            result = self.transform(data)
+        else:
+            result = np.full(nrows, np.nan)
+            num_old = nrows - num_new
+            if num_old > 0:
+                result[:num_old] = prev_result[len(prev_result) - num_old:]
+            if num_new > 0:
+                start = max(num_old, self.window - 1)
+                if start < nrows:
+                    windows = sliding_window_view(data[start - self.window + 1:], self.window)
+                    result[start:] = self.model_last(windows)
+
+        # only need to keep the last window of inputs to detect overlap on the next call
+        self.stream_inputs[key] = data[-self.window:].copy()
+        self.stream_outputs[key] = result
+
+        return result
+
+    # clear streaming state (for one key, or all keys)
+    def reset(self, key=None):
+        if key is None:
+            self.stream_inputs = {}
+            self.stream_outputs = {}
+        else:
+            self.stream_inputs.pop(key, None)
+            self.stream_outputs.pop(key, None)
+
+    # figure out how many rows have been appended to data since prev_data was seen. Returns None if they don't overlap
+    def count_new_rows(self, prev_data, data):
+
+        if prev_data is None:
+            return None
+
+        plen = len(prev_data)
+        nrows = len(data)
+        for num_new in range(0, nrows - plen + 1):
+            end = nrows - num_new
+            if np.array_equal(prev_data, data[end - plen:end], equal_nan=True):
+                return num_new
+
+        return None
+
+    # runs the DWT model on each row of windows (shape [nwindows, window]), and returns the last sample of each
+    def model_last(self, windows) -> np.ndarray:
+
+        nwin = np.shape(windows)[0]
+        result = np.empty(nwin, dtype=float)
+
+        for start in range(0, nwin, self.batch_size):
+            end = min(start + self.batch_size, nwin)
+            batch = windows[start:end]
+
+            # de-trend each window
+            w_mean = batch.mean(axis=1, keepdims=True)
+            w_std = batch.std(axis=1, keepdims=True)
+            a_notrend = (batch - w_mean) / w_std
+
+            restored_sig = self.dwt_model(a_notrend)
+
+            # re-trend (last sample only)
+            result[start:end] = (restored_sig[:, -1] * w_std[:, 0]) + w_mean[:, 0]
+
+        # rolling().apply() does not evaluate windows containing NaNs
+        nan_rows = np.isnan(windows).any(axis=1)
+        result[nan_rows] = np.nan
+
+        return result
+
+    # batched equivalent of DataframePopulator.dwtModel(). Each row of data is an independent signal
+    def dwt_model(self, data) -> np.ndarray:
+
+        length = np.shape(data)[1]
+
+        # Apply DWT transform
+        coeff = pywt.wavedec(data, self.wavelet, mode=self.wmode, axis=1)
+
+        # remove higher harmonics (threshold is per-window)
+        detail = coeff[-self.level]
+        madev = np.mean(np.absolute(detail - np.mean(detail, axis=1, keepdims=True)), axis=1, keepdims=True)
+        sigma = (1 / 0.6745) * madev
+        uthresh = sigma * np.sqrt(2 * np.log(length))
+
+        if self.tmode == "hard":
+            coeff[1:] = (np.where(np.absolute(c) < uthresh, 0.0, c) for c in coeff[1:])
+        else:
+            coeff[1:] = (np.sign(c) * np.maximum(np.absolute(c) - uthresh, 0.0) for c in coeff[1:])
+
+        # inverse DWT transform
+        model = pywt.waverec(coeff, self.wavelet, mode=self.wmode, axis=1)
+
+        # waverec can return an extra item at the end for odd lengths
+        return model[:, :length]
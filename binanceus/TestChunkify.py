@@ -1,5 +1,13 @@
 
 import numpy as np
+import time
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from DataframeUtils import DataframeUtils
 
 
 def chunkify(data, seq_len):
@@ -36,6 +44,38 @@ def chunkify(data, seq_len):
     print("data:{} chunked:{}".format(np.shape(data), np.shape(chunked_array)))
     return chunked_array
 
+
+# compare the original (loop-based) chunkify() against DataframeUtils.df_to_tensor()
+def benchmark(nrows=100000, nfeatures=64, seq_len=32):
+
+    print("")
+    print(f"Benchmark: nrows:{nrows} nfeatures:{nfeatures} seq_len:{seq_len}")
+
+    data = np.random.randn(nrows, nfeatures)
+    dataframeUtils = DataframeUtils()
+
+    start = time.perf_counter()
+    ref = chunkify(data, seq_len)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    view = dataframeUtils.df_to_tensor(data, seq_len)
+    view_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    view32 = dataframeUtils.df_to_tensor(data, seq_len, dtype=np.float32)
+    float32_time = time.perf_counter() - start
+
+    print(f"    loop:    {loop_time:8.4f}s")
+    print(f"    view:    {view_time:8.4f}s ({loop_time / view_time:.0f}x)")
+    print(f"    float32: {float32_time:8.4f}s ({loop_time / float32_time:.1f}x)")
+
+    # results must be identical (not just close)
+    if np.array_equal(ref, view) and np.array_equal(ref.astype(np.float32), view32):
+        print("    results match")
+    else:
+        print("    *** ERROR: results do not match ***")
+
 def main():
 
     nrows = 12
@@ -74,5 +114,10 @@ def main():
         print(chunk2[i])
     print("")
 
+    chunk3 = DataframeUtils().df_to_tensor(arr1, seq_len)
+    print("df_to_tensor matches chunkify:", np.array_equal(chunky, chunk3))
+
+    benchmark()
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
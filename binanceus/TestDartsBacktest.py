@@ -0,0 +1,117 @@
+
+# benchmarks the fast backtest engine used by the darts-based predictors (see DartsBacktester), against the original
+# method (one call to predict() per input chunk, which is what historical_forecasts() does), and checks that they give
+# the same predictions
+#
+# Usage:
+#   python TestDartsBacktest.py [nrows]
+
+import numpy as np
+import pandas as pd
+import time
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+import torch
+from darts.models import NBEATSModel, NHiTSModel, NLinearModel, TFTModel
+
+from TimeSeriesBuilder import TimeSeriesBuilder
+from DartsBacktester import DartsBacktester
+
+
+lookback = 32
+lookahead = 6
+num_features = 8
+num_reference = 200  # number of rows checked against predict() (it is too slow to run on all rows)
+
+
+# minimal stand-in for ClassifierDarts (only the parts used by DartsBacktester)
+class TestClassifier():
+
+    def __init__(self, model):
+        self.model = model
+        self.target_column = 'close'
+        self.lookback = lookback
+        self.batch_size = 1024
+        self.model_path = ""
+        self.series_builder = TimeSeriesBuilder(self.target_column, reuse_scalers=True)
+
+    def get_lookahead(self):
+        return lookahead
+
+    def model_predict(self, model, target_series, covariate_series, verbose=True):
+        return model.predict(n=lookahead, series=target_series, past_covariates=covariate_series,
+                             batch_size=self.batch_size, verbose=verbose)
+
+
+# random walk price, plus some (noisy) indicators derived from it
+def make_data(nrows):
+    rng = np.random.default_rng(0)
+    close = 100.0 + np.cumsum(rng.standard_normal(nrows))
+    df = pd.DataFrame({'date': pd.date_range('2023-01-01', periods=nrows, freq='5min'), 'close': close})
+    for i in range(num_features - 1):
+        df[f'ind_{i}'] = pd.Series(close).rolling(i + 2, min_periods=1).mean() + rng.standard_normal(nrows) * 0.1
+    return df
+
+
+def make_models():
+    args = {'input_chunk_length': lookback, 'output_chunk_length': lookahead, 'n_epochs': 1, 'random_state': 0,
+            'pl_trainer_kwargs': {'accelerator': 'cpu', 'enable_progress_bar': False, 'logger': False}}
+    return {
+        'NBeats': NBEATSModel(num_stacks=2, num_blocks=1, layer_widths=64, **args),
+        'NHiTS': NHiTSModel(num_stacks=2, num_blocks=1, layer_widths=64, **args),
+        'NLinear': NLinearModel(**args),
+        # NNPredictor_TFT uses the default (probabilistic) likelihood, so each prediction is a random sample. Use a
+        # deterministic version here so that results can be compared
+        'TFT': TFTModel(hidden_size=16, add_relative_index=True, likelihood=None, loss_fn=torch.nn.MSELoss(), **args),
+    }
+
+
+# original method: predict from the input chunk ending at each row
+def reference_predictions(classifier, dataframe, rows):
+    covariate_series, target_series, target_scaler = classifier.series_builder.transform(dataframe,
+                                                                                          dtype=np.float32)
+    preds = []
+    for i in rows:
+        pred = classifier.model_predict(classifier.model, target_series[i - lookback + 1:i + 1],
+                                        covariate_series[i - lookback + 1:i + 1], verbose=False)
+        preds.append(classifier.series_builder.inverse_transform_target(pred, target_scaler)[-1])
+    return np.array(preds)
+
+
+if __name__ == '__main__':
+
+    nrows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"rows:{nrows} lookback:{lookback} lookahead:{lookahead} features:{num_features} "
+          f"threads:{torch.get_num_threads()}")
+
+    df_train = make_data(4000)
+    df_test = make_data(nrows)
+    train_results = df_train['close'].to_numpy()
+
+    for name, model in make_models().items():
+
+        classifier = TestClassifier(model)
+        train_cov, train_target, _, _ = classifier.series_builder.fit_transform(df_train, train_results,
+                                                                                 df_train, train_results,
+                                                                                 dtype=np.float32)
+        model.fit(train_target, past_covariates=train_cov, verbose=False)
+
+        backtester = DartsBacktester()
+        direct = backtester.can_run_module(model, lookahead)
+
+        start = time.perf_counter()
+        preds = backtester.backtest(classifier, df_test)
+        fast_time = time.perf_counter() - start
+
+        rows = np.arange(nrows - num_reference, nrows)
+        start = time.perf_counter()
+        ref = reference_predictions(classifier, df_test, rows)
+        ref_time = (time.perf_counter() - start) * (nrows - lookback + 1) / num_reference
+
+        max_diff = np.max(np.abs(preds[rows] - ref))
+        print(f"{name:8s} direct:{str(direct):5s} fast:{fast_time:7.2f}s ({(nrows / fast_time):9.0f} rows/s)  "
+              f"predict():{ref_time:8.1f}s (est)  speedup:{(ref_time / fast_time):6.1f}x  max diff:{max_diff:.2e}")
@@ -0,0 +1,119 @@
+
+# checks that strategies which limit their features (indicator_list) still get all of the indicators needed by their
+# training signals: the dataframe is populated with a reduced indicator_list, the future data is added, and the
+# training signal check must find all of its columns (for NNTC, that is TrainingSignals.check_indicators())
+#
+# Usage:
+#   python TestIndicatorColumns.py
+
+import numpy as np
+import pandas as pd
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from DataframePopulator import DataframePopulator, DatasetType
+import TrainingSignals
+
+from PCA_fbb import PCA_fbb
+from NNBC_fbb import NNBC_fbb
+from Anomaly_fbb import Anomaly_fbb
+from NNTC_macd_LSTM import NNTC_macd_LSTM
+from NNTC_adx_LSTM import NNTC_adx_LSTM
+from NNTC_aroon_LSTM import NNTC_aroon_LSTM
+
+
+# features used by the test strategies. Deliberately does not include anything used by the training signals
+reduced_indicator_list = ['cci']
+
+# indicators outside the minimal set (which is always calculated). The fbb signals only use the minimal set, so
+# versions of those strategies that also need these are checked as well
+optional_signal_indicators = ['adx', 'di_plus', 'di_minus', 'aroonup', 'aroondown']
+
+
+def with_optional_indicators(strategy_class):
+    return type(f"{strategy_class.__name__}_opt", (strategy_class,),
+                {'signal_indicator_list': strategy_class.signal_indicator_list + optional_signal_indicators})
+
+
+def make_candles(nrows):
+    rng = np.random.default_rng(0)
+    close = 100.0 * np.exp(np.cumsum(rng.standard_normal(nrows) * 0.003))
+    open = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open, close) * (1.0 + rng.random(nrows) * 0.002)
+    low = np.minimum(open, close) * (1.0 - rng.random(nrows) * 0.002)
+    return pd.DataFrame({'date': pd.date_range('2023-01-01', periods=nrows, freq='5min', tz='UTC'),
+                         'open': open, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.random(nrows) * 1000.0 + 10.0})
+
+
+# bare strategy instance (the rest of the strategy is not initialised, so no config is needed)
+def make_strategy(strategy_class):
+    strategy = strategy_class.__new__(strategy_class)
+    strategy.indicator_list = reduced_indicator_list
+    strategy.dbg_curr_df = pd.DataFrame()
+
+    populator = DataframePopulator()
+    populator.runmode = 'backtest'
+    populator.use_feature_store = False
+    populator.win_size = min(14, strategy.curr_lookahead)
+    populator.startup_win = strategy.startup_candle_count
+    populator.n_loss_stddevs = strategy.n_loss_stddevs
+    populator.n_profit_stddevs = strategy.n_profit_stddevs
+    strategy.dataframePopulator = populator
+
+    if getattr(strategy, 'signal_type', None) is not None:
+        strategy.training_signals = TrainingSignals.create_training_signals(strategy.signal_type,
+                                                                            strategy.curr_lookahead)
+    return strategy
+
+
+# populate with the reduced columns, and check the columns needed by the training signals
+def check_strategy(strategy_class, candles, num_all_columns):
+    strategy = make_strategy(strategy_class)
+    name = strategy_class.__name__
+
+    columns = strategy.get_indicator_columns()
+    assert columns is not None, f"{name}: indicator_list ignored"
+    dataframe = strategy.dataframePopulator.add_indicators(candles.copy(), columns=columns)
+    assert dataframe.shape[1] < num_all_columns, f"{name}: all indicators were calculated"
+
+    future_df = strategy.dataframePopulator.add_hidden_indicators(dataframe.copy())
+    future_df = strategy.dataframePopulator.add_future_data(future_df, strategy.curr_lookahead,
+                                                            columns=strategy.get_future_indicators())
+
+    if getattr(strategy, 'training_signals', None) is not None:
+        assert strategy.training_signals.check_indicators(future_df), f"{name}: missing training signal indicators"
+    else:
+        assert strategy.check_signal_indicators(future_df), f"{name}: missing training signal indicators"
+
+    # the training data must be created from the reduced data. For strategies that do not use TrainingSignals, this
+    # also adds their debug indicators
+    if getattr(strategy, 'training_signals', None) is not None:
+        buys = np.asarray(strategy.get_train_buy_signals(future_df))
+        sells = np.asarray(strategy.get_train_sell_signals(future_df))
+    else:
+        buys, sells = strategy.create_training_data(dataframe)
+        buys, sells = np.asarray(buys), np.asarray(sells)
+    assert len(buys) == len(sells) == len(candles)
+
+    print(f"    {name:20s} columns:{dataframe.shape[1]}/{num_all_columns}  "
+          f"buys:{int(buys.sum())}  sells:{int(sells.sum())}")
+
+
+if __name__ == '__main__':
+
+    candles = make_candles(2000)
+
+    full_populator = DataframePopulator()
+    full_populator.runmode = 'backtest'
+    full_populator.use_feature_store = False
+    num_all_columns = full_populator.add_indicators(candles.copy(), DatasetType.DEFAULT).shape[1]
+
+    strategy_classes = [PCA_fbb, NNBC_fbb, Anomaly_fbb, NNTC_macd_LSTM, NNTC_adx_LSTM, NNTC_aroon_LSTM]
+    strategy_classes += [with_optional_indicators(c) for c in [PCA_fbb, NNBC_fbb, Anomaly_fbb]]
+
+    for strategy_class in strategy_classes:
+        check_strategy(strategy_class, candles, num_all_columns)
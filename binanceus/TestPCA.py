@@ -0,0 +1,96 @@
+
+# benchmarks the PCA solvers available to the PCA strategies (see PCA.pca_solver), and checks that they give
+# equivalent results to the original (full SVD) method. Uses PCA.get_pca() from the strategy itself
+
+import numpy as np
+import pandas as pd
+import time
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from PCA import PCA
+
+
+# strategy instance that can run get_pca() (the rest of the strategy is not initialised, so no config is needed)
+def make_strategy(solver=None):
+    strategy = PCA.__new__(PCA)
+    if solver is not None:
+        strategy.pca_solver = solver
+    return strategy
+
+
+def get_pca(df_norm, solver=None):
+    return make_strategy(solver).get_pca(df_norm)
+
+
+# correlated test data, roughly like a normalised dataframe of indicators (many near-duplicate columns)
+def make_data(nrows, ncols, nfactors=24):
+    rng = np.random.default_rng(0)
+    factors = np.cumsum(rng.standard_normal((nrows, nfactors)), axis=0)
+    factors = (factors - factors.mean(axis=0)) / factors.std(axis=0)
+    weights = rng.standard_normal((nfactors, ncols)) * np.exp(-np.arange(nfactors) / 4.0)[:, np.newaxis]
+    data = factors @ weights + 0.05 * rng.standard_normal((nrows, ncols))
+    return pd.DataFrame(data, columns=[f"f{i}" for i in range(ncols)])
+
+
+def compare(ref, pca, df):
+    # components can differ in sign (and the tail can rotate slightly), so compare the reconstructed data and the
+    # variance explained by the leading components
+    ref_recon = ref.inverse_transform(ref.transform(df))
+    recon = pca.inverse_transform(pca.transform(df))
+    recon_err = np.max(np.abs(ref_recon - recon))
+    nlead = min(8, len(ref.explained_variance_ratio_), len(pca.explained_variance_ratio_))
+    ratio_err = np.max(np.abs(ref.explained_variance_ratio_[:nlead] - pca.explained_variance_ratio_[:nlead]))
+    return recon_err, ratio_err
+
+
+def benchmark(nrows=50000, ncols=150):
+
+    df = make_data(nrows, ncols)
+    print(f"data: {df.shape}")
+
+    ref = None
+    ref_time = 0.0
+    for solver in ['full', 'covariance', 'randomized', 'incremental']:
+        start = time.perf_counter()
+        pca = get_pca(df, solver)
+        duration = time.perf_counter() - start
+
+        if ref is None:
+            ref = pca
+            ref_time = duration
+            print(f"    {solver:12s} {duration:7.3f}s  components:{pca.n_components_}")
+        else:
+            recon_err, ratio_err = compare(ref, pca, df)
+            print(f"    {solver:12s} {duration:7.3f}s  components:{pca.n_components_}  " +
+                  f"speedup:{ref_time / duration:6.1f}x  recon err:{recon_err:.2e}  var ratio err:{ratio_err:.2e}")
+
+
+# the default solver must match the original method, and an unknown solver must fall back to 'covariance'
+def check_solver_selection(nrows=5000, ncols=60):
+
+    df = make_data(nrows, ncols)
+    ref = get_pca(df, 'full')
+    tolerance = 1e-6
+
+    default_solver = make_strategy().pca_solver
+    pca = get_pca(df)
+    recon_err, ratio_err = compare(ref, pca, df)
+    assert pca.n_components_ == ref.n_components_, "default solver: number of components differs"
+    assert (recon_err < tolerance) and (ratio_err < tolerance), \
+        f"default solver ({default_solver}) differs from full SVD: {recon_err:.2e} {ratio_err:.2e}"
+    print(f"    default solver ({default_solver}) matches full SVD")
+
+    cov = get_pca(df, 'covariance')
+    fallback = get_pca(df, 'unknown')
+    assert type(fallback) is type(cov), f"unknown solver: expected {type(cov).__name__}, got {type(fallback).__name__}"
+    assert np.array_equal(fallback.components_, cov.components_), "unknown solver: results differ from covariance"
+    print("    unknown solver falls back to covariance")
+
+
+if __name__ == '__main__':
+    check_solver_selection()
+    benchmark()
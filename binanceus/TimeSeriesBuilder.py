@@ -0,0 +1,199 @@
+# Conversion of dataframes into (scaled) darts TimeSeries, for the darts-based classifiers
+#
+# ClassifierDarts and ClassifierPyTorch used to convert every dataframe they were given by copying it, converting the
+# date column, calling darts.TimeSeries.from_dataframe() twice (covariates and target), and then fitting new
+# Scaler(RobustScaler()) objects to the result. In live runs that happens on every predict() call, and on 5m data the
+# conversion takes longer than the model itself.
+#
+# TimeSeriesBuilder:
+#   - builds the covariate and target series directly from (float) numpy blocks, without copying the dataframe
+#   - scales with sklearn RobustScalers (same result as darts' Scaler(RobustScaler()))
+#   - keeps the scalers fitted during training, so that they can be reused at inference (reuse_scalers), and saved
+#     along with the model (get_scalers()/set_scalers())
+#   - when the scalers are reused, the scaled covariates from the previous call are kept, and only new rows (candles)
+#     are converted on the next call. The kept covariates are guarded by a lock, since the rolling predictions can call
+#     predict_batch() from several threads (which skips this, because each window would replace the previous one)
+#
+# If the scalers are not reused (or have not been fitted), new scalers are fitted on each call, which is the original
+# behaviour (needed if a model is shared across pairs, because prices vary so much)
+#
+# Usage:
+#   builder = TimeSeriesBuilder('close')
+#   train_covariates, train_target, test_covariates, test_target = builder.fit_transform(df_train, train_results,
+#                                                                                        df_test, test_results)
+#   covariate_series, target_series, target_scaler = builder.transform(dataframe)
+#   predictions = builder.inverse_transform_target(preds, target_scaler)
+
+import threading
+
+import darts
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from sklearn.preprocessing import RobustScaler
+
+
+class TimeSeriesBuilder():
+
+    target_column = 'close'
+    reuse_scalers = False  # set to True to use the scalers fitted in training for inference
+    covariate_scaler = None
+    target_scaler = None
+    covariate_columns = []  # columns used to fit covariate_scaler
+
+    # covariates from the previous call to transform() (only used if scalers are reused)
+    last_dates = None
+    last_covariates = None
+    cache_lock = None
+
+    def __init__(self, target_column='close', reuse_scalers=False):
+        super().__init__()
+        self.target_column = target_column
+        self.reuse_scalers = reuse_scalers
+        self.covariate_scaler = None
+        self.target_scaler = None
+        self.covariate_columns = []
+        self.last_dates = None
+        self.last_covariates = None
+        self.cache_lock = threading.Lock()
+
+    # ---------------------------
+
+    # returns the (timezone-naive) dates of the dataframe
+    def get_dates(self, dataframe: DataFrame) -> pd.DatetimeIndex:
+        dates = pd.DatetimeIndex(pd.to_datetime(dataframe['date']))
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        return dates
+
+    # covariates are all columns except the date
+    def get_columns(self, dataframe: DataFrame) -> list:
+        return [col for col in dataframe.columns if col != 'date']
+
+    # missing values are set to 0 (same as fillna_value=0 in from_dataframe())
+    def fillna(self, values) -> np.ndarray:
+        return np.where(np.isnan(values), 0, values)
+
+    def make_series(self, dates, values, columns) -> darts.TimeSeries:
+        return darts.TimeSeries.from_times_and_values(dates, values, columns=columns)
+
+    def fit_scaler(self, values) -> RobustScaler:
+        return RobustScaler().fit(values)
+
+    def scaled(self, scaler, values, dtype) -> np.ndarray:
+        return scaler.transform(values).astype(dtype, copy=False)
+
+    # ---------------------------
+
+    # fit the scalers to the training data, and return the scaled covariate and target series for training & test data
+    def fit_transform(self, df_train: DataFrame, train_results, df_test: DataFrame, test_results, dtype=np.float64):
+
+        train_dates = self.get_dates(df_train)
+        test_dates = self.get_dates(df_test)
+
+        self.covariate_columns = self.get_columns(df_train)
+        train_covariates = self.fillna(df_train[self.covariate_columns].to_numpy(dtype=dtype))
+        test_covariates = self.fillna(df_test[self.covariate_columns].to_numpy(dtype=dtype))
+        train_target = self.fillna(np.asarray(train_results, dtype=dtype).reshape(-1, 1))
+        test_target = self.fillna(np.asarray(test_results, dtype=dtype).reshape(-1, 1))
+
+        self.covariate_scaler = self.fit_scaler(train_covariates)
+        self.target_scaler = self.fit_scaler(train_target)
+        with self.cache_lock:
+            self.last_dates = None
+            self.last_covariates = None
+
+        columns = self.covariate_columns
+        target = [self.target_column]
+        return (
+            self.make_series(train_dates, self.scaled(self.covariate_scaler, train_covariates, dtype), columns),
+            self.make_series(train_dates, self.scaled(self.target_scaler, train_target, dtype), target),
+            self.make_series(test_dates, self.scaled(self.covariate_scaler, test_covariates, dtype), columns),
+            self.make_series(test_dates, self.scaled(self.target_scaler, test_target, dtype), target)
+        )
+
+    # returns the scaled covariate and target series for the dataframe, plus the scaler used for the target (needed
+    # to reverse the scaling of the predictions). Set incremental=False to ignore (and keep) the covariates saved from
+    # the previous call
+    def transform(self, dataframe: DataFrame, dtype=np.float32, incremental=True):
+
+        dates = self.get_dates(dataframe)
+        columns = self.get_columns(dataframe)
+        target = dataframe[self.target_column].to_numpy(dtype=dtype).reshape(-1, 1)
+
+        if self.can_reuse_scalers(columns):
+            if incremental:
+                covariates = self.get_reused_covariates(dataframe, dates, dtype)
+            else:
+                covariates = self.scaled(self.covariate_scaler, dataframe[columns].to_numpy(dtype=dtype), dtype)
+            target_scaler = self.target_scaler
+        else:
+            raw = dataframe[columns].to_numpy(dtype=dtype)
+            covariates = self.scaled(self.fit_scaler(raw), raw, dtype)
+            target_scaler = self.fit_scaler(target)
+
+        covariate_series = self.make_series(dates, covariates, columns)
+        target_series = self.make_series(dates, self.scaled(target_scaler, target, dtype), [self.target_column])
+
+        return covariate_series, target_series, target_scaler
+
+    # the fitted scalers can only be used with the columns they were fitted on
+    def can_reuse_scalers(self, columns) -> bool:
+        return (self.reuse_scalers and (self.covariate_scaler is not None) and (self.target_scaler is not None) and
+                (list(columns) == list(self.covariate_columns)))
+
+    # scaled covariates using the fitted scaler. Rows that were scaled on the previous call are reused, so in live runs
+    # only the new candle(s) need to be converted
+    def get_reused_covariates(self, dataframe: DataFrame, dates, dtype) -> np.ndarray:
+
+        columns = self.covariate_columns
+
+        # dates and covariates must come from the same call
+        with self.cache_lock:
+            last_dates = self.last_dates
+            last_covariates = self.last_covariates
+
+        num_old = 0
+        if (last_dates is not None) and (last_covariates.dtype == dtype) and (len(dates) > 0):
+            # position of the first date in the previous call, and number of rows that overlap
+            start = last_dates.searchsorted(dates[0])
+            if (start < len(last_dates)) and (last_dates[start] == dates[0]):
+                num_old = min(len(last_dates) - start, len(dates))
+                if not last_dates[start:start + num_old].equals(dates[:num_old]):
+                    num_old = 0
+
+        if num_old > 0:
+            covariates = np.empty((len(dates), len(columns)), dtype=dtype)
+            covariates[:num_old] = last_covariates[start:start + num_old]
+            if num_old < len(dates):
+                new_rows = dataframe[columns].iloc[num_old:].to_numpy(dtype=dtype)
+                covariates[num_old:] = self.scaled(self.covariate_scaler, new_rows, dtype)
+        else:
+            covariates = self.scaled(self.covariate_scaler, dataframe[columns].to_numpy(dtype=dtype), dtype)
+
+        with self.cache_lock:
+            self.last_dates = dates
+            self.last_covariates = covariates
+        return covariates
+
+    # reverse the scaling of (target) predictions. Returns a numpy array
+    def inverse_transform_target(self, series: darts.TimeSeries, target_scaler) -> np.ndarray:
+        values = series.values(copy=False).reshape(-1, 1)
+        return target_scaler.inverse_transform(values)[:, 0]
+
+    # ---------------------------
+
+    # fitted scalers, so that they can be saved with the model
+    def get_scalers(self) -> dict:
+        return {'covariate_scaler': self.covariate_scaler, 'target_scaler': self.target_scaler,
+                'covariate_columns': self.covariate_columns}
+
+    def set_scalers(self, scalers: dict):
+        if not scalers:
+            return
+        self.covariate_scaler = scalers.get('covariate_scaler')
+        self.target_scaler = scalers.get('target_scaler')
+        self.covariate_columns = scalers.get('covariate_columns', [])
+        with self.cache_lock:
+            self.last_dates = None
+            self.last_covariates = None
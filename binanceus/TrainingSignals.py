@@ -41,6 +41,7 @@ pd.options.mode.chained_assignment = None  # default='warn'
 # define a xxx_signals class for each type of training signal
 # This allows us to deal with the different types in a  generic fashion
 # Each class must contain the follow *static* functions :
+#   get_indicator_list()
 #   get_entry_training_signals()
 #   get_exit_training_signals()
 #   get_entry_guard_conditions()
@@ -96,9 +97,15 @@ class base_signals(ABC):
 
         return result
 
+    # returns the list of indicators used by this signal type, including the future_* columns created by
+    # DataframePopulator.add_future_data() (which can then skip anything that is not needed)
     @abstractmethod
+    def get_indicator_list(self):
+        return []
+
+    # check that needed indicators are present
     def check_indicators(self, future_df: DataFrame) -> bool:
-        return False
+        return self.indicators_present(self.get_indicator_list(), future_df)
 
     @abstractmethod
     def get_entry_training_signals(self, future_df: DataFrame):
@@ -135,14 +142,13 @@ class base_signals(ABC):
 
 class adx_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'adx', 'dm_delta', 'di_delta',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     # function to get buy signals
     def get_entry_training_signals(self, future_df: DataFrame):
@@ -211,14 +217,13 @@ class adx_signals(base_signals):
 
 class adx2_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'adx', 'di_plus', 'di_minus',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     # function to get buy signals
     def get_entry_training_signals(self, future_df: DataFrame):
@@ -287,14 +292,13 @@ class adx2_signals(base_signals):
 
 class adx3_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'adx', 'di_plus', 'di_minus',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     # function to get buy signals
     def get_entry_training_signals(self, future_df: DataFrame):
@@ -364,14 +368,13 @@ class adx3_signals(base_signals):
 
 class aroon_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'aroonup', 'aroondown',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     # function to get buy signals
     def get_entry_training_signals(self, future_df: DataFrame):
@@ -432,14 +435,13 @@ class aroon_signals(base_signals):
 
 class bbw_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'bb_width',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     # function to get buy signals
     def get_entry_training_signals(self, future_df: DataFrame):
@@ -520,15 +522,14 @@ class bbw_signals(base_signals):
 
 class dwt_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'dwt_diff',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold',
             'recent_max'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         global lookahead
@@ -604,14 +605,13 @@ class dwt_signals(base_signals):
 
 class dwt2_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'full_dwt', 'fisher_wr',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         global lookahead
@@ -687,15 +687,15 @@ class dwt2_signals(base_signals):
 
 class fbb_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'mfi', 'fisher_wr', 'bb_gain',
             'profit_threshold', 'loss_threshold',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_gain', 'future_profit_min'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -761,14 +761,13 @@ class fbb_signals(base_signals):
 
 class fwr_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'fisher_wr',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -817,14 +816,14 @@ class fwr_signals(base_signals):
 
 class highlow_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'dwt_at_low', 'dwt_at_high', 'fisher_wr',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'full_dwt', 'future_min', 'future_max'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -875,14 +874,14 @@ class highlow_signals(base_signals):
 
 class jump_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'dwt_delta_min', 'dwt_delta_max',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_profit_mean', 'future_profit_std', 'future_loss_mean', 'future_loss_std'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -947,14 +946,13 @@ class jump_signals(base_signals):
 
 class macd_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'macdhist',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -1005,14 +1003,13 @@ class macd_signals(base_signals):
 
 class macd2_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'macdhist',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         # detect valleys
@@ -1074,14 +1071,13 @@ class macd2_signals(base_signals):
 
 class macd3_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'macdhist', 'mfi',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         # MACD is related to price, so need to figure out scale
@@ -1149,14 +1145,13 @@ class macd3_signals(base_signals):
 
 class mfi_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'mfi',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -1205,14 +1200,14 @@ class mfi_signals(base_signals):
 
 class minmax_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'full_dwt', 'dwt_recent_min', 'dwt_recent_max', 'fisher_wr',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_min', 'future_max'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -1271,15 +1266,15 @@ class minmax_signals(base_signals):
 
 class nseq_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'dwt_nseq_dn', 'dwt_nseq_up',
             'full_dwt_nseq_dn', 'full_dwt_nseq_up',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_nseq_up', 'future_nseq_dn'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -1345,14 +1340,13 @@ class nseq_signals(base_signals):
 
 class over_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'rsi', 'mfi', 'fisher_wr',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -1409,14 +1403,14 @@ class profit_signals(base_signals):
     n_profit_stddevs = 2.0
     n_loss_stddevs = 2.0
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'fisher_wr',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_gain'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -1467,15 +1461,15 @@ class profit_signals(base_signals):
 
 class pv_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'full_dwt',
             'recent_min', 'recent_max',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_gain'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         global lookahead
@@ -1540,14 +1534,14 @@ class pv_signals(base_signals):
 
 class slope_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'dwt_slope', 'fisher_wr', 'future_slope',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_gain'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         global lookahead
@@ -1615,14 +1609,13 @@ class slope_signals(base_signals):
 
 class smooth_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'mid', 'fisher_wr',
             'future_loss_min', 'future_loss_threshold',
             'future_profit_max', 'future_profit_threshold'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         global lookahead
@@ -1702,14 +1695,14 @@ class smooth_signals(base_signals):
 
 class stochastic_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'fast_diff',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_gain'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         global lookahead
@@ -1763,15 +1756,15 @@ class stochastic_signals(base_signals):
 
 class swing_signals(base_signals):
 
-    def check_indicators(self, dataframe) -> bool:
-        # check that needed indicators are present
-        ind_list = [
+    def get_indicator_list(self):
+        # indicators needed by this signal type
+        return [
             'dwt_bottom', 'dwt_top',
             'recent_min', 'recent_max',
             'future_loss_min', 'future_loss_threshold',
-            'future_profit_max', 'future_profit_threshold'
+            'future_profit_max', 'future_profit_threshold',
+            'future_profit', 'future_loss'
         ]
-        return self.indicators_present(ind_list, dataframe)
 
     def get_entry_training_signals(self, future_df: DataFrame):
         signals = np.where(
@@ -218,7 +218,7 @@ def smi_momentum(df: DataFrame, k_length=9, d_length=3):
     return df
 
 
-def exhaustion_bars(dataframe, maj_qual=6, maj_len=12, min_qual=6, min_len=12, core_length=4):
+def exhaustion_bars(dataframe, maj_qual=6, maj_len=12, min_qual=6, min_len=12, core_length=4, start=0, state=None):
     """
     Leledc Exhaustion Bars - Extended
     Infamous S/R Reversal Indicator
@@ -234,13 +234,20 @@ def exhaustion_bars(dataframe, maj_qual=6, maj_len=12, min_qual=6, min_len=12, c
 
     Original (MT4) https://www.abundancetradinggroup.com/leledc-exhaustion-bar-mt4-indicator/
 
+    The counters carry over from one candle to the next indefinitely. To continue a previous calculation, pass the
+    state (dict) it returned and the row to resume at (start). Rows before start are not calculated.
+    If state is supplied, it is updated with the counters after the last row
+
     :return: DataFrame with columns populated
     """
 
     bindex_maj, sindex_maj, trend_maj = 0, 0, 0
     bindex_min, sindex_min = 0, 0
+    if state:
+        bindex_maj, sindex_maj, trend_maj = state['bindex_maj'], state['sindex_maj'], state['trend_maj']
+        bindex_min, sindex_min = state['bindex_min'], state['sindex_min']
 
-    for i in range(len(dataframe)):
+    for i in range(start, len(dataframe)):
         close = dataframe['close'][i]
 
         if i < 1 or i - core_length < 0:
@@ -279,6 +286,10 @@ def exhaustion_bars(dataframe, maj_qual=6, maj_len=12, min_qual=6, min_len=12, c
         else:
             dataframe.loc[i, 'leledc_minor'] = 0
 
+    if state is not None:
+        state.update({'bindex_maj': bindex_maj, 'sindex_maj': sindex_maj, 'trend_maj': trend_maj,
+                      'bindex_min': bindex_min, 'sindex_min': sindex_min})
+
     return dataframe
 
 
@@ -0,0 +1,356 @@
+# Batched ("windowed") versions of the signal models used by the DWT, FFT and Kalman strategies
+#
+# The strategies originally calculated their model column with:
+#       informative['close'].rolling(window).apply(self.model)
+# which standardises, models and re-trends each window in python, one window at a time.
+# Here, all of the windows are stacked into a 2D array (a strided view, so no copying), normalised in one step, and
+# the transform is run across the whole batch. Only the last sample of each window is kept (same as model())
+#
+# Usage:
+#   import windowed_models as wm
+#   informative['dwt_model'] = wm.rolling_model(informative['close'], self.dwt_window, wm.dwt_model)
+#
+# The model functions all take a 2D array of normalised windows (one window per row) and return the
+# (normalised) model value of the last sample in each window
+
+import numpy as np
+import pywt
+import scipy.fft
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# max number of windows processed at once (limits memory usage on long dataframes)
+batch_size = 8192
+
+
+# returns a read-only 2D view of all (full) windows in col, shape: [nrows-window+1, window]
+def get_windows(col, window: int) -> np.ndarray:
+    data = np.asarray(col, dtype=float)
+    return sliding_window_view(data, window)
+
+
+# standardise each window (row). Returns the scaled data, plus the mean & stddev needed to re-trend the results
+def normalise(windows, fill_nan=False):
+    w_mean = windows.mean(axis=1, keepdims=True)
+    w_std = windows.std(axis=1, keepdims=True)
+    scaled = (windows - w_mean) / w_std
+    if fill_nan:
+        scaled = np.where(np.isnan(scaled), 0.0, scaled)
+    return scaled, w_mean[:, 0], w_std[:, 0]
+
+
+# equivalent of col.rolling(window).apply(model), where model de-trends the window, applies model_func and re-trends.
+# The first (window-1) entries are NaN, as are windows that contain NaNs.
+# Set fill_nan=True to replace NaNs in the normalised data with 0 (i.e. scaled.fillna(0)) before modelling
+# Set retrend=False to return the normalised model values, or scale=False to model the raw (unscaled) data
+def rolling_model(col, window: int, model_func, fill_nan=False, retrend=True, scale=True) -> np.ndarray:
+
+    data = np.asarray(col, dtype=float)
+    nrows = len(data)
+    result = np.full(nrows, np.nan)
+
+    if nrows < window:
+        return result
+
+    windows = get_windows(data, window)
+    nwin = np.shape(windows)[0]
+    model = np.empty(nwin, dtype=float)
+
+    for start in range(0, nwin, batch_size):
+        end = min(start + batch_size, nwin)
+        if not scale:
+            model[start:end] = model_func(windows[start:end])
+        else:
+            scaled, w_mean, w_std = normalise(windows[start:end], fill_nan=fill_nan)
+            if retrend:
+                model[start:end] = (model_func(scaled) * w_std) + w_mean
+            else:
+                model[start:end] = model_func(scaled)
+
+    # rolling().apply() does not evaluate windows containing NaNs
+    model[np.isnan(windows).any(axis=1)] = np.nan
+
+    result[window - 1:] = model
+    return result
+
+
+# Streaming wrapper around rolling_model(), intended for live/dry runs where the dataframe only changes by a candle
+# or so between calls. Results from the previous call are kept, and only the windows ending on new candles are
+# modelled. Create one per pair.
+class StreamingModel():
+
+    window = 128
+    model_func = None
+    fill_nan = False
+
+    last_date = None
+    last_result = None
+
+    def __init__(self, window: int, model_func, fill_nan=False):
+        super().__init__()
+        self.window = window
+        self.model_func = model_func
+        self.fill_nan = fill_nan
+        self.last_date = None
+        self.last_result = None
+
+    # dates must be the (sorted) candle dates corresponding to col
+    def update(self, dates, col) -> np.ndarray:
+
+        dates = np.asarray(dates)
+        data = np.asarray(col, dtype=float)
+        nrows = len(data)
+
+        num_old = 0
+        if self.last_date is not None:
+            idx = np.searchsorted(dates, self.last_date)
+            if (idx < nrows) and (dates[idx] == self.last_date) and (len(self.last_result) > idx):
+                num_old = idx + 1
+
+        if num_old == 0:
+            result = rolling_model(data, self.window, self.model_func, fill_nan=self.fill_nan)
+        else:
+            result = np.full(nrows, np.nan)
+            result[:num_old] = self.last_result[len(self.last_result) - num_old:]
+            num_new = nrows - num_old
+            if num_new > 0:
+                start = max(0, num_old - self.window + 1)
+                tail = rolling_model(data[start:], self.window, self.model_func, fill_nan=self.fill_nan)
+                result[num_old:] = tail[len(tail) - num_new:]
+
+        self.last_date = dates[-1] if nrows > 0 else None
+        self.last_result = result
+
+        return result
+
+
+###################################
+# Model functions
+
+# Wavelet (DWT) denoising, using a hard threshold on the detail coefficients
+def dwt_model(data, wavelet='haar', level=1, wmode='smooth') -> np.ndarray:
+
+    length = np.shape(data)[1]
+
+    coeff = pywt.wavedec(data, wavelet, mode=wmode, axis=1)
+
+    # remove higher harmonics (threshold is calculated per window)
+    detail = coeff[-level]
+    madev = np.mean(np.absolute(detail - np.mean(detail, axis=1, keepdims=True)), axis=1, keepdims=True)
+    sigma = (1 / 0.6745) * madev
+    uthresh = sigma * np.sqrt(2 * np.log(length))
+    coeff[1:] = (np.where(np.absolute(c) < uthresh, 0.0, c) for c in coeff[1:])
+
+    # inverse transform
+    model = pywt.waverec(coeff, wavelet, mode=wmode, axis=1)
+
+    # Note: waverec can return an extra element for odd lengths. The original model() returned the last element
+    # of the full result, so do the same here
+    return model[:, -1]
+
+
+# FFT denoising - remove frequencies with low power spectrum density
+# For real data, the spectrum is symmetric, so only the non-negative frequencies are needed (rfft), and since only the
+# last sample of each window is kept, the inverse transform is just a dot product with a (cached) twiddle vector
+def fft_model(data, threshold=20) -> np.ndarray:
+
+    n = np.shape(data)[1]
+
+    fft = scipy.fft.rfft(data, n, axis=1, workers=-1)
+
+    # power spectrum density (squared magnitude of each fft coefficient)
+    psd = (fft.real * fft.real + fft.imag * fft.imag) / n
+    fft = np.where(psd < threshold, 0, fft)
+
+    # inverse fourier transform (last sample only)
+    return last_sample(fft, n)
+
+
+# FFT low pass filter: remove the linear trend, zero out frequencies beyond cutoff (a fraction of the spectrum),
+# then restore the trend. Equivalent to the fourierModel() used by FBB_FFT (last sample only)
+def fft_lowpass_model(data, cutoff=0.2) -> np.ndarray:
+
+    n = np.shape(data)[1]
+    t = np.arange(n, dtype=float)
+
+    # slope of the linear (least squares) trend of each window
+    t_mean = t.mean()
+    slope = ((data - data.mean(axis=1, keepdims=True)) @ (t - t_mean)) / np.sum((t - t_mean) ** 2)
+    notrend = data - slope[:, np.newaxis] * t
+
+    fft = scipy.fft.rfft(notrend, axis=1, workers=-1)
+
+    # zero out frequencies beyond 'cutoff'
+    index = int(np.shape(fft)[1] * cutoff)
+    fft[:, (index - 1):] = 0
+
+    return last_sample(fft, n) + slope * t[-1]
+
+
+# twiddle vectors for last_sample(), keyed by length
+twiddle_cache = {}
+
+
+# returns the last sample of the inverse rfft (length n) of each row of fft, i.e. irfft(fft, n)[:, -1]
+def last_sample(fft, n: int) -> np.ndarray:
+    if n not in twiddle_cache:
+        k = np.arange(n // 2 + 1)
+        # x[n-1] = (1/n) * sum(X[k] * exp(2j*pi*k*(n-1)/n)), with the negative frequencies folded into the positive ones
+        scale = np.full(len(k), 2.0 / n)
+        scale[0] = 1.0 / n
+        if n % 2 == 0:
+            scale[-1] = 1.0 / n
+        twiddle_cache[n] = scale * np.exp(2j * np.pi * k * (n - 1) / n)
+    return (fft @ twiddle_cache[n][:np.shape(fft)[1]]).real
+
+
+# Kalman smoother. kfilter must be a simdkalman.KalmanFilter, which natively processes multiple series at once
+def simd_kalman_model(data, kfilter) -> np.ndarray:
+    smoothed = kfilter.smooth(data)
+    return smoothed.observations.mean[:, -1]
+
+
+# Kalman smoother. kfilter is a pykalman.KalmanFilter (1D state), which is converted into a LocalLevelKalman.
+# Equivalent to kfilter.smooth(window)[0][-1] for each window
+def kalman_model(data, kfilter) -> np.ndarray:
+    return LocalLevelKalman.from_pykalman(kfilter).model_last(data)
+
+
+###################################
+
+# Vectorised 1D Kalman filter/RTS smoother (for a local level model), processing all windows (rows) at once.
+# This replaces per-window calls to pykalman's KalmanFilter.smooth(), which does its matrix algebra in python.
+#
+# For a linear model with fixed parameters, the covariances and gains do not depend on the data, so they are
+# calculated once (per window length) and then applied to all windows with numpy.
+# Also, the last sample of the RTS smoother is the same as the last sample of the filter, and that is a fixed
+# linear combination of the observations, so model_last() is just a dot product with a (cached) weight vector.
+class LocalLevelKalman():
+
+    transition_matrix = 1.0
+    observation_matrix = 1.0
+    transition_offset = 0.0
+    observation_offset = 0.0
+    transition_covariance = 0.1
+    observation_covariance = 0.1
+    initial_state_mean = 0.0
+    initial_state_covariance = 1.0
+
+    weights_cache = {}
+
+    def __init__(self, transition_covariance=0.1, observation_covariance=0.1,
+                 initial_state_mean=0.0, initial_state_covariance=1.0,
+                 transition_matrix=1.0, observation_matrix=1.0,
+                 transition_offset=0.0, observation_offset=0.0):
+        super().__init__()
+        self.transition_matrix = float(transition_matrix)
+        self.observation_matrix = float(observation_matrix)
+        self.transition_offset = float(transition_offset)
+        self.observation_offset = float(observation_offset)
+        self.transition_covariance = float(transition_covariance)
+        self.observation_covariance = float(observation_covariance)
+        self.initial_state_mean = float(initial_state_mean)
+        self.initial_state_covariance = float(initial_state_covariance)
+        self.weights_cache = {}
+
+    # create from the (current) parameters of a pykalman KalmanFilter. Filters are cached on the parameter values,
+    # so calling this for every batch is cheap (and picks up changes made by em())
+    @classmethod
+    def from_pykalman(cls, kfilter):
+        params = tuple(float(np.squeeze(p)) for p in (
+            kfilter.transition_covariance, kfilter.observation_covariance,
+            kfilter.initial_state_mean, kfilter.initial_state_covariance,
+            kfilter.transition_matrices, kfilter.observation_matrices,
+            0.0 if kfilter.transition_offsets is None else kfilter.transition_offsets,
+            0.0 if kfilter.observation_offsets is None else kfilter.observation_offsets
+        ))
+        if params not in filter_cache:
+            filter_cache[params] = cls(*params)
+        return filter_cache[params]
+
+    # data-independent part of the filter: predicted & filtered covariances, and the Kalman gains
+    def get_gains(self, n: int):
+        a = self.transition_matrix
+        c = self.observation_matrix
+
+        pred_cov = np.empty(n, dtype=float)
+        filt_cov = np.empty(n, dtype=float)
+        gain = np.empty(n, dtype=float)
+
+        p = self.initial_state_covariance
+        for t in range(n):
+            if t > 0:
+                p = a * a * filt_cov[t - 1] + self.transition_covariance
+            pred_cov[t] = p
+            gain[t] = p * c / (c * c * p + self.observation_covariance)
+            filt_cov[t] = p - gain[t] * c * p
+
+        return pred_cov, filt_cov, gain
+
+    # run the filter over each row of data. Returns predicted means, filtered means and their covariances
+    def filter(self, data):
+        data = np.atleast_2d(np.asarray(data, dtype=float))
+        nrows, n = np.shape(data)
+        a = self.transition_matrix
+        c = self.observation_matrix
+
+        pred_cov, filt_cov, gain = self.get_gains(n)
+
+        pred_mean = np.empty((nrows, n), dtype=float)
+        filt_mean = np.empty((nrows, n), dtype=float)
+
+        m = np.full(nrows, self.initial_state_mean)
+        for t in range(n):
+            if t > 0:
+                m = a * filt_mean[:, t - 1] + self.transition_offset
+            pred_mean[:, t] = m
+            filt_mean[:, t] = m + gain[t] * (data[:, t] - c * m - self.observation_offset)
+
+        return pred_mean, filt_mean, pred_cov, filt_cov
+
+    # RTS smoother over each row of data. Returns the smoothed state means and covariances
+    def smooth(self, data):
+        pred_mean, filt_mean, pred_cov, filt_cov = self.filter(data)
+        n = np.shape(filt_mean)[1]
+        a = self.transition_matrix
+
+        smooth_mean = filt_mean.copy()
+        smooth_cov = filt_cov.copy()
+        for t in reversed(range(n - 1)):
+            j = filt_cov[t] * a / pred_cov[t + 1]
+            smooth_mean[:, t] = filt_mean[:, t] + j * (smooth_mean[:, t + 1] - pred_mean[:, t + 1])
+            smooth_cov[t] = filt_cov[t] + j * (smooth_cov[t + 1] - pred_cov[t + 1]) * j
+
+        return smooth_mean, smooth_cov
+
+    # the final filtered (=smoothed) mean is w.y + c, where w and c only depend on the parameters & length
+    def get_weights(self, n: int):
+        if n not in self.weights_cache:
+            a = self.transition_matrix
+            c = self.observation_matrix
+            _, _, gain = self.get_gains(n)
+
+            w = np.zeros(n, dtype=float)
+            const = self.initial_state_mean
+            for t in range(n):
+                if t > 0:
+                    w = a * w
+                    const = a * const + self.transition_offset
+                w = (1.0 - gain[t] * c) * w
+                w[t] += gain[t]
+                const = (1.0 - gain[t] * c) * const - gain[t] * self.observation_offset
+
+            self.weights_cache[n] = (w, const)
+
+        return self.weights_cache[n]
+
+    # returns the last smoothed sample for each row of data
+    def model_last(self, data) -> np.ndarray:
+        data = np.atleast_2d(np.asarray(data, dtype=float))
+        w, const = self.get_weights(np.shape(data)[1])
+        return data @ w + const
+
+
+# LocalLevelKalman instances, keyed by parameters
+filter_cache = {}
@@ -29,6 +29,7 @@ import re
 
 
 import custom_indicators as cta
+from informative_cache import InformativeCache
 
 import pywt
 
@@ -139,6 +140,7 @@ class DWT_Leveraged_recent(IStrategy):
 
     # Strategy Specific Variable Storage
     dwt_window = startup_candle_count
+    informative_cache = InformativeCache()  # populated informative dataframes of the underlying pairs
     custom_trade_info = {}
     custom_fiat = "USDT"  # Only relevant if stake is BTC or ETH
 
@@ -183,14 +185,11 @@ class DWT_Leveraged_recent(IStrategy):
             inf_slow = self.dp.get_pair_dataframe(pair=inf_pair, timeframe=self.inf_timeframe)
             inf_fast = self.dp.get_pair_dataframe(pair=inf_pair, timeframe=self.timeframe)
 
-            # DWT
-
-            inf_slow['dwt_model'] = inf_slow['close'].rolling(window=self.dwt_window).apply(self.model)
-
-            # trend (in informative)
-            inf_fast['candle-up'] = np.where(inf_fast['close'] >= inf_fast['open'], 1, 0)
-            inf_fast['candle-up-trend'] = np.where(inf_fast['candle-up'].rolling(5).sum() >= 3, 1, 0)
-            inf_fast['candle-dn-trend'] = np.where(inf_fast['candle-up'].rolling(5).sum() <= 2, 1, 0)
+            # indicators are calculated from the underlying pair, so are the same for the BULL and BEAR tokens
+            inf_slow = self.informative_cache.get_dataframe(inf_pair, self.inf_timeframe, inf_slow,
+                                                            self.populate_slow_informative)
+            inf_fast = self.informative_cache.get_dataframe(inf_pair, self.timeframe, inf_fast,
+                                                            self.populate_fast_informative)
 
             # merge into normal timeframe
             dataframe = merge_informative_pair(dataframe, inf_slow, self.timeframe, self.inf_timeframe, ffill=True)
@@ -265,6 +264,26 @@ class DWT_Leveraged_recent(IStrategy):
 
     ###################################
 
+    # indicators for the underlying pair (informative timeframe)
+    def populate_slow_informative(self, inf_slow: DataFrame) -> DataFrame:
+
+        # DWT
+        inf_slow['dwt_model'] = inf_slow['close'].rolling(window=self.dwt_window).apply(self.model)
+
+        return inf_slow
+
+    # indicators for the underlying pair (strategy timeframe)
+    def populate_fast_informative(self, inf_fast: DataFrame) -> DataFrame:
+
+        # trend (in informative)
+        inf_fast['candle-up'] = np.where(inf_fast['close'] >= inf_fast['open'], 1, 0)
+        inf_fast['candle-up-trend'] = np.where(inf_fast['candle-up'].rolling(5).sum() >= 3, 1, 0)
+        inf_fast['candle-dn-trend'] = np.where(inf_fast['candle-up'].rolling(5).sum() <= 2, 1, 0)
+
+        return inf_fast
+
+    ###################################
+
     def madev(self, d, axis=None):
         """ Mean absolute deviation of a signal """
         return np.mean(np.absolute(d - np.mean(d, axis)), axis)
@@ -33,6 +33,7 @@ log = logging.getLogger(__name__)
 warnings.simplefilter(action='ignore', category=pd.errors.PerformanceWarning)
 
 import custom_indicators as cta
+import windowed_models as wm
 
 import pywt
 
@@ -161,7 +162,8 @@ class FBB_FFT(IStrategy):
 
         # informative['fft_lookahead'] = informative['close'].rolling(window=self.fft_window).apply(self.predict)
 
-        informative['fft_dev'] = informative['close'].rolling(window=self.fft_window).apply(self.scaledModel)
+        informative['fft_dev'] = wm.rolling_model(informative['close'], self.fft_window, wm.fft_model,
+                                                fill_nan=True, retrend=False)  # same as scaledModel()
         informative['fft_dev'].fillna(0, inplace=True) # missing data can cause issue with ta functions
         informative['fft_slope'] = ta.LINEARREG_SLOPE(informative['fft_dev'], timeperiod=3)
 
@@ -33,6 +33,7 @@ log = logging.getLogger(__name__)
 warnings.simplefilter(action='ignore', category=pd.errors.PerformanceWarning)
 
 import custom_indicators as cta
+import windowed_models as wm
 
 from  pykalman import KalmanFilter
 
@@ -86,6 +87,7 @@ class Kalman(IStrategy):
     kf_window = startup_candle_count
     filter_list = {}
     filter_init_list = {}
+    stream_list = {}
 
     kalman_filter = KalmanFilter(
                 transition_matrices=1.0,
@@ -182,11 +184,14 @@ class Kalman(IStrategy):
             )
             self.filter_init_list[curr_pair] = False
 
+            # keeps results between calls, so that live runs only need to model new candles
+            self.stream_list[curr_pair] = wm.StreamingModel(self.kf_window, self.batchModel, fill_nan=True)
+
 
         # set current filter (can't pass parameter to apply())
         self.kalman_filter = self.filter_list[curr_pair]
 
-        informative['kf_predict'] = informative['close'].rolling(window=self.kf_window).apply(self.model)
+        informative['kf_predict'] = self.stream_list[curr_pair].update(informative['date'], informative['close'])
 
         # merge into normal timeframe
         dataframe = merge_informative_pair(dataframe, informative, self.timeframe, self.inf_timeframe, ffill=True)
@@ -228,6 +233,17 @@ class Kalman(IStrategy):
 
     ###################################
 
+    # batched version of model(). data is a 2D array of normalised windows, returns the last sample of each
+    def batchModel(self, data: np.ndarray) -> np.ndarray:
+
+        # init filter if needed (em() updates the filter in place)
+        if not self.filter_init_list[self.current_pair]:
+            self.filter_init_list[self.current_pair] = True
+            self.filter_list[self.current_pair] = self.filter_list[self.current_pair].em(data[0], n_iter=6)
+
+        # closed form equivalent of kalmanModel()
+        return wm.kalman_model(data, self.kalman_filter)
+
     def model(self, a: np.ndarray) -> np.float:
 
         # scale the data
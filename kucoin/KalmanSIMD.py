@@ -33,6 +33,7 @@ log = logging.getLogger(__name__)
 warnings.simplefilter(action='ignore', category=pd.errors.PerformanceWarning)
 
 import custom_indicators as cta
+import windowed_models as wm
 
 from  simdkalman import KalmanFilter
 
@@ -183,7 +184,8 @@ class KalmanSIMD(IStrategy):
         # set current filter (can't pass parameter to apply())
         self.kalman_filter = self.filter_list[curr_pair]
 
-        informative['kf_model'] = informative['close'].rolling(window=self.kf_window).apply(self.model)
+        informative['kf_model'] = wm.rolling_model(informative['close'], self.kf_window, self.batchModel,
+                                                   fill_nan=True)
         # informative['kf_predict'] = informative['kf_model'].rolling(window=self.kf_window).apply(self.predict)
 
         # merge into normal timeframe
@@ -227,6 +229,16 @@ class KalmanSIMD(IStrategy):
 
     ###################################
 
+    # batched version of model(). data is a 2D array of normalised windows, returns the last sample of each
+    def batchModel(self, data: np.ndarray) -> np.ndarray:
+
+        # init filter if needed
+        if not self.filter_init_list[self.current_pair]:
+            self.filter_init_list[self.current_pair] = True
+            self.filter_list[self.current_pair] = self.filter_list[self.current_pair].em(data[0], n_iter=6)
+
+        return wm.simd_kalman_model(data, self.kalman_filter)
+
     def model(self, a: np.ndarray) -> np.float:
 
         # scale the data
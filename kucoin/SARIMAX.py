@@ -36,6 +36,9 @@ import custom_indicators as cta
 
 import statsmodels.api as sm
 
+import windowed_models as wm
+import sarimax_models as smm
+
 
 """
 ####################################################################################
@@ -83,8 +86,12 @@ class SARIMAX(IStrategy):
     # Strategy Specific Variable Storage
 
     smax_window = startup_candle_count
+    smax_engine = 'ar2'  # 'ar2': least squares AR(2) (fast, batched), 'sarimax': statsmodels fit (warm-started)
+    smax_workers = 0  # processes used by the 'sarimax' engine (backtests)
+    smax_refit_interval = 12  # 'sarimax' engine, live: re-fit after this many candles (extend the last fit otherwise)
     filter_list = {}
     filter_init_list = {}
+    stream_list = {}
     current_pair = ""
 
 
@@ -153,7 +160,16 @@ class SARIMAX(IStrategy):
         if not curr_pair in self.filter_list:
             self.filter_init_list[curr_pair] = False
 
-        informative['smax_predict'] = informative['close'].rolling(window=self.smax_window).apply(self.model)
+        # keeps results between calls, so that live runs only need to model new candles
+        if not curr_pair in self.stream_list:
+            if self.smax_engine == 'sarimax':
+                self.stream_list[curr_pair] = smm.SarimaxForecaster(self.smax_window, order=(2, 0, 0),
+                                                                    num_workers=self.smax_workers,
+                                                                    refit_interval=self.smax_refit_interval)
+            else:
+                self.stream_list[curr_pair] = wm.StreamingModel(self.smax_window, smm.ar2_model, fill_nan=True)
+
+        informative['smax_predict'] = self.stream_list[curr_pair].update(informative['date'], informative['close'])
 
         # merge into normal timeframe
         dataframe = merge_informative_pair(dataframe, informative, self.timeframe, self.inf_timeframe, ffill=True)
@@ -0,0 +1,72 @@
+# Fast access to the last few rows (candles) of an analysed dataframe
+#
+# custom_exit(), custom_stoploss() etc. are called for every open trade, often several times per candle, and they
+# usually start with something like:
+#     dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+#     last_candle = dataframe.iloc[-1].squeeze()
+# Building a Series from a row of a wide dataframe (hundreds of columns of mixed types) takes a few hundred
+# microseconds, and each lookup in the Series is also slow. CandleCache takes a snapshot of the last rows once per pair
+# and candle, and the callbacks then just get the saved rows.
+#
+# Rows are dicts (column -> value), so they can be used in the same way as the Series (row['close'], 'buy' in row).
+# Values have the same types as the ones returned by iloc (numpy scalars, Timestamps etc.)
+#
+# A snapshot is reused until the dataframe changes, which is detected using the last_updated time returned by
+# get_analyzed_dataframe(), the length of the dataframe and the index of the last row.
+#
+# Usage:
+#   dataframe, last_updated = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
+#   last_candle = self.candle_cache.get_row(pair, dataframe, last_updated)
+#   last_candle, previous_candle = self.candle_cache.get_rows(pair, dataframe, last_updated, 2)
+
+import numpy as np
+from pandas import DataFrame
+
+
+class CandleCache():
+
+    num_rows = 1  # minimum number of rows saved in each snapshot
+    snapshots = {}  # pair -> snapshot
+
+    def __init__(self, num_rows=1):
+        super().__init__()
+        self.num_rows = num_rows
+        self.snapshots = {}
+
+    # returns the last row of the dataframe
+    def get_row(self, pair: str, dataframe: DataFrame, last_updated) -> dict:
+        return self.get_rows(pair, dataframe, last_updated, 1)[0]
+
+    # returns the last num_rows rows of the dataframe, last row first (fewer if the dataframe is shorter)
+    def get_rows(self, pair: str, dataframe: DataFrame, last_updated, num_rows=1) -> list:
+        key = (last_updated, len(dataframe), dataframe.index[-1] if len(dataframe) > 0 else None)
+        snapshot = self.snapshots.get(pair)
+        if (snapshot is None) or (snapshot['key'] != key) or (snapshot['num_rows'] < num_rows):
+            snapshot = self.take_snapshot(dataframe, key, max(num_rows, self.num_rows), snapshot)
+            self.snapshots[pair] = snapshot
+        return snapshot['rows'][:num_rows]
+
+    def take_snapshot(self, dataframe: DataFrame, key, num_rows: int, previous=None) -> dict:
+        tail = dataframe.iloc[-num_rows:]
+
+        # column names and types only change when the dataframe is analysed again
+        if (previous is not None) and (previous['key'][0] == key[0]):
+            columns, types = previous['columns'], previous['types']
+        else:
+            columns = tail.columns.tolist()
+            types = [dtype.type if (isinstance(dtype, np.dtype) and (dtype.kind in 'biuf')) else None
+                     for dtype in tail.dtypes]
+
+        # convert all of the columns in one step (much faster than column by column), then restore the numpy types of
+        # numeric values, so that they are the same as the ones returned by iloc (numpy scalars for numeric columns,
+        # objects such as Timestamps for anything else)
+        values = tail.to_numpy(dtype=object)
+        rows = []
+        for i in range(len(tail) - 1, -1, -1):
+            rows.append({col: (value if value_type is None else value_type(value))
+                         for col, value_type, value in zip(columns, types, values[i])})
+
+        return {'key': key, 'num_rows': num_rows, 'rows': rows, 'columns': columns, 'types': types}
+
+    def clear(self):
+        self.snapshots = {}
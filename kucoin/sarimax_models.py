@@ -0,0 +1,222 @@
+# Rolling SARIMAX forecasts for the SARIMAX strategy
+#
+# The strategy originally calculated its forecast with:
+#       informative['close'].rolling(window).apply(self.model)
+# where model() builds and fits a new statsmodels SARIMAX model (a full MLE optimisation) for every window, which is
+# far too slow for backtesting more than a few days.
+#
+# Two engines are provided:
+#   - ar2_model(): for the default order (2, 0, 0), a closed-form least squares fit of an AR(2) model, run across a
+#     whole batch of windows with numpy. Use with windowed_models.rolling_model() or StreamingModel
+#   - SarimaxForecaster: statsmodels fits (any order). Each fit is warm-started from the parameters of the previous
+#     window, and windows can be spread across a process pool. In live runs, update() only models new candles: the
+#     last fit is extended with the new observations (one filter step per candle), and the model is only re-fitted
+#     every refit_interval candles
+#
+# Windows are standardised before fitting and forecasts are re-trended, in the same way as the windowed_models
+#
+# Usage:
+#   import sarimax_models as smm
+#   informative['smax_predict'] = wm.rolling_model(informative['close'], window, smm.ar2_model, fill_nan=True)
+# or:
+#   forecaster = smm.SarimaxForecaster(window)  # one per pair
+#   informative['smax_predict'] = forecaster.update(informative['date'], informative['close'])
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import statsmodels.api as sm
+
+import windowed_models as wm
+
+
+# returns the (steps ahead) forecast of an AR(2) model fitted by least squares to each row of data (normalised
+# windows). Rows that cannot be fitted (e.g. constant data) forecast 0, i.e. the window mean
+def ar2_model(data, steps=2) -> np.ndarray:
+
+    data = np.atleast_2d(np.asarray(data, dtype=float))
+
+    y = data[:, 2:]
+    x1 = data[:, 1:-1]
+    x2 = data[:, :-2]
+
+    # normal equations for y[t] = phi1 * y[t-1] + phi2 * y[t-2]
+    s11 = np.sum(x1 * x1, axis=1)
+    s12 = np.sum(x1 * x2, axis=1)
+    s22 = np.sum(x2 * x2, axis=1)
+    b1 = np.sum(x1 * y, axis=1)
+    b2 = np.sum(x2 * y, axis=1)
+
+    det = s11 * s22 - s12 * s12
+    valid = np.abs(det) > 1e-12
+    det = np.where(valid, det, 1.0)
+    phi1 = np.where(valid, (s22 * b1 - s12 * b2) / det, 0.0)
+    phi2 = np.where(valid, (s11 * b2 - s12 * b1) / det, 0.0)
+
+    # recursive forecast
+    prev2 = data[:, -2]
+    prev1 = data[:, -1]
+    for _ in range(steps):
+        prev1, prev2 = phi1 * prev1 + phi2 * prev2, prev1
+
+    return prev1
+
+
+# standardise a single window. Returns the scaled data, mean & stddev
+def normalise_window(window):
+    scaled, w_mean, w_std = wm.normalise(np.reshape(window, (1, -1)), fill_nan=True)
+    return scaled[0], w_mean[0], w_std[0]
+
+
+# fit a SARIMAX model to the (normalised) window, starting from start_params (if not None)
+def fit_window(scaled, order, start_params=None):
+    model = sm.tsa.SARIMAX(scaled, order=order, enforce_invertibility=False, enforce_stationarity=False)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result = model.fit(start_params=start_params, disp=False)
+    return result
+
+
+# fit each row of windows in turn, each one warm-started from the previous fit. Returns the (re-trended) forecasts
+# and the parameters of the last fit. This is a module level function so that it can run in a process pool
+def fit_windows(windows, order, steps, start_params=None):
+    forecasts = np.full(np.shape(windows)[0], np.nan)
+    params = start_params
+    for i in range(np.shape(windows)[0]):
+        if np.isnan(windows[i]).any():
+            continue
+        scaled, w_mean, w_std = normalise_window(windows[i])
+        try:
+            result = fit_window(scaled, order, params)
+        except Exception:
+            # bad starting point (or bad data), so try again from scratch
+            try:
+                result = fit_window(scaled, order)
+            except Exception:
+                continue
+        params = result.params
+        forecasts[i] = result.forecast(steps)[-1] * w_std + w_mean
+    return forecasts, params
+
+
+class SarimaxForecaster():
+
+    window = 32
+    order = (2, 0, 0)
+    steps = 2  # forecast this many candles ahead (the last one is returned)
+    num_workers = 0  # processes used for fitting. 0 or 1 fits in the current process
+    min_chunk_size = 64  # min number of windows given to each process (each chunk has to fit its first window cold)
+    refit_interval = 12  # live: re-fit the model after this many new candles (extend the last fit otherwise)
+
+    params = None  # parameters of the last fit (used to warm start the next one)
+    result = None  # last fitted results (live)
+    fit_mean = 0.0
+    fit_std = 1.0
+    num_extended = 0
+    last_date = None
+    last_result = None
+
+    def __init__(self, window: int, order=(2, 0, 0), steps=2, num_workers=0, refit_interval=12):
+        super().__init__()
+        self.window = window
+        self.order = order
+        self.steps = steps
+        self.num_workers = num_workers
+        self.refit_interval = refit_interval
+        self.params = None
+        self.result = None
+        self.num_extended = 0
+        self.last_date = None
+        self.last_result = None
+
+    # equivalent of col.rolling(window).apply(model). The first (window-1) entries are NaN
+    def rolling_forecast(self, col) -> np.ndarray:
+
+        data = np.asarray(col, dtype=float)
+        nrows = len(data)
+        result = np.full(nrows, np.nan)
+
+        if nrows < self.window:
+            return result
+
+        windows = wm.get_windows(data, self.window)
+        nwin = np.shape(windows)[0]
+
+        nchunks = 1
+        if self.num_workers > 1:
+            nchunks = max(1, min(self.num_workers, nwin // self.min_chunk_size))
+
+        if nchunks == 1:
+            forecasts, self.params = fit_windows(windows, self.order, self.steps, self.params)
+        else:
+            # contiguous chunks, so that each window is still warm-started from its neighbour
+            bounds = np.linspace(0, nwin, nchunks + 1).astype(int)
+            with ProcessPoolExecutor(max_workers=nchunks) as executor:
+                futures = [executor.submit(fit_windows, np.array(windows[bounds[i]:bounds[i + 1]]),
+                                           self.order, self.steps, self.params)
+                           for i in range(nchunks)]
+                chunks = [future.result() for future in futures]
+            forecasts = np.concatenate([chunk[0] for chunk in chunks])
+            self.params = chunks[-1][1]
+
+        result[self.window - 1:] = forecasts
+        return result
+
+    # fit the window ending at the last entry of data, and save the results so that they can be extended
+    def refit(self, data) -> float:
+        window = data[-self.window:]
+        if (len(window) < self.window) or np.isnan(window).any():
+            self.result = None
+            return np.nan
+
+        scaled, self.fit_mean, self.fit_std = normalise_window(window)
+        try:
+            self.result = fit_window(scaled, self.order, self.params)
+        except Exception:
+            self.result = fit_window(scaled, self.order)
+        self.params = self.result.params
+        self.num_extended = 0
+        return self.result.forecast(self.steps)[-1] * self.fit_std + self.fit_mean
+
+    # add a new observation to the last fit (one filter step, parameters and scaling are not changed)
+    def extend(self, value) -> float:
+        if np.isnan(value) or (self.fit_std == 0.0):
+            self.result = None
+            return np.nan
+
+        self.result = self.result.extend([(value - self.fit_mean) / self.fit_std])
+        self.num_extended += 1
+        return self.result.forecast(self.steps)[-1] * self.fit_std + self.fit_mean
+
+    # dates must be the (sorted) candle dates corresponding to col. Results from the previous call are kept, and only
+    # new candles are modelled (see StreamingModel in windowed_models)
+    def update(self, dates, col) -> np.ndarray:
+
+        dates = np.asarray(dates)
+        data = np.asarray(col, dtype=float)
+        nrows = len(data)
+
+        num_old = 0
+        if self.last_date is not None:
+            idx = np.searchsorted(dates, self.last_date)
+            if (idx < nrows) and (dates[idx] == self.last_date) and (len(self.last_result) > idx):
+                num_old = idx + 1
+
+        if num_old == 0:
+            result = self.rolling_forecast(data)
+            if nrows >= self.window:
+                self.refit(data)
+        else:
+            result = np.full(nrows, np.nan)
+            result[:num_old] = self.last_result[len(self.last_result) - num_old:]
+            for i in range(num_old, nrows):
+                if (self.result is None) or (self.num_extended >= self.refit_interval - 1):
+                    result[i] = self.refit(data[:i + 1])
+                else:
+                    result[i] = self.extend(data[i])
+
+        self.last_date = dates[-1] if nrows > 0 else None
+        self.last_result = result
+
+        return result
@@ -4,6 +4,7 @@ import pathlib
 import rapidjson
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 import numpy as np
+import pandas as pd
 import talib.abstract as ta
 from freqtrade.strategy.interface import IStrategy
 from freqtrade.strategy import merge_informative_pair, timeframe_to_minutes
@@ -17,6 +18,10 @@ from datetime import datetime, timedelta
 from technical.util import resample_to_interval, resampled_merge
 from technical.indicators import RMI, zema, VIDYA, ichimoku
 import time
+import ast
+import inspect
+import operator
+import textwrap
 
 log = logging.getLogger(__name__)
 #log.setLevel(logging.DEBUG)
@@ -139,6 +144,14 @@ class NostalgiaForInfinityX(IStrategy):
     # Exchange Downtime protection
     has_downtime_protection = False
 
+    # Evaluate the buy conditions with NumPy (see BuyConditionEngine), instead of pandas
+    use_buy_condition_engine = True
+
+    # Precompute the sell functions that only depend on the candle and the profit, in populate_exit_trend (see
+    # SellSignalProgram). custom_exit then only has to look up the result
+    precompute_sell_signals = True
+    precomputed_sell_functions = ['sell_over_main', 'sell_under_main', 'sell_r', 'sell_dec_main', 'sell_pump_main', 'sell_pivot']
+
     # Do you want to use the hold feature? (with hold-trades.json)
     holdSupportEnabled = True
 
@@ -147,11 +160,13 @@ class NostalgiaForInfinityX(IStrategy):
     coin_metrics['top_traded_enabled'] = False
     coin_metrics['top_traded_updated'] = False
     coin_metrics['top_traded_len'] = 10
-    coin_metrics['tt_dataframe'] = DataFrame()
+    coin_metrics['tt_ranking'] = {}
+    coin_metrics['tt_values'] = {}
     coin_metrics['top_grossing_enabled'] = False
     coin_metrics['top_grossing_updated'] = False
     coin_metrics['top_grossing_len'] = 20
-    coin_metrics['tg_dataframe'] = DataFrame()
+    coin_metrics['tg_ranking'] = {}
+    coin_metrics['tg_values'] = {}
     coin_metrics['current_whitelist'] = []
 
     # Run "populate_indicators()" only for new candle.
@@ -1914,6 +1929,11 @@ class NostalgiaForInfinityX(IStrategy):
 
     hold_trades_cache = None
     target_profit_cache = None
+    btc_info_cache = None
+    buy_condition_engine = None
+    sell_signal_programs = None
+    sell_signal_cache = None
+    candle_cache = None
     #############################################################
 
     def __init__(self, config: dict) -> None:
@@ -1926,6 +1946,15 @@ class NostalgiaForInfinityX(IStrategy):
         # If the cached data hasn't changed, it's a no-op
         self.target_profit_cache.save()
 
+        # BTC informative indicators, shared by all pairs (see get_btc_informative)
+        self.btc_info_cache = {}
+
+        # precomputed sell signals, per pair (see precompute_sells)
+        self.sell_signal_cache = {}
+
+        # last candles of each pair, for the callbacks (see CandleCache)
+        self.candle_cache = CandleCache(num_rows=6)
+
     def get_hold_trades_config_file(self):
         proper_holds_file_path = self.config["user_data_dir"].resolve() / "nfi-hold-trades.json"
         if proper_holds_file_path.is_file():
@@ -1977,51 +2006,10 @@ class NostalgiaForInfinityX(IStrategy):
         log.info("Updating top traded pairlist...")
         tik = time.perf_counter()
 
-        self.coin_metrics['tt_dataframe'] = DataFrame()
-
-        # Build traded volume dataframe
-        for coin_pair in self.coin_metrics['current_whitelist']:
-            coin = coin_pair.split('/')[0]
-
-            # Get the volume for the daily informative timeframe and name the column for the coin
-            pair_dataframe = self.dp.get_pair_dataframe(pair=coin_pair, timeframe=self.info_timeframe_1d)
-            pair_dataframe.set_index('date')
-
-            if self.config['runmode'].value in ('live', 'dry_run'):
-                pair_dataframe = pair_dataframe.iloc[-7:,:]
-
-            # Set the date index of the self.coin_metrics['tt_dataframe'] once
-            if not 'date' in self.coin_metrics['tt_dataframe']:
-                self.coin_metrics['tt_dataframe']['date'] = pair_dataframe['date']
-                self.coin_metrics['tt_dataframe'].set_index('date')
-
-            # Calculate daily traded volume
-            pair_dataframe[coin] = pair_dataframe['volume'] * qtpylib.typical_price(pair_dataframe)
-
-            # Drop the columns we don't need
-            pair_dataframe.drop(columns=['open', 'high', 'low', 'close', 'volume'], inplace=True)
-
-            # Merge it in on the date key
-            self.coin_metrics['tt_dataframe'] = self.coin_metrics['tt_dataframe'].merge(pair_dataframe, on='date', how='left')
-
-        # Forward fill empty cells (due to different df shapes)
-        self.coin_metrics['tt_dataframe'].fillna(0, inplace=True)
-
-        # Store and drop date column for value sorting
-        pair_dates = self.coin_metrics['tt_dataframe']['date']
-        self.coin_metrics['tt_dataframe'].drop(columns=['date'], inplace=True)
-
-        # Build columns and top traded coins
-        column_names = [f"Coin #{i}" for i in range(1, self.coin_metrics['top_traded_len'] + 1)]
-        self.coin_metrics['tt_dataframe'][column_names] = self.coin_metrics['tt_dataframe'].apply(lambda x: x.nlargest(self.coin_metrics['top_traded_len']).index.values, axis=1, result_type='expand')
-        self.coin_metrics['tt_dataframe'].drop(columns=[col for col in self.coin_metrics['tt_dataframe'] if col not in column_names], inplace=True)
-
-        # Re-add stored date column
-        self.coin_metrics['tt_dataframe'].insert(loc = 0, column = 'date', value = pair_dates)
-        self.coin_metrics['tt_dataframe'].set_index('date')
+        self.coin_metrics['tt_ranking'] = self.coin_ranking(self.coin_metrics['tt_values'], self.coin_traded_volume, self.coin_metrics['top_traded_len'])
         self.coin_metrics['top_traded_updated'] = True
         log.info("Updated top traded pairlist (tail-5):")
-        log.info(f"\n{self.coin_metrics['tt_dataframe'].tail(5)}")
+        log.info(f"\n{self.coin_ranking_tail(self.coin_metrics['tt_ranking'], self.coin_metrics['top_traded_len'])}")
 
         tok = time.perf_counter()
         log.info(f"Updating top traded pairlist took {tok - tik:0.4f} seconds...")
@@ -2030,57 +2018,123 @@ class NostalgiaForInfinityX(IStrategy):
         log.info("Updating top grossing pairlist...")
         tik = time.perf_counter()
 
-        self.coin_metrics['tg_dataframe'] = DataFrame()
-
-        # Build grossing volume dataframe
-        for coin_pair in self.coin_metrics['current_whitelist']:
-            coin = coin_pair.split('/')[0]
-
-            # Get the volume for the daily informative timeframe and name the column for the coin
-            pair_dataframe = self.dp.get_pair_dataframe(pair=coin_pair, timeframe=self.info_timeframe_1d)
-            pair_dataframe.set_index('date')
-
-            if self.config['runmode'].value in ('live', 'dry_run'):
-                pair_dataframe = pair_dataframe.iloc[-7:,:]
-
-            # Set the date index of the self.coin_metrics['tg_dataframe'] once
-            if not 'date' in self.coin_metrics['tg_dataframe']:
-                self.coin_metrics['tg_dataframe']['date'] = pair_dataframe['date']
-                self.coin_metrics['tg_dataframe'].set_index('date')
-
-            # Calculate daily grossing rate
-            pair_dataframe[coin] = pair_dataframe['close'].pct_change() * 100
-
-            # Drop the columns we don't need
-            pair_dataframe.drop(columns=['open', 'high', 'low', 'close', 'volume'], inplace=True)
-
-            # Merge it in on the date key
-            self.coin_metrics['tg_dataframe'] = self.coin_metrics['tg_dataframe'].merge(pair_dataframe, on='date', how='left')
-
-        # Forward fill empty cells (due to different df shapes)
-        self.coin_metrics['tg_dataframe'].fillna(0, inplace=True)
-
-        # Store and drop date column for value sorting
-        pair_dates = self.coin_metrics['tg_dataframe']['date']
-        self.coin_metrics['tg_dataframe'].drop(columns=['date'], inplace=True)
-
-        # Build columns and top grossing coins
-        column_names = [f"Coin #{i}" for i in range(1, self.coin_metrics['top_grossing_len'] + 1)]
-        self.coin_metrics['tg_dataframe'][column_names] = self.coin_metrics['tg_dataframe'].apply(lambda x: x.nlargest(self.coin_metrics['top_grossing_len']).index.values, axis=1, result_type='expand')
-        self.coin_metrics['tg_dataframe'].drop(columns=[col for col in self.coin_metrics['tg_dataframe'] if col not in column_names], inplace=True)
-
-        # Re-add stored date column
-        self.coin_metrics['tg_dataframe'].insert(loc = 0, column = 'date', value = pair_dates)
-        self.coin_metrics['tg_dataframe'].set_index('date')
+        self.coin_metrics['tg_ranking'] = self.coin_ranking(self.coin_metrics['tg_values'], self.coin_grossing_rate, self.coin_metrics['top_grossing_len'])
         self.coin_metrics['top_grossing_updated'] = True
         log.info("Updated top grossing pairlist (tail-5):")
-        log.info(f"\n{self.coin_metrics['tg_dataframe'].tail(5)}")
+        log.info(f"\n{self.coin_ranking_tail(self.coin_metrics['tg_ranking'], self.coin_metrics['top_grossing_len'])}")
 
         tok = time.perf_counter()
         log.info(f"Updating top grossing pairlist took {tok - tik:0.4f} seconds...")
 
-    def is_top_coin(self, coin_pair, row_data, top_length) -> bool:
-        return coin_pair.split('/')[0] in row_data.loc['Coin #1':f"Coin #{top_length}"].values
+    # Calculate daily traded volume
+    def coin_traded_volume(self, dataframe: DataFrame) -> np.ndarray:
+        return (dataframe['volume'] * qtpylib.typical_price(dataframe)).to_numpy(dtype=float)
+
+    # Calculate daily grossing rate
+    def coin_grossing_rate(self, dataframe: DataFrame) -> np.ndarray:
+        return (dataframe['close'].pct_change() * 100).to_numpy(dtype=float)
+
+    # Daily values of a coin metric (value_func) for a pair. The values are cached, and only the candles after the
+    # last cached one are calculated. value_func is given one extra (older) candle, since it may need it (pct_change)
+    def coin_metric_values(self, coin_pair: str, dataframe: DataFrame, values_cache: dict, value_func):
+        dates = dataframe['date'].to_numpy(dtype='datetime64[ns]')
+
+        start = 0
+        cached = values_cache.get(coin_pair)
+        if (cached is not None) and (len(cached[0]) > 0):
+            cached_dates, cached_values = cached
+            start = np.searchsorted(dates, cached_dates[-1], side='right')
+            found, positions = self.align_dates(cached_dates, dates[:start])
+            if not found.all():
+                start = 0
+
+        if start == 0:
+            values = value_func(dataframe)
+        else:
+            values = np.concatenate([cached_values[positions], value_func(dataframe.iloc[start - 1:])[1:]])
+
+        values_cache[coin_pair] = (dates, values)
+        return dates, values
+
+    # Rank the coins in the whitelist by a daily metric. Returns a dict with:
+    #   dates:  daily dates (from the first pair in the whitelist, i.e. BTC)
+    #   coins:  coin names (columns)
+    #   values: [dates, coins] matrix of metric values (0 where a coin has no data)
+    #   top:    [dates, coins] boolean matrix, True if the coin is in the top top_length coins for that date
+    def coin_ranking(self, values_cache: dict, value_func, top_length: int) -> dict:
+        dates = None
+        coins = []
+        columns = []
+
+        for coin_pair in self.coin_metrics['current_whitelist']:
+            pair_dataframe = self.dp.get_pair_dataframe(pair=coin_pair, timeframe=self.info_timeframe_1d)
+            pair_dates, pair_values = self.coin_metric_values(coin_pair, pair_dataframe, values_cache, value_func)
+
+            if self.config['runmode'].value in ('live', 'dry_run'):
+                pair_dates = pair_dates[-7:]
+                pair_values = pair_values[-7:]
+
+            if dates is None:
+                dates = pair_dates
+
+            # align to the dates of the first pair
+            column = np.zeros(len(dates))
+            found, positions = self.align_dates(pair_dates, dates)
+            column[found] = pair_values[positions[found]]
+            columns.append(column)
+            coins.append(coin_pair.split('/')[0])
+
+        # drop pairs that are no longer in the whitelist
+        for coin_pair in list(values_cache.keys()):
+            if coin_pair not in self.coin_metrics['current_whitelist']:
+                del values_cache[coin_pair]
+
+        if dates is None:
+            dates = np.array([], dtype='datetime64[ns]')
+        values = np.column_stack(columns) if len(columns) > 0 else np.zeros((len(dates), 0))
+        values[np.isnan(values)] = 0.0
+
+        return {'dates': dates, 'coins': coins, 'values': values, 'top': self.top_coins(values, top_length)}
+
+    # True for the top_length largest values in each row. Ties are resolved in column order (same as nlargest())
+    def top_coins(self, values: np.ndarray, top_length: int) -> np.ndarray:
+        nrows, ncols = values.shape
+        if ncols <= top_length:
+            return np.ones((nrows, ncols), dtype=bool)
+
+        kth = np.partition(values, ncols - top_length, axis=1)[:, ncols - top_length]
+        greater = values > kth[:, np.newaxis]
+        equal = values == kth[:, np.newaxis]
+        needed = top_length - greater.sum(axis=1)
+        return greater | (equal & (np.cumsum(equal, axis=1) <= needed[:, np.newaxis]))
+
+    # the top coins (in order) for the last rows of a ranking, for logging
+    def coin_ranking_tail(self, ranking: dict, top_length: int, rows: int = 5) -> DataFrame:
+        values = ranking['values'][-rows:]
+        order = np.argsort(-values, axis=1, kind='stable')[:, :top_length]
+        tail = DataFrame(np.array(ranking['coins'], dtype=object)[order], columns=[f"Coin #{i}" for i in range(1, order.shape[1] + 1)])
+        tail.insert(loc = 0, column = 'date', value = ranking['dates'][-len(tail):])
+        return tail
+
+    # for each of dates, whether it is in ref_dates (sorted) and its position there
+    def align_dates(self, ref_dates: np.ndarray, dates: np.ndarray):
+        if len(ref_dates) == 0:
+            return np.zeros(len(dates), dtype=bool), np.zeros(len(dates), dtype=int)
+        positions = np.minimum(np.searchsorted(ref_dates, dates), len(ref_dates) - 1)
+        return ref_dates[positions] == dates, positions
+
+    # whether the pair is one of the top coins of the ranking, for each of the dates
+    def is_top_coin(self, coin_pair: str, dates: Series, ranking: dict) -> np.ndarray:
+        is_top = np.zeros(len(dates), dtype=bool)
+        coin = coin_pair.split('/')[0]
+        if (not ranking) or (coin not in ranking['coins']):
+            return is_top
+
+        columns = [i for i, c in enumerate(ranking['coins']) if c == coin]
+        coin_top = ranking['top'][:, columns].any(axis=1)
+        found, positions = self.align_dates(ranking['dates'], dates.to_numpy(dtype='datetime64[ns]'))
+        is_top[found] = coin_top[positions[found]]
+        return is_top
 
     def is_support(self, row_data) -> bool:
         conditions = []
@@ -6486,13 +6540,9 @@ class NostalgiaForInfinityX(IStrategy):
 
     def custom_exit(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float,
                     current_profit: float, **kwargs):
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
-        last_candle = dataframe.iloc[-1]
-        previous_candle_1 = dataframe.iloc[-2]
-        previous_candle_2 = dataframe.iloc[-3]
-        previous_candle_3 = dataframe.iloc[-4]
-        previous_candle_4 = dataframe.iloc[-5]
-        previous_candle_5 = dataframe.iloc[-6]
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+        last_candle, previous_candle_1, previous_candle_2, previous_candle_3, previous_candle_4, previous_candle_5 = \
+            self.candle_cache.get_rows(pair, dataframe, last_updated, 6)
 
         buy_tag = 'empty'
         if hasattr(trade, 'buy_tag') and trade.buy_tag is not None:
@@ -6509,6 +6559,8 @@ class NostalgiaForInfinityX(IStrategy):
             # Skip remaining sell logic for long mode
             return None
 
+        sell_codes = self.get_sell_codes(pair, dataframe)
+
         # Original sell signals
         sell, signal_name = self.sell_signals(current_profit, max_profit, max_loss, last_candle, previous_candle_1, previous_candle_2, previous_candle_3, previous_candle_4, previous_candle_5, trade, current_time, buy_tag)
         if sell and (signal_name is not None):
@@ -6520,17 +6572,17 @@ class NostalgiaForInfinityX(IStrategy):
             return f"{signal_name} ( {buy_tag})"
 
         # Over EMA200, main profit targets
-        sell, signal_name = self.sell_over_main(current_profit, last_candle)
+        sell, signal_name = self.run_sell_function(sell_codes, 'sell_over_main', current_profit, last_candle)
         if sell and (signal_name is not None):
             return f"{signal_name} ( {buy_tag})"
 
         # Under EMA200, main profit targets
-        sell, signal_name = self.sell_under_main(current_profit, last_candle)
+        sell, signal_name = self.run_sell_function(sell_codes, 'sell_under_main', current_profit, last_candle)
         if sell and (signal_name is not None):
             return f"{signal_name} ( {buy_tag})"
 
         # Williams %R based sells
-        sell, signal_name = self.sell_r(current_profit, max_profit, max_loss, last_candle, previous_candle_1, trade, current_time)
+        sell, signal_name = self.run_sell_function(sell_codes, 'sell_r', current_profit, max_profit, max_loss, last_candle, previous_candle_1, trade, current_time)
         if sell and (signal_name is not None):
             return f"{signal_name} ( {buy_tag})"
 
@@ -6540,12 +6592,12 @@ class NostalgiaForInfinityX(IStrategy):
             return f"{signal_name} ( {buy_tag})"
 
         # The pair is descending
-        sell, signal_name = self.sell_dec_main(current_profit, last_candle)
+        sell, signal_name = self.run_sell_function(sell_codes, 'sell_dec_main', current_profit, last_candle)
         if sell and (signal_name is not None):
             return f"{signal_name} ( {buy_tag})"
 
         # Sell logic for pumped pairs
-        sell, signal_name = self.sell_pump_main(current_profit, last_candle)
+        sell, signal_name = self.run_sell_function(sell_codes, 'sell_pump_main', current_profit, last_candle)
         if sell and (signal_name is not None):
             return f"{signal_name} ( {buy_tag})"
 
@@ -6555,12 +6607,72 @@ class NostalgiaForInfinityX(IStrategy):
             return f"{signal_name} ( {buy_tag})"
 
         # Pivot points based sells
-        sell, signal_name = self.sell_pivot(current_profit, max_profit, max_loss, last_candle, previous_candle_1, trade, current_time)
+        sell, signal_name = self.run_sell_function(sell_codes, 'sell_pivot', current_profit, max_profit, max_loss, last_candle, previous_candle_1, trade, current_time)
         if sell and (signal_name is not None):
             return f"{signal_name} ( {buy_tag})"
 
         return None
 
+    # Compile the sell functions that can be precomputed (once)
+    def compile_sell_programs(self) -> dict:
+        tik = time.perf_counter()
+        programs = {}
+        for name in self.precomputed_sell_functions:
+            try:
+                programs[name] = SellSignalProgram(getattr(self, name))
+            except Exception as e:
+                log.warning(f"Can't precompute {name}, it will be run for each trade: {e}")
+
+        tok = time.perf_counter()
+        log.info(f"Compiled {len(programs)} sell functions for precomputation in {tok - tik:0.4f} seconds.")
+        return programs
+
+    # Evaluate the precomputed sell functions for every candle (and profit band) of the pair
+    def precompute_sells(self, dataframe: DataFrame, metadata: dict):
+        tik = time.perf_counter()
+        if self.sell_signal_programs is None:
+            self.sell_signal_programs = self.compile_sell_programs()
+
+        codes = {}
+        for name, program in self.sell_signal_programs.items():
+            try:
+                codes[name] = program.evaluate(dataframe)
+            except Exception as e:
+                log.warning(f"[{metadata['pair']}] Could not precompute {name}: {e}")
+
+        self.sell_signal_cache[metadata['pair']] = {
+            'dates': dataframe['date'].to_numpy(dtype='datetime64[ns]').view('int64'),
+            'codes': codes
+        }
+
+        tok = time.perf_counter()
+        log.debug(f"[{metadata['pair']}] precompute_sells took: {tok - tik:0.4f} seconds.")
+
+    # The precomputed sell codes, and the row for the last candle of the dataframe. None if they are not available
+    def get_sell_codes(self, pair: str, dataframe: DataFrame):
+        if not self.sell_signal_cache:
+            return None
+        table = self.sell_signal_cache.get(pair)
+        if table is None:
+            return None
+
+        last_date = pd.Timestamp(dataframe['date'].iloc[-1]).value
+        row = int(np.searchsorted(table['dates'], last_date))
+        if (row >= len(table['dates'])) or (table['dates'][row] != last_date):
+            return None
+        return table['codes'], row
+
+    # Run one of the sell functions, using the precomputed result if there is one (see precompute_sells)
+    def run_sell_function(self, sell_codes, name: str, current_profit: float, *args) -> tuple:
+        if (sell_codes is not None) and (name in sell_codes[0]):
+            program = self.sell_signal_programs[name]
+            code = sell_codes[0][name][sell_codes[1], program.band(current_profit)]
+            if code > 0:
+                return True, program.signal_names[code]
+            return False, None
+
+        return getattr(self, name)(current_profit, *args)
+
     def range_percent_change(self, dataframe: DataFrame, method, length: int) -> float:
         """
         Rolling Percentage Change Maximum across interval.
@@ -6615,16 +6727,10 @@ class NostalgiaForInfinityX(IStrategy):
 
         # Top traded coins
         if self.coin_metrics['top_traded_enabled']:
-            informative_1d = informative_1d.merge(self.coin_metrics['tt_dataframe'], on='date', how='left')
-            informative_1d['is_top_traded'] = informative_1d.apply(lambda row: self.is_top_coin(metadata['pair'], row, self.coin_metrics['top_traded_len']), axis=1)
-            column_names = [f"Coin #{i}" for i in range(1, self.coin_metrics['top_traded_len'] + 1)]
-            informative_1d.drop(columns = column_names, inplace=True)
+            informative_1d['is_top_traded'] = self.is_top_coin(metadata['pair'], informative_1d['date'], self.coin_metrics['tt_ranking'])
         # Top grossing coins
         if self.coin_metrics['top_grossing_enabled']:
-            informative_1d = informative_1d.merge(self.coin_metrics['tg_dataframe'], on='date', how='left')
-            informative_1d['is_top_grossing'] = informative_1d.apply(lambda row: self.is_top_coin(metadata['pair'], row, self.coin_metrics['top_grossing_len']), axis=1)
-            column_names = [f"Coin #{i}" for i in range(1, self.coin_metrics['top_grossing_len'] + 1)]
-            informative_1d.drop(columns = column_names, inplace=True)
+            informative_1d['is_top_grossing'] = self.is_top_coin(metadata['pair'], informative_1d['date'], self.coin_metrics['tg_ranking'])
 
         # Pivots
         informative_1d['pivot'], informative_1d['res1'], informative_1d['res2'], informative_1d['res3'], informative_1d['sup1'], informative_1d['sup2'], informative_1d['sup3'] = pivot_points(informative_1d, mode='fibonacci')
@@ -6962,6 +7068,65 @@ class NostalgiaForInfinityX(IStrategy):
 
         return dataframe
 
+    # The BTC informative indicators are the same for every pair, so they are only calculated once per BTC candle (for
+    # each timeframe) and then shared. Keyed on the last BTC candle, so this happens once per bot loop (or backtest)
+    def get_btc_informative(self, btc_info_pair: str, timeframe: str, indicators_func, metadata: dict) -> dict:
+        btc_dataframe = self.dp.get_pair_dataframe(btc_info_pair, timeframe)
+        last_date = btc_dataframe['date'].iloc[-1] if len(btc_dataframe) > 0 else None
+
+        cache_key = (btc_info_pair, timeframe)
+        btc_info = self.btc_info_cache.get(cache_key)
+        if (btc_info is not None) and (btc_info['last_date'] == last_date) and (btc_info['length'] == len(btc_dataframe)):
+            return btc_info
+
+        btc_dataframe = indicators_func(btc_dataframe.copy(), metadata)
+
+        # same alignment as merge_informative_pair(): an informative candle is only used once it has closed
+        minutes_inf = timeframe_to_minutes(timeframe)
+        minutes = timeframe_to_minutes(self.timeframe)
+        merge_dates = pd.to_datetime(btc_dataframe['date'], utc=True)
+        if minutes_inf > minutes:
+            merge_dates = merge_dates + pd.to_timedelta(minutes_inf - minutes, 'm')
+
+        ignore_columns = ['date', 'open', 'high', 'low', 'close', 'volume']
+        columns = [col for col in btc_dataframe.columns if col not in ignore_columns]
+        btc_info = {
+            'last_date': last_date,
+            'length': len(btc_dataframe),
+            'merge_dates': merge_dates.to_numpy(dtype='datetime64[ns]'),
+            'dataframe': btc_dataframe[columns].reset_index(drop=True),
+            'indexes': {}  # pair date range -> BTC row for each candle
+        }
+        self.btc_info_cache[cache_key] = btc_info
+        return btc_info
+
+    # adds the BTC informative indicators (with the timeframe suffix) to the pair dataframe. Equivalent to
+    # merge_informative_pair(..., ffill=True) for the BTC columns (the pair's own columns are not forward filled), but
+    # uses an index of the BTC row for each candle, which is the same for all pairs with the same date range
+    def merge_btc_informative(self, dataframe: DataFrame, btc_info_pair: str, timeframe: str, indicators_func, metadata: dict) -> DataFrame:
+        btc_info = self.get_btc_informative(btc_info_pair, timeframe, indicators_func, metadata)
+
+        dates = dataframe['date']
+        index_key = (len(dataframe), dates.iloc[0], dates.iloc[-1]) if len(dataframe) > 0 else (0,)
+        index = btc_info['indexes'].get(index_key)
+        if index is None:
+            # last BTC row (that lines up with a candle in the pair) available at each candle
+            pair_dates = dates.to_numpy(dtype='datetime64[ns]')
+            matched = np.flatnonzero(np.isin(btc_info['merge_dates'], pair_dates))
+            positions = np.searchsorted(btc_info['merge_dates'][matched], pair_dates, side='right') - 1
+            index = np.where(positions >= 0, matched[np.maximum(positions, 0)] if len(matched) > 0 else -1, -1)
+            btc_info['indexes'][index_key] = index
+
+        informative = btc_info['dataframe'].iloc[np.maximum(index, 0)].reset_index(drop=True)
+        if (index < 0).any():
+            informative = informative.where(np.repeat((index >= 0)[:, np.newaxis], informative.shape[1], axis=1))
+        # merge_informative_pair() forward fills, so a missing BTC value repeats the previous candle's value
+        informative = informative.ffill()
+        informative.columns = [f"{col}_{timeframe}" for col in informative.columns]
+        informative.index = dataframe.index
+
+        return concat([dataframe, informative], axis=1)
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         tik = time.perf_counter()
         '''
@@ -6974,25 +7139,13 @@ class NostalgiaForInfinityX(IStrategy):
             btc_info_pair = "BTC/USDT"
 
         if self.has_BTC_daily_tf:
-            btc_daily_tf = self.dp.get_pair_dataframe(btc_info_pair, '1d')
-            btc_daily_tf = self.daily_tf_btc_indicators(btc_daily_tf, metadata)
-            dataframe = merge_informative_pair(dataframe, btc_daily_tf, self.timeframe, '1d', ffill=True)
-            drop_columns = [f"{s}_1d" for s in ['date', 'open', 'high', 'low', 'close', 'volume']]
-            dataframe.drop(columns=dataframe.columns.intersection(drop_columns), inplace=True)
+            dataframe = self.merge_btc_informative(dataframe, btc_info_pair, '1d', self.daily_tf_btc_indicators, metadata)
 
         if self.has_BTC_info_tf:
-            btc_info_tf = self.dp.get_pair_dataframe(btc_info_pair, self.info_timeframe_1h)
-            btc_info_tf = self.info_tf_btc_indicators(btc_info_tf, metadata)
-            dataframe = merge_informative_pair(dataframe, btc_info_tf, self.timeframe, self.info_timeframe_1h, ffill=True)
-            drop_columns = [f"{s}_{self.info_timeframe_1h}" for s in ['date', 'open', 'high', 'low', 'close', 'volume']]
-            dataframe.drop(columns=dataframe.columns.intersection(drop_columns), inplace=True)
+            dataframe = self.merge_btc_informative(dataframe, btc_info_pair, self.info_timeframe_1h, self.info_tf_btc_indicators, metadata)
 
         if self.has_BTC_base_tf:
-            btc_base_tf = self.dp.get_pair_dataframe(btc_info_pair, self.timeframe)
-            btc_base_tf = self.base_tf_btc_indicators(btc_base_tf, metadata)
-            dataframe = merge_informative_pair(dataframe, btc_base_tf, self.timeframe, self.timeframe, ffill=True)
-            drop_columns = [f"{s}_{self.timeframe}" for s in ['date', 'open', 'high', 'low', 'close', 'volume']]
-            dataframe.drop(columns=dataframe.columns.intersection(drop_columns), inplace=True)
+            dataframe = self.merge_btc_informative(dataframe, btc_info_pair, self.timeframe, self.base_tf_btc_indicators, metadata)
 
         '''
         --> Informative timeframe
@@ -7042,808 +7195,854 @@ class NostalgiaForInfinityX(IStrategy):
         return dataframe
 
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        tik = time.perf_counter()
         conditions = []
         dataframe.loc[:, 'buy_tag'] = ''
 
-        for index in self.buy_protection_params:
-            item_buy_protection_list = [True]
-            global_buy_protection_params = self.buy_protection_params[index]
-
-            if self.buy_params[f"buy_condition_{index}_enable"]:
-                # Standard protections - Common to every condition
-                # -----------------------------------------------------------------------------------------
-                if global_buy_protection_params["ema_fast"]:
-                    item_buy_protection_list.append(dataframe[f"ema_{global_buy_protection_params['ema_fast_len']}"] > dataframe['ema_200'])
-                if global_buy_protection_params["ema_slow"]:
-                    item_buy_protection_list.append(dataframe[f"ema_{global_buy_protection_params['ema_slow_len']}_1h"] > dataframe['ema_200_1h'])
-                if global_buy_protection_params["close_above_ema_fast"]:
-                    item_buy_protection_list.append(dataframe['close'] > dataframe[f"ema_{global_buy_protection_params['close_above_ema_fast_len']}"])
-                if global_buy_protection_params["close_above_ema_slow"]:
-                    item_buy_protection_list.append(dataframe['close'] > dataframe[f"ema_{global_buy_protection_params['close_above_ema_slow_len']}_1h"])
-                if global_buy_protection_params["sma200_rising"]:
-                    item_buy_protection_list.append(dataframe['sma_200'] > dataframe['sma_200'].shift(int(global_buy_protection_params['sma200_rising_val'])))
-                if global_buy_protection_params["sma200_1h_rising"]:
-                    item_buy_protection_list.append(dataframe['sma_200_1h'] > dataframe['sma_200_1h'].shift(int(global_buy_protection_params['sma200_1h_rising_val'])))
-                if global_buy_protection_params["safe_dips_threshold_0"] is not None:
-                    item_buy_protection_list.append(dataframe['tpct_change_0'] < global_buy_protection_params["safe_dips_threshold_0"])
-                if global_buy_protection_params["safe_dips_threshold_2"] is not None:
-                    item_buy_protection_list.append(dataframe['tpct_change_2'] < global_buy_protection_params["safe_dips_threshold_2"])
-                if global_buy_protection_params["safe_dips_threshold_12"] is not None:
-                    item_buy_protection_list.append(dataframe['tpct_change_12'] < global_buy_protection_params["safe_dips_threshold_12"])
-                if global_buy_protection_params["safe_dips_threshold_144"] is not None:
-                    item_buy_protection_list.append(dataframe['tpct_change_144'] < global_buy_protection_params["safe_dips_threshold_144"])
-                if global_buy_protection_params["safe_pump_6h_threshold"] is not None:
-                    item_buy_protection_list.append(dataframe['hl_pct_change_6_1h'] < global_buy_protection_params["safe_pump_6h_threshold"])
-                if global_buy_protection_params["safe_pump_12h_threshold"] is not None:
-                    item_buy_protection_list.append(dataframe['hl_pct_change_12_1h'] < global_buy_protection_params["safe_pump_12h_threshold"])
-                if global_buy_protection_params["safe_pump_24h_threshold"] is not None:
-                    item_buy_protection_list.append(dataframe['hl_pct_change_24_1h'] < global_buy_protection_params["safe_pump_24h_threshold"])
-                if global_buy_protection_params["safe_pump_36h_threshold"] is not None:
-                    item_buy_protection_list.append(dataframe['hl_pct_change_36_1h'] < global_buy_protection_params["safe_pump_36h_threshold"])
-                if global_buy_protection_params["safe_pump_48h_threshold"] is not None:
-                    item_buy_protection_list.append(dataframe['hl_pct_change_48_1h'] < global_buy_protection_params["safe_pump_48h_threshold"])
-                if global_buy_protection_params['btc_1h_not_downtrend']:
-                    item_buy_protection_list.append(dataframe['btc_not_downtrend_1h'])
-                if global_buy_protection_params['close_over_pivot_type'] != 'none':
-                    item_buy_protection_list.append(dataframe['close'] > dataframe[f"{global_buy_protection_params['close_over_pivot_type']}_1d"] * global_buy_protection_params['close_over_pivot_offset'])
-                if global_buy_protection_params['close_under_pivot_type'] != 'none':
-                    item_buy_protection_list.append(dataframe['close'] < dataframe[f"{global_buy_protection_params['close_under_pivot_type']}_1d"] * global_buy_protection_params['close_under_pivot_offset'])
-                if not self.config['runmode'].value in ('live', 'dry_run'):
-                    if self.has_bt_agefilter:
-                        item_buy_protection_list.append(dataframe['bt_agefilter_ok'])
-                else:
-                    if self.has_downtime_protection:
-                        item_buy_protection_list.append(dataframe['live_data_ok'])
-
-                # Buy conditions
-                # -----------------------------------------------------------------------------------------
-                item_buy_logic = []
-                item_buy_logic.append(reduce(lambda x, y: x & y, item_buy_protection_list))
-
-                # Condition #1 - Semi swing mode. Increase in the last candles & relative local dip.
-                if index == 1:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(((dataframe['close'] - dataframe['open'].rolling(12).min()) / dataframe['open'].rolling(12).min()) > 0.032)
-                    item_buy_logic.append(dataframe['rsi_14'] < 36.0)
-                    item_buy_logic.append(dataframe['r_14'] < -75.0)
-                    item_buy_logic.append(dataframe['r_32'] < -75.0)
-                    item_buy_logic.append(dataframe['mfi'] < 46.0)
-                    item_buy_logic.append(dataframe['rsi_14_1h'] > 30.0)
-                    item_buy_logic.append(dataframe['rsi_14_1h'] < 84.0)
-                    item_buy_logic.append(dataframe['r_480_1h'] > -99.0)
-
-                # Condition #2 - Semi swing. Local dip.
-                elif index == 2:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['rsi_14'] < (dataframe['rsi_14_1h'] - 47.0))
-                    item_buy_logic.append(dataframe['mfi'] < 46.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.8)
-                    item_buy_logic.append(dataframe['r_14'] < -98.0)
-                    item_buy_logic.append(dataframe['r_480'] > -95.0)
-                    item_buy_logic.append(dataframe['cti_1h'] < 0.82)
-
-                # Condition #3 - Semi swing. Local dip.
-                elif index == 3:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['bb40_2_low'].shift().gt(0))
-                    item_buy_logic.append(dataframe['bb40_2_delta'].gt(dataframe['close'] * 0.045))
-                    item_buy_logic.append(dataframe['closedelta'].gt(dataframe['close'] * 0.02))
-                    item_buy_logic.append(dataframe['tail'].lt(dataframe['bb40_2_delta'] * 0.24))
-                    item_buy_logic.append(dataframe['close'].lt(dataframe['bb40_2_low'].shift()))
-                    item_buy_logic.append(dataframe['close'].le(dataframe['close'].shift()))
-                    item_buy_logic.append(dataframe['cti'] < -0.5)
-                    item_buy_logic.append(dataframe['r_14'] < -90.0)
-                    item_buy_logic.append(dataframe['r_96'] < -80.0)
-                    item_buy_logic.append(dataframe['cti_1h'] < -0.75)
-                    item_buy_logic.append(dataframe['r_480_1h'] < -30.0)
-
-                # Condition #4 - Semi swing. Local dip.
-                elif index == 4:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
-                    item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.02))
-                    item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.992))
-                    item_buy_logic.append(dataframe['rsi_14'] > 30.0)
-                    item_buy_logic.append(dataframe['mfi'] > 25.0)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 14.0)
-
-                # Condition #5 - Semi swing. Local dip. Uptrend.
-                elif index == 5:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
-                    item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_75'] * 0.932)
-                    item_buy_logic.append(dataframe['ewo'] > 3.4)
-                    item_buy_logic.append(dataframe['cti'] < -0.93)
-                    item_buy_logic.append(dataframe['r_14'] < -97.0)
-
-                # Condition #6 - Semi swing. Local dip.
-                elif index == 6:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_15'] * 0.937)
-                    item_buy_logic.append(dataframe['crsi'] < 30.0)
-                    item_buy_logic.append(dataframe['rsi_14'] < dataframe['rsi_14'].shift(1))
-                    item_buy_logic.append(dataframe['rsi_14'] < 28.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.82)
-                    item_buy_logic.append(dataframe['cci'] < -200.0)
-
-                # Condition #7 - Semi swing. Local dip.
-                elif index == 7:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_50_1h'] > dataframe['ema_100_1h'])
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_30'] * 0.94)
-                    item_buy_logic.append(dataframe['close'] < dataframe['bb20_2_low'] * 0.984)
-                    item_buy_logic.append(dataframe['cti'] < -0.8)
-                    item_buy_logic.append(dataframe['r_14'] < -97.0)
-                    item_buy_logic.append(dataframe['crsi'] > 8.0)
-                    item_buy_logic.append(dataframe['cti_1h'] > -0.5)
-                    item_buy_logic.append(dataframe['cti_1h'] < 0.85)
-
-                # Condition #8 - Semi swing. Local deeper dip. Uptrend.
-                elif index == 8:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_30'] * 0.927)
-                    item_buy_logic.append(dataframe['ewo'] > 3.0)
-                    item_buy_logic.append(dataframe['rsi_14'] < 32.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.9)
-                    item_buy_logic.append(dataframe['r_14'] < -97.0)
-
-                # Condition #9 - Semi swing. Local dip. Downtrend.
-                elif index == 9:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_50_1h'] > dataframe['ema_100_1h'])
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_30'] * 0.99)
-                    item_buy_logic.append(dataframe['cti'] < -0.92)
-                    item_buy_logic.append(dataframe['ewo'] < -5.0)
-                    item_buy_logic.append(dataframe['cti_1h'] < -0.88)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 20.0)
-
-                # Condition #10 - Semi swing. Local dip.
-                elif index == 10:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
-                    item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.017))
-                    item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.984))
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.965)
-                    item_buy_logic.append(dataframe['cti'] < -0.85)
-
-                # Condition #11 - Semi swing. Local dip.
-                elif index == 11:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
-                    item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.027))
-                    item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.932)
-                    item_buy_logic.append(dataframe['rsi_14'] < 25.0)
-
-                # Condition #12 - Semi swing. Local deeper dip. Uptrend.
-                elif index == 12:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.932)
-                    item_buy_logic.append(dataframe['ewo'] > 0.1)
-                    item_buy_logic.append(dataframe['rsi_14'] < 40.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.9)
-                    item_buy_logic.append(dataframe['r_480_1h'] < -20.0)
-
-                # Condition #13 - Semi swing. Downtrend. Local dip.
-                elif index == 13:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.999)
-                    item_buy_logic.append(dataframe['ewo'] < -5.7)
-                    item_buy_logic.append(dataframe['cti'] < -0.97)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 12.0)
-
-                # Condition #14 - Semi swing. Strong uptrend. Local dip.
-                elif index == 14:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_100_1h'] > dataframe['ema_100_1h'].shift(12))
-                    item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(36))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_30'] * 0.98)
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.984))
-                    item_buy_logic.append(dataframe['ewo'] > 7.8) # 4.0 7.8
-                    item_buy_logic.append(dataframe['rsi_14'] < 32.0) # 36.0
-                    item_buy_logic.append(dataframe['cti'] < -0.54)
-                    item_buy_logic.append(dataframe['cti_1h'] > -0.5)
-
-                # Condition #15 - Semi swing. Uptrend. Local dip.
-                elif index == 15:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.986))
-                    item_buy_logic.append(dataframe['ewo'] > 2.0)
-                    item_buy_logic.append(dataframe['rsi_14'] < 28.5)
-                    item_buy_logic.append(dataframe['cti'] < -0.75)
-                    item_buy_logic.append(dataframe['rsi_14_1h'] < 80.0)
-                    item_buy_logic.append(dataframe['cti_1h'] < 0.62)
-
-                # Condition #16 - Semi swing. Cross above.
-                elif index == 16:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_12_1h'].shift(12) < dataframe['ema_35_1h'].shift(12))
-                    item_buy_logic.append(dataframe['ema_12_1h'] > dataframe['ema_35_1h'])
-                    item_buy_logic.append(dataframe['cmf_1h'].shift(12) < 0.0)
-                    item_buy_logic.append(dataframe['cmf_1h'] > 0.0)
-                    item_buy_logic.append(dataframe['rsi_14'] < 50.0)
-                    item_buy_logic.append(dataframe['cti'] < 0.5)
-                    item_buy_logic.append(dataframe['rsi_14_1h'] > 70.0)
-
-                # Condition #17 - Semi swing. Deep buy.
-                elif index == 17:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['r_480'] < -99.0)
-                    item_buy_logic.append(dataframe['r_14'] == -100.0)
-                    item_buy_logic.append(dataframe['r_480_1h'] < -95.0)
-                    item_buy_logic.append(dataframe['rsi_14_1h'] + dataframe['rsi_14'] < 40.0)
-
-                # Condition #18 - Semi swing. Local dip. BTC not negative.
-                elif index == 18:
-                    # Non-Standard protections (add below)
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
-                    item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
-                    item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
-                    item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.018))
-                    item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.982))
-                    item_buy_logic.append(dataframe['cti_1h'] > -0.5)
-
-                # Condition #19 - Semi swing. Uptrend. Local dip.  BTC not downtrend.
-                elif index == 19:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
-                    item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
-                    item_buy_logic.append(dataframe['bb40_2_low'].shift().gt(0))
-                    item_buy_logic.append(dataframe['bb40_2_delta'].gt(dataframe['close'] * 0.045))
-                    item_buy_logic.append(dataframe['closedelta'].gt(dataframe['close'] * 0.02))
-                    item_buy_logic.append(dataframe['tail'].lt(dataframe['bb40_2_delta'] * 0.28))
-                    item_buy_logic.append(dataframe['close'].lt(dataframe['bb40_2_low'].shift()))
-                    item_buy_logic.append(dataframe['close'].le(dataframe['close'].shift()))
-                    item_buy_logic.append(dataframe['cti'] < -0.9)
-                    item_buy_logic.append(dataframe['cti_1h'] > -0.75)
-                    item_buy_logic.append(dataframe['cti_1h'] < 0.25)
-
-                # Condition #20 - Semi swing. Uptrend. Local dip.
-                elif index == 20:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'].shift(1) < (dataframe['sma_15'].shift(1) * 0.942))
-                    item_buy_logic.append(dataframe['close'] > (dataframe['open'].shift(1)))
-                    item_buy_logic.append(dataframe['ewo'] > 4.8)
-                    item_buy_logic.append(dataframe['cti'] < -0.9)
-                    item_buy_logic.append(dataframe['r_14'].shift(1) < -97.0)
-
-                # Condition #21 - Semi swing. Deep local dip. Mild uptrend.
-                elif index == 21:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.941)
-                    item_buy_logic.append(dataframe['ewo'] > 2.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.84)
-                    item_buy_logic.append(dataframe['r_14'] < -97.0)
-                    item_buy_logic.append(dataframe['r_96'] < -85.0)
-
-                # Condition #22 - Swing. Uptrend. Bounce from daily support level
-                elif index == 22:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['close_1h'] > dataframe['sup_level_1d'])
-                    item_buy_logic.append(dataframe['close_1h'] < dataframe['sup_level_1d'] * 1.05)
-                    item_buy_logic.append(dataframe['low_1h'] < dataframe['sup_level_1d'] * 0.99)
-                    item_buy_logic.append(dataframe['close_1h'] < dataframe['res_level_1h'])
-                    item_buy_logic.append(dataframe['res_level_1d'] > dataframe['sup_level_1d'])
-                    item_buy_logic.append(dataframe['rsi_14'] < 40.0)
-                    item_buy_logic.append(dataframe['rsi_14_1h'] > 48.0)
-
-                    # Confirm uptrend - Heikin-Ashi
-                    item_buy_logic.append(dataframe['open_sha_1d'] < dataframe['close_sha_1d'])
-                    item_buy_logic.append(dataframe['open_sha_1d'].shift(288) < dataframe['close_sha_1d'].shift(288))
-                    item_buy_logic.append(dataframe['pivot_1d'] > dataframe['pivot_1d'].shift(288) * 0.95)
-
-                # Condition #23 - Semi swing. Downtrend. Local dip.
-                elif index == 23:
-                    # Non-Standard protections (add below)
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ewo'].shift(1) < -6.4)
-                    item_buy_logic.append(dataframe['cti'].shift(1).rolling(5).max() < -0.9)
-                    item_buy_logic.append(dataframe['r_14'].shift(1) < -97.0)
-                    item_buy_logic.append(dataframe['close'] > (dataframe['open'].shift(1)))
-                    item_buy_logic.append(dataframe['crsi_1h'] > 2.0)
-
-                # Condition #24 - Semi swing. Uptrend. 1h uptrend. Local dip.
-                elif index == 24:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ewo'] > 4.8)
-                    item_buy_logic.append(dataframe['r_14'] < -97.0)
-                    item_buy_logic.append(dataframe['r_96'] < -97.0)
-                    item_buy_logic.append(dataframe['ewo_1h'] > 2.8)
-                    item_buy_logic.append(dataframe['cti_1h'] < 0.92)
-
-                # Condition #25 - Semi swing. CMF 1h cross.
-                elif index == 25:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_12_1h'].shift(12) < dataframe['ema_35_1h'].shift(12))
-                    item_buy_logic.append(dataframe['ema_12_1h'] > dataframe['ema_35_1h'])
-                    item_buy_logic.append(dataframe['cmf_1h'].shift(12) < 0.0)
-                    item_buy_logic.append(dataframe['cmf_1h'] > 0.0)
-                    item_buy_logic.append(dataframe['rsi_14'] < 48.0)
-                    item_buy_logic.append(dataframe['rsi_14_1h'] > 66.9)
-
-                # Condition #26 - Semi swing. Local deep dip.
-                elif index == 26:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_20_1h'] > dataframe['ema_25_1h'])
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_15'] * 0.93)
-                    item_buy_logic.append(dataframe['rsi_14'] > 25.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.9)
-
-                # Condition #27 - Semi swing. Local deep. Uptrend.
-                elif index == 27:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_75'] * 0.934)
-                    item_buy_logic.append(dataframe['ewo'] > 6.4)
-                    item_buy_logic.append(dataframe['rsi_14'] < 32.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.8)
-                    item_buy_logic.append(dataframe['r_14'] < -96.0)
-
-                # Condition #28 - Semi swing. Downtrend. Local deep.
-                elif index == 28:
-                    # Non-Standard protections (add below)
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['sma_75'] * 0.96)
-                    item_buy_logic.append(dataframe['ewo'] < -8.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.9)
-                    item_buy_logic.append(dataframe['r_14'] < -97.0)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 14.0)
-
-                # Condition #29 - Semi swing. Downtrend. Local deep.
-                elif index == 29:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < (dataframe['ema_16'] * 0.982))
-                    item_buy_logic.append(dataframe['ewo'] < -16.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.75)
-
-                # Condition #30 - Semi swing. Local dip. BTC not downtrend.
-                elif index == 30:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
-                    item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.02))
-                    item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.98))
-
-                # Condition #31 - Long mode. Local dip.
-                elif index == 31:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['bb40_2_low'].shift().gt(0))
-                    item_buy_logic.append(dataframe['bb40_2_delta'].gt(dataframe['close'] * 0.045))
-                    item_buy_logic.append(dataframe['closedelta'].gt(dataframe['close'] * 0.028))
-                    item_buy_logic.append(dataframe['tail'].lt(dataframe['bb40_2_delta'] * 0.25))
-                    item_buy_logic.append(dataframe['close'].lt(dataframe['bb40_2_low'].shift()))
-                    item_buy_logic.append(dataframe['close'].le(dataframe['close'].shift()))
-                    item_buy_logic.append(dataframe['cti'] < -0.9)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 10.0)
-
-                # Condition #32 - Long mode. Local dip.
-                elif index == 32:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
-                    item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.046))
-                    item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
-                    item_buy_logic.append(dataframe['cti'] < -0.9)
-                    item_buy_logic.append(dataframe['r_480_1h'] < -5.0)
-
-                # Condition #33 - Long mode. Local dip. Uptrend.
-                elif index == 33:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < (dataframe['ema_16'] * 0.934))
-                    item_buy_logic.append(dataframe['ewo'] > 2.5)
-                    item_buy_logic.append(dataframe['rsi_14'] < 46.0)
-                    item_buy_logic.append(dataframe['r_14'] < -97.0)
-                    item_buy_logic.append(dataframe['ewo_1h'] > 0.1)
-
-                # Condition #34 - Long mode. Local dip.
-                elif index == 34:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_50'])
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.972))
-                    item_buy_logic.append(dataframe['cti'] < -0.8)
-                    item_buy_logic.append(dataframe['rsi_14'] < 18.0)
-
-                # Condition #35 - Long mode. Local deep dip.
-                elif index == 35:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_25'] * 0.85)
-                    item_buy_logic.append(dataframe['close'] > dataframe['open'])
-                    item_buy_logic.append(dataframe['rsi_14'] < 46.0)
-                    item_buy_logic.append(dataframe['mfi'] < 36.0)
-                    item_buy_logic.append(dataframe['cti_1h'] > -0.85)
-
-                # Condition #36 - Long mode. Uptrend. Local dip.
-                elif index == 36:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(36) * 1.035))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.956)
-                    item_buy_logic.append(dataframe['rsi_14'] < 34.0)
-                    item_buy_logic.append(dataframe['r_64'] < -80.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.5)
-                    item_buy_logic.append(dataframe['r_480_1h'] < -30.0)
-
-                # Condition #37 - Semi swing. Uptrend. Local dip.
-                elif index == 37:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(12) * 1.01))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.986))
-                    item_buy_logic.append(dataframe['r_14'] < -75.0)
-                    item_buy_logic.append(dataframe['r_64'] < -75.0)
-                    item_buy_logic.append(dataframe['cmf_1h'] < 0.25)
-
-                # Condition #38 - Semi swing. Uptrend. Local dip.
-                elif index == 38:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(12) * 1.01))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
-                    item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.02))
-                    item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
-                    item_buy_logic.append(dataframe['mfi'] < 34.5)
-                    item_buy_logic.append(dataframe['r_64'] < -65.0)
-                    item_buy_logic.append(dataframe['r_96'] < -50.0)
-                    item_buy_logic.append(dataframe['r_480_1h'] < -1.0)
-
-                # Condition #39 - Semi swing. Uptrend. Local dip.
-                elif index == 39:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(12) * 1.01))
-                    item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(48) * 1.07))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['bb40_2_low'].shift().gt(0))
-                    item_buy_logic.append(dataframe['bb40_2_delta'].gt(dataframe['close'] * 0.056))
-                    item_buy_logic.append(dataframe['closedelta'].gt(dataframe['close'] * 0.01))
-                    item_buy_logic.append(dataframe['tail'].lt(dataframe['bb40_2_delta'] * 0.5))
-                    item_buy_logic.append(dataframe['close'].lt(dataframe['bb40_2_low'].shift()))
-                    item_buy_logic.append(dataframe['close'].le(dataframe['close'].shift()))
-                    item_buy_logic.append(dataframe['close'] > dataframe['ema_50'] * 0.925)
-
-                # Condition #40 - Semi swing. Uptrend. Local dip.
-                elif index == 40:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(12) * 1.01))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.97)
-                    item_buy_logic.append(dataframe['rsi_14'] < 32.0)
-                    item_buy_logic.append(dataframe['r_14'] < -90.0)
-                    item_buy_logic.append(dataframe['r_64'] < -80.0)
-
-                # Condition #41 - 15m. Semi swing. Local dip. BTC not downtrend.
-                elif index == 41:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_12_15m'] > dataframe['ema_200_1h'])
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
-                    item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.03))
-                    item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
-                    item_buy_logic.append(dataframe['close_15m'] < (dataframe['bb20_2_low_15m'] * 0.99))
-
-                # Condition #42 - 15m. Semi swing. Local dip. 15m uptrend.
-                elif index == 42:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ewo_15m'] > 5.4)
-                    item_buy_logic.append(dataframe['rsi_14_15m'] < 36.0)
-                    item_buy_logic.append(dataframe['cti_15m'] < -0.9)
-                    item_buy_logic.append(dataframe['cci_15m'] < -160.0)
-                    item_buy_logic.append(dataframe['r_14_15m'] < -90.0)
-                    item_buy_logic.append(dataframe['cti_1h'] < 0.5)
-
-                # Condition #43 - 15m. Semi swing. Local dip. 1h uptrend.
-                elif index == 43:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['bb40_2_low_15m'].shift().gt(0))
-                    item_buy_logic.append(dataframe['bb40_2_delta_15m'].gt(dataframe['close_15m'] * 0.045))
-                    item_buy_logic.append(dataframe['closedelta_15m'].gt(dataframe['close_15m'] * 0.034))
-                    item_buy_logic.append(dataframe['tail_15m'].lt(dataframe['bb40_2_delta_15m'] * 0.18))
-                    item_buy_logic.append(dataframe['close_15m'].lt(dataframe['bb40_2_low_15m'].shift()))
-                    item_buy_logic.append(dataframe['close_15m'].le(dataframe['close_15m'].shift()))
-                    item_buy_logic.append(dataframe['rsi_14_15m'] < 30.0)
-                    item_buy_logic.append(dataframe['cti_15m'] < -0.85)
-                    item_buy_logic.append(dataframe['r_64_15m'] < -70.0)
-
-                # Condition #44 - 15m. Semi swing. Local deeper dip. 15m uptrend.
-                elif index == 44:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_200_15m'] > (dataframe['ema_200_15m'].shift(36) * 1.01))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close_15m'] < dataframe['ema_26_15m'] * 0.942)
-                    item_buy_logic.append(dataframe['rsi_14_15m'] < 28.0)
-                    item_buy_logic.append(dataframe['r_14_15m'] < -96.0)
-
-                # Condition #45 - 15m. Semi swing. Local deeper dip. 15m uptrend.
-                elif index == 45:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_50_15m'] > dataframe['ema_200_1h'])
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close_15m'] < dataframe['ema_20_15m'] * 0.934)
-                    item_buy_logic.append(dataframe['ewo_15m'] > 3.6)
-                    item_buy_logic.append(dataframe['cci_15m'] < -190.0)
-                    item_buy_logic.append(dataframe['r_14_15m'] < -97.0)
-                    item_buy_logic.append((dataframe['rsi_14_1h'] + dataframe['rsi_14_15m']) < 70.0)
-
-                # Condition #46 - 15m. Semi swing. 1h uptrend.
-                elif index == 46:
-                    # Non-Standard protections (add below)
-                    item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
-                    item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
-                    item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.027))
-                    item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
-                    item_buy_logic.append(dataframe['close_15m'] < (dataframe['bb20_2_low_15m'] * 0.982))
-                    item_buy_logic.append(dataframe['r_14'] < -75.0)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 14.0)
-
-                # Condition #47 - 15m. Semi swing. Local dip. 1h minor dip.
-                elif index == 47:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['rsi_14_15m'] < dataframe['rsi_14_15m'].shift(3))
-                    item_buy_logic.append(dataframe['ema_20_1h'] > dataframe['ema_25_1h'])
-                    item_buy_logic.append(dataframe['close_15m'] < (dataframe['sma_15_15m'] * 0.95))
-                    item_buy_logic.append(
-                        ((dataframe['open_15m'] < dataframe['ema_20_1h']) & (dataframe['low_15m'] < dataframe['ema_20_1h'])) |
-                        ((dataframe['open_15m'] > dataframe['ema_20_1h']) & (dataframe['low_15m'] > dataframe['ema_20_1h'])))
-                    item_buy_logic.append(dataframe['cti_15m'] < -0.9)
-                    item_buy_logic.append(dataframe['r_14_15m'] < -90.0)
-                    item_buy_logic.append(dataframe['r_14'] < -97.0)
-                    item_buy_logic.append(dataframe['cti_1h'] < 0.1)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 8.0)
-
-                # Condition #48 - 15m. Semi swing. Local deep. 15m uptrend.
-                elif index == 48:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close_15m'].shift(3) < (dataframe['sma_15_15m'].shift(3) * 0.95))
-                    item_buy_logic.append(dataframe['close_15m'] > (dataframe['open_15m'].shift(3)))
-                    item_buy_logic.append(dataframe['ewo_15m'] > 2.8)
-                    item_buy_logic.append(dataframe['cti_15m'] < -0.75)
-                    item_buy_logic.append(dataframe['r_14_15m'].shift(3) < -94.0)
-                    item_buy_logic.append(dataframe['cti'] < -0.5)
-                    item_buy_logic.append(dataframe['cti_1h'] < 0.1)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 18.0)
-
-                # Condition #49 - 15m. Semi swing. Local deeper dip.
-                elif index == 49:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
-                    item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.032))
-                    item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
-                    item_buy_logic.append(dataframe['close_15m'] < dataframe['ema_20_15m'] * 0.928)
-                    item_buy_logic.append(dataframe['rsi_14_15m'] < 28.0)
-                    item_buy_logic.append(dataframe['crsi_15m'] > 18.0)
-
-                # Condition #50 - 15m. Semi swing. Deep local dip. Mild 15m uptrend.
-                elif index == 50:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close_15m'] < dataframe['ema_20_15m'] * 0.932)
-                    item_buy_logic.append(dataframe['ewo_15m'] > 1.8)
-                    item_buy_logic.append(dataframe['cti_15m'] < -0.9)
-                    item_buy_logic.append(dataframe['r_14_15m'] < -96.0)
-                    item_buy_logic.append(dataframe['r_96_15m'] < -75.0)
-                    item_buy_logic.append(dataframe['rsi_14'] < 32.0)
-                    item_buy_logic.append(dataframe['r_14_15m'] < -97.0)
-
-                # Condition #51 - 15m. Semi swing. Downtrend. Dip.
-                elif index == 51:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['close_15m'] < (dataframe['ema_16_15m'] * 0.944))
-                    item_buy_logic.append(dataframe['ewo_15m'] < -1.0)
-                    item_buy_logic.append(dataframe['rsi_14_15m'] > 28.0)
-                    item_buy_logic.append(dataframe['cti_15m'] < -0.84)
-                    item_buy_logic.append(dataframe['r_14_15m'] < -94.0)
-                    item_buy_logic.append(dataframe['rsi_14'] > 30.0)
-                    item_buy_logic.append(dataframe['crsi_1h'] > 1.0)
-
-                # Condition #52 - 15m Semi swing. Local dip. BTC not downtrend.
-                elif index == 52:
-                    # Non-Standard protections (add below)
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
-                    item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.032))
-                    item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
-                    item_buy_logic.append(dataframe['close_15m'] < (dataframe['bb20_2_low_15m'] * 0.998))
-                    item_buy_logic.append(dataframe['crsi_1h'] > 10.0)
-
-                # Condition #53 - 15m. Semi swing. BTC not negative. Local dip.
-                elif index == 53:
-                    # Non-Standard protections (add below)
-                    item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
-                    item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
-                    item_buy_logic.append(dataframe['ema_200_1h'].shift(24) > dataframe['ema_200_1h'].shift(36))
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
-                    item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.02))
-                    item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
-                    item_buy_logic.append(dataframe['close_15m'] < (dataframe['bb20_2_low_15m'] * 0.99))
-                    item_buy_logic.append(dataframe['r_14'] < -90.0)
-                    item_buy_logic.append(dataframe['cti_1h'] > -0.7)
-
-                # Condition #54 - 15m Semi swing. Uptrend. Local dip.
-                elif index == 54:
-                    # Non-Standard protections
-                    item_buy_logic.append(dataframe['ema_12_15m'] > dataframe['ema_200_15m'])
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ewo_15m'] > 7.4)
-                    item_buy_logic.append(dataframe['r_14_15m'] < -96.0)
-                    item_buy_logic.append(dataframe['r_96_15m'] < -94.0)
-                    item_buy_logic.append(dataframe['r_14'] < -96.0)
-
-                # Condition #55 - 15m. Semi swing. Uptrend. Local dip.
-                elif index == 55:
-                    # Non-Standard protections (add below)
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ewo_15m'] > 7.0)
-                    item_buy_logic.append(dataframe['close_15m'] > (dataframe['close_15m'].shift(3)))
-                    item_buy_logic.append(dataframe['close_15m'].shift(3) < (dataframe['bb20_2_low_15m'].shift(3) * 0.986))
-                    item_buy_logic.append(dataframe['r_14_15m'].shift(3) < -95.0)
-                    item_buy_logic.append(dataframe['r_96_15m'].shift(3) < -86.0)
-
-                # Condition #56 - 15m. Semi swing. Downtrend. Local dip.
-                elif index == 56:
-                    # Non-Standard protections (add below)
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ewo_15m'].shift(3) < -14.0)
-                    item_buy_logic.append(dataframe['cti_15m'].shift(3).rolling(15).max() < -0.9)
-                    item_buy_logic.append(dataframe['r_14_15m'].shift(3) < -90.0)
-
-                # Condition #57 - 15m. Semi swing. Strong uptrend. Local dip. BTC not downtrend.
-                elif index == 57:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ewo_15m'].shift(3) > 6.5)
-                    item_buy_logic.append(dataframe['close_15m'].shift(3) < (dataframe['sma_30_15m'].shift(3) * 0.988))
-                    item_buy_logic.append(dataframe['close_15m'].shift(3) < (dataframe['bb20_2_low_15m'].shift(3) * 0.996))
-                    item_buy_logic.append(dataframe['rsi_14_15m'].shift(3) < 31.2)
-                    item_buy_logic.append(dataframe['r_14_15m'].shift(3) < -94.0)
-                    item_buy_logic.append(dataframe['r_96_15m'].shift(3) < -80.0)
-                    item_buy_logic.append(dataframe['r_480_1h'] < -18.0)
-
-                # Condition #58 - Semi swing. Local dip.
-                elif index == 58:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['rmi_17'] < 49.0)
-                    item_buy_logic.append(dataframe['cci_25'] < -120.0)
-                    item_buy_logic.append(dataframe['srsi_fk'] < 32.0)
-                    item_buy_logic.append(dataframe['bb20_delta'] > 0.025)
-                    item_buy_logic.append(dataframe['bb20_width'] > 0.095)
-                    item_buy_logic.append(dataframe['close_delta'] > dataframe['close'] * 10.0 / 1000.0 )
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_3_low'] * 0.996))
-
-                # Condition #59 - Semi swing. Local dip.
-                elif index == 59:
-                    # Non-Standard protections
-
-                    # Logic
-                    item_buy_logic.append(dataframe['ema_100'] < (dataframe['ema_200'] * 1.054))
-                    item_buy_logic.append(dataframe['bb20_width'] > 0.34)
-                    item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_mid'] * 1.014))
-                    item_buy_logic.append(dataframe['volume_mean_12'] > (dataframe['volume_mean_24'] * 1.6))
-                    item_buy_logic.append(dataframe['cti'] < -0.115)
-                    item_buy_logic.append(dataframe['r_14'] < -45.0)
-
-                item_buy_logic.append(dataframe['volume'] > 0)
-                item_buy = reduce(lambda x, y: x & y, item_buy_logic)
-                dataframe.loc[item_buy, 'buy_tag'] += f"{index} "
+        if self.use_buy_condition_engine and (self.buy_condition_engine is None):
+            self.buy_condition_engine = self.compile_buy_conditions()
+
+        if self.buy_condition_engine is not None:
+            buy_tags = np.full(len(dataframe), '', dtype=object)
+            for index, item_buy in self.buy_condition_engine.evaluate(dataframe).items():
+                buy_tags[item_buy] += f"{index} "
                 conditions.append(item_buy)
+            dataframe.loc[:, 'buy_tag'] = buy_tags
 
-        if conditions:
-            dataframe.loc[:, 'buy'] = reduce(lambda x, y: x | y, conditions)
+            if conditions:
+                dataframe.loc[:, 'buy'] = np.logical_or.reduce(conditions)
+        else:
+            for index in self.buy_protection_params:
+                if self.buy_params[f"buy_condition_{index}_enable"]:
+                    item_buy = self.buy_condition(dataframe, index)
+                    dataframe.loc[item_buy, 'buy_tag'] += f"{index} "
+                    conditions.append(item_buy)
+
+            if conditions:
+                dataframe.loc[:, 'buy'] = reduce(lambda x, y: x | y, conditions)
+
+        tok = time.perf_counter()
+        log.debug(f"[{metadata['pair']}] populate_entry_trend took: {tok - tik:0.4f} seconds.")
+        if self.buy_condition_engine is not None:
+            log.debug(f"[{metadata['pair']}] Slowest buy conditions (total): {self.buy_condition_engine.timing_report()}")
 
         return dataframe
 
+    # Trace the enabled buy conditions into a BuyConditionEngine (once). If a condition uses something the engine
+    # does not support, then the conditions are evaluated with pandas instead
+    def compile_buy_conditions(self):
+        tik = time.perf_counter()
+        engine = BuyConditionEngine()
+        frame = engine.frame()
+        try:
+            for index in self.buy_protection_params:
+                if self.buy_params[f"buy_condition_{index}_enable"]:
+                    engine.add_condition(index, self.buy_condition(frame, index))
+        except Exception as e:
+            log.warning(f"Could not compile the buy conditions, using pandas instead: {e}")
+            self.use_buy_condition_engine = False
+            return None
+
+        tok = time.perf_counter()
+        log.info(f"Compiled {len(engine.conditions)} buy conditions ({len(engine.nodes)} unique expressions) in {tok - tik:0.4f} seconds.")
+        return engine
+
+    # The buy logic of condition #index. This is also traced with symbolic columns (see BuyConditionEngine), so only
+    # use column operations that BuyExpr supports, and &, | and ~ rather than and, or and not
+    def buy_condition(self, dataframe: DataFrame, index: int):
+        item_buy_protection_list = [True]
+        global_buy_protection_params = self.buy_protection_params[index]
+
+        # Standard protections - Common to every condition
+        # -----------------------------------------------------------------------------------------
+        if global_buy_protection_params["ema_fast"]:
+            item_buy_protection_list.append(dataframe[f"ema_{global_buy_protection_params['ema_fast_len']}"] > dataframe['ema_200'])
+        if global_buy_protection_params["ema_slow"]:
+            item_buy_protection_list.append(dataframe[f"ema_{global_buy_protection_params['ema_slow_len']}_1h"] > dataframe['ema_200_1h'])
+        if global_buy_protection_params["close_above_ema_fast"]:
+            item_buy_protection_list.append(dataframe['close'] > dataframe[f"ema_{global_buy_protection_params['close_above_ema_fast_len']}"])
+        if global_buy_protection_params["close_above_ema_slow"]:
+            item_buy_protection_list.append(dataframe['close'] > dataframe[f"ema_{global_buy_protection_params['close_above_ema_slow_len']}_1h"])
+        if global_buy_protection_params["sma200_rising"]:
+            item_buy_protection_list.append(dataframe['sma_200'] > dataframe['sma_200'].shift(int(global_buy_protection_params['sma200_rising_val'])))
+        if global_buy_protection_params["sma200_1h_rising"]:
+            item_buy_protection_list.append(dataframe['sma_200_1h'] > dataframe['sma_200_1h'].shift(int(global_buy_protection_params['sma200_1h_rising_val'])))
+        if global_buy_protection_params["safe_dips_threshold_0"] is not None:
+            item_buy_protection_list.append(dataframe['tpct_change_0'] < global_buy_protection_params["safe_dips_threshold_0"])
+        if global_buy_protection_params["safe_dips_threshold_2"] is not None:
+            item_buy_protection_list.append(dataframe['tpct_change_2'] < global_buy_protection_params["safe_dips_threshold_2"])
+        if global_buy_protection_params["safe_dips_threshold_12"] is not None:
+            item_buy_protection_list.append(dataframe['tpct_change_12'] < global_buy_protection_params["safe_dips_threshold_12"])
+        if global_buy_protection_params["safe_dips_threshold_144"] is not None:
+            item_buy_protection_list.append(dataframe['tpct_change_144'] < global_buy_protection_params["safe_dips_threshold_144"])
+        if global_buy_protection_params["safe_pump_6h_threshold"] is not None:
+            item_buy_protection_list.append(dataframe['hl_pct_change_6_1h'] < global_buy_protection_params["safe_pump_6h_threshold"])
+        if global_buy_protection_params["safe_pump_12h_threshold"] is not None:
+            item_buy_protection_list.append(dataframe['hl_pct_change_12_1h'] < global_buy_protection_params["safe_pump_12h_threshold"])
+        if global_buy_protection_params["safe_pump_24h_threshold"] is not None:
+            item_buy_protection_list.append(dataframe['hl_pct_change_24_1h'] < global_buy_protection_params["safe_pump_24h_threshold"])
+        if global_buy_protection_params["safe_pump_36h_threshold"] is not None:
+            item_buy_protection_list.append(dataframe['hl_pct_change_36_1h'] < global_buy_protection_params["safe_pump_36h_threshold"])
+        if global_buy_protection_params["safe_pump_48h_threshold"] is not None:
+            item_buy_protection_list.append(dataframe['hl_pct_change_48_1h'] < global_buy_protection_params["safe_pump_48h_threshold"])
+        if global_buy_protection_params['btc_1h_not_downtrend']:
+            item_buy_protection_list.append(dataframe['btc_not_downtrend_1h'])
+        if global_buy_protection_params['close_over_pivot_type'] != 'none':
+            item_buy_protection_list.append(dataframe['close'] > dataframe[f"{global_buy_protection_params['close_over_pivot_type']}_1d"] * global_buy_protection_params['close_over_pivot_offset'])
+        if global_buy_protection_params['close_under_pivot_type'] != 'none':
+            item_buy_protection_list.append(dataframe['close'] < dataframe[f"{global_buy_protection_params['close_under_pivot_type']}_1d"] * global_buy_protection_params['close_under_pivot_offset'])
+        if not self.config['runmode'].value in ('live', 'dry_run'):
+            if self.has_bt_agefilter:
+                item_buy_protection_list.append(dataframe['bt_agefilter_ok'])
+        else:
+            if self.has_downtime_protection:
+                item_buy_protection_list.append(dataframe['live_data_ok'])
+
+        # Buy conditions
+        # -----------------------------------------------------------------------------------------
+        item_buy_logic = []
+        item_buy_logic.append(reduce(lambda x, y: x & y, item_buy_protection_list))
+
+        # Condition #1 - Semi swing mode. Increase in the last candles & relative local dip.
+        if index == 1:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(((dataframe['close'] - dataframe['open'].rolling(12).min()) / dataframe['open'].rolling(12).min()) > 0.032)
+            item_buy_logic.append(dataframe['rsi_14'] < 36.0)
+            item_buy_logic.append(dataframe['r_14'] < -75.0)
+            item_buy_logic.append(dataframe['r_32'] < -75.0)
+            item_buy_logic.append(dataframe['mfi'] < 46.0)
+            item_buy_logic.append(dataframe['rsi_14_1h'] > 30.0)
+            item_buy_logic.append(dataframe['rsi_14_1h'] < 84.0)
+            item_buy_logic.append(dataframe['r_480_1h'] > -99.0)
+
+        # Condition #2 - Semi swing. Local dip.
+        elif index == 2:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['rsi_14'] < (dataframe['rsi_14_1h'] - 47.0))
+            item_buy_logic.append(dataframe['mfi'] < 46.0)
+            item_buy_logic.append(dataframe['cti'] < -0.8)
+            item_buy_logic.append(dataframe['r_14'] < -98.0)
+            item_buy_logic.append(dataframe['r_480'] > -95.0)
+            item_buy_logic.append(dataframe['cti_1h'] < 0.82)
+
+        # Condition #3 - Semi swing. Local dip.
+        elif index == 3:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['bb40_2_low'].shift().gt(0))
+            item_buy_logic.append(dataframe['bb40_2_delta'].gt(dataframe['close'] * 0.045))
+            item_buy_logic.append(dataframe['closedelta'].gt(dataframe['close'] * 0.02))
+            item_buy_logic.append(dataframe['tail'].lt(dataframe['bb40_2_delta'] * 0.24))
+            item_buy_logic.append(dataframe['close'].lt(dataframe['bb40_2_low'].shift()))
+            item_buy_logic.append(dataframe['close'].le(dataframe['close'].shift()))
+            item_buy_logic.append(dataframe['cti'] < -0.5)
+            item_buy_logic.append(dataframe['r_14'] < -90.0)
+            item_buy_logic.append(dataframe['r_96'] < -80.0)
+            item_buy_logic.append(dataframe['cti_1h'] < -0.75)
+            item_buy_logic.append(dataframe['r_480_1h'] < -30.0)
+
+        # Condition #4 - Semi swing. Local dip.
+        elif index == 4:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
+            item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.02))
+            item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.992))
+            item_buy_logic.append(dataframe['rsi_14'] > 30.0)
+            item_buy_logic.append(dataframe['mfi'] > 25.0)
+            item_buy_logic.append(dataframe['crsi_1h'] > 14.0)
+
+        # Condition #5 - Semi swing. Local dip. Uptrend.
+        elif index == 5:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
+            item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_75'] * 0.932)
+            item_buy_logic.append(dataframe['ewo'] > 3.4)
+            item_buy_logic.append(dataframe['cti'] < -0.93)
+            item_buy_logic.append(dataframe['r_14'] < -97.0)
+
+        # Condition #6 - Semi swing. Local dip.
+        elif index == 6:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_15'] * 0.937)
+            item_buy_logic.append(dataframe['crsi'] < 30.0)
+            item_buy_logic.append(dataframe['rsi_14'] < dataframe['rsi_14'].shift(1))
+            item_buy_logic.append(dataframe['rsi_14'] < 28.0)
+            item_buy_logic.append(dataframe['cti'] < -0.82)
+            item_buy_logic.append(dataframe['cci'] < -200.0)
+
+        # Condition #7 - Semi swing. Local dip.
+        elif index == 7:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_50_1h'] > dataframe['ema_100_1h'])
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_30'] * 0.94)
+            item_buy_logic.append(dataframe['close'] < dataframe['bb20_2_low'] * 0.984)
+            item_buy_logic.append(dataframe['cti'] < -0.8)
+            item_buy_logic.append(dataframe['r_14'] < -97.0)
+            item_buy_logic.append(dataframe['crsi'] > 8.0)
+            item_buy_logic.append(dataframe['cti_1h'] > -0.5)
+            item_buy_logic.append(dataframe['cti_1h'] < 0.85)
+
+        # Condition #8 - Semi swing. Local deeper dip. Uptrend.
+        elif index == 8:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_30'] * 0.927)
+            item_buy_logic.append(dataframe['ewo'] > 3.0)
+            item_buy_logic.append(dataframe['rsi_14'] < 32.0)
+            item_buy_logic.append(dataframe['cti'] < -0.9)
+            item_buy_logic.append(dataframe['r_14'] < -97.0)
+
+        # Condition #9 - Semi swing. Local dip. Downtrend.
+        elif index == 9:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_50_1h'] > dataframe['ema_100_1h'])
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_30'] * 0.99)
+            item_buy_logic.append(dataframe['cti'] < -0.92)
+            item_buy_logic.append(dataframe['ewo'] < -5.0)
+            item_buy_logic.append(dataframe['cti_1h'] < -0.88)
+            item_buy_logic.append(dataframe['crsi_1h'] > 20.0)
+
+        # Condition #10 - Semi swing. Local dip.
+        elif index == 10:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
+            item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.017))
+            item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.984))
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.965)
+            item_buy_logic.append(dataframe['cti'] < -0.85)
+
+        # Condition #11 - Semi swing. Local dip.
+        elif index == 11:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
+            item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.027))
+            item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.932)
+            item_buy_logic.append(dataframe['rsi_14'] < 25.0)
+
+        # Condition #12 - Semi swing. Local deeper dip. Uptrend.
+        elif index == 12:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.932)
+            item_buy_logic.append(dataframe['ewo'] > 0.1)
+            item_buy_logic.append(dataframe['rsi_14'] < 40.0)
+            item_buy_logic.append(dataframe['cti'] < -0.9)
+            item_buy_logic.append(dataframe['r_480_1h'] < -20.0)
+
+        # Condition #13 - Semi swing. Downtrend. Local dip.
+        elif index == 13:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.999)
+            item_buy_logic.append(dataframe['ewo'] < -5.7)
+            item_buy_logic.append(dataframe['cti'] < -0.97)
+            item_buy_logic.append(dataframe['crsi_1h'] > 12.0)
+
+        # Condition #14 - Semi swing. Strong uptrend. Local dip.
+        elif index == 14:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_100_1h'] > dataframe['ema_100_1h'].shift(12))
+            item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(36))
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_30'] * 0.98)
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.984))
+            item_buy_logic.append(dataframe['ewo'] > 7.8) # 4.0 7.8
+            item_buy_logic.append(dataframe['rsi_14'] < 32.0) # 36.0
+            item_buy_logic.append(dataframe['cti'] < -0.54)
+            item_buy_logic.append(dataframe['cti_1h'] > -0.5)
+
+        # Condition #15 - Semi swing. Uptrend. Local dip.
+        elif index == 15:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.986))
+            item_buy_logic.append(dataframe['ewo'] > 2.0)
+            item_buy_logic.append(dataframe['rsi_14'] < 28.5)
+            item_buy_logic.append(dataframe['cti'] < -0.75)
+            item_buy_logic.append(dataframe['rsi_14_1h'] < 80.0)
+            item_buy_logic.append(dataframe['cti_1h'] < 0.62)
+
+        # Condition #16 - Semi swing. Cross above.
+        elif index == 16:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_12_1h'].shift(12) < dataframe['ema_35_1h'].shift(12))
+            item_buy_logic.append(dataframe['ema_12_1h'] > dataframe['ema_35_1h'])
+            item_buy_logic.append(dataframe['cmf_1h'].shift(12) < 0.0)
+            item_buy_logic.append(dataframe['cmf_1h'] > 0.0)
+            item_buy_logic.append(dataframe['rsi_14'] < 50.0)
+            item_buy_logic.append(dataframe['cti'] < 0.5)
+            item_buy_logic.append(dataframe['rsi_14_1h'] > 70.0)
+
+        # Condition #17 - Semi swing. Deep buy.
+        elif index == 17:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['r_480'] < -99.0)
+            item_buy_logic.append(dataframe['r_14'] == -100.0)
+            item_buy_logic.append(dataframe['r_480_1h'] < -95.0)
+            item_buy_logic.append(dataframe['rsi_14_1h'] + dataframe['rsi_14'] < 40.0)
+
+        # Condition #18 - Semi swing. Local dip. BTC not negative.
+        elif index == 18:
+            # Non-Standard protections (add below)
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
+            item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
+            item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
+            item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.018))
+            item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.982))
+            item_buy_logic.append(dataframe['cti_1h'] > -0.5)
+
+        # Condition #19 - Semi swing. Uptrend. Local dip.  BTC not downtrend.
+        elif index == 19:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
+            item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
+            item_buy_logic.append(dataframe['bb40_2_low'].shift().gt(0))
+            item_buy_logic.append(dataframe['bb40_2_delta'].gt(dataframe['close'] * 0.045))
+            item_buy_logic.append(dataframe['closedelta'].gt(dataframe['close'] * 0.02))
+            item_buy_logic.append(dataframe['tail'].lt(dataframe['bb40_2_delta'] * 0.28))
+            item_buy_logic.append(dataframe['close'].lt(dataframe['bb40_2_low'].shift()))
+            item_buy_logic.append(dataframe['close'].le(dataframe['close'].shift()))
+            item_buy_logic.append(dataframe['cti'] < -0.9)
+            item_buy_logic.append(dataframe['cti_1h'] > -0.75)
+            item_buy_logic.append(dataframe['cti_1h'] < 0.25)
+
+        # Condition #20 - Semi swing. Uptrend. Local dip.
+        elif index == 20:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'].shift(1) < (dataframe['sma_15'].shift(1) * 0.942))
+            item_buy_logic.append(dataframe['close'] > (dataframe['open'].shift(1)))
+            item_buy_logic.append(dataframe['ewo'] > 4.8)
+            item_buy_logic.append(dataframe['cti'] < -0.9)
+            item_buy_logic.append(dataframe['r_14'].shift(1) < -97.0)
+
+        # Condition #21 - Semi swing. Deep local dip. Mild uptrend.
+        elif index == 21:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.941)
+            item_buy_logic.append(dataframe['ewo'] > 2.0)
+            item_buy_logic.append(dataframe['cti'] < -0.84)
+            item_buy_logic.append(dataframe['r_14'] < -97.0)
+            item_buy_logic.append(dataframe['r_96'] < -85.0)
+
+        # Condition #22 - Swing. Uptrend. Bounce from daily support level
+        elif index == 22:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['close_1h'] > dataframe['sup_level_1d'])
+            item_buy_logic.append(dataframe['close_1h'] < dataframe['sup_level_1d'] * 1.05)
+            item_buy_logic.append(dataframe['low_1h'] < dataframe['sup_level_1d'] * 0.99)
+            item_buy_logic.append(dataframe['close_1h'] < dataframe['res_level_1h'])
+            item_buy_logic.append(dataframe['res_level_1d'] > dataframe['sup_level_1d'])
+            item_buy_logic.append(dataframe['rsi_14'] < 40.0)
+            item_buy_logic.append(dataframe['rsi_14_1h'] > 48.0)
+
+            # Confirm uptrend - Heikin-Ashi
+            item_buy_logic.append(dataframe['open_sha_1d'] < dataframe['close_sha_1d'])
+            item_buy_logic.append(dataframe['open_sha_1d'].shift(288) < dataframe['close_sha_1d'].shift(288))
+            item_buy_logic.append(dataframe['pivot_1d'] > dataframe['pivot_1d'].shift(288) * 0.95)
+
+        # Condition #23 - Semi swing. Downtrend. Local dip.
+        elif index == 23:
+            # Non-Standard protections (add below)
+
+            # Logic
+            item_buy_logic.append(dataframe['ewo'].shift(1) < -6.4)
+            item_buy_logic.append(dataframe['cti'].shift(1).rolling(5).max() < -0.9)
+            item_buy_logic.append(dataframe['r_14'].shift(1) < -97.0)
+            item_buy_logic.append(dataframe['close'] > (dataframe['open'].shift(1)))
+            item_buy_logic.append(dataframe['crsi_1h'] > 2.0)
+
+        # Condition #24 - Semi swing. Uptrend. 1h uptrend. Local dip.
+        elif index == 24:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ewo'] > 4.8)
+            item_buy_logic.append(dataframe['r_14'] < -97.0)
+            item_buy_logic.append(dataframe['r_96'] < -97.0)
+            item_buy_logic.append(dataframe['ewo_1h'] > 2.8)
+            item_buy_logic.append(dataframe['cti_1h'] < 0.92)
+
+        # Condition #25 - Semi swing. CMF 1h cross.
+        elif index == 25:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_12_1h'].shift(12) < dataframe['ema_35_1h'].shift(12))
+            item_buy_logic.append(dataframe['ema_12_1h'] > dataframe['ema_35_1h'])
+            item_buy_logic.append(dataframe['cmf_1h'].shift(12) < 0.0)
+            item_buy_logic.append(dataframe['cmf_1h'] > 0.0)
+            item_buy_logic.append(dataframe['rsi_14'] < 48.0)
+            item_buy_logic.append(dataframe['rsi_14_1h'] > 66.9)
+
+        # Condition #26 - Semi swing. Local deep dip.
+        elif index == 26:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_20_1h'] > dataframe['ema_25_1h'])
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_15'] * 0.93)
+            item_buy_logic.append(dataframe['rsi_14'] > 25.0)
+            item_buy_logic.append(dataframe['cti'] < -0.9)
+
+        # Condition #27 - Semi swing. Local deep. Uptrend.
+        elif index == 27:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_75'] * 0.934)
+            item_buy_logic.append(dataframe['ewo'] > 6.4)
+            item_buy_logic.append(dataframe['rsi_14'] < 32.0)
+            item_buy_logic.append(dataframe['cti'] < -0.8)
+            item_buy_logic.append(dataframe['r_14'] < -96.0)
+
+        # Condition #28 - Semi swing. Downtrend. Local deep.
+        elif index == 28:
+            # Non-Standard protections (add below)
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['sma_75'] * 0.96)
+            item_buy_logic.append(dataframe['ewo'] < -8.0)
+            item_buy_logic.append(dataframe['cti'] < -0.9)
+            item_buy_logic.append(dataframe['r_14'] < -97.0)
+            item_buy_logic.append(dataframe['crsi_1h'] > 14.0)
+
+        # Condition #29 - Semi swing. Downtrend. Local deep.
+        elif index == 29:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < (dataframe['ema_16'] * 0.982))
+            item_buy_logic.append(dataframe['ewo'] < -16.0)
+            item_buy_logic.append(dataframe['cti'] < -0.75)
+
+        # Condition #30 - Semi swing. Local dip. BTC not downtrend.
+        elif index == 30:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
+            item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.02))
+            item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.98))
+
+        # Condition #31 - Long mode. Local dip.
+        elif index == 31:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['bb40_2_low'].shift().gt(0))
+            item_buy_logic.append(dataframe['bb40_2_delta'].gt(dataframe['close'] * 0.045))
+            item_buy_logic.append(dataframe['closedelta'].gt(dataframe['close'] * 0.028))
+            item_buy_logic.append(dataframe['tail'].lt(dataframe['bb40_2_delta'] * 0.25))
+            item_buy_logic.append(dataframe['close'].lt(dataframe['bb40_2_low'].shift()))
+            item_buy_logic.append(dataframe['close'].le(dataframe['close'].shift()))
+            item_buy_logic.append(dataframe['cti'] < -0.9)
+            item_buy_logic.append(dataframe['crsi_1h'] > 10.0)
+
+        # Condition #32 - Long mode. Local dip.
+        elif index == 32:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
+            item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.046))
+            item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
+            item_buy_logic.append(dataframe['cti'] < -0.9)
+            item_buy_logic.append(dataframe['r_480_1h'] < -5.0)
+
+        # Condition #33 - Long mode. Local dip. Uptrend.
+        elif index == 33:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < (dataframe['ema_16'] * 0.934))
+            item_buy_logic.append(dataframe['ewo'] > 2.5)
+            item_buy_logic.append(dataframe['rsi_14'] < 46.0)
+            item_buy_logic.append(dataframe['r_14'] < -97.0)
+            item_buy_logic.append(dataframe['ewo_1h'] > 0.1)
+
+        # Condition #34 - Long mode. Local dip.
+        elif index == 34:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_50'])
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.972))
+            item_buy_logic.append(dataframe['cti'] < -0.8)
+            item_buy_logic.append(dataframe['rsi_14'] < 18.0)
+
+        # Condition #35 - Long mode. Local deep dip.
+        elif index == 35:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_25'] * 0.85)
+            item_buy_logic.append(dataframe['close'] > dataframe['open'])
+            item_buy_logic.append(dataframe['rsi_14'] < 46.0)
+            item_buy_logic.append(dataframe['mfi'] < 36.0)
+            item_buy_logic.append(dataframe['cti_1h'] > -0.85)
+
+        # Condition #36 - Long mode. Uptrend. Local dip.
+        elif index == 36:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(36) * 1.035))
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.956)
+            item_buy_logic.append(dataframe['rsi_14'] < 34.0)
+            item_buy_logic.append(dataframe['r_64'] < -80.0)
+            item_buy_logic.append(dataframe['cti'] < -0.5)
+            item_buy_logic.append(dataframe['r_480_1h'] < -30.0)
+
+        # Condition #37 - Semi swing. Uptrend. Local dip.
+        elif index == 37:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(12) * 1.01))
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_low'] * 0.986))
+            item_buy_logic.append(dataframe['r_14'] < -75.0)
+            item_buy_logic.append(dataframe['r_64'] < -75.0)
+            item_buy_logic.append(dataframe['cmf_1h'] < 0.25)
+
+        # Condition #38 - Semi swing. Uptrend. Local dip.
+        elif index == 38:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(12) * 1.01))
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26'] > dataframe['ema_12'])
+            item_buy_logic.append((dataframe['ema_26'] - dataframe['ema_12']) > (dataframe['open'] * 0.02))
+            item_buy_logic.append((dataframe['ema_26'].shift() - dataframe['ema_12'].shift()) > (dataframe['open'] / 100))
+            item_buy_logic.append(dataframe['mfi'] < 34.5)
+            item_buy_logic.append(dataframe['r_64'] < -65.0)
+            item_buy_logic.append(dataframe['r_96'] < -50.0)
+            item_buy_logic.append(dataframe['r_480_1h'] < -1.0)
+
+        # Condition #39 - Semi swing. Uptrend. Local dip.
+        elif index == 39:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(12) * 1.01))
+            item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(48) * 1.07))
+
+            # Logic
+            item_buy_logic.append(dataframe['bb40_2_low'].shift().gt(0))
+            item_buy_logic.append(dataframe['bb40_2_delta'].gt(dataframe['close'] * 0.056))
+            item_buy_logic.append(dataframe['closedelta'].gt(dataframe['close'] * 0.01))
+            item_buy_logic.append(dataframe['tail'].lt(dataframe['bb40_2_delta'] * 0.5))
+            item_buy_logic.append(dataframe['close'].lt(dataframe['bb40_2_low'].shift()))
+            item_buy_logic.append(dataframe['close'].le(dataframe['close'].shift()))
+            item_buy_logic.append(dataframe['close'] > dataframe['ema_50'] * 0.925)
+
+        # Condition #40 - Semi swing. Uptrend. Local dip.
+        elif index == 40:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_200'] > (dataframe['ema_200'].shift(12) * 1.01))
+
+            # Logic
+            item_buy_logic.append(dataframe['close'] < dataframe['ema_20'] * 0.97)
+            item_buy_logic.append(dataframe['rsi_14'] < 32.0)
+            item_buy_logic.append(dataframe['r_14'] < -90.0)
+            item_buy_logic.append(dataframe['r_64'] < -80.0)
+
+        # Condition #41 - 15m. Semi swing. Local dip. BTC not downtrend.
+        elif index == 41:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_12_15m'] > dataframe['ema_200_1h'])
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
+            item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.03))
+            item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
+            item_buy_logic.append(dataframe['close_15m'] < (dataframe['bb20_2_low_15m'] * 0.99))
+
+        # Condition #42 - 15m. Semi swing. Local dip. 15m uptrend.
+        elif index == 42:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ewo_15m'] > 5.4)
+            item_buy_logic.append(dataframe['rsi_14_15m'] < 36.0)
+            item_buy_logic.append(dataframe['cti_15m'] < -0.9)
+            item_buy_logic.append(dataframe['cci_15m'] < -160.0)
+            item_buy_logic.append(dataframe['r_14_15m'] < -90.0)
+            item_buy_logic.append(dataframe['cti_1h'] < 0.5)
+
+        # Condition #43 - 15m. Semi swing. Local dip. 1h uptrend.
+        elif index == 43:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['bb40_2_low_15m'].shift().gt(0))
+            item_buy_logic.append(dataframe['bb40_2_delta_15m'].gt(dataframe['close_15m'] * 0.045))
+            item_buy_logic.append(dataframe['closedelta_15m'].gt(dataframe['close_15m'] * 0.034))
+            item_buy_logic.append(dataframe['tail_15m'].lt(dataframe['bb40_2_delta_15m'] * 0.18))
+            item_buy_logic.append(dataframe['close_15m'].lt(dataframe['bb40_2_low_15m'].shift()))
+            item_buy_logic.append(dataframe['close_15m'].le(dataframe['close_15m'].shift()))
+            item_buy_logic.append(dataframe['rsi_14_15m'] < 30.0)
+            item_buy_logic.append(dataframe['cti_15m'] < -0.85)
+            item_buy_logic.append(dataframe['r_64_15m'] < -70.0)
+
+        # Condition #44 - 15m. Semi swing. Local deeper dip. 15m uptrend.
+        elif index == 44:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_200_15m'] > (dataframe['ema_200_15m'].shift(36) * 1.01))
+
+            # Logic
+            item_buy_logic.append(dataframe['close_15m'] < dataframe['ema_26_15m'] * 0.942)
+            item_buy_logic.append(dataframe['rsi_14_15m'] < 28.0)
+            item_buy_logic.append(dataframe['r_14_15m'] < -96.0)
+
+        # Condition #45 - 15m. Semi swing. Local deeper dip. 15m uptrend.
+        elif index == 45:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_50_15m'] > dataframe['ema_200_1h'])
+
+            # Logic
+            item_buy_logic.append(dataframe['close_15m'] < dataframe['ema_20_15m'] * 0.934)
+            item_buy_logic.append(dataframe['ewo_15m'] > 3.6)
+            item_buy_logic.append(dataframe['cci_15m'] < -190.0)
+            item_buy_logic.append(dataframe['r_14_15m'] < -97.0)
+            item_buy_logic.append((dataframe['rsi_14_1h'] + dataframe['rsi_14_15m']) < 70.0)
+
+        # Condition #46 - 15m. Semi swing. 1h uptrend.
+        elif index == 46:
+            # Non-Standard protections (add below)
+            item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
+            item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
+            item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.027))
+            item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
+            item_buy_logic.append(dataframe['close_15m'] < (dataframe['bb20_2_low_15m'] * 0.982))
+            item_buy_logic.append(dataframe['r_14'] < -75.0)
+            item_buy_logic.append(dataframe['crsi_1h'] > 14.0)
+
+        # Condition #47 - 15m. Semi swing. Local dip. 1h minor dip.
+        elif index == 47:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['rsi_14_15m'] < dataframe['rsi_14_15m'].shift(3))
+            item_buy_logic.append(dataframe['ema_20_1h'] > dataframe['ema_25_1h'])
+            item_buy_logic.append(dataframe['close_15m'] < (dataframe['sma_15_15m'] * 0.95))
+            item_buy_logic.append(
+                ((dataframe['open_15m'] < dataframe['ema_20_1h']) & (dataframe['low_15m'] < dataframe['ema_20_1h'])) |
+                ((dataframe['open_15m'] > dataframe['ema_20_1h']) & (dataframe['low_15m'] > dataframe['ema_20_1h'])))
+            item_buy_logic.append(dataframe['cti_15m'] < -0.9)
+            item_buy_logic.append(dataframe['r_14_15m'] < -90.0)
+            item_buy_logic.append(dataframe['r_14'] < -97.0)
+            item_buy_logic.append(dataframe['cti_1h'] < 0.1)
+            item_buy_logic.append(dataframe['crsi_1h'] > 8.0)
+
+        # Condition #48 - 15m. Semi swing. Local deep. 15m uptrend.
+        elif index == 48:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close_15m'].shift(3) < (dataframe['sma_15_15m'].shift(3) * 0.95))
+            item_buy_logic.append(dataframe['close_15m'] > (dataframe['open_15m'].shift(3)))
+            item_buy_logic.append(dataframe['ewo_15m'] > 2.8)
+            item_buy_logic.append(dataframe['cti_15m'] < -0.75)
+            item_buy_logic.append(dataframe['r_14_15m'].shift(3) < -94.0)
+            item_buy_logic.append(dataframe['cti'] < -0.5)
+            item_buy_logic.append(dataframe['cti_1h'] < 0.1)
+            item_buy_logic.append(dataframe['crsi_1h'] > 18.0)
+
+        # Condition #49 - 15m. Semi swing. Local deeper dip.
+        elif index == 49:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
+            item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.032))
+            item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
+            item_buy_logic.append(dataframe['close_15m'] < dataframe['ema_20_15m'] * 0.928)
+            item_buy_logic.append(dataframe['rsi_14_15m'] < 28.0)
+            item_buy_logic.append(dataframe['crsi_15m'] > 18.0)
+
+        # Condition #50 - 15m. Semi swing. Deep local dip. Mild 15m uptrend.
+        elif index == 50:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close_15m'] < dataframe['ema_20_15m'] * 0.932)
+            item_buy_logic.append(dataframe['ewo_15m'] > 1.8)
+            item_buy_logic.append(dataframe['cti_15m'] < -0.9)
+            item_buy_logic.append(dataframe['r_14_15m'] < -96.0)
+            item_buy_logic.append(dataframe['r_96_15m'] < -75.0)
+            item_buy_logic.append(dataframe['rsi_14'] < 32.0)
+            item_buy_logic.append(dataframe['r_14_15m'] < -97.0)
+
+        # Condition #51 - 15m. Semi swing. Downtrend. Dip.
+        elif index == 51:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['close_15m'] < (dataframe['ema_16_15m'] * 0.944))
+            item_buy_logic.append(dataframe['ewo_15m'] < -1.0)
+            item_buy_logic.append(dataframe['rsi_14_15m'] > 28.0)
+            item_buy_logic.append(dataframe['cti_15m'] < -0.84)
+            item_buy_logic.append(dataframe['r_14_15m'] < -94.0)
+            item_buy_logic.append(dataframe['rsi_14'] > 30.0)
+            item_buy_logic.append(dataframe['crsi_1h'] > 1.0)
+
+        # Condition #52 - 15m Semi swing. Local dip. BTC not downtrend.
+        elif index == 52:
+            # Non-Standard protections (add below)
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
+            item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.032))
+            item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
+            item_buy_logic.append(dataframe['close_15m'] < (dataframe['bb20_2_low_15m'] * 0.998))
+            item_buy_logic.append(dataframe['crsi_1h'] > 10.0)
+
+        # Condition #53 - 15m. Semi swing. BTC not negative. Local dip.
+        elif index == 53:
+            # Non-Standard protections (add below)
+            item_buy_logic.append(dataframe['ema_200_1h'] > dataframe['ema_200_1h'].shift(12))
+            item_buy_logic.append(dataframe['ema_200_1h'].shift(12) > dataframe['ema_200_1h'].shift(24))
+            item_buy_logic.append(dataframe['ema_200_1h'].shift(24) > dataframe['ema_200_1h'].shift(36))
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_26_15m'] > dataframe['ema_12_15m'])
+            item_buy_logic.append((dataframe['ema_26_15m'] - dataframe['ema_12_15m']) > (dataframe['open_15m'] * 0.02))
+            item_buy_logic.append((dataframe['ema_26_15m'].shift(3) - dataframe['ema_12_15m'].shift(3)) > (dataframe['open_15m'] / 100))
+            item_buy_logic.append(dataframe['close_15m'] < (dataframe['bb20_2_low_15m'] * 0.99))
+            item_buy_logic.append(dataframe['r_14'] < -90.0)
+            item_buy_logic.append(dataframe['cti_1h'] > -0.7)
+
+        # Condition #54 - 15m Semi swing. Uptrend. Local dip.
+        elif index == 54:
+            # Non-Standard protections
+            item_buy_logic.append(dataframe['ema_12_15m'] > dataframe['ema_200_15m'])
+
+            # Logic
+            item_buy_logic.append(dataframe['ewo_15m'] > 7.4)
+            item_buy_logic.append(dataframe['r_14_15m'] < -96.0)
+            item_buy_logic.append(dataframe['r_96_15m'] < -94.0)
+            item_buy_logic.append(dataframe['r_14'] < -96.0)
+
+        # Condition #55 - 15m. Semi swing. Uptrend. Local dip.
+        elif index == 55:
+            # Non-Standard protections (add below)
+
+            # Logic
+            item_buy_logic.append(dataframe['ewo_15m'] > 7.0)
+            item_buy_logic.append(dataframe['close_15m'] > (dataframe['close_15m'].shift(3)))
+            item_buy_logic.append(dataframe['close_15m'].shift(3) < (dataframe['bb20_2_low_15m'].shift(3) * 0.986))
+            item_buy_logic.append(dataframe['r_14_15m'].shift(3) < -95.0)
+            item_buy_logic.append(dataframe['r_96_15m'].shift(3) < -86.0)
+
+        # Condition #56 - 15m. Semi swing. Downtrend. Local dip.
+        elif index == 56:
+            # Non-Standard protections (add below)
+
+            # Logic
+            item_buy_logic.append(dataframe['ewo_15m'].shift(3) < -14.0)
+            item_buy_logic.append(dataframe['cti_15m'].shift(3).rolling(15).max() < -0.9)
+            item_buy_logic.append(dataframe['r_14_15m'].shift(3) < -90.0)
+
+        # Condition #57 - 15m. Semi swing. Strong uptrend. Local dip. BTC not downtrend.
+        elif index == 57:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ewo_15m'].shift(3) > 6.5)
+            item_buy_logic.append(dataframe['close_15m'].shift(3) < (dataframe['sma_30_15m'].shift(3) * 0.988))
+            item_buy_logic.append(dataframe['close_15m'].shift(3) < (dataframe['bb20_2_low_15m'].shift(3) * 0.996))
+            item_buy_logic.append(dataframe['rsi_14_15m'].shift(3) < 31.2)
+            item_buy_logic.append(dataframe['r_14_15m'].shift(3) < -94.0)
+            item_buy_logic.append(dataframe['r_96_15m'].shift(3) < -80.0)
+            item_buy_logic.append(dataframe['r_480_1h'] < -18.0)
+
+        # Condition #58 - Semi swing. Local dip.
+        elif index == 58:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['rmi_17'] < 49.0)
+            item_buy_logic.append(dataframe['cci_25'] < -120.0)
+            item_buy_logic.append(dataframe['srsi_fk'] < 32.0)
+            item_buy_logic.append(dataframe['bb20_delta'] > 0.025)
+            item_buy_logic.append(dataframe['bb20_width'] > 0.095)
+            item_buy_logic.append(dataframe['close_delta'] > dataframe['close'] * 10.0 / 1000.0 )
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_3_low'] * 0.996))
+
+        # Condition #59 - Semi swing. Local dip.
+        elif index == 59:
+            # Non-Standard protections
+
+            # Logic
+            item_buy_logic.append(dataframe['ema_100'] < (dataframe['ema_200'] * 1.054))
+            item_buy_logic.append(dataframe['bb20_width'] > 0.34)
+            item_buy_logic.append(dataframe['close'] < (dataframe['bb20_2_mid'] * 1.014))
+            item_buy_logic.append(dataframe['volume_mean_12'] > (dataframe['volume_mean_24'] * 1.6))
+            item_buy_logic.append(dataframe['cti'] < -0.115)
+            item_buy_logic.append(dataframe['r_14'] < -45.0)
+
+        item_buy_logic.append(dataframe['volume'] > 0)
+        return reduce(lambda x, y: x & y, item_buy_logic)
+
     def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe.loc[:, 'sell'] = 0
 
+        if self.precompute_sell_signals:
+            self.precompute_sells(dataframe, metadata)
+
         return dataframe
 
     def confirm_trade_entry(self, pair: str, order_type: str, amount: float, rate: float,
                             time_in_force: str, current_time: datetime, **kwargs) -> bool:
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+        dataframe, last_updated = self.dp.get_analyzed_dataframe(pair, self.timeframe)
 
         if(len(dataframe) < 1):
             return False
 
-        dataframe = dataframe.iloc[-1].squeeze()
+        dataframe = self.candle_cache.get_row(pair, dataframe, last_updated)
 
         if ((rate > dataframe['close'])):
             slippage = ((rate / dataframe['close']) - 1.0)
@@ -8070,6 +8269,547 @@ def heikin_ashi(dataframe, smooth_inputs = False, smooth_outputs = False, length
     else:
         return open_ha, close_ha, low_ha
 
+# Buy condition engine
+#
+# The buy conditions (NostalgiaForInfinityX.buy_condition()) are traced once, using symbolic columns (BuyExpr)
+# instead of Series. That gives an expression graph in which identical sub-expressions (columns, shifts, comparisons,
+# arithmetic) are shared, so for each dataframe every one of them is only calculated once, in NumPy, no matter how
+# many conditions use it.
+# Each condition is the AND of its terms (protections and logic), which are evaluated in order, stopping as soon as
+# there are no candles left. Once only a few candles are left (sparse_fraction), the remaining terms are only evaluated
+# for those candles.
+class BuyConditionEngine:
+
+    def __init__(self):
+        self.nodes = []  # node id -> (op, arg, children)
+        self.node_ids = {}  # (op, arg, children) -> node id
+        self.conditions = {}  # condition index -> list of term node ids
+        self.timings = {}  # condition index -> total evaluation time (seconds)
+        self.calls = 0
+        self.sparse_fraction = 0.25
+
+    def node(self, op: str, arg=None, children=()) -> 'BuyExpr':
+        key = (op, arg, tuple(children))
+        node_id = self.node_ids.get(key)
+        if node_id is None:
+            node_id = len(self.nodes)
+            self.nodes.append(key)
+            self.node_ids[key] = node_id
+        return BuyExpr(self, node_id)
+
+    def as_node_id(self, value) -> int:
+        if isinstance(value, BuyExpr):
+            return value.node_id
+        if isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating)):
+            return self.node('const', (type(value).__name__, value)).node_id
+        raise TypeError(f"Unsupported value in buy condition: {value!r}")
+
+    def frame(self) -> 'BuySymbolicFrame':
+        return BuySymbolicFrame(self)
+
+    # add a (traced) condition, split into the terms that are ANDed together
+    def add_condition(self, index, expr):
+        terms = []
+        self.and_terms(self.as_node_id(expr), terms)
+        self.conditions[index] = terms
+
+    def and_terms(self, node_id: int, terms: list):
+        op, arg, children = self.nodes[node_id]
+        if op == 'and':
+            for child in children:
+                self.and_terms(child, terms)
+        elif node_id not in terms:
+            terms.append(node_id)
+
+    # returns {condition index: boolean array}, for the enabled conditions
+    def evaluate(self, dataframe: DataFrame) -> dict:
+        length = len(dataframe)
+        values = {}
+        results = {}
+        with np.errstate(all='ignore'):
+            for index, terms in self.conditions.items():
+                tik = time.perf_counter()
+                mask = np.ones(length, dtype=bool)
+                rows = None  # candles still left, once there are only a few
+                for term in terms:
+                    if rows is None:
+                        mask = mask & self.as_mask(self.value(term, dataframe, values), length)
+                        count = np.count_nonzero(mask)
+                        if count == 0:
+                            break
+                        if count < length * self.sparse_fraction:
+                            rows = np.flatnonzero(mask)
+                    else:
+                        rows = rows[self.as_mask(self.value_at(term, rows, dataframe, values), len(rows))]
+                        if len(rows) == 0:
+                            break
+                if rows is not None:
+                    mask = np.zeros(length, dtype=bool)
+                    mask[rows] = True
+                results[index] = mask
+                self.timings[index] = self.timings.get(index, 0.0) + (time.perf_counter() - tik)
+        self.calls += 1
+        return results
+
+    # the conditions that have taken the longest (total over all calls)
+    def timing_report(self, count: int = 10) -> str:
+        slowest = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:count]
+        return ", ".join(f"#{index}: {timing:0.4f}s" for index, timing in slowest)
+
+    def as_mask(self, value, length: int) -> np.ndarray:
+        if isinstance(value, np.ndarray):
+            if value.dtype == bool:
+                return value
+            # e.g. object columns (bool with NaN): NaN is False, same as pandas
+            return value == True
+        return np.full(length, bool(value))
+
+    def value(self, node_id: int, dataframe: DataFrame, values: dict):
+        if node_id in values:
+            return values[node_id]
+
+        op, arg, children = self.nodes[node_id]
+        args = [self.value(child, dataframe, values) for child in children]
+
+        if op == 'const':
+            result = arg[1]
+        elif op == 'column':
+            result = dataframe[arg].to_numpy()
+        elif op == 'shift':
+            result = self.shift(args[0], arg, len(dataframe))
+        elif op == 'rolling':
+            result = getattr(Series(args[0]).rolling(arg[1]), arg[0])().to_numpy()
+        elif op == 'and':
+            result = self.as_mask(args[0], len(dataframe)) & self.as_mask(args[1], len(dataframe))
+        elif op == 'or':
+            result = self.as_mask(args[0], len(dataframe)) | self.as_mask(args[1], len(dataframe))
+        elif op == 'invert':
+            result = ~self.as_mask(args[0], len(dataframe))
+        elif op == 'neg':
+            result = -args[0]
+        elif op == 'abs':
+            result = np.abs(args[0])
+        else:
+            result = self.binary_ops[op](args[0], args[1])
+
+        values[node_id] = result
+        return result
+
+    # value of a node for some of the candles (rows). Element-wise operations are only calculated for those candles,
+    # anything else (columns, shift, rolling) is calculated in full (and shared), then indexed
+    def value_at(self, node_id: int, rows: np.ndarray, dataframe: DataFrame, values: dict):
+        op, arg, children = self.nodes[node_id]
+        if op == 'const':
+            return arg[1]
+        if (node_id in values) or (op in ('column', 'shift', 'rolling')):
+            value = self.value(node_id, dataframe, values)
+            return value[rows] if isinstance(value, np.ndarray) else value
+
+        args = [self.value_at(child, rows, dataframe, values) for child in children]
+        if op == 'and':
+            return self.as_mask(args[0], len(rows)) & self.as_mask(args[1], len(rows))
+        elif op == 'or':
+            return self.as_mask(args[0], len(rows)) | self.as_mask(args[1], len(rows))
+        elif op == 'invert':
+            return ~self.as_mask(args[0], len(rows))
+        elif op == 'neg':
+            return -args[0]
+        elif op == 'abs':
+            return np.abs(args[0])
+        return self.binary_ops[op](args[0], args[1])
+
+    # same as Series.shift() (integer and bool values become float, with NaN for the missing values)
+    def shift(self, values, periods: int, length: int):
+        if not isinstance(values, np.ndarray):
+            values = np.full(length, values)
+        if values.dtype.kind in 'biu':
+            values = values.astype(float)
+        result = np.empty_like(values)
+        periods = max(-length, min(length, periods))
+        if periods > 0:
+            result[:periods] = np.nan
+            result[periods:] = values[:length - periods]
+        elif periods < 0:
+            result[periods:] = np.nan
+            result[:periods] = values[-periods:]
+        else:
+            result[:] = values
+        return result
+
+    binary_ops = {
+        'add': np.add,
+        'sub': np.subtract,
+        'mul': np.multiply,
+        'truediv': np.true_divide,
+        'gt': np.greater,
+        'lt': np.less,
+        'ge': np.greater_equal,
+        'le': np.less_equal,
+        'eq': np.equal,
+        'ne': np.not_equal
+    }
+
+
+# Symbolic column (or expression of columns) used to trace the buy conditions. Supports the Series operations used
+# in buy_condition(): arithmetic, comparisons, &, |, ~, shift() and rolling().min()/max()/mean()/sum()
+class BuyExpr:
+
+    def __init__(self, engine: BuyConditionEngine, node_id: int):
+        self.engine = engine
+        self.node_id = node_id
+
+    def binary(self, op: str, other, reverse: bool = False) -> 'BuyExpr':
+        other_id = self.engine.as_node_id(other)
+        children = (other_id, self.node_id) if reverse else (self.node_id, other_id)
+        return self.engine.node(op, None, children)
+
+    def logical(self, op: str, other) -> 'BuyExpr':
+        # True & x (the start of the protection list) is just x, as is False | x
+        if isinstance(other, (bool, np.bool_)) and (bool(other) == (op == 'and')):
+            return self
+        return self.engine.node(op, None, (self.node_id, self.engine.as_node_id(other)))
+
+    def __add__(self, other): return self.binary('add', other)
+    def __radd__(self, other): return self.binary('add', other, True)
+    def __sub__(self, other): return self.binary('sub', other)
+    def __rsub__(self, other): return self.binary('sub', other, True)
+    def __mul__(self, other): return self.binary('mul', other)
+    def __rmul__(self, other): return self.binary('mul', other, True)
+    def __truediv__(self, other): return self.binary('truediv', other)
+    def __rtruediv__(self, other): return self.binary('truediv', other, True)
+    def __gt__(self, other): return self.binary('gt', other)
+    def __lt__(self, other): return self.binary('lt', other)
+    def __ge__(self, other): return self.binary('ge', other)
+    def __le__(self, other): return self.binary('le', other)
+    def __eq__(self, other): return self.binary('eq', other)
+    def __ne__(self, other): return self.binary('ne', other)
+    def __and__(self, other): return self.logical('and', other)
+    def __rand__(self, other): return self.logical('and', other)
+    def __or__(self, other): return self.logical('or', other)
+    def __ror__(self, other): return self.logical('or', other)
+    def __invert__(self): return self.engine.node('invert', None, (self.node_id,))
+    def __neg__(self): return self.engine.node('neg', None, (self.node_id,))
+    def __abs__(self): return self.engine.node('abs', None, (self.node_id,))
+
+    def gt(self, other): return self.binary('gt', other)
+    def lt(self, other): return self.binary('lt', other)
+    def ge(self, other): return self.binary('ge', other)
+    def le(self, other): return self.binary('le', other)
+    def eq(self, other): return self.binary('eq', other)
+    def ne(self, other): return self.binary('ne', other)
+    def abs(self): return self.__abs__()
+
+    def shift(self, periods: int = 1) -> 'BuyExpr':
+        return self.engine.node('shift', int(periods), (self.node_id,))
+
+    def rolling(self, window: int) -> 'BuyRolling':
+        return BuyRolling(self, int(window))
+
+    __hash__ = None
+
+    def __bool__(self):
+        raise TypeError("A buy condition column can't be used as a bool (use &, | and ~ instead of and, or and not)")
+
+
+class BuyRolling:
+
+    def __init__(self, expr: BuyExpr, window: int):
+        self.expr = expr
+        self.window = window
+
+    def aggregate(self, func: str) -> BuyExpr:
+        return self.expr.engine.node('rolling', (func, self.window), (self.expr.node_id,))
+
+    def min(self): return self.aggregate('min')
+    def max(self): return self.aggregate('max')
+    def mean(self): return self.aggregate('mean')
+    def sum(self): return self.aggregate('sum')
+
+
+# stands in for the dataframe when tracing the buy conditions
+class BuySymbolicFrame:
+
+    def __init__(self, engine: BuyConditionEngine):
+        self.engine = engine
+
+    def __getitem__(self, column: str) -> BuyExpr:
+        return self.engine.node('column', column)
+
+
+# Precomputed sell functions
+#
+# Most of the sell functions (sell_over_main, sell_r, sell_dec_main...) only depend on the last candle and on
+# current_profit, and current_profit is only ever compared with constants. So the result only depends on the candle and
+# on which 'band' (between, or equal to, those constants) the profit is in.
+# SellSignalProgram compiles such a function (from its source) so that it can be evaluated for a whole dataframe with
+# NumPy, once for each profit band. custom_exit then just has to look up the result for the candle and band.
+class SellSignalProgram:
+
+    def __init__(self, func):
+        self.name = func.__name__
+        tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+        self.function = tree.body[0]
+        self.profit_nodes = set()  # ids of nodes that depend on current_profit
+        self.signal_names = [None]  # code -> signal name (0 is no sell)
+        self.signal_codes = {}
+
+        thresholds = set()
+        self.check_statements(self.function.body, thresholds)
+        self.thresholds = np.array(sorted(thresholds), dtype=float)
+
+        # one profit value for each band: below the first threshold, each threshold, between each pair of thresholds
+        # and above the last one
+        self.band_profits = []
+        for i in range(len(self.thresholds) + 1):
+            if len(self.thresholds) == 0:
+                self.band_profits.append(0.0)
+            elif i == 0:
+                self.band_profits.append(self.thresholds[0] - 1.0)
+            elif i == len(self.thresholds):
+                self.band_profits.append(self.thresholds[-1] + 1.0)
+            else:
+                self.band_profits.append((self.thresholds[i - 1] + self.thresholds[i]) / 2.0)
+            if i < len(self.thresholds):
+                self.band_profits.append(self.thresholds[i])
+
+        self.code_dtype = np.uint8 if len(self.signal_names) < 256 else np.uint16
+
+    # check that the function only uses what can be evaluated here, and collect the profit thresholds & signal names
+    def check_statements(self, statements, thresholds: set):
+        for statement in statements:
+            if isinstance(statement, ast.If):
+                self.check_expression(statement.test, thresholds)
+                self.check_statements(statement.body, thresholds)
+                self.check_statements(statement.orelse, thresholds)
+            elif isinstance(statement, ast.Return):
+                sell, signal_name = ast.literal_eval(statement.value)
+                if sell and (signal_name is not None) and (signal_name not in self.signal_codes):
+                    self.signal_codes[signal_name] = len(self.signal_names)
+                    self.signal_names.append(signal_name)
+            elif isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant):
+                pass  # docstring
+            else:
+                raise ValueError(f"{self.name}: unsupported statement at line {statement.lineno}")
+
+    # returns True if the expression depends on current_profit
+    def check_expression(self, node, thresholds: set) -> bool:
+        uses_profit = False
+        if isinstance(node, ast.Compare):
+            if not all(type(op) in self.compare_ops for op in node.ops):
+                raise ValueError(f"{self.name}: unsupported comparison at line {node.lineno}")
+            operands = [node.left] + node.comparators
+            profit_compare = any(isinstance(op, ast.Name) and op.id == 'current_profit' for op in operands)
+            for op in operands:
+                if profit_compare:
+                    if isinstance(op, ast.Name) and op.id == 'current_profit':
+                        self.profit_nodes.add(id(op))
+                        continue
+                    # current_profit can only be compared with constants
+                    thresholds.add(float(ast.literal_eval(op)))
+                else:
+                    uses_profit |= self.check_expression(op, thresholds)
+            uses_profit |= profit_compare
+        elif isinstance(node, ast.Name):
+            if node.id == 'current_profit':
+                raise ValueError(f"{self.name}: current_profit used outside of a comparison at line {node.lineno}")
+            if node.id not in ('True', 'False', 'None'):
+                raise ValueError(f"{self.name}: unsupported name {node.id} at line {node.lineno}")
+        elif isinstance(node, ast.Subscript):
+            if not (isinstance(node.value, ast.Name) and node.value.id == 'last_candle'
+                    and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str)):
+                raise ValueError(f"{self.name}: unsupported subscript at line {node.lineno}")
+        elif isinstance(node, ast.Constant):
+            pass
+        elif isinstance(node, (ast.BoolOp, ast.BinOp, ast.UnaryOp)):
+            if (isinstance(node, ast.BinOp) and (type(node.op) not in self.binary_ops)) or \
+                    (isinstance(node, ast.UnaryOp) and (type(node.op) not in self.unary_ops) and not isinstance(node.op, ast.Not)):
+                raise ValueError(f"{self.name}: unsupported operator at line {node.lineno}")
+            children = node.values if isinstance(node, ast.BoolOp) else ([node.left, node.right] if isinstance(node, ast.BinOp) else [node.operand])
+            for child in children:
+                uses_profit |= self.check_expression(child, thresholds)
+        else:
+            raise ValueError(f"{self.name}: unsupported expression at line {node.lineno}")
+
+        if uses_profit:
+            self.profit_nodes.add(id(node))
+        return uses_profit
+
+    # profit band of current_profit (column of the table returned by evaluate())
+    def band(self, current_profit: float) -> int:
+        i = int(np.searchsorted(self.thresholds, current_profit))
+        if (i < len(self.thresholds)) and (self.thresholds[i] == current_profit):
+            return 2 * i + 1
+        return 2 * i
+
+    # returns a [candles, profit bands] table of signal codes (0 for no sell, otherwise index into signal_names)
+    def evaluate(self, dataframe: DataFrame) -> np.ndarray:
+        length = len(dataframe)
+        codes = np.zeros((length, len(self.band_profits)), dtype=self.code_dtype)
+        candle_values = {}  # candle-only expressions are shared by all bands
+        with np.errstate(all='ignore'):
+            for band, profit in enumerate(self.band_profits):
+                decided = np.zeros(length, dtype=bool)
+                self.run(self.function.body, np.ones(length, dtype=bool), decided, codes[:, band], profit, dataframe, candle_values)
+        return codes
+
+    def run(self, statements, active, decided, codes, profit, dataframe, candle_values):
+        for statement in statements:
+            active = active & ~decided
+            if not active.any():
+                return
+            if isinstance(statement, ast.If):
+                test = self.test(statement.test, profit, dataframe, candle_values)
+                if isinstance(test, np.ndarray):
+                    self.run(statement.body, active & test, decided, codes, profit, dataframe, candle_values)
+                    self.run(statement.orelse, active & ~test, decided, codes, profit, dataframe, candle_values)
+                elif test:
+                    self.run(statement.body, active, decided, codes, profit, dataframe, candle_values)
+                else:
+                    self.run(statement.orelse, active, decided, codes, profit, dataframe, candle_values)
+            elif isinstance(statement, ast.Return):
+                sell, signal_name = ast.literal_eval(statement.value)
+                if sell and (signal_name is not None):
+                    codes[active] = self.signal_codes[signal_name]
+                decided |= active
+                return
+
+    # Python truth value, for each candle (NaN is True, same as bool(nan))
+    def truth(self, value: np.ndarray) -> np.ndarray:
+        if value.dtype == bool:
+            return value
+        if value.dtype.kind in 'iuf':
+            return value != 0
+        return np.frompyfunc(bool, 1, 1)(value).astype(bool)
+
+    # value of an expression used as a condition, either one bool or an array of them (one for each candle)
+    def test(self, node, profit, dataframe, candle_values):
+        if isinstance(node, ast.Subscript):
+            # columns are often used directly as conditions, only convert them once
+            key = ('truth', node.slice.value)
+            if key not in candle_values:
+                candle_values[key] = self.truth(self.value(node, profit, dataframe, candle_values))
+            return candle_values[key]
+        value = self.value(node, profit, dataframe, candle_values)
+        return self.truth(value) if isinstance(value, np.ndarray) else value
+
+    def value(self, node, profit, dataframe, candle_values):
+        candle_only = id(node) not in self.profit_nodes
+        if candle_only and (id(node) in candle_values):
+            return candle_values[id(node)]
+
+        if isinstance(node, ast.Constant):
+            result = node.value
+        elif isinstance(node, ast.Name):
+            result = {'True': True, 'False': False, 'None': None}[node.id] if node.id != 'current_profit' else profit
+        elif isinstance(node, ast.Subscript):
+            column = node.slice.value
+            if column not in candle_values:
+                candle_values[column] = dataframe[column].to_numpy()
+            result = candle_values[column]
+        elif isinstance(node, ast.UnaryOp):
+            if isinstance(node.op, ast.Not):
+                operand = self.test(node.operand, profit, dataframe, candle_values)
+                result = ~operand if isinstance(operand, np.ndarray) else (not operand)
+            else:
+                result = self.unary_ops[type(node.op)](self.value(node.operand, profit, dataframe, candle_values))
+        elif isinstance(node, ast.BinOp):
+            result = self.binary_ops[type(node.op)](self.value(node.left, profit, dataframe, candle_values),
+                                                    self.value(node.right, profit, dataframe, candle_values))
+        elif isinstance(node, ast.BoolOp):
+            is_and = isinstance(node.op, ast.And)
+            result = is_and
+            for child in node.values:
+                value = self.test(child, profit, dataframe, candle_values)
+                if isinstance(value, np.ndarray):
+                    result = value if isinstance(result, bool) else ((result & value) if is_and else (result | value))
+                elif bool(value) != is_and:
+                    # short circuit (False for and, True for or)
+                    result = not is_and
+                    break
+        else:  # ast.Compare
+            result = True
+            left = self.value(node.left, profit, dataframe, candle_values)
+            for op, comparator in zip(node.ops, node.comparators):
+                right = self.value(comparator, profit, dataframe, candle_values)
+                compared = self.compare_ops[type(op)](left, right)
+                if isinstance(compared, np.ndarray):
+                    result = compared if isinstance(result, bool) else (result & compared)
+                elif not compared:
+                    result = False
+                    break
+                left = right
+
+        if candle_only:
+            candle_values[id(node)] = result
+        return result
+
+    unary_ops = {
+        ast.USub: operator.neg,
+        ast.UAdd: operator.pos
+    }
+
+    binary_ops = {
+        ast.Add: operator.add,
+        ast.Sub: operator.sub,
+        ast.Mult: operator.mul,
+        ast.Div: operator.truediv
+    }
+
+    compare_ops = {
+        ast.Gt: operator.gt,
+        ast.Lt: operator.lt,
+        ast.GtE: operator.ge,
+        ast.LtE: operator.le,
+        ast.Eq: operator.eq,
+        ast.NotEq: operator.ne
+    }
+
+
+class CandleCache:
+
+    # Snapshot of the last rows of the analysed dataframe of each pair, so that the callbacks (custom_exit etc.), which
+    # are called for each open trade, don't have to extract rows with iloc every time. Rows are dicts, so they are used
+    # in the same way as the Series (row['close'], 'buy' in row), with the same value types as iloc.
+    # A snapshot is reused until the dataframe changes (last_updated, length or index of the last row).
+
+    def __init__(self, num_rows=1):
+        self.num_rows = num_rows
+        self.snapshots = {}
+
+    # returns the last row of the dataframe
+    def get_row(self, pair: str, dataframe: DataFrame, last_updated) -> dict:
+        return self.get_rows(pair, dataframe, last_updated, 1)[0]
+
+    # returns the last num_rows rows of the dataframe, last row first (fewer if the dataframe is shorter)
+    def get_rows(self, pair: str, dataframe: DataFrame, last_updated, num_rows=1) -> list:
+        key = (last_updated, len(dataframe), dataframe.index[-1] if len(dataframe) > 0 else None)
+        snapshot = self.snapshots.get(pair)
+        if (snapshot is None) or (snapshot['key'] != key) or (snapshot['num_rows'] < num_rows):
+            snapshot = self.take_snapshot(dataframe, key, max(num_rows, self.num_rows), snapshot)
+            self.snapshots[pair] = snapshot
+        return snapshot['rows'][:num_rows]
+
+    def take_snapshot(self, dataframe: DataFrame, key, num_rows: int, previous=None) -> dict:
+        tail = dataframe.iloc[-num_rows:]
+
+        # column names and types only change when the dataframe is analysed again
+        if (previous is not None) and (previous['key'][0] == key[0]):
+            columns, types = previous['columns'], previous['types']
+        else:
+            columns = tail.columns.tolist()
+            types = [dtype.type if (isinstance(dtype, np.dtype) and (dtype.kind in 'biuf')) else None
+                     for dtype in tail.dtypes]
+
+        # convert all of the columns in one step, then restore the numpy types of numeric values
+        values = tail.to_numpy(dtype=object)
+        rows = []
+        for i in range(len(tail) - 1, -1, -1):
+            rows.append({col: (value if value_type is None else value_type(value))
+                         for col, value_type, value in zip(columns, types, values[i])})
+
+        return {'key': key, 'num_rows': num_rows, 'rows': rows, 'columns': columns, 'types': types}
+
+
 class Cache:
 
     def __init__(self, path):